@@ -2,7 +2,7 @@ from datetime import datetime
 from uuid import UUID, uuid4
 from typing import Optional
 
-from sqlalchemy import DateTime, ForeignKey, func, Enum, JSON
+from sqlalchemy import DateTime, ForeignKey, func, Enum, JSON, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from core.database.database import BaseModel
@@ -21,6 +21,11 @@ class Activity(BaseModel):
         DateTime(timezone=True), nullable=False, default=func.now()
     )
 
+    __table_args__ = (
+        # Инкрементальные выгрузки BI читают активности, созданные после watermark
+        Index("ix_activities_created_at", "created_at"),
+    )
+
     deal: Mapped["Deal"] = relationship(back_populates="activities")
     author: Mapped[Optional["User"]] = relationship(back_populates="authored_activities")
 
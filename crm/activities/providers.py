@@ -4,6 +4,7 @@ from dishka import Provider, Scope, provide, FromComponent
 from activities.repositories import ActivityRepository
 from deals.repositories import DealRepository
 from activities.usecases import CreateActivityUseCase, ListActivitiesUseCase
+from live.services import LivePublisher
 from core.database.unit_of_work import UnitOfWork
 
 
@@ -23,8 +24,9 @@ class ActivityProvider(Provider):
         uow: Annotated[UnitOfWork, FromComponent("database")],
         activity_repository: Annotated[ActivityRepository, FromComponent("activities")],
         deal_repository: Annotated[DealRepository, FromComponent("deals")],
+        live_publisher: Annotated[LivePublisher, FromComponent("live")],
     ) -> CreateActivityUseCase:
-        return CreateActivityUseCase(uow, activity_repository, deal_repository)
+        return CreateActivityUseCase(uow, activity_repository, deal_repository, live_publisher)
 
     @provide
     def get_list_activities_usecase(
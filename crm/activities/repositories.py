@@ -1,12 +1,23 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Row, select
 from uuid import UUID
 from typing import Optional
 
 from activities.models import Activity
 from activities.entities import ActivityEntity
+from core.entities import entity_from_row
+from core.tracing import traced
 
 
+# Колонки ActivityEntity: списки читают их кортежами, без ORM-объектов и identity map
+ACTIVITY_COLUMNS = tuple(getattr(Activity, field) for field in ActivityEntity.model_fields)
+
+
+def activity_from_row(row: Row) -> ActivityEntity:
+    return entity_from_row(ActivityEntity, row)
+
+
+@traced
 class ActivityRepository:
     def __init__(self, session: AsyncSession):
         self._session = session
@@ -27,11 +38,10 @@ class ActivityRepository:
 
     async def list_by_deal(self, deal_id: UUID) -> list[ActivityEntity]:
         query = (
-            select(Activity)
+            select(*ACTIVITY_COLUMNS)
             .where(Activity.deal_id == deal_id)
             .order_by(Activity.created_at.desc())
         )
         result = await self._session.execute(query)
-        activities = result.scalars().all()
-        return [ActivityEntity.model_validate(a) for a in activities]
+        return [activity_from_row(row) for row in result]
 
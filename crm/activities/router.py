@@ -7,6 +7,7 @@ from dishka import FromComponent
 from activities.schemas import CreateActivityRequest, ActivityResponse, ActivitiesListResponse
 from activities.usecases import CreateActivityUseCase, ListActivitiesUseCase
 from auth.entities import AuthenticatedUser
+from core.responses import PydanticJSONResponse
 
 
 router = APIRouter(
@@ -23,7 +24,7 @@ async def list_activities(
     list_usecase: Annotated[ListActivitiesUseCase, FromComponent("activities")],
 ):
     activities = await list_usecase(user, deal_id)
-    return ActivitiesListResponse(data=activities)
+    return PydanticJSONResponse(ActivitiesListResponse(data=activities))
 
 
 @router.post("", response_model=ActivityResponse)
@@ -35,5 +36,5 @@ async def create_activity(
     create_usecase: Annotated[CreateActivityUseCase, FromComponent("activities")],
 ):
     activity = await create_usecase(user, deal_id, request.type, request.payload)
-    return ActivityResponse(data=activity)
+    return PydanticJSONResponse(ActivityResponse(data=activity))
 
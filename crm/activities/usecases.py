@@ -2,7 +2,9 @@ from uuid import UUID, uuid4
 from datetime import datetime, timezone
 
 from core.database.unit_of_work import UnitOfWork
+from core.metrics import instrumented
 from activities.repositories import ActivityRepository
+from live.services import LivePublisher
 from deals.repositories import DealRepository
 from activities.entities import ActivityEntity
 from activities.exceptions import ActivityAccessDeniedError
@@ -10,16 +12,19 @@ from deals.exceptions import DealNotFoundError
 from auth.entities import AuthenticatedUser
 
 
+@instrumented
 class CreateActivityUseCase:
     def __init__(
         self,
         uow: UnitOfWork,
         activity_repository: ActivityRepository,
         deal_repository: DealRepository,
+        live_publisher: LivePublisher,
     ):
         self._uow = uow
         self._activity_repository = activity_repository
         self._deal_repository = deal_repository
+        self._live_publisher = live_publisher
 
     async def __call__(
         self, user: AuthenticatedUser, deal_id: UUID, activity_type: str, payload: dict
@@ -40,9 +45,12 @@ class CreateActivityUseCase:
                 "payload": payload,
                 "created_at": datetime.now(timezone.utc),
             }
-            return await self._activity_repository.create(activity_data)
+            activity = await self._activity_repository.create(activity_data)
+            await self._live_publisher.publish(user.organization_id, "activity", [activity])
+            return activity
 
 
+@instrumented
 class ListActivitiesUseCase:
     def __init__(
         self,
@@ -1,6 +1,10 @@
-from pydantic import BaseModel
-from typing import Dict
+from pydantic import BaseModel, ConfigDict
+from typing import Dict, Optional
+from datetime import date, datetime
 from decimal import Decimal
+from uuid import UUID
+
+from analytics.enums import TimeseriesInterval, LeaderboardOrder, PivotDimension
 
 
 class DealsSummaryEntity(BaseModel):
@@ -19,3 +23,128 @@ class FunnelStageEntity(BaseModel):
 class DealsFunnelEntity(BaseModel):
     stages: list[FunnelStageEntity]
 
+
+
+class TimeseriesPointEntity(BaseModel):
+    bucket: date
+    created_count: int = 0
+    created_amount: Decimal = Decimal(0)
+    won_count: int = 0
+    won_amount: Decimal = Decimal(0)
+    lost_count: int = 0
+    lost_amount: Decimal = Decimal(0)
+
+
+class DealsTimeseriesEntity(BaseModel):
+    interval: TimeseriesInterval
+    date_from: date
+    date_to: date
+    points: list[TimeseriesPointEntity]
+
+    model_config = ConfigDict(use_enum_values=True)
+
+
+
+class StageVelocityEntity(BaseModel):
+    stage: str
+    # Вышедшие с этапа за период и сколько дней в среднем они на нем провели
+    exited_count: int
+    average_days_in_stage: Optional[float]
+    # Открытые сделки на этапе сейчас и сколько дней в среднем они уже на нем
+    open_count: int
+    open_average_age_days: Optional[float]
+
+
+class DealsStageVelocityEntity(BaseModel):
+    date_from: date
+    date_to: date
+    stages: list[StageVelocityEntity]
+
+
+class StageTransitionEntity(BaseModel):
+    from_stage: str
+    to_stage: str
+    transition_count: int
+
+
+class StageConversionEntity(BaseModel):
+    stage: str
+    entered_count: int
+    advanced_count: int
+    conversion_rate: float
+
+
+class DealsStageConversionEntity(BaseModel):
+    date_from: date
+    date_to: date
+    stages: list[StageConversionEntity]
+    transitions: list[StageTransitionEntity]
+
+
+class ViewRefreshEntity(BaseModel):
+    refreshed_at: datetime
+    last_change_id: int
+    snapshot_xmin: int
+
+
+class FreshnessEntity(BaseModel):
+    refreshed_at: datetime
+    # Изменения сделок организации, еще не попавшие в ответ (считаются до порога обновления)
+    pending_changes: int
+
+
+class OwnerStatsEntity(BaseModel):
+    owner_id: UUID
+    owner_name: str
+    pipeline_count: int
+    pipeline_amount: Decimal
+    won_count: int
+    won_amount: Decimal
+    lost_count: int
+    lost_amount: Decimal
+    win_rate: float
+
+
+class OwnerLeaderboardEntity(BaseModel):
+    order_by: LeaderboardOrder
+    owners: list[OwnerStatsEntity]
+    freshness: FreshnessEntity
+
+    model_config = ConfigDict(use_enum_values=True)
+
+
+class PipelineOwnerEntity(BaseModel):
+    owner_id: UUID
+    owner_name: str
+    deal_count: int
+    amount: Decimal
+
+
+class PipelineStageEntity(BaseModel):
+    stage: str
+    deal_count: int
+    amount: Decimal
+    owners: list[PipelineOwnerEntity]
+
+
+class DealsPipelineEntity(BaseModel):
+    stages: list[PipelineStageEntity]
+    freshness: FreshnessEntity
+
+
+class PivotCellEntity(BaseModel):
+    # Значения измерений строкой: UUID владельца, этап, статус, валюта или начало периода
+    keys: Dict[str, str]
+    deal_count: int
+    amount: Decimal
+    average_amount: Decimal
+
+
+class DealsPivotEntity(BaseModel):
+    group_by: list[PivotDimension]
+    cells: list[PivotCellEntity]
+    deal_count: int
+    amount: Decimal
+    snapshot_at: datetime
+
+    model_config = ConfigDict(use_enum_values=True)
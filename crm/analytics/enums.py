@@ -0,0 +1,24 @@
+from enum import Enum as PyEnum
+
+
+class TimeseriesInterval(str, PyEnum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class LeaderboardOrder(str, PyEnum):
+    WON_AMOUNT = "won_amount"
+    WON_COUNT = "won_count"
+    WIN_RATE = "win_rate"
+    PIPELINE_AMOUNT = "pipeline_amount"
+
+
+class PivotDimension(str, PyEnum):
+    OWNER_ID = "owner_id"
+    STAGE = "stage"
+    STATUS = "status"
+    CURRENCY = "currency"
+    CREATED_DAY = "created_day"
+    CREATED_WEEK = "created_week"
+    CREATED_MONTH = "created_month"
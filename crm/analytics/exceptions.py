@@ -0,0 +1,11 @@
+from core.exceptions import BadRequestException
+
+
+class InvalidTimeseriesRangeError(BadRequestException):
+    def __init__(self, message: str = "error.analytics.invalid_range"):
+        super().__init__(message)
+
+
+class InvalidPivotError(BadRequestException):
+    def __init__(self, message: str = "error.analytics.invalid_pivot"):
+        super().__init__(message)
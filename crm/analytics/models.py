@@ -0,0 +1,60 @@
+from datetime import date, datetime
+from uuid import UUID
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, Date, DateTime, Enum, Float, ForeignKey, Integer, Numeric, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.database.database import BaseModel
+from deals.enums import DealStage
+
+
+class DealStatsDaily(BaseModel):
+    """
+    Дневной срез сделок организации (UTC): созданные по created_at, выигранные и
+    проигранные по closed_at. Поддерживается инкрементально use case'ами сделок.
+    """
+
+    __tablename__ = "deal_stats_daily"
+
+    organization_id: Mapped[UUID] = mapped_column(ForeignKey("organizations.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    created_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_amount: Mapped[Decimal] = mapped_column(Numeric(18, 2), nullable=False, default=0)
+    won_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    won_amount: Mapped[Decimal] = mapped_column(Numeric(18, 2), nullable=False, default=0)
+    lost_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    lost_amount: Mapped[Decimal] = mapped_column(Numeric(18, 2), nullable=False, default=0)
+
+
+class DealStageTransitionDaily(BaseModel):
+    """
+    Переходы сделок между этапами по дням выхода с этапа (UTC): число переходов и
+    суммарное время, проведенное на этапе from_stage. Поддерживается инкрементально
+    при смене этапа; удаление сделки историю переходов не меняет.
+    """
+
+    __tablename__ = "deal_stage_transitions_daily"
+
+    organization_id: Mapped[UUID] = mapped_column(ForeignKey("organizations.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    from_stage: Mapped[DealStage] = mapped_column(Enum(DealStage), primary_key=True)
+    to_stage: Mapped[DealStage] = mapped_column(Enum(DealStage), primary_key=True)
+    transition_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    duration_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+
+
+class AnalyticsRefresh(BaseModel):
+    """
+    Состояние материализованных представлений аналитики: когда обновлены и
+    докуда в change_events учтены изменения (для свежести ответа и порога N изменений).
+    """
+
+    __tablename__ = "analytics_refreshes"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # max(change_events.id) на момент обновления
+    last_change_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # Транзакции с txid не меньше этого могли не попасть в снимок представления
+    snapshot_xmin: Mapped[int] = mapped_column(BigInteger, nullable=False)
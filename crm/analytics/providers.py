@@ -1,28 +1,159 @@
+from datetime import timedelta
 from typing import Annotated
 from dishka import Provider, Scope, provide, FromComponent
 
-from analytics.usecases import GetDealsSummaryUseCase, GetDealsFunnelUseCase
+from analytics.usecases import (
+    GetDealsSummaryUseCase,
+    GetDealsFunnelUseCase,
+    GetDealsTimeseriesUseCase,
+    GetStageVelocityUseCase,
+    GetStageConversionUseCase,
+    GetOwnerLeaderboardUseCase,
+    GetDealsPipelineUseCase,
+    RefreshDealViewsUseCase,
+    GetDealsPivotUseCase,
+)
+from analytics.repositories import DealStatsRepository, DealStageStatsRepository, DealViewsRepository
+from analytics.services import DealStatsRollup
 from deals.repositories import DealRepository
 from core.database.unit_of_work import UnitOfWork
+from core.environment.config import Settings
+from core.cache import InvalidationBus, LocalCache, SingleFlight
 
 
 class AnalyticsProvider(Provider):
     scope = Scope.REQUEST
     component = "analytics"
 
+    @provide
+    def get_deal_stats_repository(
+        self, uow: Annotated[UnitOfWork, FromComponent("database")]
+    ) -> DealStatsRepository:
+        return DealStatsRepository(uow.session)
+
+    @provide
+    def get_deal_stage_stats_repository(
+        self, uow: Annotated[UnitOfWork, FromComponent("database")]
+    ) -> DealStageStatsRepository:
+        return DealStageStatsRepository(uow.session)
+
+    @provide
+    def get_deal_views_repository(
+        self, uow: Annotated[UnitOfWork, FromComponent("database")]
+    ) -> DealViewsRepository:
+        return DealViewsRepository(uow.session)
+
+    @provide(scope=Scope.APP)
+    def get_snapshot_cache(
+        self,
+        settings: Annotated[Settings, FromComponent("environment")],
+        bus: Annotated[InvalidationBus, FromComponent("cache")],
+    ) -> LocalCache:
+        # Снимки сделок для сводок: по одному на организацию
+        return bus.register(LocalCache(
+            "deal_snapshots", settings.analytics_snapshot_cache_size, settings.analytics_snapshot_ttl_seconds
+        ))
+
+    @provide
+    def get_deal_stats_rollup(
+        self,
+        deal_stats_repository: Annotated[DealStatsRepository, FromComponent("analytics")],
+        deal_stage_stats_repository: Annotated[DealStageStatsRepository, FromComponent("analytics")],
+    ) -> DealStatsRollup:
+        return DealStatsRollup(deal_stats_repository, deal_stage_stats_repository)
+
     @provide
     def get_deals_summary_usecase(
         self,
         uow: Annotated[UnitOfWork, FromComponent("database")],
         deal_repository: Annotated[DealRepository, FromComponent("deals")],
+        single_flight: Annotated[SingleFlight, FromComponent("cache")],
     ) -> GetDealsSummaryUseCase:
-        return GetDealsSummaryUseCase(uow, deal_repository)
+        return GetDealsSummaryUseCase(uow, deal_repository, single_flight)
 
     @provide
     def get_deals_funnel_usecase(
         self,
         uow: Annotated[UnitOfWork, FromComponent("database")],
         deal_repository: Annotated[DealRepository, FromComponent("deals")],
+        single_flight: Annotated[SingleFlight, FromComponent("cache")],
     ) -> GetDealsFunnelUseCase:
-        return GetDealsFunnelUseCase(uow, deal_repository)
+        return GetDealsFunnelUseCase(uow, deal_repository, single_flight)
+
+
+    @provide
+    def get_deals_timeseries_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        deal_stats_repository: Annotated[DealStatsRepository, FromComponent("analytics")],
+        single_flight: Annotated[SingleFlight, FromComponent("cache")],
+    ) -> GetDealsTimeseriesUseCase:
+        return GetDealsTimeseriesUseCase(uow, deal_stats_repository, single_flight)
+
+    @provide
+    def get_stage_velocity_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        deal_repository: Annotated[DealRepository, FromComponent("deals")],
+        deal_stage_stats_repository: Annotated[DealStageStatsRepository, FromComponent("analytics")],
+        single_flight: Annotated[SingleFlight, FromComponent("cache")],
+    ) -> GetStageVelocityUseCase:
+        return GetStageVelocityUseCase(uow, deal_repository, deal_stage_stats_repository, single_flight)
 
+    @provide
+    def get_stage_conversion_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        deal_stats_repository: Annotated[DealStatsRepository, FromComponent("analytics")],
+        deal_stage_stats_repository: Annotated[DealStageStatsRepository, FromComponent("analytics")],
+        single_flight: Annotated[SingleFlight, FromComponent("cache")],
+    ) -> GetStageConversionUseCase:
+        return GetStageConversionUseCase(uow, deal_stats_repository, deal_stage_stats_repository, single_flight)
+
+    @provide
+    def get_owner_leaderboard_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        deal_views_repository: Annotated[DealViewsRepository, FromComponent("analytics")],
+        single_flight: Annotated[SingleFlight, FromComponent("cache")],
+        settings: Annotated[Settings, FromComponent("environment")],
+    ) -> GetOwnerLeaderboardUseCase:
+        return GetOwnerLeaderboardUseCase(
+            uow, deal_views_repository, single_flight, settings.analytics_views_refresh_changes
+        )
+
+    @provide
+    def get_deals_pipeline_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        deal_views_repository: Annotated[DealViewsRepository, FromComponent("analytics")],
+        single_flight: Annotated[SingleFlight, FromComponent("cache")],
+        settings: Annotated[Settings, FromComponent("environment")],
+    ) -> GetDealsPipelineUseCase:
+        return GetDealsPipelineUseCase(
+            uow, deal_views_repository, single_flight, settings.analytics_views_refresh_changes
+        )
+
+    @provide
+    def get_refresh_deal_views_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        deal_views_repository: Annotated[DealViewsRepository, FromComponent("analytics")],
+        settings: Annotated[Settings, FromComponent("environment")],
+    ) -> RefreshDealViewsUseCase:
+        return RefreshDealViewsUseCase(
+            uow,
+            deal_views_repository,
+            timedelta(seconds=settings.analytics_views_max_age_seconds),
+            settings.analytics_views_refresh_changes,
+        )
+
+    @provide
+    def get_deals_pivot_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        deal_repository: Annotated[DealRepository, FromComponent("deals")],
+        snapshot_cache: Annotated[LocalCache, FromComponent("analytics")],
+        single_flight: Annotated[SingleFlight, FromComponent("cache")],
+    ) -> GetDealsPivotUseCase:
+        return GetDealsPivotUseCase(uow, deal_repository, snapshot_cache, single_flight)
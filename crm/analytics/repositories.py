@@ -0,0 +1,361 @@
+from datetime import date
+from decimal import Decimal
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import (
+    Date, DateTime, Enum, Integer, Numeric, Uuid, cast, column, delete, func, literal, literal_column, select,
+    table, text, update,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from analytics.enums import TimeseriesInterval, LeaderboardOrder
+from analytics.entities import TimeseriesPointEntity, ViewRefreshEntity, OwnerStatsEntity
+from analytics.models import DealStatsDaily, DealStageTransitionDaily, AnalyticsRefresh
+from changes.enums import ChangeEntityType
+from changes.models import ChangeEvent
+from core.tracing import traced
+from deals.enums import DealStage
+from users.models import User
+
+
+STATS_COUNTERS = ("created_count", "created_amount", "won_count", "won_amount", "lost_count", "lost_amount")
+
+# Полный пересчет срезов по таблице deals: после массовой загрузки в обход use case'ов.
+# Суммы - amount_base (в базовой валюте)
+REBUILD_SQL = """
+INSERT INTO deal_stats_daily (
+    organization_id, day, created_count, created_amount, won_count, won_amount, lost_count, lost_amount
+)
+SELECT organization_id, day, sum(created_count), sum(created_amount),
+       sum(won_count), sum(won_amount), sum(lost_count), sum(lost_amount)
+FROM (
+    SELECT organization_id, (created_at AT TIME ZONE 'UTC')::date AS day,
+           1 AS created_count, coalesce(amount_base, 0) AS created_amount,
+           0 AS won_count, 0 AS won_amount, 0 AS lost_count, 0 AS lost_amount
+    FROM deals
+    WHERE {where}
+    UNION ALL
+    SELECT organization_id, (closed_at AT TIME ZONE 'UTC')::date,
+           0, 0,
+           (status = 'WON')::int, CASE WHEN status = 'WON' THEN coalesce(amount_base, 0) ELSE 0 END,
+           (status = 'LOST')::int, CASE WHEN status = 'LOST' THEN coalesce(amount_base, 0) ELSE 0 END
+    FROM deals
+    WHERE {where} AND status IN ('WON', 'LOST') AND closed_at IS NOT NULL
+) AS contributions
+GROUP BY organization_id, day
+"""
+
+# Переходы между этапами из таймлайна: время на этапе - от предыдущей смены этапа (или создания сделки)
+REBUILD_TRANSITIONS_SQL = """
+INSERT INTO deal_stage_transitions_daily (
+    organization_id, day, from_stage, to_stage, transition_count, duration_seconds
+)
+SELECT organization_id, day, from_stage, to_stage, count(*), sum(extract(epoch FROM left_at - entered_at))
+FROM (
+    SELECT deals.organization_id,
+           (activities.created_at AT TIME ZONE 'UTC')::date AS day,
+           upper(activities.payload ->> 'old_stage')::dealstage AS from_stage,
+           upper(activities.payload ->> 'new_stage')::dealstage AS to_stage,
+           activities.created_at AS left_at,
+           coalesce(
+               lag(activities.created_at) OVER (PARTITION BY activities.deal_id ORDER BY activities.created_at),
+               deals.created_at
+           ) AS entered_at
+    FROM activities
+    JOIN deals ON deals.id = activities.deal_id
+    WHERE activities.type = 'STAGE_CHANGED' AND {where}
+) AS transitions
+GROUP BY organization_id, day, from_stage, to_stage
+"""
+
+DEAL_VIEWS = "deal_views"
+
+# Материализованные представления создаются миграцией; в метаданных ORM их нет
+deal_owner_stats = table(
+    "deal_owner_stats",
+    column("organization_id", Uuid),
+    column("owner_id", Uuid),
+    column("pipeline_count", Integer),
+    column("pipeline_amount", Numeric),
+    column("won_count", Integer),
+    column("won_amount", Numeric),
+    column("lost_count", Integer),
+    column("lost_amount", Numeric),
+)
+
+deal_pipeline_stats = table(
+    "deal_pipeline_stats",
+    column("organization_id", Uuid),
+    column("stage", Enum(DealStage)),
+    column("owner_id", Uuid),
+    column("deal_count", Integer),
+    column("amount", Numeric),
+)
+
+
+@traced
+class DealStatsRepository:
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def increment(self, organization_id: UUID, deltas: dict[date, dict[str, Any]]):
+        """
+        Прибавляет дельты к дневным срезам одним INSERT ... ON CONFLICT DO UPDATE.
+        Дни идут по возрастанию, чтобы параллельные транзакции блокировали строки
+        в одном порядке и не ловили deadlock.
+        """
+        if not deltas:
+            return
+        rows = [
+            {"organization_id": organization_id, "day": day, **{name: values.get(name, 0) for name in STATS_COUNTERS}}
+            for day, values in sorted(deltas.items())
+        ]
+        stmt = insert(DealStatsDaily).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DealStatsDaily.organization_id, DealStatsDaily.day],
+            set_={name: getattr(DealStatsDaily, name) + getattr(stmt.excluded, name) for name in STATS_COUNTERS},
+        )
+        await self._session.execute(stmt)
+
+    async def get_timeseries(
+        self,
+        organization_id: UUID,
+        interval: TimeseriesInterval,
+        date_from: date,
+        date_to: date,
+    ) -> list[TimeseriesPointEntity]:
+        """Непустые корзины date_trunc(interval) в пределах [date_from, date_to]"""
+        # Интервал - значение enum, литерал нужен, чтобы SELECT и GROUP BY совпали
+        bucket = cast(
+            func.date_trunc(literal_column(f"'{interval.value}'"), cast(DealStatsDaily.day, DateTime)), Date
+        ).label("bucket")
+        query = (
+            select(bucket, *(func.sum(getattr(DealStatsDaily, name)).label(name) for name in STATS_COUNTERS))
+            .where(
+                DealStatsDaily.organization_id == organization_id,
+                DealStatsDaily.day >= date_from,
+                DealStatsDaily.day <= date_to,
+            )
+            .group_by(bucket)
+            .order_by(bucket)
+        )
+        result = await self._session.execute(query)
+        return [TimeseriesPointEntity.model_construct(**row._mapping) for row in result.all()]
+
+    async def rebuild(self, organization_id: Optional[UUID] = None):
+        if organization_id is None:
+            await self._session.execute(delete(DealStatsDaily))
+            await self._session.execute(text(REBUILD_SQL.format(where="true")))
+            return
+        await self._session.execute(delete(DealStatsDaily).where(DealStatsDaily.organization_id == organization_id))
+        await self._session.execute(
+            text(REBUILD_SQL.format(where="organization_id = :organization_id")),
+            {"organization_id": organization_id},
+        )
+
+    async def get_created_count(self, organization_id: UUID, date_from: date, date_to: date) -> int:
+        query = select(func.coalesce(func.sum(DealStatsDaily.created_count), 0)).where(
+            DealStatsDaily.organization_id == organization_id,
+            DealStatsDaily.day >= date_from,
+            DealStatsDaily.day <= date_to,
+        )
+        created = await self._session.scalar(query)
+        return created or 0
+
+
+@traced
+class DealStageStatsRepository:
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def add_transition(
+        self,
+        organization_id: UUID,
+        day: date,
+        from_stage: DealStage,
+        to_stage: DealStage,
+        duration_seconds: float,
+    ):
+        stmt = insert(DealStageTransitionDaily).values(
+            organization_id=organization_id,
+            day=day,
+            from_stage=from_stage,
+            to_stage=to_stage,
+            transition_count=1,
+            duration_seconds=duration_seconds,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                DealStageTransitionDaily.organization_id,
+                DealStageTransitionDaily.day,
+                DealStageTransitionDaily.from_stage,
+                DealStageTransitionDaily.to_stage,
+            ],
+            set_={
+                "transition_count": DealStageTransitionDaily.transition_count + 1,
+                "duration_seconds": DealStageTransitionDaily.duration_seconds + stmt.excluded.duration_seconds,
+            },
+        )
+        await self._session.execute(stmt)
+
+    async def get_transitions(
+        self,
+        organization_id: UUID,
+        date_from: date,
+        date_to: date,
+    ) -> list[tuple[DealStage, DealStage, int, float]]:
+        """Переходы за [date_from, date_to] по дню выхода с этапа: откуда, куда, сколько, секунд на этапе"""
+        query = (
+            select(
+                DealStageTransitionDaily.from_stage,
+                DealStageTransitionDaily.to_stage,
+                func.sum(DealStageTransitionDaily.transition_count).label("transition_count"),
+                func.sum(DealStageTransitionDaily.duration_seconds).label("duration_seconds"),
+            )
+            .where(
+                DealStageTransitionDaily.organization_id == organization_id,
+                DealStageTransitionDaily.day >= date_from,
+                DealStageTransitionDaily.day <= date_to,
+            )
+            .group_by(DealStageTransitionDaily.from_stage, DealStageTransitionDaily.to_stage)
+            .order_by(DealStageTransitionDaily.from_stage, DealStageTransitionDaily.to_stage)
+        )
+        result = await self._session.execute(query)
+        return [tuple(row) for row in result.all()]
+
+    async def rebuild(self, organization_id: Optional[UUID] = None):
+        """Пересчет по таймлайну; переходы удаленных сделок в него уже не попадут"""
+        if organization_id is None:
+            await self._session.execute(delete(DealStageTransitionDaily))
+            await self._session.execute(text(REBUILD_TRANSITIONS_SQL.format(where="true")))
+            return
+        await self._session.execute(
+            delete(DealStageTransitionDaily).where(DealStageTransitionDaily.organization_id == organization_id)
+        )
+        await self._session.execute(
+            text(REBUILD_TRANSITIONS_SQL.format(where="deals.organization_id = :organization_id")),
+            {"organization_id": organization_id},
+        )
+
+
+@traced
+class DealViewsRepository:
+    """Материализованные представления по владельцам сделок: deal_owner_stats и deal_pipeline_stats"""
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def get_refresh_state(self) -> ViewRefreshEntity:
+        result = await self._session.execute(
+            select(AnalyticsRefresh.refreshed_at, AnalyticsRefresh.last_change_id, AnalyticsRefresh.snapshot_xmin)
+            .where(AnalyticsRefresh.name == DEAL_VIEWS)
+        )
+        return ViewRefreshEntity.model_construct(**result.one()._mapping)
+
+    async def lock_refresh_state(self) -> Optional[ViewRefreshEntity]:
+        """Блокирует состояние до конца транзакции; None - представления уже обновляет другой воркер"""
+        result = await self._session.execute(
+            select(AnalyticsRefresh.refreshed_at, AnalyticsRefresh.last_change_id, AnalyticsRefresh.snapshot_xmin)
+            .where(AnalyticsRefresh.name == DEAL_VIEWS)
+            .with_for_update(skip_locked=True)
+        )
+        row = result.one_or_none()
+        return ViewRefreshEntity.model_construct(**row._mapping) if row else None
+
+    async def count_pending_changes(
+        self,
+        state: ViewRefreshEntity,
+        limit: int,
+        organization_id: Optional[UUID] = None,
+    ) -> int:
+        """
+        Изменения сделок после обновления, не больше limit.
+        По организации - по txid из индекса ленты изменений (с запасом: учитываются
+        и часть транзакций, успевших в снимок), по всем - по первичному ключу.
+        """
+        query = select(literal(1)).where(ChangeEvent.entity_type == ChangeEntityType.DEAL)
+        if organization_id is None:
+            query = query.where(ChangeEvent.id > state.last_change_id)
+        else:
+            query = query.where(
+                ChangeEvent.organization_id == organization_id,
+                ChangeEvent.txid >= state.snapshot_xmin,
+            )
+        changes = await self._session.scalar(select(func.count()).select_from(query.limit(limit).subquery()))
+        return changes or 0
+
+    async def refresh(self):
+        """
+        REFRESH MATERIALIZED VIEW CONCURRENTLY не блокирует чтение представлений.
+        Отметка берется до обновления: изменения, закоммиченные между ней и снимком
+        REFRESH, будут посчитаны как еще не учтенные - свежесть занижается, а не завышается.
+        """
+        marker = (await self._session.execute(text(
+            "SELECT clock_timestamp() AS refreshed_at, "
+            "(SELECT coalesce(max(id), 0) FROM change_events) AS last_change_id, "
+            "txid_snapshot_xmin(txid_current_snapshot()) AS snapshot_xmin"
+        ))).one()
+        await self._session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY deal_owner_stats"))
+        await self._session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY deal_pipeline_stats"))
+        await self._session.execute(
+            update(AnalyticsRefresh).where(AnalyticsRefresh.name == DEAL_VIEWS).values(**marker._mapping)
+        )
+
+    async def get_owner_stats(
+        self,
+        organization_id: UUID,
+        order_by: LeaderboardOrder,
+        limit: int,
+    ) -> list[OwnerStatsEntity]:
+        stats = deal_owner_stats.c
+        closed = stats.won_count + stats.lost_count
+        win_rate = func.coalesce(
+            func.round(cast(stats.won_count, Numeric) * 100 / func.nullif(closed, 0), 2), 0
+        ).label("win_rate")
+        sort_columns = {
+            LeaderboardOrder.WON_AMOUNT: stats.won_amount,
+            LeaderboardOrder.WON_COUNT: stats.won_count,
+            LeaderboardOrder.WIN_RATE: win_rate,
+            LeaderboardOrder.PIPELINE_AMOUNT: stats.pipeline_amount,
+        }
+        query = (
+            select(
+                stats.owner_id,
+                User.name.label("owner_name"),
+                stats.pipeline_count,
+                stats.pipeline_amount,
+                stats.won_count,
+                stats.won_amount,
+                stats.lost_count,
+                stats.lost_amount,
+                win_rate,
+            )
+            .join(User, User.id == stats.owner_id)
+            .where(stats.organization_id == organization_id)
+            .order_by(sort_columns[order_by].desc(), stats.owner_id)
+            .limit(limit)
+        )
+        result = await self._session.execute(query)
+        return [
+            OwnerStatsEntity.model_construct(**{**row._mapping, "win_rate": float(row.win_rate)})
+            for row in result.all()
+        ]
+
+    async def get_pipeline(
+        self,
+        organization_id: UUID,
+        owner_id: Optional[UUID] = None,
+    ) -> list[tuple[DealStage, UUID, str, int, Decimal]]:
+        stats = deal_pipeline_stats.c
+        query = (
+            select(stats.stage, stats.owner_id, User.name, stats.deal_count, stats.amount)
+            .join(User, User.id == stats.owner_id)
+            .where(stats.organization_id == organization_id)
+            .order_by(stats.stage, stats.amount.desc(), stats.owner_id)
+        )
+        if owner_id is not None:
+            query = query.where(stats.owner_id == owner_id)
+        result = await self._session.execute(query)
+        return [tuple(row) for row in result.all()]
@@ -1,11 +1,34 @@
-from typing import Annotated
+from datetime import date, datetime, timedelta, timezone
+from typing import Annotated, Optional
+from uuid import UUID
 from fastapi import APIRouter, Query
 from dishka.integrations.fastapi import inject
 from dishka import FromComponent
 
-from analytics.entities import DealsSummaryEntity, DealsFunnelEntity
-from analytics.usecases import GetDealsSummaryUseCase, GetDealsFunnelUseCase
+from analytics.entities import (
+    DealsSummaryEntity,
+    DealsFunnelEntity,
+    DealsTimeseriesEntity,
+    DealsStageVelocityEntity,
+    DealsStageConversionEntity,
+    OwnerLeaderboardEntity,
+    DealsPipelineEntity,
+    DealsPivotEntity,
+)
+from analytics.enums import TimeseriesInterval, LeaderboardOrder, PivotDimension
+from analytics.usecases import (
+    GetDealsSummaryUseCase,
+    GetDealsFunnelUseCase,
+    GetDealsTimeseriesUseCase,
+    GetStageVelocityUseCase,
+    GetStageConversionUseCase,
+    GetOwnerLeaderboardUseCase,
+    GetDealsPipelineUseCase,
+    GetDealsPivotUseCase,
+)
 from auth.entities import AuthenticatedUser
+from deals.enums import DealStage, DealStatus
+from core.responses import PydanticJSONResponse
 
 
 router = APIRouter(
@@ -21,7 +44,8 @@ async def get_deals_summary(
     summary_usecase: Annotated[GetDealsSummaryUseCase, FromComponent("analytics")],
     days: int = Query(30, ge=1, le=365),
 ):
-    return await summary_usecase(user, days)
+    summary = await summary_usecase(user, days)
+    return PydanticJSONResponse(summary)
 
 
 @router.get("/deals/funnel", response_model=DealsFunnelEntity)
@@ -30,5 +54,113 @@ async def get_deals_funnel(
     user: Annotated[AuthenticatedUser, FromComponent("auth")],
     funnel_usecase: Annotated[GetDealsFunnelUseCase, FromComponent("analytics")],
 ):
-    return await funnel_usecase(user)
+    funnel = await funnel_usecase(user)
+    return PydanticJSONResponse(funnel)
+
+
+
+@router.get("/deals/timeseries", response_model=DealsTimeseriesEntity)
+@inject
+async def get_deals_timeseries(
+    user: Annotated[AuthenticatedUser, FromComponent("auth")],
+    timeseries_usecase: Annotated[GetDealsTimeseriesUseCase, FromComponent("analytics")],
+    interval: TimeseriesInterval = Query(TimeseriesInterval.DAY),
+    date_from: Optional[date] = Query(None, description="по умолчанию - 30 дней до date_to"),
+    date_to: Optional[date] = Query(None, description="по умолчанию - сегодня (UTC)"),
+):
+    """
+    Созданные, выигранные и проигранные сделки по дням, неделям или месяцам (UTC).
+
+    Выигранные и проигранные считаются по дню закрытия сделки. Первая и последняя
+    корзины могут быть неполными: учитываются только дни внутри диапазона.
+    """
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=30)
+    timeseries = await timeseries_usecase(user, interval, date_from, date_to)
+    return PydanticJSONResponse(timeseries)
 
+
+@router.get("/deals/stage-velocity", response_model=DealsStageVelocityEntity)
+@inject
+async def get_stage_velocity(
+    user: Annotated[AuthenticatedUser, FromComponent("auth")],
+    velocity_usecase: Annotated[GetStageVelocityUseCase, FromComponent("analytics")],
+    date_from: Optional[date] = Query(None, description="по умолчанию - 90 дней до date_to"),
+    date_to: Optional[date] = Query(None, description="по умолчанию - сегодня (UTC)"),
+):
+    """
+    Сколько дней сделки проводят на каждом этапе: по вышедшим с этапа за период
+    (день выхода, UTC) и по открытым сделкам, которые на этапе сейчас.
+    """
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=90)
+    velocity = await velocity_usecase(user, date_from, date_to)
+    return PydanticJSONResponse(velocity)
+
+
+@router.get("/deals/stage-conversion", response_model=DealsStageConversionEntity)
+@inject
+async def get_stage_conversion(
+    user: Annotated[AuthenticatedUser, FromComponent("auth")],
+    conversion_usecase: Annotated[GetStageConversionUseCase, FromComponent("analytics")],
+    date_from: Optional[date] = Query(None, description="по умолчанию - 90 дней до date_to"),
+    date_to: Optional[date] = Query(None, description="по умолчанию - сегодня (UTC)"),
+):
+    """
+    Переходы между этапами за период и конверсия каждого этапа: доля перешедших на
+    более поздний этап среди вошедших на него за период (на первый этап - созданные).
+    """
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=90)
+    conversion = await conversion_usecase(user, date_from, date_to)
+    return PydanticJSONResponse(conversion)
+
+
+@router.get("/deals/leaderboard", response_model=OwnerLeaderboardEntity)
+@inject
+async def get_owner_leaderboard(
+    user: Annotated[AuthenticatedUser, FromComponent("auth")],
+    leaderboard_usecase: Annotated[GetOwnerLeaderboardUseCase, FromComponent("analytics")],
+    order_by: LeaderboardOrder = Query(LeaderboardOrder.WON_AMOUNT),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    Владельцы сделок: открытая воронка, выигранные и проигранные, доля выигранных
+    среди закрытых (%). Данные из материализованного представления, их возраст - в freshness.
+    """
+    leaderboard = await leaderboard_usecase(user, order_by, limit)
+    return PydanticJSONResponse(leaderboard)
+
+
+@router.get("/deals/pipeline", response_model=DealsPipelineEntity)
+@inject
+async def get_deals_pipeline(
+    user: Annotated[AuthenticatedUser, FromComponent("auth")],
+    pipeline_usecase: Annotated[GetDealsPipelineUseCase, FromComponent("analytics")],
+    owner_id: Optional[UUID] = Query(None),
+):
+    """Открытые сделки (new, in_progress) по этапам с разбивкой по владельцам"""
+    pipeline = await pipeline_usecase(user, owner_id)
+    return PydanticJSONResponse(pipeline)
+
+
+@router.get("/deals/pivot", response_model=DealsPivotEntity)
+@inject
+async def get_deals_pivot(
+    user: Annotated[AuthenticatedUser, FromComponent("auth")],
+    pivot_usecase: Annotated[GetDealsPivotUseCase, FromComponent("analytics")],
+    group_by: list[PivotDimension] = Query([]),
+    owner_id: list[UUID] = Query([]),
+    stage: list[DealStage] = Query([]),
+    status: list[DealStatus] = Query([]),
+    currency: list[str] = Query([]),
+    date_from: Optional[date] = Query(None, description="день создания сделки (UTC), включительно"),
+    date_to: Optional[date] = Query(None, description="день создания сделки (UTC), включительно"),
+):
+    """
+    Число сделок и сумма в базовой валюте в разрезе любых измерений (до четырех),
+    например owner_id x stage x created_month с фильтром по валюте сделки.
+    Считается по снимку сделок в памяти; момент снимка - snapshot_at.
+    """
+    pivot = await pivot_usecase(user, group_by, owner_id, stage, status, currency, date_from, date_to)
+    return PydanticJSONResponse(pivot)
@@ -0,0 +1,255 @@
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional, Sequence
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import Row
+
+from analytics.enums import PivotDimension
+from analytics.exceptions import InvalidPivotError
+from analytics.repositories import DealStatsRepository, DealStageStatsRepository
+from deals.entities import DealEntity
+from deals.enums import DealStatus, DealStage
+
+
+CLOSED_COUNTERS = {
+    DealStatus.WON: ("won_count", "won_amount"),
+    DealStatus.LOST: ("lost_count", "lost_amount"),
+}
+
+
+def _contributions(deal: DealEntity) -> dict[date, dict[str, int | Decimal]]:
+    """Вклад сделки в дневные срезы: создание в день created_at, закрытие в день closed_at"""
+    # Количества остаются int, суммы - Decimal
+    days: dict[date, dict[str, int | Decimal]] = defaultdict(lambda: defaultdict(int))
+    # Суммы - в базовой валюте; сделка в валюте без курса учитывается только в количестве
+    amount = deal.amount_base or Decimal(0)
+    created = days[deal.created_at.astimezone(timezone.utc).date()]
+    created["created_count"] += 1
+    created["created_amount"] += amount
+
+    counters = CLOSED_COUNTERS.get(DealStatus(deal.status))
+    if counters and deal.closed_at is not None:
+        closed = days[deal.closed_at.astimezone(timezone.utc).date()]
+        closed[counters[0]] += 1
+        closed[counters[1]] += amount
+    return days
+
+
+class DealStatsRollup:
+    """
+    Инкрементальное обновление срезов аналитики в транзакции изменяющего use case.
+
+    deal_stats_daily: вычитается вклад сделки до изменения и прибавляется вклад после.
+    deal_stage_transitions_daily: смена этапа добавляет переход и время на прежнем этапе.
+    """
+
+    def __init__(
+        self,
+        deal_stats_repository: DealStatsRepository,
+        deal_stage_stats_repository: DealStageStatsRepository,
+    ):
+        self._deal_stats_repository = deal_stats_repository
+        self._deal_stage_stats_repository = deal_stage_stats_repository
+
+    async def record(self, before: Optional[DealEntity], after: Optional[DealEntity]):
+        deal = after or before
+        if deal is None:
+            return
+        deltas: dict[date, dict[str, int | Decimal]] = defaultdict(lambda: defaultdict(int))
+        for entity, sign in ((before, -1), (after, 1)):
+            if entity is None:
+                continue
+            for day, values in _contributions(entity).items():
+                for name, value in values.items():
+                    deltas[day][name] += sign * value
+
+        changed = {
+            day: dict(values) for day, values in deltas.items() if any(value != 0 for value in values.values())
+        }
+        await self._deal_stats_repository.increment(deal.organization_id, changed)
+
+        if before is None or after is None or DealStage(before.stage) == DealStage(after.stage):
+            return
+        left_at = after.stage_entered_at
+        entered_at = before.stage_entered_at
+        # Колонка NOT NULL: None бывает только у сущности, собранной не из строки сделки
+        if left_at is None or entered_at is None:
+            return
+        await self._deal_stage_stats_repository.add_transition(
+            deal.organization_id,
+            left_at.astimezone(timezone.utc).date(),
+            DealStage(before.stage),
+            DealStage(after.stage),
+            (left_at - entered_at).total_seconds(),
+        )
+
+
+STAGES = list(DealStage)
+STATUSES = list(DealStatus)
+EPOCH_DAY = date(1970, 1, 1)
+# До стольких ячеек решетка измерений считается плотно, даже если сделок меньше
+DENSE_PIVOT_CELLS = 1 << 20
+
+
+@dataclass
+class PivotResult:
+    keys: list[dict[PivotDimension, str]]
+    counts: list[int]
+    amounts: list[Decimal]
+
+
+class DealSnapshot:
+    """
+    Колоночный снимок сделок организации в памяти воркера.
+
+    Каждая колонка - массив NumPy длиной в число сделок: владелец, этап, статус и
+    валюта закодированы индексами в справочниках, день создания - числом дней от
+    1970-01-01 (UTC), сумма - целым числом центов в базовой валюте. Фильтры и группировка
+    считаются целиком над массивами, без цикла по сделкам в Python.
+    """
+
+    def __init__(self, rows: Sequence[Row], loaded_at: datetime):
+        self.loaded_at = loaded_at
+        owner_index: dict[UUID, int] = {}
+        currency_index: dict[str, int] = {}
+        stage_index = {stage.name: code for code, stage in enumerate(STAGES)}
+        status_index = {status.name: code for code, status in enumerate(STATUSES)}
+        size = len(rows)
+
+        self.owner_codes = np.fromiter(
+            (owner_index.setdefault(row.owner_id, len(owner_index)) for row in rows), np.int32, size
+        )
+        # Этап и статус приходят членами enum (ORM) или их именами (сырой SQL)
+        self.stage_codes = np.fromiter(
+            (stage_index[getattr(row.stage, "name", row.stage)] for row in rows), np.int8, size
+        )
+        self.status_codes = np.fromiter(
+            (status_index[getattr(row.status, "name", row.status)] for row in rows), np.int8, size
+        )
+        self.currency_codes = np.fromiter(
+            (currency_index.setdefault(row.currency, len(currency_index)) for row in rows), np.int32, size
+        )
+        self.created_days = np.fromiter((row.created_day for row in rows), np.int32, size)
+        self.amount_cents = np.fromiter((row.amount_cents for row in rows), np.float64, size)
+        # 1970-01-01 - четверг: +3 дня сдвигают начало недели на понедельник
+        self.created_weeks = (self.created_days + 3) // 7
+        self.created_months = self.created_days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int32)
+        self.owners = list(owner_index)
+        self.currencies = list(currency_index)
+
+    def __len__(self) -> int:
+        return len(self.amount_cents)
+
+    def pivot(
+        self,
+        group_by: Sequence[PivotDimension],
+        owner_ids: Sequence[UUID] = (),
+        stages: Sequence[DealStage] = (),
+        statuses: Sequence[DealStatus] = (),
+        currencies: Sequence[str] = (),
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        max_cells: Optional[int] = None,
+    ) -> PivotResult:
+        conditions = []
+        if owner_ids:
+            conditions.append(self._isin(self.owner_codes, self.owners, owner_ids))
+        if stages:
+            conditions.append(np.isin(self.stage_codes, [STAGES.index(DealStage(stage)) for stage in stages]))
+        if statuses:
+            conditions.append(
+                np.isin(self.status_codes, [STATUSES.index(DealStatus(status)) for status in statuses])
+            )
+        if currencies:
+            conditions.append(self._isin(self.currency_codes, self.currencies, currencies))
+        if date_from is not None:
+            conditions.append(self.created_days >= (date_from - EPOCH_DAY).days)
+        if date_to is not None:
+            conditions.append(self.created_days <= (date_to - EPOCH_DAY).days)
+        mask = np.logical_and.reduce(conditions) if conditions else None
+
+        def filtered(column: np.ndarray) -> np.ndarray:
+            return column if mask is None else column[mask]
+
+        cents = filtered(self.amount_cents)
+        if not group_by:
+            return PivotResult([{}], [len(cents)], [Decimal(int(cents.sum())).scaleb(-2)])
+
+        # Ключ группы - номер ячейки в плотной решетке измерений (смешанная система
+        # счисления), поэтому счетчики и суммы считаются одним bincount без сортировки
+        keys = np.zeros(len(cents), dtype=np.int64)
+        offsets, sizes = [], []
+        for dimension in group_by:
+            column = filtered(self._codes(dimension))
+            offset = int(column.min()) if len(column) else 0
+            size = int(column.max()) - offset + 1 if len(column) else 1
+            keys = keys * size + (column - offset)
+            offsets.append(offset)
+            sizes.append(size)
+
+        cells = math.prod(sizes)
+        if cells <= max(len(cents), DENSE_PIVOT_CELLS):
+            counts = np.bincount(keys, minlength=cells)
+            # Центы - целые числа в float64: суммы точны до 2**53 центов на ячейку
+            sums = np.bincount(keys, weights=cents, minlength=cells)
+            present = np.flatnonzero(counts)
+            counts, sums = counts[present], sums[present]
+        else:
+            present, groups = np.unique(keys, return_inverse=True)
+            counts = np.bincount(groups)
+            sums = np.bincount(groups, weights=cents)
+        if max_cells is not None and len(present) > max_cells:
+            raise InvalidPivotError("error.analytics.pivot_too_large")
+
+        # Подписи считаются один раз на значение измерения, а не на ячейку
+        labels = []
+        columns = np.unravel_index(present, sizes)
+        for dimension, column, offset, size in zip(group_by, columns, offsets, sizes, strict=True):
+            table = np.array([self._label(dimension, code + offset) for code in range(size)], dtype=object)
+            labels.append(table[column].tolist())
+        return PivotResult(
+            [dict(zip(group_by, values, strict=True)) for values in zip(*labels, strict=True)],
+            counts.tolist(),
+            [Decimal(int(value)).scaleb(-2) for value in sums.tolist()],
+        )
+
+    def _codes(self, dimension: PivotDimension) -> np.ndarray:
+        if dimension == PivotDimension.OWNER_ID:
+            return self.owner_codes
+        if dimension == PivotDimension.STAGE:
+            return self.stage_codes
+        if dimension == PivotDimension.STATUS:
+            return self.status_codes
+        if dimension == PivotDimension.CURRENCY:
+            return self.currency_codes
+        if dimension == PivotDimension.CREATED_WEEK:
+            return self.created_weeks
+        if dimension == PivotDimension.CREATED_MONTH:
+            return self.created_months
+        return self.created_days
+
+    def _label(self, dimension: PivotDimension, code) -> str:
+        index = int(code)
+        if dimension == PivotDimension.OWNER_ID:
+            return str(self.owners[index])
+        if dimension == PivotDimension.STAGE:
+            return STAGES[index].value
+        if dimension == PivotDimension.STATUS:
+            return STATUSES[index].value
+        if dimension == PivotDimension.CURRENCY:
+            return self.currencies[index]
+        if dimension == PivotDimension.CREATED_WEEK:
+            return (EPOCH_DAY + timedelta(days=index * 7 - 3)).isoformat()
+        if dimension == PivotDimension.CREATED_MONTH:
+            return date(1970 + index // 12, index % 12 + 1, 1).isoformat()
+        return (EPOCH_DAY + timedelta(days=index)).isoformat()
+
+    @staticmethod
+    def _isin(codes: np.ndarray, categories: list, selected: Sequence) -> np.ndarray:
+        index = {value: code for code, value in enumerate(categories)}
+        return np.isin(codes, [index[value] for value in selected if value in index])
@@ -1,27 +1,102 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID
+
+from core.cache import LocalCache, SingleFlight, cache_tag
 from core.database.unit_of_work import UnitOfWork
+from core.metrics import instrumented
+from changes.enums import ChangeEntityType
 from deals.repositories import DealRepository
-from analytics.entities import DealsSummaryEntity, DealsFunnelEntity, FunnelStageEntity
+from analytics.entities import (
+    DealsSummaryEntity,
+    DealsFunnelEntity,
+    FunnelStageEntity,
+    DealsTimeseriesEntity,
+    TimeseriesPointEntity,
+    FreshnessEntity,
+    OwnerLeaderboardEntity,
+    DealsPipelineEntity,
+    PipelineStageEntity,
+    PipelineOwnerEntity,
+    DealsStageVelocityEntity,
+    StageVelocityEntity,
+    DealsStageConversionEntity,
+    StageConversionEntity,
+    StageTransitionEntity,
+    DealsPivotEntity,
+    PivotCellEntity,
+)
+from analytics.enums import TimeseriesInterval, LeaderboardOrder, PivotDimension
+from analytics.exceptions import InvalidTimeseriesRangeError, InvalidPivotError
+from analytics.repositories import DealStatsRepository, DealStageStatsRepository, DealViewsRepository
+from analytics.services import DealSnapshot
 from auth.entities import AuthenticatedUser
+from deals.enums import DealStage, DealStatus
+from fx.services import CENT, normalize_currency
+from jobs.registry import job_handler
+
+
+MAX_TIMESERIES_DAYS = 5 * 366
+
+REFRESH_DEAL_VIEWS_TASK = "analytics.refresh_deal_views"
+DEAL_VIEWS_CHECK_SECONDS = 30
+
+MAX_PIVOT_DIMENSIONS = 4
+MAX_PIVOT_CELLS = 10_000
+
+
+def bucket_start(day: date, interval: TimeseriesInterval) -> date:
+    """Начало корзины так же, как date_trunc в Postgres: неделя - с понедельника"""
+    if interval == TimeseriesInterval.WEEK:
+        return day - timedelta(days=day.weekday())
+    if interval == TimeseriesInterval.MONTH:
+        return day.replace(day=1)
+    return day
+
+
+def check_range(date_from: date, date_to: date):
+    if date_from > date_to or (date_to - date_from).days > MAX_TIMESERIES_DAYS:
+        raise InvalidTimeseriesRangeError()
 
 
+def next_bucket(bucket: date, interval: TimeseriesInterval) -> date:
+    if interval == TimeseriesInterval.WEEK:
+        return bucket + timedelta(days=7)
+    if interval == TimeseriesInterval.MONTH:
+        return (bucket.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return bucket + timedelta(days=1)
+
+
+@instrumented
 class GetDealsSummaryUseCase:
-    def __init__(self, uow: UnitOfWork, deal_repository: DealRepository):
+    def __init__(self, uow: UnitOfWork, deal_repository: DealRepository, single_flight: SingleFlight):
         self._uow = uow
         self._deal_repository = deal_repository
+        self._single_flight = single_flight
 
     async def __call__(self, user: AuthenticatedUser, days: int = 30) -> DealsSummaryEntity:
+        # Дашборд открывают многие пользователи организации разом: запросы в базу - одни на всех
+        return await self._single_flight.do(
+            "deals_summary",
+            (user.organization_id, days),
+            lambda: self._load(user.organization_id, days),
+            [cache_tag(user.organization_id, ChangeEntityType.DEAL.value)],
+        )
+
+    async def _load(self, organization_id: UUID, days: int) -> DealsSummaryEntity:
         async with self._uow:
             count_by_status = await self._deal_repository.get_deals_count_by_status(
-                user.organization_id
+                organization_id
             )
             amount_by_status = await self._deal_repository.get_deals_amount_by_status(
-                user.organization_id
+                organization_id
             )
             new_deals_count = await self._deal_repository.get_new_deals_count(
-                user.organization_id, days
+                organization_id, days
             )
             won_average = await self._deal_repository.get_won_deals_average(
-                user.organization_id
+                organization_id
             )
             
             return DealsSummaryEntity(
@@ -32,15 +107,25 @@ class GetDealsSummaryUseCase:
             )
 
 
+@instrumented
 class GetDealsFunnelUseCase:
-    def __init__(self, uow: UnitOfWork, deal_repository: DealRepository):
+    def __init__(self, uow: UnitOfWork, deal_repository: DealRepository, single_flight: SingleFlight):
         self._uow = uow
         self._deal_repository = deal_repository
+        self._single_flight = single_flight
 
     async def __call__(self, user: AuthenticatedUser) -> DealsFunnelEntity:
+        return await self._single_flight.do(
+            "deals_funnel",
+            (user.organization_id,),
+            lambda: self._load(user.organization_id),
+            [cache_tag(user.organization_id, ChangeEntityType.DEAL.value)],
+        )
+
+    async def _load(self, organization_id: UUID) -> DealsFunnelEntity:
         async with self._uow:
             funnel_data = await self._deal_repository.get_deals_funnel_data(
-                user.organization_id
+                organization_id
             )
             
             stages_dict: dict[str, dict[str, int]] = {}
@@ -75,3 +160,396 @@ class GetDealsFunnelUseCase:
             
             return DealsFunnelEntity(stages=stages)
 
+
+
+@instrumented
+class GetDealsTimeseriesUseCase:
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        deal_stats_repository: DealStatsRepository,
+        single_flight: SingleFlight,
+    ):
+        self._uow = uow
+        self._deal_stats_repository = deal_stats_repository
+        self._single_flight = single_flight
+
+    async def __call__(
+        self,
+        user: AuthenticatedUser,
+        interval: TimeseriesInterval,
+        date_from: date,
+        date_to: date,
+    ) -> DealsTimeseriesEntity:
+        check_range(date_from, date_to)
+        
+        return await self._single_flight.do(
+            "deals_timeseries",
+            (user.organization_id, interval, date_from, date_to),
+            lambda: self._load(user.organization_id, interval, date_from, date_to),
+            [cache_tag(user.organization_id, ChangeEntityType.DEAL.value)],
+        )
+
+    async def _load(
+        self,
+        organization_id: UUID,
+        interval: TimeseriesInterval,
+        date_from: date,
+        date_to: date,
+    ) -> DealsTimeseriesEntity:
+        # Читаем дневные срезы, а не сделки: два года - не больше 731 строки на организацию
+        async with self._uow:
+            points = await self._deal_stats_repository.get_timeseries(
+                organization_id, interval, date_from, date_to
+            )
+        
+        # Пустые корзины заполняем нулями, чтобы на графике не было разрывов
+        by_bucket = {point.bucket: point for point in points}
+        series = []
+        bucket = bucket_start(date_from, interval)
+        while bucket <= date_to:
+            series.append(by_bucket.get(bucket) or TimeseriesPointEntity(bucket=bucket))
+            bucket = next_bucket(bucket, interval)
+        
+        return DealsTimeseriesEntity(interval=interval, date_from=date_from, date_to=date_to, points=series)
+
+
+
+@instrumented
+class GetStageVelocityUseCase:
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        deal_repository: DealRepository,
+        deal_stage_stats_repository: DealStageStatsRepository,
+        single_flight: SingleFlight,
+    ):
+        self._uow = uow
+        self._deal_repository = deal_repository
+        self._deal_stage_stats_repository = deal_stage_stats_repository
+        self._single_flight = single_flight
+
+    async def __call__(self, user: AuthenticatedUser, date_from: date, date_to: date) -> DealsStageVelocityEntity:
+        check_range(date_from, date_to)
+        
+        return await self._single_flight.do(
+            "stage_velocity",
+            (user.organization_id, date_from, date_to),
+            lambda: self._load(user.organization_id, date_from, date_to),
+            [cache_tag(user.organization_id, ChangeEntityType.DEAL.value)],
+        )
+
+    async def _load(self, organization_id: UUID, date_from: date, date_to: date) -> DealsStageVelocityEntity:
+        # История - из дневных агрегатов переходов, текущее состояние - по stage_entered_at открытых сделок
+        async with self._uow:
+            transitions = await self._deal_stage_stats_repository.get_transitions(
+                organization_id, date_from, date_to
+            )
+            open_deals = await self._deal_repository.get_open_deals_stage_age(organization_id)
+        
+        exited: dict[DealStage, list] = {stage: [0, 0.0] for stage in DealStage}
+        for from_stage, _, transition_count, duration_seconds in transitions:
+            exited[from_stage][0] += transition_count
+            exited[from_stage][1] += duration_seconds
+        open_by_stage = {stage: (count, age_seconds) for stage, count, age_seconds in open_deals}
+        
+        stages = []
+        for stage in DealStage:
+            exited_count, duration_seconds = exited[stage]
+            open_count, open_age_seconds = open_by_stage.get(stage, (0, 0.0))
+            stages.append(StageVelocityEntity(
+                stage=stage.value,
+                exited_count=exited_count,
+                average_days_in_stage=(
+                    round(duration_seconds / exited_count / 86400, 2) if exited_count else None
+                ),
+                open_count=open_count,
+                open_average_age_days=round(open_age_seconds / 86400, 2) if open_count else None,
+            ))
+        
+        return DealsStageVelocityEntity(date_from=date_from, date_to=date_to, stages=stages)
+
+
+@instrumented
+class GetStageConversionUseCase:
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        deal_stats_repository: DealStatsRepository,
+        deal_stage_stats_repository: DealStageStatsRepository,
+        single_flight: SingleFlight,
+    ):
+        self._uow = uow
+        self._deal_stats_repository = deal_stats_repository
+        self._deal_stage_stats_repository = deal_stage_stats_repository
+        self._single_flight = single_flight
+
+    async def __call__(self, user: AuthenticatedUser, date_from: date, date_to: date) -> DealsStageConversionEntity:
+        check_range(date_from, date_to)
+        
+        return await self._single_flight.do(
+            "stage_conversion",
+            (user.organization_id, date_from, date_to),
+            lambda: self._load(user.organization_id, date_from, date_to),
+            [cache_tag(user.organization_id, ChangeEntityType.DEAL.value)],
+        )
+
+    async def _load(self, organization_id: UUID, date_from: date, date_to: date) -> DealsStageConversionEntity:
+        async with self._uow:
+            transitions = await self._deal_stage_stats_repository.get_transitions(
+                organization_id, date_from, date_to
+            )
+            created_count = await self._deal_stats_repository.get_created_count(
+                organization_id, date_from, date_to
+            )
+        
+        # Конверсия за период по потоку: из вошедших на этап сколько перешло на более поздний.
+        # На первый этап сделки попадают при создании
+        order = {stage: index for index, stage in enumerate(DealStage)}
+        entered = {stage: 0 for stage in DealStage}
+        advanced = {stage: 0 for stage in DealStage}
+        entered[DealStage.QUALIFICATION] = created_count
+        for from_stage, to_stage, transition_count, _ in transitions:
+            entered[to_stage] += transition_count
+            if order[to_stage] > order[from_stage]:
+                advanced[from_stage] += transition_count
+        
+        stages = [
+            StageConversionEntity(
+                stage=stage.value,
+                entered_count=entered[stage],
+                advanced_count=advanced[stage],
+                conversion_rate=round(advanced[stage] / entered[stage] * 100, 2) if entered[stage] else 0.0,
+            )
+            for stage in list(DealStage)[:-1]
+        ]
+        return DealsStageConversionEntity(
+            date_from=date_from,
+            date_to=date_to,
+            stages=stages,
+            transitions=[
+                StageTransitionEntity(
+                    from_stage=from_stage.value, to_stage=to_stage.value, transition_count=transition_count
+                )
+                for from_stage, to_stage, transition_count, _ in transitions
+            ],
+        )
+
+
+@instrumented
+class GetOwnerLeaderboardUseCase:
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        deal_views_repository: DealViewsRepository,
+        single_flight: SingleFlight,
+        refresh_changes: int,
+    ):
+        self._uow = uow
+        self._deal_views_repository = deal_views_repository
+        self._single_flight = single_flight
+        self._refresh_changes = refresh_changes
+
+    async def __call__(
+        self,
+        user: AuthenticatedUser,
+        order_by: LeaderboardOrder = LeaderboardOrder.WON_AMOUNT,
+        limit: int = 20,
+    ) -> OwnerLeaderboardEntity:
+        return await self._single_flight.do(
+            "owner_leaderboard",
+            (user.organization_id, order_by, limit),
+            lambda: self._load(user.organization_id, order_by, limit),
+            [cache_tag(user.organization_id, ChangeEntityType.DEAL.value)],
+        )
+
+    async def _load(self, organization_id: UUID, order_by: LeaderboardOrder, limit: int) -> OwnerLeaderboardEntity:
+        # Состояние читается до представления: если обновление закоммитится между ними,
+        # свежесть в ответе окажется заниженной, а не завышенной
+        async with self._uow:
+            state = await self._deal_views_repository.get_refresh_state()
+            owners = await self._deal_views_repository.get_owner_stats(organization_id, order_by, limit)
+            pending_changes = await self._deal_views_repository.count_pending_changes(
+                state, self._refresh_changes, organization_id
+            )
+        
+        return OwnerLeaderboardEntity(
+            order_by=order_by,
+            owners=owners,
+            freshness=FreshnessEntity(refreshed_at=state.refreshed_at, pending_changes=pending_changes),
+        )
+
+
+@instrumented
+class GetDealsPipelineUseCase:
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        deal_views_repository: DealViewsRepository,
+        single_flight: SingleFlight,
+        refresh_changes: int,
+    ):
+        self._uow = uow
+        self._deal_views_repository = deal_views_repository
+        self._single_flight = single_flight
+        self._refresh_changes = refresh_changes
+
+    async def __call__(self, user: AuthenticatedUser, owner_id: Optional[UUID] = None) -> DealsPipelineEntity:
+        return await self._single_flight.do(
+            "deals_pipeline",
+            (user.organization_id, owner_id),
+            lambda: self._load(user.organization_id, owner_id),
+            [cache_tag(user.organization_id, ChangeEntityType.DEAL.value)],
+        )
+
+    async def _load(self, organization_id: UUID, owner_id: Optional[UUID]) -> DealsPipelineEntity:
+        async with self._uow:
+            state = await self._deal_views_repository.get_refresh_state()
+            rows = await self._deal_views_repository.get_pipeline(organization_id, owner_id)
+            pending_changes = await self._deal_views_repository.count_pending_changes(
+                state, self._refresh_changes, organization_id
+            )
+        
+        # Строки идут по этапам в порядке воронки, внутри этапа - по сумме
+        stages: dict[str, PipelineStageEntity] = {}
+        for stage, stage_owner_id, owner_name, deal_count, amount in rows:
+            entry = stages.get(stage.value)
+            if entry is None:
+                entry = stages[stage.value] = PipelineStageEntity(
+                    stage=stage.value, deal_count=0, amount=Decimal(0), owners=[]
+                )
+            entry.deal_count += deal_count
+            entry.amount += amount
+            entry.owners.append(PipelineOwnerEntity(
+                owner_id=stage_owner_id, owner_name=owner_name, deal_count=deal_count, amount=amount
+            ))
+        
+        return DealsPipelineEntity(
+            stages=list(stages.values()),
+            freshness=FreshnessEntity(refreshed_at=state.refreshed_at, pending_changes=pending_changes),
+        )
+
+
+@job_handler(REFRESH_DEAL_VIEWS_TASK, component="analytics", every=DEAL_VIEWS_CHECK_SECONDS)
+@instrumented
+class RefreshDealViewsUseCase:
+    """
+    Периодическое задание воркера: обновляет представления по владельцам сделок,
+    если они старше max_age или с прошлого обновления накопилось refresh_changes
+    изменений сделок. Одновременно обновляет только один воркер.
+    """
+
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        deal_views_repository: DealViewsRepository,
+        max_age: timedelta,
+        refresh_changes: int,
+    ):
+        self._uow = uow
+        self._deal_views_repository = deal_views_repository
+        self._max_age = max_age
+        self._refresh_changes = refresh_changes
+
+    async def __call__(self):
+        async with self._uow:
+            state = await self._deal_views_repository.lock_refresh_state()
+            if state is None:
+                return
+            
+            if datetime.now(timezone.utc) - state.refreshed_at < self._max_age:
+                pending_changes = await self._deal_views_repository.count_pending_changes(
+                    state, self._refresh_changes
+                )
+                if pending_changes < self._refresh_changes:
+                    return
+            
+            await self._deal_views_repository.refresh()
+
+
+@instrumented
+class GetDealsPivotUseCase:
+    """
+    Произвольная сводка по сделкам: группировка по любым измерениям с фильтрами.
+
+    Колонки сделок организации читаются из базы одним запросом в DealSnapshot и
+    держатся в памяти воркера до изменения сделок организации (тег сделок) или TTL.
+    Любые группировки поверх снимка считаются в NumPy, без GROUP BY на каждый запрос.
+    """
+
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        deal_repository: DealRepository,
+        snapshot_cache: LocalCache,
+        single_flight: SingleFlight,
+    ):
+        self._uow = uow
+        self._deal_repository = deal_repository
+        self._snapshot_cache = snapshot_cache
+        self._single_flight = single_flight
+
+    async def __call__(
+        self,
+        user: AuthenticatedUser,
+        group_by: list[PivotDimension],
+        owner_ids: list[UUID],
+        stages: list[DealStage],
+        statuses: list[DealStatus],
+        currencies: list[str],
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> DealsPivotEntity:
+        if len(group_by) > MAX_PIVOT_DIMENSIONS or len(set(group_by)) != len(group_by):
+            raise InvalidPivotError()
+        if date_from is not None and date_to is not None and date_from > date_to:
+            raise InvalidTimeseriesRangeError()
+        
+        snapshot = await self._get_snapshot(user.organization_id)
+        result = snapshot.pivot(
+            group_by,
+            owner_ids=owner_ids,
+            stages=stages,
+            statuses=statuses,
+            currencies=[normalize_currency(currency) for currency in currencies],
+            date_from=date_from,
+            date_to=date_to,
+            max_cells=MAX_PIVOT_CELLS,
+        )
+        
+        cells = [
+            PivotCellEntity(
+                keys={dimension.value: value for dimension, value in keys.items()},
+                deal_count=count,
+                amount=amount,
+                average_amount=(amount / count).quantize(CENT) if count else Decimal(0),
+            )
+            for keys, count, amount in zip(result.keys, result.counts, result.amounts, strict=True)
+            if count
+        ]
+        return DealsPivotEntity(
+            group_by=group_by,
+            cells=cells,
+            deal_count=sum(cell.deal_count for cell in cells),
+            amount=sum((cell.amount for cell in cells), Decimal(0)),
+            snapshot_at=snapshot.loaded_at,
+        )
+
+    async def _get_snapshot(self, organization_id: UUID) -> DealSnapshot:
+        snapshot: Optional[DealSnapshot] = self._snapshot_cache.get(organization_id)
+        if snapshot is not None:
+            return snapshot
+        tags = [cache_tag(organization_id, ChangeEntityType.DEAL.value)]
+        return await self._single_flight.do(
+            "deal_snapshot", (organization_id,), lambda: self._load(organization_id, tags), tags
+        )
+
+    async def _load(self, organization_id: UUID, tags: list[str]) -> DealSnapshot:
+        generation = self._snapshot_cache.generation
+        async with self._uow:
+            loaded_at = datetime.now(timezone.utc)
+            rows = await self._deal_repository.get_snapshot_rows(organization_id)
+        
+        snapshot = DealSnapshot(rows, loaded_at)
+        self._snapshot_cache.set(organization_id, snapshot, tags, generation)
+        return snapshot
@@ -3,13 +3,16 @@ from fastapi import Request
 from dishka import Provider, Scope, provide, FromComponent
 
 from auth.usecases import RegisterUseCase, LoginUseCase
-from auth.services import JWTBearer
+from auth.services import JWTBearer, PasswordHasher
 from auth.entities import AuthenticatedUser
 from users.repositories import UserRepository
 from organizations.repositories import OrganizationRepository
 from core.database.unit_of_work import UnitOfWork
 from core.environment.config import Settings
 from core.exceptions import AuthorizationException
+from core.tracing import start_span
+from core.cache import InvalidationBus, LocalCache, cache_tag
+from changes.enums import ChangeEntityType
 from organizations.exceptions import OrganizationAccessDeniedError
 
 
@@ -21,6 +24,23 @@ class AuthProvider(Provider):
     def get_jwt_bearer(self) -> JWTBearer:
         return JWTBearer()
 
+    @provide(scope=Scope.APP)
+    def get_password_hasher(
+        self, settings: Annotated[Settings, FromComponent("environment")]
+    ) -> PasswordHasher:
+        return PasswordHasher(settings.password_hash_workers)
+
+    @provide(scope=Scope.APP)
+    def get_membership_cache(
+        self,
+        settings: Annotated[Settings, FromComponent("environment")],
+        bus: Annotated[InvalidationBus, FromComponent("cache")],
+    ) -> LocalCache:
+        # Роль пользователя в организации проверяется на каждом запросе
+        return bus.register(LocalCache(
+            "membership", settings.membership_cache_size, settings.membership_cache_ttl_seconds
+        ))
+
     @provide
     def get_register_usecase(
         self,
@@ -28,8 +48,9 @@ class AuthProvider(Provider):
         user_repository: Annotated[UserRepository, FromComponent("users")],
         organization_repository: Annotated[OrganizationRepository, FromComponent("organizations")],
         settings: Annotated[Settings, FromComponent("environment")],
+        password_hasher: Annotated[PasswordHasher, FromComponent("auth")],
     ) -> RegisterUseCase:
-        return RegisterUseCase(uow, user_repository, organization_repository, settings)
+        return RegisterUseCase(uow, user_repository, organization_repository, settings, password_hasher)
 
     @provide
     def get_login_usecase(
@@ -37,8 +58,9 @@ class AuthProvider(Provider):
         uow: Annotated[UnitOfWork, FromComponent("database")],
         user_repository: Annotated[UserRepository, FromComponent("users")],
         settings: Annotated[Settings, FromComponent("environment")],
+        password_hasher: Annotated[PasswordHasher, FromComponent("auth")],
     ) -> LoginUseCase:
-        return LoginUseCase(uow, user_repository, settings)
+        return LoginUseCase(uow, user_repository, settings, password_hasher)
 
     @provide
     async def get_authenticated_user(
@@ -47,36 +69,49 @@ class AuthProvider(Provider):
         user_repository: Annotated[UserRepository, FromComponent("users")],
         jwt_bearer: Annotated[JWTBearer, FromComponent("auth")],
         settings: Annotated[Settings, FromComponent("environment")],
+        membership_cache: Annotated[LocalCache, FromComponent("auth")],
     ) -> AuthenticatedUser:
-        token = await jwt_bearer(request, settings)
-        if not token:
-            raise AuthorizationException("error.auth.token_not_provided")
-        
-        payload = jwt_bearer.decode_jwt(token, settings)
-        if not payload:
-            raise AuthorizationException("error.auth.token.invalid")
-        
-        org_id_header = request.headers.get("X-Organization-Id")
-        if not org_id_header:
-            raise AuthorizationException("error.auth.organization_id_not_provided")
-        
-        from uuid import UUID
-        user = await user_repository.get_user_by_id(UUID(payload["id"]))
-        if not user:
-            raise AuthorizationException("error.auth.user.not_found")
-        
-        # Проверяем, что пользователь состоит в организации из заголовка
-        membership = await user_repository.get_user_membership(
-            UUID(payload["id"]), UUID(org_id_header)
-        )
-        if not membership:
-            raise OrganizationAccessDeniedError()
-        
-        # Используем organization_id из заголовка, а не из токена!
-        return AuthenticatedUser(
-            id=UUID(payload["id"]),
-            email=payload["email"],
-            organization_id=UUID(org_id_header),
-            role=membership.role,
-        )
+        with start_span("auth.authenticate"):
+            token = await jwt_bearer(request, settings)
+            if not token:
+                raise AuthorizationException("error.auth.token_not_provided")
+            
+            payload = jwt_bearer.decode_jwt(token, settings)
+            if not payload:
+                raise AuthorizationException("error.auth.token.invalid")
+            
+            org_id_header = request.headers.get("X-Organization-Id")
+            if not org_id_header:
+                raise AuthorizationException("error.auth.organization_id_not_provided")
+            
+            from uuid import UUID
+            user_id = UUID(payload["id"])
+            organization_id = UUID(org_id_header)
+            role = membership_cache.get((user_id, organization_id))
+            if role is None:
+                generation = membership_cache.generation
+                user = await user_repository.get_user_by_id(user_id)
+                if not user:
+                    raise AuthorizationException("error.auth.user.not_found")
+                
+                # Проверяем, что пользователь состоит в организации из заголовка
+                membership = await user_repository.get_user_membership(user_id, organization_id)
+                if not membership:
+                    raise OrganizationAccessDeniedError()
+                
+                role = membership.role
+                membership_cache.set(
+                    (user_id, organization_id),
+                    role,
+                    [cache_tag(organization_id, ChangeEntityType.ORGANIZATION_MEMBER.value, user_id)],
+                    generation,
+                )
+            
+            # Используем organization_id из заголовка, а не из токена!
+            return AuthenticatedUser(
+                id=user_id,
+                email=payload["email"],
+                organization_id=organization_id,
+                role=role,
+            )
 
@@ -6,6 +6,7 @@ from dishka import FromComponent
 from auth.schemas import RegisterRequest, LoginRequest, LoginResponse, TokenResponse
 from auth.usecases import RegisterUseCase, LoginUseCase
 from core.exceptions import AuthorizationException
+from core.responses import PydanticJSONResponse
 
 
 router = APIRouter(
@@ -23,7 +24,7 @@ async def register(
     tokens = await register_usecase(
         request.email, request.password, request.name, request.organization_name
     )
-    return LoginResponse(data=TokenResponse(**tokens.model_dump()))
+    return PydanticJSONResponse(LoginResponse(data=TokenResponse(**tokens.model_dump())))
 
 
 @router.post("/login", response_model=LoginResponse)
@@ -37,5 +38,5 @@ async def login(
     if not x_organization_id:
         raise AuthorizationException("error.auth.organization_id_not_provided")
     tokens = await login_usecase(payload.email, payload.password, x_organization_id)
-    return LoginResponse(data=TokenResponse(**tokens.model_dump()))
+    return PydanticJSONResponse(LoginResponse(data=TokenResponse(**tokens.model_dump())))
 
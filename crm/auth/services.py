@@ -1,9 +1,13 @@
-from typing import Optional
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
 from fastapi import Request
+import bcrypt
 import jwt
 
 from core.environment.config import Settings
 from auth.exceptions import InvalidTokenError, TokenExpiredError
+from core.metrics import password_hash_queue_depth
 
 
 class JWTBearer:
@@ -28,3 +32,29 @@ class JWTBearer:
         except jwt.InvalidTokenError:
             raise InvalidTokenError()
 
+
+class PasswordHasher:
+    """
+    bcrypt в отдельном пуле потоков: хеширование занимает сотни миллисекунд CPU
+    и не должно блокировать event loop. Глубина очереди видна в password_hash_queue_depth.
+    """
+
+    def __init__(self, max_workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+
+    async def _run(self, function: Callable, *args):
+        password_hash_queue_depth.inc()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+        finally:
+            password_hash_queue_depth.dec()
+
+    async def hash(self, password: str) -> str:
+        hashed: bytes = await self._run(bcrypt.hashpw, password.encode("utf-8"), bcrypt.gensalt())
+        return hashed.decode("utf-8")
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        valid: bool = await self._run(
+            bcrypt.checkpw, password.encode("utf-8"), hashed_password.encode("utf-8")
+        )
+        return valid
@@ -1,19 +1,21 @@
 from uuid import uuid4, UUID
 from datetime import datetime, timezone, timedelta
-import bcrypt
 import jwt
 
 from core.database.unit_of_work import UnitOfWork
 from core.environment.config import Settings
+from core.metrics import instrumented
 from users.repositories import UserRepository
 from organizations.repositories import OrganizationRepository
 from users.enums import UserRole
 from auth.entities import TokenPair
+from auth.services import PasswordHasher
 from auth.exceptions import InvalidCredentialsError
 from users.exceptions import UserAlreadyExistsError
 from organizations.exceptions import OrganizationAccessDeniedError
 
 
+@instrumented
 class RegisterUseCase:
     def __init__(
         self,
@@ -21,11 +23,13 @@ class RegisterUseCase:
         user_repository: UserRepository,
         organization_repository: OrganizationRepository,
         settings: Settings,
+        password_hasher: PasswordHasher,
     ):
         self._uow = uow
         self._user_repository = user_repository
         self._organization_repository = organization_repository
         self._settings = settings
+        self._password_hasher = password_hasher
 
     async def __call__(
         self, email: str, password: str, name: str, organization_name: str
@@ -35,9 +39,7 @@ class RegisterUseCase:
             if existing_user:
                 raise UserAlreadyExistsError()
 
-            hashed_password = bcrypt.hashpw(
-                password.encode("utf-8"), bcrypt.gensalt()
-            ).decode("utf-8")
+            hashed_password = await self._password_hasher.hash(password)
 
             user_id = uuid4()
             user_data = {
@@ -97,16 +99,19 @@ class RegisterUseCase:
             )
 
 
+@instrumented
 class LoginUseCase:
     def __init__(
         self,
         uow: UnitOfWork,
         user_repository: UserRepository,
         settings: Settings,
+        password_hasher: PasswordHasher,
     ):
         self._uow = uow
         self._user_repository = user_repository
         self._settings = settings
+        self._password_hasher = password_hasher
 
     async def __call__(self, email: str, password: str, organization_id: str) -> TokenPair:
         async with self._uow:
@@ -114,7 +119,7 @@ class LoginUseCase:
             if not user:
                 raise InvalidCredentialsError()
 
-            if not bcrypt.checkpw(password.encode("utf-8"), user.hashed_password.encode("utf-8")):
+            if not await self._password_hasher.verify(password, user.hashed_password):
                 raise InvalidCredentialsError()
 
             membership = await self._user_repository.get_user_membership(
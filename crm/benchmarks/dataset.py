@@ -0,0 +1,219 @@
+"""
+Детерминированный набор данных для бенчмарков: организации × контакты × сделки × активности.
+
+Все идентификаторы и значения выводятся из seed, поэтому повторный прогон с теми же
+параметрами дает те же строки, а бенчмарки сравнимы между собой. Повторное заполнение
+с тем же seed сначала удаляет прежний набор вместе со всеми зависимыми строками.
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import UUID
+
+import bcrypt
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, create_async_engine
+
+from core.database.database import BaseModel
+from core.environment.config import Settings
+from organizations.models import Organization
+from users.models import User, OrganizationMember
+from contacts.models import Contact
+from deals.models import Deal
+from activities.models import Activity
+from tasks.models import Task  # noqa: F401 - регистрирует маппер для relationship
+from users.enums import UserRole
+from deals.enums import DealStatus, DealStage
+from activities.enums import ActivityType
+from analytics.repositories import DealStatsRepository, DealStageStatsRepository, DealViewsRepository
+
+
+BENCH_PASSWORD = "BenchPassword123"
+INSERT_BATCH = 5000
+SAMPLE_IDS = 200
+
+
+@dataclass
+class DatasetConfig:
+    organizations: int = 5
+    contacts_per_organization: int = 200
+    deals_per_contact: int = 2
+    activities_per_deal: int = 2
+    seed: int = 42
+
+    @property
+    def organization_prefix(self) -> str:
+        return f"Bench Org {self.seed}-"
+
+
+@dataclass
+class OrganizationFixture:
+    organization_id: UUID
+    email: str
+    deal_ids: list[UUID] = field(default_factory=list)
+    contact_ids: list[UUID] = field(default_factory=list)
+
+
+def make_engine(settings: Settings) -> AsyncEngine:
+    return create_async_engine(
+        f"{settings.database_dialect}+asyncpg://{settings.postgres_user}:"
+        f"{settings.postgres_password}@{settings.postgres_hostname}:"
+        f"{settings.postgres_port}/{settings.postgres_db}"
+    )
+
+
+def _uuid(rng: random.Random) -> UUID:
+    return UUID(int=rng.getrandbits(128), version=4)
+
+
+def generate_rows(config: DatasetConfig, hashed_password: str):
+    """Строки по таблицам в порядке вставки: (таблица, список словарей)"""
+    rng = random.Random(config.seed)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    statuses = list(DealStatus)
+    stages = list(DealStage)
+
+    for org_index in range(config.organizations):
+        organization_id = _uuid(rng)
+        user_id = _uuid(rng)
+        yield Organization.__table__, [{
+            "id": organization_id,
+            "name": f"{config.organization_prefix}{org_index}",
+            "created_at": now,
+        }]
+        yield User.__table__, [{
+            "id": user_id,
+            "email": f"bench-{config.seed}-{org_index}@example.com",
+            "hashed_password": hashed_password,
+            "name": f"Bench User {org_index}",
+            "created_at": now,
+        }]
+        yield OrganizationMember.__table__, [{
+            "id": _uuid(rng),
+            "organization_id": organization_id,
+            "user_id": user_id,
+            "role": UserRole.OWNER,
+        }]
+
+        contacts, deals, activities = [], [], []
+        for contact_index in range(config.contacts_per_organization):
+            contact_id = _uuid(rng)
+            created_at = now - timedelta(days=rng.randint(0, 365), seconds=rng.randint(0, 86399))
+            contacts.append({
+                "id": contact_id,
+                "organization_id": organization_id,
+                "owner_id": user_id,
+                "name": f"Contact {org_index}-{contact_index}",
+                "email": f"contact-{org_index}-{contact_index}@example.com",
+                "phone": None,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            for deal_index in range(config.deals_per_contact):
+                deal_id = _uuid(rng)
+                deal_created_at = created_at + timedelta(hours=rng.randint(0, 24 * 30))
+                status = rng.choice(statuses)
+                amount = Decimal(rng.randint(100, 100_000))
+                deals.append({
+                    "id": deal_id,
+                    "organization_id": organization_id,
+                    "contact_id": contact_id,
+                    "owner_id": user_id,
+                    "title": f"Deal {org_index}-{contact_index}-{deal_index}",
+                    "amount": amount,
+                    "currency": "USD",
+                    "amount_base": amount,
+                    "status": status,
+                    "stage": rng.choice(stages),
+                    "created_at": deal_created_at,
+                    "updated_at": deal_created_at,
+                    "version": 1,
+                    "closed_at": (
+                        deal_created_at if status in (DealStatus.WON, DealStatus.LOST) else None
+                    ),
+                    "stage_entered_at": deal_created_at,
+                })
+                for activity_index in range(config.activities_per_deal):
+                    activities.append({
+                        "id": _uuid(rng),
+                        "deal_id": deal_id,
+                        "author_id": user_id,
+                        "type": ActivityType.COMMENT,
+                        "payload": {"text": f"Comment {activity_index}"},
+                        "created_at": deal_created_at + timedelta(hours=activity_index + 1),
+                    })
+
+        yield Contact.__table__, contacts
+        yield Deal.__table__, deals
+        yield Activity.__table__, activities
+
+
+async def delete_dataset(conn: AsyncConnection, config: DatasetConfig):
+    """
+    Удаляет организации набора, их пользователей и все строки, ссылающиеся на них.
+
+    Таблицы обходятся от зависимых к родительским (metadata.sorted_tables), поэтому
+    новые таблицы с organization_id или deal_id учитываются без правок здесь.
+    """
+    organization_ids = list(await conn.scalars(
+        select(Organization.id).where(Organization.name.startswith(config.organization_prefix))
+    ))
+    if not organization_ids:
+        return
+    user_ids = list(await conn.scalars(
+        select(OrganizationMember.user_id).where(OrganizationMember.organization_id.in_(organization_ids))
+    ))
+    deal_ids = select(Deal.id).where(Deal.organization_id.in_(organization_ids))
+
+    for table in reversed(BaseModel.metadata.sorted_tables):
+        if "deal_id" in table.c:
+            await conn.execute(delete(table).where(table.c.deal_id.in_(deal_ids)))
+        elif "organization_id" in table.c:
+            await conn.execute(delete(table).where(table.c.organization_id.in_(organization_ids)))
+    await conn.execute(delete(Organization).where(Organization.id.in_(organization_ids)))
+    await conn.execute(delete(User).where(User.id.in_(user_ids)))
+
+
+async def seed_dataset(engine: AsyncEngine, config: DatasetConfig) -> list[OrganizationFixture]:
+    # bcrypt дорогой, поэтому хеш один на всех пользователей набора
+    hashed_password = bcrypt.hashpw(BENCH_PASSWORD.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+
+    async with engine.begin() as conn:
+        await delete_dataset(conn, config)
+        for table, rows in generate_rows(config, hashed_password):
+            for start in range(0, len(rows), INSERT_BATCH):
+                await conn.execute(insert(table), rows[start:start + INSERT_BATCH])
+
+    fixtures = await load_dataset(engine, config)
+    # Вставка идет в обход use case'ов: дневные срезы и представления аналитики пересчитываются по сделкам
+    async with AsyncSession(engine) as session:
+        for fixture in fixtures:
+            await DealStatsRepository(session).rebuild(fixture.organization_id)
+            await DealStageStatsRepository(session).rebuild(fixture.organization_id)
+        await DealViewsRepository(session).refresh()
+        await session.commit()
+    return fixtures
+
+
+async def load_dataset(engine: AsyncEngine, config: DatasetConfig) -> list[OrganizationFixture]:
+    """Организации набора с выборкой id сделок и контактов для запросов"""
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            select(Organization.id, User.email)
+            .join(OrganizationMember, OrganizationMember.organization_id == Organization.id)
+            .join(User, User.id == OrganizationMember.user_id)
+            .where(Organization.name.startswith(config.organization_prefix))
+            .order_by(Organization.name)
+        )
+        fixtures = [OrganizationFixture(row.id, row.email) for row in result]
+
+        for fixture in fixtures:
+            fixture.deal_ids = list(await conn.scalars(
+                select(Deal.id).where(Deal.organization_id == fixture.organization_id).limit(SAMPLE_IDS)
+            ))
+            fixture.contact_ids = list(await conn.scalars(
+                select(Contact.id).where(Contact.organization_id == fixture.organization_id).limit(SAMPLE_IDS)
+            ))
+
+    return fixtures
@@ -0,0 +1,368 @@
+"""
+Генератор больших мультитенантных наборов данных через COPY.
+
+    python -m benchmarks.generate --organizations 10000 --deals 2000000 --activities-per-deal 3 --workers 4
+
+Размеры тенантов распределены по Ципфу (--skew): несколько крупных организаций и длинный
+хвост мелких. Статусы и стадии сделок согласованы между собой, у каждой сделки есть история
+активностей: переходы по стадиям, смена статуса и комментарии.
+
+Генерация детерминирована: у каждой организации свой генератор случайных чисел от --seed,
+поэтому результат не зависит от --workers. Строки пишутся бинарным COPY (asyncpg
+copy_records_to_table) пачками по --batch-size, колонки берутся из моделей SQLAlchemy.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, ROUND_HALF_UP
+from typing import cast
+from uuid import UUID
+
+import bcrypt
+from sqlalchemy import Table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from benchmarks.dataset import BENCH_PASSWORD, make_engine
+from core.database.database import BaseModel
+from core.environment.config import Settings
+from organizations.models import Organization
+from users.models import User, OrganizationMember
+from contacts.models import Contact
+from deals.models import Deal
+from activities.models import Activity
+from tasks.models import Task
+from users.enums import UserRole
+from deals.enums import DealStatus, DealStage
+from activities.enums import ActivityType
+from analytics.models import DealStatsDaily, DealStageTransitionDaily
+from analytics.repositories import (
+    DealStatsRepository, DealStageStatsRepository, DealViewsRepository, deal_owner_stats, deal_pipeline_stats,
+)
+from fx.repositories import FxRateRepository
+from fx.services import CENT
+
+
+# Доли статусов и стадии, в которых сделка с таким статусом может находиться
+STATUS_WEIGHTS = {
+    DealStatus.NEW: 30,
+    DealStatus.IN_PROGRESS: 35,
+    DealStatus.WON: 20,
+    DealStatus.LOST: 15,
+}
+STATUS_STAGES = {
+    DealStatus.NEW: [DealStage.QUALIFICATION],
+    DealStatus.IN_PROGRESS: [DealStage.QUALIFICATION, DealStage.PROPOSAL, DealStage.NEGOTIATION],
+    DealStatus.WON: [DealStage.NEGOTIATION, DealStage.CLOSED, DealStage.CLOSED],
+    DealStatus.LOST: [DealStage.QUALIFICATION, DealStage.PROPOSAL, DealStage.NEGOTIATION, DealStage.CLOSED],
+}
+STAGES = list(DealStage)
+CURRENCIES = ["USD"] * 8 + ["EUR", "RUB"]
+# Курсы к USD, с которыми генерируются сделки; те же загружаются в fx_rates
+FX_RATES = {"USD": Decimal(1), "EUR": Decimal("1.08"), "RUB": Decimal("0.011")}
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+HISTORY_DAYS = 3 * 365
+
+
+@dataclass
+class GeneratorConfig:
+    organizations: int
+    deals: int
+    deals_per_contact: float
+    activities_per_deal: float
+    users_per_organization: int
+    skew: float
+    seed: int
+    batch_size: int
+
+
+def model_table(model: type[BaseModel]) -> Table:
+    # В декларативной модели __table__ объявлен как FromClause, но всегда это Table
+    return cast(Table, model.__table__)
+
+
+def table_columns(table: Table, names: list[str]) -> list[str]:
+    # Имена сверяются с моделью: переименованная или удаленная колонка сломает генератор сразу
+    missing = [name for name in names if name not in table.c]
+    if missing:
+        raise RuntimeError(f"{table.name}: unknown columns {missing}")
+    return names
+
+
+COLUMNS = {
+    table: table_columns(table, names)
+    for table, names in (
+        (model_table(Organization), ["id", "name", "created_at"]),
+        (model_table(User), ["id", "email", "hashed_password", "name", "created_at"]),
+        (model_table(OrganizationMember), ["id", "organization_id", "user_id", "role"]),
+        (
+            model_table(Contact),
+            ["id", "organization_id", "owner_id", "name", "email", "phone", "created_at", "updated_at"],
+        ),
+        (
+            model_table(Deal),
+            [
+                "id", "organization_id", "contact_id", "owner_id", "title", "amount", "currency", "amount_base",
+                "status", "stage", "created_at", "updated_at", "version", "closed_at", "stage_entered_at",
+            ],
+        ),
+        (model_table(Activity), ["id", "deal_id", "author_id", "type", "payload", "created_at"]),
+    )
+}
+# Порядок вставки - порядок внешних ключей
+TABLES = list(COLUMNS)
+
+
+def tenant_sizes(config: GeneratorConfig) -> list[int]:
+    """Число сделок на организацию: закон Ципфа по случайно перемешанным рангам"""
+    rng = random.Random(config.seed)
+    weights = [1 / (rank + 1) ** config.skew for rank in range(config.organizations)]
+    rng.shuffle(weights)
+    total_weight = sum(weights)
+    return [max(1, round(config.deals * weight / total_weight)) for weight in weights]
+
+
+def _uuid(rng: random.Random) -> UUID:
+    return UUID(int=rng.getrandbits(128), version=4)
+
+
+def organization_rows(org_index: int, deals_count: int, config: GeneratorConfig, hashed_password: str):
+    """Все строки одной организации: (таблица, кортеж) в порядке внешних ключей"""
+    rng = random.Random(config.seed * 1_000_003 + org_index)
+    organization_id = _uuid(rng)
+    created_at = EPOCH - timedelta(days=HISTORY_DAYS)
+    yield Organization.__table__, (organization_id, f"Org {config.seed}-{org_index}", created_at)
+
+    user_ids = []
+    for user_index in range(config.users_per_organization):
+        user_id = _uuid(rng)
+        user_ids.append(user_id)
+        yield User.__table__, (
+            user_id,
+            f"gen-{config.seed}-{org_index}-{user_index}@example.com",
+            hashed_password,
+            f"User {org_index}-{user_index}",
+            created_at,
+        )
+        role = UserRole.OWNER if user_index == 0 else rng.choice([UserRole.MANAGER, UserRole.MEMBER])
+        yield OrganizationMember.__table__, (_uuid(rng), organization_id, user_id, role.name)
+
+    statuses = list(STATUS_WEIGHTS)
+    status_weights = list(STATUS_WEIGHTS.values())
+    contacts_count = max(1, round(deals_count / config.deals_per_contact))
+    contacts = []
+    for contact_index in range(contacts_count):
+        contact_id = _uuid(rng)
+        contact_created_at = EPOCH - timedelta(seconds=rng.randint(0, HISTORY_DAYS * 86400))
+        contacts.append((contact_id, contact_created_at))
+        yield Contact.__table__, (
+            contact_id,
+            organization_id,
+            rng.choice(user_ids),
+            f"Contact {org_index}-{contact_index}",
+            f"contact-{org_index}-{contact_index}@example.com",
+            None,
+            contact_created_at,
+            contact_created_at,
+        )
+
+    activities = []
+    for deal_index in range(deals_count):
+        deal_id = _uuid(rng)
+        owner_id = rng.choice(user_ids)
+        contact_id, contact_created_at = rng.choice(contacts)
+        deal_created_at = contact_created_at + timedelta(seconds=rng.randint(0, 60 * 86400))
+        status = rng.choices(statuses, status_weights)[0]
+        stage = rng.choice(STATUS_STAGES[status])
+
+        # История: переходы по стадиям до текущей, смена статуса и комментарии
+        moment = deal_created_at
+        history = []
+        for previous, current in itertools.pairwise(STAGES[:STAGES.index(stage) + 1]):
+            moment += timedelta(seconds=rng.randint(3600, 14 * 86400))
+            history.append((ActivityType.STAGE_CHANGED, {"old_stage": previous.value, "new_stage": current.value}, moment))
+        stage_entered_at = moment
+        if status != DealStatus.NEW:
+            moment += timedelta(seconds=rng.randint(3600, 7 * 86400))
+            history.append((ActivityType.STATUS_CHANGED, {"old_status": DealStatus.NEW.value, "new_status": status.value}, moment))
+        # Комментарии не меняют саму сделку: version и updated_at определяются переходами
+        version = 1 + len(history)
+        updated_at = moment
+        closed_at = moment if status in (DealStatus.WON, DealStatus.LOST) else None
+        for comment_index in range(int(rng.expovariate(1 / config.activities_per_deal)) if config.activities_per_deal else 0):
+            history.append((
+                ActivityType.COMMENT,
+                {"text": f"Comment {comment_index}"},
+                deal_created_at + timedelta(seconds=rng.randint(60, 90 * 86400)),
+            ))
+
+        amount = Decimal(int(rng.lognormvariate(8.5, 1.2)) + 100)
+        currency = rng.choice(CURRENCIES)
+        yield Deal.__table__, (
+            deal_id,
+            organization_id,
+            contact_id,
+            owner_id,
+            f"Deal {org_index}-{deal_index}",
+            amount,
+            currency,
+            (amount * FX_RATES[currency]).quantize(CENT, ROUND_HALF_UP),
+            status.name,
+            stage.name,
+            deal_created_at,
+            updated_at,
+            version,
+            closed_at,
+            stage_entered_at,
+        )
+        for activity_type, payload, activity_created_at in history:
+            activities.append((
+                _uuid(rng), deal_id, owner_id, activity_type.name, json.dumps(payload), activity_created_at
+            ))
+
+        # Активности копятся отдельно: сделки должны попасть в COPY раньше них
+        if len(activities) >= config.batch_size:
+            yield from ((Activity.__table__, row) for row in activities)
+            activities = []
+
+    yield from ((Activity.__table__, row) for row in activities)
+
+
+async def write_organizations(org_indexes: list[int], sizes: list[int], config: GeneratorConfig, hashed_password: str) -> dict[str, int]:
+    engine = make_engine(Settings())
+    counts = {table.name: 0 for table in TABLES}
+    buffers: dict[Table, list[tuple]] = {table: [] for table in TABLES}
+
+    async def flush(connection):
+        # Пачки сбрасываются все сразу и в порядке внешних ключей
+        for table in TABLES:
+            rows = buffers[table]
+            if rows:
+                await connection.copy_records_to_table(table.name, records=rows, columns=COLUMNS[table])
+                counts[table.name] += len(rows)
+                buffers[table] = []
+
+    try:
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            connection = raw.driver_connection
+            pending = 0
+            for org_index in org_indexes:
+                for table, row in organization_rows(org_index, sizes[org_index], config, hashed_password):
+                    buffers[table].append(row)
+                    pending += 1
+                    if pending >= config.batch_size:
+                        await flush(connection)
+                        pending = 0
+            await flush(connection)
+            await conn.commit()
+    finally:
+        await engine.dispose()
+    return counts
+
+
+def _worker(org_indexes: list[int], sizes: list[int], config: GeneratorConfig, hashed_password: str) -> dict[str, int]:
+    return asyncio.run(write_organizations(org_indexes, sizes, config, hashed_password))
+
+
+async def truncate():
+    engine = make_engine(Settings())
+    tables = [model_table(Task).name] + [table.name for table in reversed(TABLES)]
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"TRUNCATE {', '.join(tables)} CASCADE"))
+    finally:
+        await engine.dispose()
+
+
+async def rebuild_rollups():
+    # COPY идет в обход use case'ов, поэтому дневные срезы и представления аналитики пересчитываются целиком
+    engine = make_engine(Settings())
+    try:
+        async with AsyncSession(engine) as session:
+            await FxRateRepository(session).upsert(FX_RATES)
+            await DealStatsRepository(session).rebuild()
+            await DealStageStatsRepository(session).rebuild()
+            await DealViewsRepository(session).refresh()
+            await session.commit()
+    finally:
+        await engine.dispose()
+
+
+async def analyze():
+    engine = make_engine(Settings())
+    try:
+        async with engine.begin() as conn:
+            rollups = [model_table(DealStatsDaily), model_table(DealStageTransitionDaily), deal_owner_stats, deal_pipeline_stats]
+            for table in [*TABLES, *rollups]:
+                await conn.execute(text(f"ANALYZE {table.name}"))
+    finally:
+        await engine.dispose()
+
+
+def main(args: argparse.Namespace):
+    config = GeneratorConfig(
+        organizations=args.organizations,
+        deals=args.deals,
+        deals_per_contact=args.deals_per_contact,
+        activities_per_deal=args.activities_per_deal,
+        users_per_organization=args.users_per_organization,
+        skew=args.skew,
+        seed=args.seed,
+        batch_size=args.batch_size,
+    )
+    if args.truncate:
+        asyncio.run(truncate())
+
+    started = time.perf_counter()
+    sizes = tenant_sizes(config)
+    hashed_password = bcrypt.hashpw(BENCH_PASSWORD.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    # Организации раздаются воркерам по кругу, чтобы крупные тенанты не достались одному
+    slices = [list(range(worker, config.organizations, args.workers)) for worker in range(args.workers)]
+
+    totals = {table.name: 0 for table in TABLES}
+    if args.workers == 1:
+        results = [_worker(slices[0], sizes, config, hashed_password)]
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            results = list(executor.map(
+                _worker, slices, [sizes] * args.workers, [config] * args.workers, [hashed_password] * args.workers
+            ))
+    for counts in results:
+        for table, count in counts.items():
+            totals[table] += count
+
+    asyncio.run(rebuild_rollups())
+    asyncio.run(analyze())
+    elapsed = time.perf_counter() - started
+    rows = sum(totals.values())
+    print(json.dumps(
+        {
+            "rows": totals,
+            "total_rows": rows,
+            "largest_organization_deals": max(sizes),
+            "elapsed_s": round(elapsed, 1),
+            "rows_per_second": round(rows / elapsed),
+        },
+        indent=2,
+    ))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetic multi-tenant CRM data generator")
+    parser.add_argument("--organizations", type=int, default=10_000)
+    parser.add_argument("--deals", type=int, default=2_000_000, help="сделок всего")
+    parser.add_argument("--deals-per-contact", type=float, default=2.0)
+    parser.add_argument("--activities-per-deal", type=float, default=3.0, help="в среднем комментариев на сделку")
+    parser.add_argument("--users-per-organization", type=int, default=3)
+    parser.add_argument("--skew", type=float, default=1.1, help="показатель закона Ципфа для размеров тенантов")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=1, help="процессов-генераторов")
+    parser.add_argument("--truncate", action="store_true", help="очистить таблицы CRM перед генерацией")
+    main(parser.parse_args())
@@ -0,0 +1,285 @@
+"""
+Нагрузочный бенчмарк API: смесь запросов через ASGI-приложение, p50/p95/p99 по маршрутам.
+
+    python -m benchmarks.load --seed-data --requests 5000 --concurrency 16 --output report.json
+    python -m benchmarks.load --requests 5000 --baseline baseline.json
+
+--seed-data заливает набор из benchmarks.dataset в базу из .env, заменяя прежний набор
+с тем же --seed (без флага используется ранее залитый набор). С --baseline отчет сравнивается с сохраненным:
+рост p95 или падение пропускной способности маршрута больше --tolerance считается
+регрессией, и процесс завершается с кодом 1.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.dataset import (
+    BENCH_PASSWORD,
+    DatasetConfig,
+    OrganizationFixture,
+    load_dataset,
+    make_engine,
+    seed_dataset,
+)
+from core.environment.config import Settings
+
+
+DEFAULT_MIX = {
+    "deals_list": 30,
+    "contacts_list": 10,
+    "deal_detail": 25,
+    "deal_update": 15,
+    "analytics_summary": 8,
+    "analytics_funnel": 7,
+    "login": 5,
+}
+
+
+@dataclass
+class Sample:
+    operation: str
+    duration_ms: float
+    status: int
+
+
+@dataclass
+class Session:
+    fixture: OrganizationFixture
+    headers: dict[str, str]
+
+
+async def login(client: AsyncClient, fixture: OrganizationFixture) -> Optional[str]:
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={"email": fixture.email, "password": BENCH_PASSWORD},
+        headers={"X-Organization-Id": str(fixture.organization_id)},
+    )
+    if response.status_code != 200:
+        return None
+    token: str = response.json()["data"]["access_token"]
+    return token
+
+
+async def perform(client: AsyncClient, operation: str, session: Session, rng: random.Random):
+    fixture = session.fixture
+    if operation == "deals_list":
+        params: dict[str, int | str] = {"page": rng.randint(1, 5), "page_size": 50}
+        if rng.random() < 0.5:
+            params["status"] = rng.choice(["new", "in_progress", "won", "lost"])
+        return await client.get("/api/v1/deals", params=params, headers=session.headers)
+    if operation == "contacts_list":
+        return await client.get(
+            "/api/v1/contacts", params={"page": rng.randint(1, 5), "page_size": 50}, headers=session.headers
+        )
+    if operation == "deal_detail":
+        return await client.get(f"/api/v1/deals/{rng.choice(fixture.deal_ids)}", headers=session.headers)
+    if operation == "deal_update":
+        return await client.patch(
+            f"/api/v1/deals/{rng.choice(fixture.deal_ids)}",
+            json={"title": f"Updated {rng.randint(0, 1_000_000)}"},
+            headers=session.headers,
+        )
+    if operation == "analytics_summary":
+        return await client.get("/api/v1/analytics/deals/summary", headers=session.headers)
+    if operation == "analytics_funnel":
+        return await client.get("/api/v1/analytics/deals/funnel", headers=session.headers)
+    if operation == "login":
+        return await client.post(
+            "/api/v1/auth/login",
+            json={"email": fixture.email, "password": BENCH_PASSWORD},
+            headers={"X-Organization-Id": str(fixture.organization_id)},
+        )
+    raise ValueError(f"unknown operation: {operation}")
+
+
+async def run_traffic(
+    client: AsyncClient,
+    sessions: list[Session],
+    mix: dict[str, int],
+    requests: int,
+    concurrency: int,
+    seed: int,
+) -> tuple[list[Sample], float]:
+    operations = list(mix)
+    weights = [mix[operation] for operation in operations]
+    remaining = requests
+    samples: list[Sample] = []
+
+    async def worker(worker_index: int):
+        nonlocal remaining
+        rng = random.Random(seed * 1000 + worker_index)
+        while remaining > 0:
+            remaining -= 1
+            operation = rng.choices(operations, weights)[0]
+            session = rng.choice(sessions)
+            started = time.perf_counter()
+            response = await perform(client, operation, session, rng)
+            samples.append(Sample(operation, (time.perf_counter() - started) * 1000, response.status_code))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    return samples, time.perf_counter() - started
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    # nearest-rank
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(q * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def build_report(samples: list[Sample], elapsed: float, config: dict) -> dict:
+    by_operation: dict[str, list[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_operation[sample.operation].append(sample)
+
+    routes = {}
+    for operation, operation_samples in sorted(by_operation.items()):
+        durations = sorted(sample.duration_ms for sample in operation_samples)
+        routes[operation] = {
+            "count": len(durations),
+            "errors": sum(1 for sample in operation_samples if sample.status >= 400),
+            "throughput_rps": round(len(durations) / elapsed, 2),
+            "mean_ms": round(sum(durations) / len(durations), 3),
+            "p50_ms": round(percentile(durations, 0.50), 3),
+            "p95_ms": round(percentile(durations, 0.95), 3),
+            "p99_ms": round(percentile(durations, 0.99), 3),
+        }
+
+    return {
+        "config": config,
+        "elapsed_s": round(elapsed, 3),
+        "total_requests": len(samples),
+        "throughput_rps": round(len(samples) / elapsed, 2),
+        "errors": sum(route["errors"] for route in routes.values()),
+        "routes": routes,
+    }
+
+
+def compare_with_baseline(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for operation, current in report["routes"].items():
+        previous = baseline.get("routes", {}).get(operation)
+        if not previous:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{operation}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{operation}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} rps"
+            )
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{operation}: errors {previous['errors']} -> {current['errors']}")
+    return regressions
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        operation, weight = part.split("=")
+        if operation not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown operation: {operation}")
+        mix[operation] = int(weight)
+    return mix
+
+
+async def main(args: argparse.Namespace) -> int:
+    from main import app
+
+    dataset_config = DatasetConfig(
+        organizations=args.organizations,
+        contacts_per_organization=args.contacts,
+        deals_per_contact=args.deals,
+        activities_per_deal=args.activities,
+        seed=args.seed,
+    )
+    engine = make_engine(Settings())
+    try:
+        if args.seed_data:
+            fixtures = await seed_dataset(engine, dataset_config)
+        else:
+            fixtures = await load_dataset(engine, dataset_config)
+    finally:
+        await engine.dispose()
+
+    if not fixtures:
+        print("dataset not found, run with --seed-data", file=sys.stderr)
+        return 2
+
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            sessions = []
+            for fixture in fixtures:
+                token = await login(client, fixture)
+                if token is None:
+                    # Без токена весь трафик организации ушел бы в 401 и исказил отчет
+                    print(
+                        f"login failed for {fixture.email}, re-seed the dataset with --seed-data",
+                        file=sys.stderr,
+                    )
+                    return 2
+                sessions.append(Session(
+                    fixture,
+                    {"Authorization": f"Bearer {token}", "X-Organization-Id": str(fixture.organization_id)},
+                ))
+
+            if args.warmup:
+                await run_traffic(client, sessions, args.mix, args.warmup, args.concurrency, args.seed + 1)
+            samples, elapsed = await run_traffic(
+                client, sessions, args.mix, args.requests, args.concurrency, args.seed
+            )
+    finally:
+        await app.state.dishka_container.close()
+
+    report = build_report(samples, elapsed, {
+        "dataset": asdict(dataset_config),
+        "mix": args.mix,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+    })
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    print(output)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare_with_baseline(report, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CRM API load benchmark")
+    parser.add_argument("--seed-data", action="store_true", help="залить набор данных перед прогоном")
+    parser.add_argument("--organizations", type=int, default=5)
+    parser.add_argument("--contacts", type=int, default=200, help="контактов на организацию")
+    parser.add_argument("--deals", type=int, default=2, help="сделок на контакт")
+    parser.add_argument("--activities", type=int, default=2, help="активностей на сделку")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=DEFAULT_MIX,
+        help="веса операций, например deals_list=50,deal_detail=30,login=20",
+    )
+    parser.add_argument("--output", help="куда сохранить JSON-отчет")
+    parser.add_argument("--baseline", help="JSON-отчет для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    sys.exit(asyncio.run(main(parser.parse_args())))
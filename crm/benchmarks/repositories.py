@@ -0,0 +1,338 @@
+"""
+Микробенчмарки репозиториев с планами запросов.
+
+    python -m benchmarks.repositories --output plans.json
+    python -m benchmarks.repositories --baseline plans.json
+
+Каждый метод вызывается напрямую на данных, залитых benchmarks.generate или
+benchmarks.load --seed-data (берется самая крупная организация). Для каждого кейса
+пишутся тайминги и EXPLAIN (ANALYZE, BUFFERS) всех выполненных запросов.
+С --baseline кейс считается регрессией, если таблица, которую раньше читали по индексу,
+теперь читается Seq Scan; процесс завершается с кодом 1.
+Все выполняется в транзакции, которая откатывается.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Awaitable, Callable, Optional
+from uuid import UUID
+
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from benchmarks.dataset import make_engine
+from core.environment.config import Settings
+from deals.models import Deal, DealStatus
+from contacts.models import Contact
+from users.models import OrganizationMember
+from deals.repositories import DealRepository
+from contacts.repositories import ContactRepository
+from activities.repositories import ActivityRepository
+from users.repositories import UserRepository
+from organizations.repositories import OrganizationRepository
+from analytics.repositories import DealStatsRepository, DealStageStatsRepository, DealViewsRepository
+from analytics.enums import TimeseriesInterval, LeaderboardOrder
+import tasks.models  # noqa: F401 - регистрирует маппер для relationship
+
+
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Index Scan", "Bitmap Heap Scan"}
+
+
+@dataclass
+class Target:
+    organization_id: UUID
+    user_id: UUID
+    deal_id: UUID
+    contact_id: UUID
+    search: str
+
+
+@dataclass
+class Case:
+    name: str
+    call: Callable[[AsyncSession, Target], Awaitable]
+
+
+def _deals_page(order_by: str) -> Callable[[AsyncSession, Target], Awaitable]:
+    return lambda session, target: DealRepository(session).list_by_organization(
+        target.organization_id, page=3, page_size=50, order_by=order_by
+    )
+
+
+def build_cases() -> list[Case]:
+    cases = [
+        Case(f"DealRepository.list_by_organization[order_by={order_by}]", _deals_page(order_by))
+        for order_by in ["created_at", "updated_at", "amount", "title", "status", "stage"]
+    ]
+    cases += [
+        Case(
+            "DealRepository.list_by_organization[status=won,in_progress]",
+            lambda session, target: DealRepository(session).list_by_organization(
+                target.organization_id, statuses=[DealStatus.WON, DealStatus.IN_PROGRESS]
+            ),
+        ),
+        Case(
+            "DealRepository.get_by_id",
+            lambda session, target: DealRepository(session).get_by_id(target.deal_id),
+        ),
+        Case(
+            "DealRepository.get_list_fingerprint",
+            lambda session, target: DealRepository(session).get_list_fingerprint(target.organization_id),
+        ),
+        Case(
+            "DealRepository.get_deals_count_by_status",
+            lambda session, target: DealRepository(session).get_deals_count_by_status(target.organization_id),
+        ),
+        Case(
+            "DealRepository.get_deals_amount_by_status",
+            lambda session, target: DealRepository(session).get_deals_amount_by_status(target.organization_id),
+        ),
+        Case(
+            "DealRepository.get_new_deals_count",
+            lambda session, target: DealRepository(session).get_new_deals_count(target.organization_id),
+        ),
+        Case(
+            "DealRepository.get_won_deals_average",
+            lambda session, target: DealRepository(session).get_won_deals_average(target.organization_id),
+        ),
+        Case(
+            "DealRepository.get_deals_funnel_data",
+            lambda session, target: DealRepository(session).get_deals_funnel_data(target.organization_id),
+        ),
+        Case(
+            "DealStatsRepository.get_timeseries[month, 2 years]",
+            lambda session, target: DealStatsRepository(session).get_timeseries(
+                target.organization_id, TimeseriesInterval.MONTH, date(2024, 1, 1), date(2025, 12, 31)
+            ),
+        ),
+        Case(
+            "DealRepository.get_snapshot_rows",
+            lambda session, target: DealRepository(session).get_snapshot_rows(target.organization_id),
+        ),
+        Case(
+            "DealRepository.get_open_deals_stage_age",
+            lambda session, target: DealRepository(session).get_open_deals_stage_age(target.organization_id),
+        ),
+        Case(
+            "DealStageStatsRepository.get_transitions[2 years]",
+            lambda session, target: DealStageStatsRepository(session).get_transitions(
+                target.organization_id, date(2024, 1, 1), date(2025, 12, 31)
+            ),
+        ),
+        Case(
+            "DealViewsRepository.get_owner_stats",
+            lambda session, target: DealViewsRepository(session).get_owner_stats(
+                target.organization_id, LeaderboardOrder.WON_AMOUNT, 20
+            ),
+        ),
+        Case(
+            "DealViewsRepository.get_pipeline",
+            lambda session, target: DealViewsRepository(session).get_pipeline(target.organization_id),
+        ),
+        Case(
+            "ContactRepository.list_by_organization",
+            lambda session, target: ContactRepository(session).list_by_organization(
+                target.organization_id, page=3, page_size=50
+            ),
+        ),
+        Case(
+            "ContactRepository.list_by_organization[search]",
+            lambda session, target: ContactRepository(session).list_by_organization(
+                target.organization_id, search=target.search
+            ),
+        ),
+        Case(
+            "ContactRepository.list_by_organization[owner_id]",
+            lambda session, target: ContactRepository(session).list_by_organization(
+                target.organization_id, owner_id=target.user_id
+            ),
+        ),
+        Case(
+            "ContactRepository.has_deals",
+            lambda session, target: ContactRepository(session).has_deals(target.contact_id),
+        ),
+        Case(
+            "ActivityRepository.list_by_deal",
+            lambda session, target: ActivityRepository(session).list_by_deal(target.deal_id),
+        ),
+        Case(
+            "UserRepository.get_user_membership",
+            lambda session, target: UserRepository(session).get_user_membership(
+                target.user_id, target.organization_id
+            ),
+        ),
+        Case(
+            "OrganizationRepository.get_members",
+            lambda session, target: OrganizationRepository(session).get_members(target.organization_id),
+        ),
+    ]
+    return cases
+
+
+async def find_target(session: AsyncSession, organization_id: Optional[UUID]) -> Optional[Target]:
+    """По умолчанию - организация с наибольшим числом сделок"""
+    if organization_id is None:
+        organization_id = await session.scalar(
+            select(Deal.organization_id)
+            .group_by(Deal.organization_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        )
+        if organization_id is None:
+            return None
+
+    deal = (await session.execute(
+        select(Deal.id, Deal.contact_id).where(Deal.organization_id == organization_id).limit(1)
+    )).one()
+    user_id = (await session.scalars(
+        select(OrganizationMember.user_id).where(OrganizationMember.organization_id == organization_id).limit(1)
+    )).one()
+    contact_name = (await session.scalars(select(Contact.name).where(Contact.id == deal.contact_id))).one()
+    return Target(organization_id, user_id, deal.id, deal.contact_id, contact_name[:8])
+
+
+def scans(plan: dict) -> list[dict]:
+    """Узлы чтения таблиц из JSON-плана: тип узла, таблица, индекс"""
+    found = []
+    if "Relation Name" in plan:
+        found.append({
+            "node": plan["Node Type"],
+            "relation": plan["Relation Name"],
+            "index": plan.get("Index Name"),
+        })
+    for child in plan.get("Plans", []):
+        found += scans(child)
+    return found
+
+
+class StatementCapture:
+    """Запоминает SQL и параметры, которые SQLAlchemy отправляет драйверу"""
+
+    def __init__(self, engine):
+        self.enabled = False
+        self.statements: list[tuple[str, tuple]] = []
+        event.listen(engine.sync_engine, "before_cursor_execute", self._capture)
+
+    def _capture(self, conn, cursor, statement, parameters, context, executemany):
+        if self.enabled:
+            self.statements.append((statement, parameters))
+
+
+async def explain(session: AsyncSession, statement: str, parameters) -> dict:
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(
+        f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters
+    )
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root: dict = plan[0]
+    return root
+
+
+async def run_case(session: AsyncSession, capture: StatementCapture, case: Case, target: Target, repeat: int) -> dict:
+    capture.statements = []
+    capture.enabled = True
+    await case.call(session, target)
+    capture.enabled = False
+    statements = capture.statements
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await case.call(session, target)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+
+    plans = []
+    for statement, parameters in statements:
+        plan = await explain(session, statement, parameters)
+        plans.append({
+            "statement": statement,
+            "execution_ms": plan["Execution Time"],
+            "shared_hit": plan["Plan"].get("Shared Hit Blocks", 0),
+            "shared_read": plan["Plan"].get("Shared Read Blocks", 0),
+            "scans": scans(plan["Plan"]),
+            "plan": plan["Plan"],
+        })
+
+    return {
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p50_ms": round(timings[len(timings) // 2], 3),
+        "max_ms": round(timings[-1], 3),
+        "queries": plans,
+    }
+
+
+def find_plan_regressions(report: dict, baseline: dict) -> list[str]:
+    regressions = []
+    for name, case in report["cases"].items():
+        previous = baseline.get("cases", {}).get(name)
+        if not previous:
+            continue
+        indexed_before = {
+            scan["relation"]
+            for query in previous["queries"]
+            for scan in query["scans"]
+            if scan["node"] in INDEX_SCANS
+        }
+        for query in case["queries"]:
+            for scan in query["scans"]:
+                if scan["node"] == "Seq Scan" and scan["relation"] in indexed_before:
+                    regressions.append(f"{name}: {scan['relation']} index scan -> Seq Scan")
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    engine = make_engine(Settings())
+    capture = StatementCapture(engine)
+    cases = [case for case in build_cases() if not args.only or args.only in case.name]
+
+    try:
+        async with AsyncSession(engine) as session:
+            target = await find_target(session, args.organization_id)
+            if target is None:
+                print("no deals found, seed data with benchmarks.generate first", file=sys.stderr)
+                return 2
+
+            results = {}
+            for case in cases:
+                results[case.name] = await run_case(session, capture, case, target, args.repeat)
+            await session.rollback()
+    finally:
+        await engine.dispose()
+
+    report = {"organization_id": str(target.organization_id), "repeat": args.repeat, "cases": results}
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2, default=str)
+
+    for name, result in results.items():
+        scan_summary = ", ".join(
+            f"{scan['node']}({scan['relation']})" for query in result["queries"] for scan in query["scans"]
+        )
+        print(f"{result['p50_ms']:>9.3f}ms  {name}  [{scan_summary}]")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = find_plan_regressions(report, json.load(file))
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Repository micro-benchmarks with EXPLAIN plans")
+    parser.add_argument("--organization-id", type=UUID, help="по умолчанию - самая крупная организация")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--only", help="запускать только кейсы, в имени которых есть подстрока")
+    parser.add_argument("--output", help="куда сохранить JSON-отчет с планами")
+    parser.add_argument("--baseline", help="отчет для сравнения планов")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,101 @@
+"""
+Бенчмарк сериализации страницы сделок.
+
+    python -m benchmarks.serialization --rows 100 --repeat 2000
+
+before - путь FastAPI по умолчанию для response_model: повторная валидация ответа,
+         serialize в python-объекты и json.dumps в JSONResponse.
+after  - PydanticJSONResponse: pydantic-core сериализует модели сразу в байты.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from core.responses import PydanticJSONResponse
+from deals.entities import DealEntity
+from deals.enums import DealStatus, DealStage
+from deals.schemas import DealsListResponse
+
+
+def build_page(rows: int) -> DealsListResponse:
+    organization_id = uuid4()
+    now = datetime.now(timezone.utc)
+    deals = [
+        DealEntity(
+            id=uuid4(),
+            organization_id=organization_id,
+            contact_id=uuid4(),
+            owner_id=uuid4(),
+            title=f"Deal #{i}",
+            amount=Decimal("1000.00") + i,
+            currency="USD",
+            status=list(DealStatus)[i % len(DealStatus)],
+            stage=list(DealStage)[i % len(DealStage)],
+            created_at=now,
+            updated_at=now,
+            version=1,
+        )
+        for i in range(rows)
+    ]
+    return DealsListResponse(data=deals, total=rows, page=1, page_size=rows)
+
+
+async def render_default(field, page: DealsListResponse) -> bytes:
+    content = await serialize_response(field=field, response_content=page)
+    return bytes(JSONResponse(content).body)
+
+
+async def render_fast(field, page: DealsListResponse) -> bytes:
+    return bytes(PydanticJSONResponse(page).body)
+
+
+async def measure(render, field, page: DealsListResponse, repeat: int) -> dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await render(field, page)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    timings.sort()
+    return {
+        "mean_us": round(statistics.fmean(timings), 1),
+        "p50_us": round(timings[len(timings) // 2], 1),
+        "p95_us": round(timings[int(len(timings) * 0.95)], 1),
+    }
+
+
+async def main(rows: int, repeat: int):
+    page = build_page(rows)
+    field = create_model_field(name="Response_list_deals", type_=DealsListResponse, mode="serialization")
+    
+    # Оба пути должны отдавать один и тот же JSON
+    assert json.loads(await render_default(field, page)) == json.loads(await render_fast(field, page))
+    
+    before = await measure(render_default, field, page, repeat)
+    after = await measure(render_fast, field, page, repeat)
+    print(json.dumps(
+        {
+            "rows": rows,
+            "repeat": repeat,
+            "before": before,
+            "after": after,
+            "speedup": round(before["mean_us"] / after["mean_us"], 2),
+        },
+        indent=2,
+    ))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deal page serialization benchmark")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
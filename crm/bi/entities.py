@@ -0,0 +1,25 @@
+from pydantic import BaseModel, ConfigDict
+from uuid import UUID
+from datetime import datetime
+from typing import Optional
+
+
+class BiExportStateEntity(BaseModel):
+    organization_id: UUID
+    watermark: Optional[datetime] = None
+    last_sequence: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BiExportEntity(BaseModel):
+    organization_id: UUID
+    sequence: int
+    watermark_from: Optional[datetime] = None
+    watermark_to: datetime
+    # Строк в файле каждой сущности; сущностей без изменений в выгрузке нет
+    row_counts: dict[str, int]
+    size_bytes: int
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
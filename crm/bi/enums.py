@@ -0,0 +1,10 @@
+from enum import Enum as PyEnum
+
+
+class ExportEntity(str, PyEnum):
+    DEALS = "deals"
+    CONTACTS = "contacts"
+    TASKS = "tasks"
+    ACTIVITIES = "activities"
+    # Удаленные сделки, контакты и задачи из ленты изменений
+    DELETIONS = "deletions"
@@ -0,0 +1,11 @@
+from core.exceptions import NotFoundException, ForbiddenException
+
+
+class BiExportNotFoundError(NotFoundException):
+    def __init__(self, message: str = "error.bi.export_not_found"):
+        super().__init__(message)
+
+
+class BiAccessDeniedError(ForbiddenException):
+    def __init__(self, message: str = "error.bi.access_denied"):
+        super().__init__(message)
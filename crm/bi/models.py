@@ -0,0 +1,32 @@
+from datetime import datetime
+from uuid import UUID
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Integer, JSON, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.database.database import BaseModel
+
+
+class BiExportState(BaseModel):
+    __tablename__ = "bi_export_states"
+
+    organization_id: Mapped[UUID] = mapped_column(ForeignKey("organizations.id"), primary_key=True)
+    # Все изменения до watermark уже выгружены; NULL - выгрузок еще не было
+    watermark: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_sequence: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class BiExport(BaseModel):
+    __tablename__ = "bi_exports"
+
+    organization_id: Mapped[UUID] = mapped_column(ForeignKey("organizations.id"), primary_key=True)
+    sequence: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Строки, измененные в (watermark_from, watermark_to]; без watermark_from - полная выгрузка
+    watermark_from: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    watermark_to: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    row_counts: Mapped[dict] = mapped_column(JSON, nullable=False)
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now()
+    )
@@ -0,0 +1,82 @@
+from typing import Annotated
+from dishka import Provider, Scope, provide, FromComponent
+
+from bi.repositories import BiExportRepository, BiSourceRepository
+from bi.services import ParquetExportStorage
+from bi.usecases import (
+    ScheduleBiExportsUseCase,
+    ExportOrganizationUseCase,
+    ListBiExportsUseCase,
+    GetBiExportFileUseCase,
+)
+from organizations.repositories import OrganizationRepository
+from jobs.services import JobQueue
+from core.database.unit_of_work import UnitOfWork
+from core.environment.config import Settings
+
+
+class BiProvider(Provider):
+    scope = Scope.REQUEST
+    component = "bi"
+
+    @provide
+    def get_bi_export_repository(
+        self, uow: Annotated[UnitOfWork, FromComponent("database")]
+    ) -> BiExportRepository:
+        return BiExportRepository(uow.session)
+
+    @provide
+    def get_bi_source_repository(
+        self, uow: Annotated[UnitOfWork, FromComponent("database")]
+    ) -> BiSourceRepository:
+        return BiSourceRepository(uow.session)
+
+    @provide(scope=Scope.APP)
+    def get_export_storage(
+        self, settings: Annotated[Settings, FromComponent("environment")]
+    ) -> ParquetExportStorage:
+        return ParquetExportStorage(settings.bi_exports_dir)
+
+    @provide
+    def get_schedule_bi_exports_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        organization_repository: Annotated[OrganizationRepository, FromComponent("organizations")],
+        job_queue: Annotated[JobQueue, FromComponent("jobs")],
+    ) -> ScheduleBiExportsUseCase:
+        return ScheduleBiExportsUseCase(uow, organization_repository, job_queue)
+
+    @provide
+    def get_export_organization_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        export_repository: Annotated[BiExportRepository, FromComponent("bi")],
+        source_repository: Annotated[BiSourceRepository, FromComponent("bi")],
+        storage: Annotated[ParquetExportStorage, FromComponent("bi")],
+        settings: Annotated[Settings, FromComponent("environment")],
+    ) -> ExportOrganizationUseCase:
+        return ExportOrganizationUseCase(
+            uow,
+            export_repository,
+            source_repository,
+            storage,
+            settings.bi_export_clock_skew_seconds,
+            settings.bi_export_batch_size,
+        )
+
+    @provide
+    def get_list_bi_exports_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        export_repository: Annotated[BiExportRepository, FromComponent("bi")],
+    ) -> ListBiExportsUseCase:
+        return ListBiExportsUseCase(uow, export_repository)
+
+    @provide
+    def get_bi_export_file_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        export_repository: Annotated[BiExportRepository, FromComponent("bi")],
+        storage: Annotated[ParquetExportStorage, FromComponent("bi")],
+    ) -> GetBiExportFileUseCase:
+        return GetBiExportFileUseCase(uow, export_repository, storage)
@@ -0,0 +1,168 @@
+from datetime import datetime
+from typing import AsyncIterator, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import Row, Select, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from bi.entities import BiExportEntity, BiExportStateEntity
+from bi.enums import ExportEntity
+from bi.models import BiExport, BiExportState
+from changes.enums import ChangeEntityType, ChangeOperation
+from changes.models import ChangeEvent
+from contacts.models import Contact
+from deals.models import Deal
+from tasks.models import Task
+from activities.models import Activity
+from core.tracing import traced
+
+
+DELETED_ENTITY_TYPES = [ChangeEntityType.DEAL, ChangeEntityType.CONTACT, ChangeEntityType.TASK]
+
+
+@traced
+class BiExportRepository:
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def lock_state(self, organization_id: UUID) -> Optional[BiExportStateEntity]:
+        """Состояние выгрузок организации под FOR UPDATE SKIP LOCKED: None, если выгружает другой воркер"""
+        await self._session.execute(
+            insert(BiExportState)
+            .values(organization_id=organization_id, last_sequence=0)
+            .on_conflict_do_nothing(index_elements=[BiExportState.organization_id])
+        )
+        result = await self._session.execute(
+            select(BiExportState)
+            .where(BiExportState.organization_id == organization_id)
+            .with_for_update(skip_locked=True)
+        )
+        state = result.scalar_one_or_none()
+        if state:
+            return BiExportStateEntity.model_validate(state)
+        return None
+
+    async def get_stable_watermark(self, clock_skew_seconds: float) -> datetime:
+        """
+        Граница, до которой изменения уже не появятся: updated_at и created_at пишутся
+        не раньше начала своей транзакции, поэтому все строки с меньшей меткой закоммичены,
+        если раньше нее не началась ни одна открытая транзакция. clock_skew_seconds -
+        запас на метки, которые приложение ставит по своим часам.
+        """
+        watermark: datetime = await self._session.scalar(text(
+            "SELECT least(now(), coalesce(min(xact_start), now())) - make_interval(secs => :skew) "
+            "FROM pg_stat_activity "
+            "WHERE datname = current_database() AND pid <> pg_backend_pid() AND xact_start IS NOT NULL"
+        ), {"skew": clock_skew_seconds})
+        return watermark
+
+    async def save(self, export_data: dict) -> BiExportEntity:
+        export = BiExport(**export_data)
+        self._session.add(export)
+        await self._session.flush()
+        await self._session.execute(
+            update(BiExportState)
+            .where(BiExportState.organization_id == export.organization_id)
+            .values(watermark=export.watermark_to, last_sequence=export.sequence)
+        )
+        return BiExportEntity.model_validate(export)
+
+    async def get(self, organization_id: UUID, sequence: int) -> Optional[BiExportEntity]:
+        result = await self._session.execute(
+            select(BiExport).where(BiExport.organization_id == organization_id, BiExport.sequence == sequence)
+        )
+        export = result.scalar_one_or_none()
+        if export:
+            return BiExportEntity.model_validate(export)
+        return None
+
+    async def list_since(self, organization_id: UUID, after: int, limit: int) -> list[BiExportEntity]:
+        result = await self._session.execute(
+            select(BiExport)
+            .where(BiExport.organization_id == organization_id, BiExport.sequence > after)
+            .order_by(BiExport.sequence)
+            .limit(limit)
+        )
+        return [BiExportEntity.model_validate(export) for export in result.scalars()]
+
+
+@traced
+class BiSourceRepository:
+    """Чтение строк для выгрузок BI: изменения организации в окне (watermark_from, watermark_to]"""
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def stream(
+        self,
+        entity: ExportEntity,
+        organization_id: UUID,
+        watermark_from: Optional[datetime],
+        watermark_to: datetime,
+        batch_size: int = 5000,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Пачки строк через серверный курсор: память не растет с размером организации"""
+        query, column = self._query(entity, organization_id)
+        query = query.where(column <= watermark_to)
+        if watermark_from is not None:
+            query = query.where(column > watermark_from)
+        query = query.order_by(column).execution_options(yield_per=batch_size)
+
+        result = await self._session.stream(query)
+        async for partition in result.partitions():
+            yield partition
+
+    def _query(
+        self, entity: ExportEntity, organization_id: UUID
+    ) -> tuple[Select, InstrumentedAttribute[datetime]]:
+        if entity == ExportEntity.DEALS:
+            return (
+                select(
+                    Deal.id, Deal.organization_id, Deal.contact_id, Deal.owner_id, Deal.title,
+                    Deal.amount, Deal.currency, Deal.amount_base, Deal.status, Deal.stage,
+                    Deal.created_at, Deal.updated_at, Deal.version, Deal.closed_at, Deal.stage_entered_at,
+                ).where(Deal.organization_id == organization_id),
+                Deal.updated_at,
+            )
+        if entity == ExportEntity.CONTACTS:
+            return (
+                select(
+                    Contact.id, Contact.organization_id, Contact.owner_id, Contact.name,
+                    Contact.email, Contact.phone, Contact.created_at, Contact.updated_at,
+                ).where(Contact.organization_id == organization_id),
+                Contact.updated_at,
+            )
+        if entity == ExportEntity.TASKS:
+            return (
+                select(
+                    Task.id, Task.deal_id, Task.title, Task.description, Task.due_date,
+                    Task.is_done, Task.created_at, Task.updated_at,
+                )
+                .join(Deal, Deal.id == Task.deal_id)
+                .where(Deal.organization_id == organization_id),
+                Task.updated_at,
+            )
+        if entity == ExportEntity.ACTIVITIES:
+            return (
+                select(
+                    Activity.id, Activity.deal_id, Activity.author_id, Activity.type,
+                    Activity.payload, Activity.created_at,
+                )
+                .join(Deal, Deal.id == Activity.deal_id)
+                .where(Deal.organization_id == organization_id),
+                Activity.created_at,
+            )
+        return (
+            select(
+                ChangeEvent.entity_type,
+                ChangeEvent.entity_id,
+                ChangeEvent.created_at.label("deleted_at"),
+            ).where(
+                ChangeEvent.organization_id == organization_id,
+                ChangeEvent.operation == ChangeOperation.DELETED,
+                ChangeEvent.entity_type.in_(DELETED_ENTITY_TYPES),
+            ),
+            ChangeEvent.created_at,
+        )
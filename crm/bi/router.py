@@ -0,0 +1,47 @@
+from typing import Annotated
+from fastapi import APIRouter, Query
+from fastapi.responses import FileResponse
+from dishka.integrations.fastapi import inject
+from dishka import FromComponent
+
+from bi.enums import ExportEntity
+from bi.schemas import BiExportsListResponse
+from bi.services import PARQUET_MEDIA_TYPE
+from bi.usecases import ListBiExportsUseCase, GetBiExportFileUseCase, MAX_EXPORTS_PAGE
+from auth.entities import AuthenticatedUser
+from core.responses import PydanticJSONResponse
+
+
+router = APIRouter(
+    prefix="/api/v1/bi",
+    tags=["bi"],
+)
+
+
+@router.get("/exports", response_model=BiExportsListResponse)
+@inject
+async def list_bi_exports(
+    user: Annotated[AuthenticatedUser, FromComponent("auth")],
+    list_usecase: Annotated[ListBiExportsUseCase, FromComponent("bi")],
+    after: int = Query(0, ge=0, description="номер последней уже загруженной выгрузки"),
+    limit: int = Query(MAX_EXPORTS_PAGE, ge=1, le=MAX_EXPORTS_PAGE),
+):
+    """
+    Выгрузки организации по порядку номеров. Каждая содержит строки, измененные
+    после предыдущей: применяйте их по порядку, более поздняя версия строки побеждает.
+    """
+    exports = await list_usecase(user, after, limit)
+    return PydanticJSONResponse(BiExportsListResponse(data=exports))
+
+
+@router.get("/exports/{sequence}/{entity}.parquet", response_class=FileResponse)
+@inject
+async def download_bi_export(
+    sequence: int,
+    entity: ExportEntity,
+    user: Annotated[AuthenticatedUser, FromComponent("auth")],
+    file_usecase: Annotated[GetBiExportFileUseCase, FromComponent("bi")],
+):
+    """Parquet-файл сущности из выгрузки; отдается с диска потоком, поддерживает Range"""
+    path = await file_usecase(user, sequence, entity)
+    return FileResponse(path, media_type=PARQUET_MEDIA_TYPE, filename=f"{entity.value}-{sequence:06d}.parquet")
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+from bi.entities import BiExportEntity
+
+
+class BiExportsListResponse(BaseModel):
+    data: list[BiExportEntity]
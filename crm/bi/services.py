@@ -0,0 +1,133 @@
+import json
+import os
+from enum import Enum
+from pathlib import Path
+from typing import AsyncIterable, Sequence
+from uuid import UUID
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Row
+
+from bi.enums import ExportEntity
+
+
+EXPORT_ORGANIZATION_TASK = "bi.export_organization"
+SCHEDULE_EXPORTS_TASK = "bi.schedule_exports"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+# Перечисления и валюта - словарь значений и int8-индексы вместо строки в каждой строке
+ENUM = pa.dictionary(pa.int8(), pa.string())
+UUID_TYPE = pa.string()
+TIMESTAMP = pa.timestamp("us", tz="UTC")
+MONEY = pa.decimal128(18, 2)
+
+EXPORT_SCHEMAS = {
+    ExportEntity.DEALS: pa.schema([
+        ("id", UUID_TYPE),
+        ("organization_id", UUID_TYPE),
+        ("contact_id", UUID_TYPE),
+        ("owner_id", UUID_TYPE),
+        ("title", pa.string()),
+        ("amount", MONEY),
+        ("currency", ENUM),
+        ("amount_base", MONEY),
+        ("status", ENUM),
+        ("stage", ENUM),
+        ("created_at", TIMESTAMP),
+        ("updated_at", TIMESTAMP),
+        ("version", pa.int32()),
+        ("closed_at", TIMESTAMP),
+        ("stage_entered_at", TIMESTAMP),
+    ]),
+    ExportEntity.CONTACTS: pa.schema([
+        ("id", UUID_TYPE),
+        ("organization_id", UUID_TYPE),
+        ("owner_id", UUID_TYPE),
+        ("name", pa.string()),
+        ("email", pa.string()),
+        ("phone", pa.string()),
+        ("created_at", TIMESTAMP),
+        ("updated_at", TIMESTAMP),
+    ]),
+    ExportEntity.TASKS: pa.schema([
+        ("id", UUID_TYPE),
+        ("deal_id", UUID_TYPE),
+        ("title", pa.string()),
+        ("description", pa.string()),
+        ("due_date", pa.date32()),
+        ("is_done", pa.bool_()),
+        ("created_at", TIMESTAMP),
+        ("updated_at", TIMESTAMP),
+    ]),
+    ExportEntity.ACTIVITIES: pa.schema([
+        ("id", UUID_TYPE),
+        ("deal_id", UUID_TYPE),
+        ("author_id", UUID_TYPE),
+        ("type", ENUM),
+        # JSON-строка: состав payload зависит от типа активности
+        ("payload", pa.string()),
+        ("created_at", TIMESTAMP),
+    ]),
+    ExportEntity.DELETIONS: pa.schema([
+        ("entity_type", ENUM),
+        ("entity_id", UUID_TYPE),
+        ("deleted_at", TIMESTAMP),
+    ]),
+}
+
+
+def _to_arrow(value):
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def record_batch(schema: pa.Schema, rows: Sequence[Row]) -> pa.RecordBatch:
+    columns = {name: [_to_arrow(row._mapping[name]) for row in rows] for name in schema.names}
+    return pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+class ParquetExportStorage:
+    """
+    Файлы выгрузок BI на диске: <root>/<organization_id>/<sequence>/<entity>.parquet.
+
+    Файл пишется пачками из серверного курсора во временный и переименовывается
+    только целиком. Повтор упавшего задания перезаписывает файлы той же выгрузки:
+    номер выгрузки фиксируется в базе вместе с записью о ней.
+    """
+
+    def __init__(self, root: str, compression: str = "zstd"):
+        self.root = Path(root)
+        self._compression = compression
+
+    def path(self, organization_id: UUID, sequence: int, entity: ExportEntity) -> Path:
+        return self.root / str(organization_id) / f"{sequence:06d}" / f"{entity.value}.parquet"
+
+    async def write(
+        self,
+        organization_id: UUID,
+        sequence: int,
+        entity: ExportEntity,
+        partitions: AsyncIterable[Sequence[Row]],
+    ) -> tuple[int, int]:
+        """Число строк и размер файла; без строк файл не создается"""
+        path = self.path(organization_id, sequence, entity)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(".parquet.tmp")
+        schema = EXPORT_SCHEMAS[entity]
+
+        rows = 0
+        with pq.ParquetWriter(temporary, schema, compression=self._compression) as writer:
+            async for partition in partitions:
+                writer.write_batch(record_batch(schema, partition))
+                rows += len(partition)
+        if not rows:
+            temporary.unlink()
+            return 0, 0
+        os.replace(temporary, path)
+        return rows, path.stat().st_size
@@ -0,0 +1,148 @@
+import time
+from pathlib import Path
+from uuid import UUID
+
+from core.database.unit_of_work import UnitOfWork
+from core.metrics import instrumented
+from jobs.registry import job_handler
+from jobs.services import JobQueue
+from organizations.repositories import OrganizationRepository
+from bi.entities import BiExportEntity
+from bi.enums import ExportEntity
+from bi.exceptions import BiAccessDeniedError, BiExportNotFoundError
+from bi.repositories import BiExportRepository, BiSourceRepository
+from bi.services import EXPORT_ORGANIZATION_TASK, SCHEDULE_EXPORTS_TASK, ParquetExportStorage
+from users.enums import UserRole
+from auth.entities import AuthenticatedUser
+
+
+EXPORT_INTERVAL_SECONDS = 3600
+MAX_EXPORTS_PAGE = 100
+
+
+def check_can_read_exports(user: AuthenticatedUser):
+    # В выгрузках все данные организации: только owner и admin
+    if user.role not in [UserRole.OWNER.value, UserRole.ADMIN.value]:
+        raise BiAccessDeniedError()
+
+
+@job_handler(SCHEDULE_EXPORTS_TASK, component="bi", every=EXPORT_INTERVAL_SECONDS)
+@instrumented
+class ScheduleBiExportsUseCase:
+    """Периодическое задание: ставит выгрузку каждой организации отдельным заданием"""
+
+    def __init__(self, uow: UnitOfWork, organization_repository: OrganizationRepository, job_queue: JobQueue):
+        self._uow = uow
+        self._organization_repository = organization_repository
+        self._job_queue = job_queue
+
+    async def __call__(self):
+        slot = int(time.time() // EXPORT_INTERVAL_SECONDS)
+        async with self._uow:
+            for organization_id in await self._organization_repository.list_ids():
+                await self._job_queue.enqueue(
+                    EXPORT_ORGANIZATION_TASK,
+                    {"organization_id": organization_id},
+                    idempotency_key=f"{EXPORT_ORGANIZATION_TASK}:{organization_id}:{slot}",
+                )
+
+
+@job_handler(EXPORT_ORGANIZATION_TASK, component="bi")
+@instrumented
+class ExportOrganizationUseCase:
+    """
+    Задание воркера: инкрементальная выгрузка организации в Parquet.
+
+    В выгрузку попадают строки, измененные (сделки, контакты, задачи - updated_at,
+    активности - created_at) и удаленные после прошлой выгрузки и до стабильной
+    границы. Без изменений выгрузка не создается. Чтение идет в воркере через
+    серверный курсор, а не пагинацией API.
+    """
+
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        export_repository: BiExportRepository,
+        source_repository: BiSourceRepository,
+        storage: ParquetExportStorage,
+        clock_skew_seconds: float,
+        batch_size: int,
+    ):
+        self._uow = uow
+        self._export_repository = export_repository
+        self._source_repository = source_repository
+        self._storage = storage
+        self._clock_skew_seconds = clock_skew_seconds
+        self._batch_size = batch_size
+
+    async def __call__(self, organization_id: str):
+        organization_uuid = UUID(organization_id)
+        async with self._uow:
+            state = await self._export_repository.lock_state(organization_uuid)
+            if state is None:
+                return
+            
+            watermark_to = await self._export_repository.get_stable_watermark(self._clock_skew_seconds)
+            if state.watermark is not None and watermark_to <= state.watermark:
+                return
+            
+            sequence = state.last_sequence + 1
+            row_counts, size_bytes = {}, 0
+            for entity in ExportEntity:
+                rows, size = await self._storage.write(
+                    organization_uuid,
+                    sequence,
+                    entity,
+                    self._source_repository.stream(
+                        entity, organization_uuid, state.watermark, watermark_to, self._batch_size
+                    ),
+                )
+                if rows:
+                    row_counts[entity.value] = rows
+                    size_bytes += size
+            
+            if not row_counts:
+                return
+            
+            await self._export_repository.save({
+                "organization_id": organization_uuid,
+                "sequence": sequence,
+                "watermark_from": state.watermark,
+                "watermark_to": watermark_to,
+                "row_counts": row_counts,
+                "size_bytes": size_bytes,
+            })
+
+
+@instrumented
+class ListBiExportsUseCase:
+    def __init__(self, uow: UnitOfWork, export_repository: BiExportRepository):
+        self._uow = uow
+        self._export_repository = export_repository
+
+    async def __call__(
+        self, user: AuthenticatedUser, after: int = 0, limit: int = MAX_EXPORTS_PAGE
+    ) -> list[BiExportEntity]:
+        check_can_read_exports(user)
+        async with self._uow:
+            return await self._export_repository.list_since(user.organization_id, after, limit)
+
+
+@instrumented
+class GetBiExportFileUseCase:
+    def __init__(self, uow: UnitOfWork, export_repository: BiExportRepository, storage: ParquetExportStorage):
+        self._uow = uow
+        self._export_repository = export_repository
+        self._storage = storage
+
+    async def __call__(self, user: AuthenticatedUser, sequence: int, entity: ExportEntity) -> Path:
+        check_can_read_exports(user)
+        async with self._uow:
+            export = await self._export_repository.get(user.organization_id, sequence)
+        
+        if export is None or entity.value not in export.row_counts:
+            raise BiExportNotFoundError()
+        path = self._storage.path(user.organization_id, sequence, entity)
+        if not path.exists():
+            raise BiExportNotFoundError()
+        return path
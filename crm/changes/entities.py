@@ -0,0 +1,30 @@
+from pydantic import BaseModel, ConfigDict, computed_field
+from uuid import UUID
+from datetime import datetime
+from typing import Optional
+
+from changes.enums import ChangeEntityType, ChangeOperation
+
+
+class ChangeEventEntity(BaseModel):
+    id: int
+    txid: int
+    organization_id: UUID
+    entity_type: ChangeEntityType
+    entity_id: UUID
+    operation: ChangeOperation
+    data: Optional[dict] = None
+    actor_id: Optional[UUID] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def cursor(self) -> str:
+        """Позиция события в ленте, передается обратно в ?since="""
+        return format_cursor(self.txid, self.id)
+
+
+def format_cursor(txid: int, event_id: int) -> str:
+    return f"{txid}-{event_id}"
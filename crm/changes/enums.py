@@ -0,0 +1,14 @@
+from enum import Enum as PyEnum
+
+
+class ChangeEntityType(str, PyEnum):
+    DEAL = "deal"
+    CONTACT = "contact"
+    TASK = "task"
+    ORGANIZATION_MEMBER = "organization_member"
+
+
+class ChangeOperation(str, PyEnum):
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
@@ -0,0 +1,6 @@
+from core.exceptions import BadRequestException
+
+
+class InvalidChangeCursorError(BadRequestException):
+    def __init__(self, message: str = "error.change.invalid_cursor"):
+        super().__init__(message)
@@ -0,0 +1,33 @@
+from datetime import datetime
+from uuid import UUID
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Identity, Enum, JSON, Index, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.database.database import BaseModel
+from changes.enums import ChangeEntityType, ChangeOperation
+
+
+class ChangeEvent(BaseModel):
+    __tablename__ = "change_events"
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    # Транзакция, записавшая событие: лента отдает события в порядке (txid, id)
+    # и только завершенных транзакций, поэтому курсор не перепрыгивает незакоммиченные
+    txid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=text("txid_current()")
+    )
+    organization_id: Mapped[UUID] = mapped_column(ForeignKey("organizations.id"), nullable=False)
+    entity_type: Mapped[ChangeEntityType] = mapped_column(Enum(ChangeEntityType), nullable=False)
+    entity_id: Mapped[UUID] = mapped_column(nullable=False)
+    operation: Mapped[ChangeOperation] = mapped_column(Enum(ChangeOperation), nullable=False)
+    data: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    actor_id: Mapped[Optional[UUID]] = mapped_column(nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now()
+    )
+
+    __table_args__ = (
+        Index("ix_change_events_organization_id_txid_id", "organization_id", "txid", "id"),
+    )
@@ -0,0 +1,35 @@
+from typing import Annotated
+from dishka import Provider, Scope, provide, FromComponent
+
+from changes.repositories import ChangeEventRepository
+from changes.services import ChangeLog
+from changes.usecases import ListChangesUseCase
+from core.database.unit_of_work import UnitOfWork
+from core.cache import CacheInvalidator
+
+
+class ChangeProvider(Provider):
+    scope = Scope.REQUEST
+    component = "changes"
+
+    @provide
+    def get_change_event_repository(
+        self, uow: Annotated[UnitOfWork, FromComponent("database")]
+    ) -> ChangeEventRepository:
+        return ChangeEventRepository(uow.session)
+
+    @provide
+    def get_change_log(
+        self,
+        change_event_repository: Annotated[ChangeEventRepository, FromComponent("changes")],
+        cache_invalidator: Annotated[CacheInvalidator, FromComponent("cache")],
+    ) -> ChangeLog:
+        return ChangeLog(change_event_repository, cache_invalidator)
+
+    @provide
+    def get_list_changes_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        change_event_repository: Annotated[ChangeEventRepository, FromComponent("changes")],
+    ) -> ListChangesUseCase:
+        return ListChangesUseCase(uow, change_event_repository)
@@ -0,0 +1,58 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, select, insert, func, literal, tuple_
+from uuid import UUID
+from typing import Optional
+
+from changes.models import ChangeEvent
+from changes.entities import ChangeEventEntity
+from core.entities import entity_from_row
+from core.tracing import traced
+
+
+CHANGE_EVENT_COLUMNS = tuple(
+    getattr(ChangeEvent, field) for field in ChangeEventEntity.model_fields
+)
+
+
+def change_event_from_row(row: Row) -> ChangeEventEntity:
+    return entity_from_row(ChangeEventEntity, row)
+
+
+@traced
+class ChangeEventRepository:
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def append(self, change_data: dict):
+        await self._session.execute(insert(ChangeEvent).values(**change_data))
+
+    async def append_many(self, changes_data: list[dict]):
+        if changes_data:
+            await self._session.execute(insert(ChangeEvent), changes_data)
+
+    async def list_since(
+        self,
+        organization_id: UUID,
+        after: Optional[tuple[int, int]],
+        limit: int,
+    ) -> list[ChangeEventEntity]:
+        """
+        События организации после курсора (txid, id), только завершенных транзакций.
+
+        txid < xmin текущего снимка означает, что транзакция события и все более ранние
+        уже завершены: события с меньшим (txid, id) позже не появятся, и курсор
+        можно сдвигать без потерь. События еще открытых транзакций придут следующим вызовом.
+        """
+        query = (
+            select(*CHANGE_EVENT_COLUMNS)
+            .where(
+                ChangeEvent.organization_id == organization_id,
+                ChangeEvent.txid < func.txid_snapshot_xmin(func.txid_current_snapshot()),
+            )
+            .order_by(ChangeEvent.txid, ChangeEvent.id)
+            .limit(limit)
+        )
+        if after is not None:
+            query = query.where(tuple_(ChangeEvent.txid, ChangeEvent.id) > tuple_(literal(after[0]), literal(after[1])))
+        result = await self._session.execute(query)
+        return [change_event_from_row(row) for row in result]
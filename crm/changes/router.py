@@ -0,0 +1,30 @@
+from typing import Annotated, Optional
+from fastapi import APIRouter, Query
+from dishka.integrations.fastapi import inject
+from dishka import FromComponent
+
+from changes.schemas import ChangesFeedResponse
+from changes.usecases import ListChangesUseCase
+from auth.entities import AuthenticatedUser
+from core.responses import PydanticJSONResponse
+
+
+router = APIRouter(
+    prefix="/api/v1/changes",
+    tags=["changes"],
+)
+
+
+@router.get("", response_model=ChangesFeedResponse)
+@inject
+async def list_changes(
+    user: Annotated[AuthenticatedUser, FromComponent("auth")],
+    list_usecase: Annotated[ListChangesUseCase, FromComponent("changes")],
+    since: Optional[str] = Query(None, description="next_cursor предыдущего ответа; без него - с начала"),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    events, has_more = await list_usecase(user, since, limit)
+    next_cursor = events[-1].cursor if events else since
+    return PydanticJSONResponse(
+        ChangesFeedResponse(data=events, next_cursor=next_cursor, has_more=has_more)
+    )
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import Optional
+
+from changes.entities import ChangeEventEntity
+
+
+class ChangesFeedResponse(BaseModel):
+    data: list[ChangeEventEntity]
+    # Курсор для следующего запроса; при пустой странице равен переданному since
+    next_cursor: Optional[str]
+    has_more: bool
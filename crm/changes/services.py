@@ -0,0 +1,76 @@
+from uuid import UUID
+from typing import Optional, Sequence
+
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
+from changes.enums import ChangeEntityType, ChangeOperation
+from changes.repositories import ChangeEventRepository
+from core.cache import CacheInvalidator, cache_tag
+
+
+class ChangeLog:
+    """
+    Запись изменений в outbox-таблицу change_events.
+
+    Вызывается внутри `async with self._uow:` изменяющего use case, поэтому событие
+    фиксируется ровно тогда, когда фиксируется само изменение. Заодно сбрасывает
+    кеши, помеченные тегами организации и сущности, во всех воркерах.
+    """
+
+    def __init__(self, change_event_repository: ChangeEventRepository, cache_invalidator: CacheInvalidator):
+        self._change_event_repository = change_event_repository
+        self._cache_invalidator = cache_invalidator
+
+    async def record(
+        self,
+        organization_id: UUID,
+        entity_type: ChangeEntityType,
+        entity_id: UUID,
+        operation: ChangeOperation,
+        data: Optional[BaseModel] = None,
+        actor_id: Optional[UUID] = None,
+    ):
+        await self._change_event_repository.append({
+            "organization_id": organization_id,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "operation": operation,
+            # Снимок сущности после изменения; у удаления - None
+            "data": to_jsonable_python(data) if data is not None else None,
+            "actor_id": actor_id,
+        })
+        await self._cache_invalidator.invalidate(
+            cache_tag(organization_id, entity_type.value),
+            cache_tag(organization_id, entity_type.value, entity_id),
+        )
+
+    async def record_many(
+        self,
+        entity_type: ChangeEntityType,
+        operation: ChangeOperation,
+        changes: Sequence[tuple[UUID, UUID, Optional[BaseModel]]],
+        actor_id: Optional[UUID] = None,
+    ):
+        """Массовое изменение: события (organization_id, entity_id, data) одним INSERT"""
+        await self._change_event_repository.append_many([
+            {
+                "organization_id": organization_id,
+                "entity_type": entity_type,
+                "entity_id": entity_id,
+                "operation": operation,
+                "data": to_jsonable_python(data) if data is not None else None,
+                "actor_id": actor_id,
+            }
+            for organization_id, entity_id, data in changes
+        ])
+        tags = dict.fromkeys(
+            tag
+            for organization_id, entity_id, _ in changes
+            for tag in (
+                cache_tag(organization_id, entity_type.value),
+                cache_tag(organization_id, entity_type.value, entity_id),
+            )
+        )
+        if tags:
+            await self._cache_invalidator.invalidate(*tags)
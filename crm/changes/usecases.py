@@ -0,0 +1,34 @@
+from typing import Optional
+
+from core.database.unit_of_work import UnitOfWork
+from core.metrics import instrumented
+from changes.repositories import ChangeEventRepository
+from changes.entities import ChangeEventEntity
+from changes.exceptions import InvalidChangeCursorError
+from auth.entities import AuthenticatedUser
+
+
+def parse_cursor(cursor: str) -> tuple[int, int]:
+    try:
+        txid, event_id = cursor.split("-")
+        return int(txid), int(event_id)
+    except ValueError:
+        raise InvalidChangeCursorError() from None
+
+
+@instrumented
+class ListChangesUseCase:
+    def __init__(self, uow: UnitOfWork, change_event_repository: ChangeEventRepository):
+        self._uow = uow
+        self._change_event_repository = change_event_repository
+
+    async def __call__(
+        self, user: AuthenticatedUser, since: Optional[str], limit: int
+    ) -> tuple[list[ChangeEventEntity], bool]:
+        after = parse_cursor(since) if since else None
+        async with self._uow:
+            # Берем на одно событие больше, чтобы узнать, есть ли следующая страница
+            events = await self._change_event_repository.list_since(
+                user.organization_id, after, limit + 1
+            )
+        return events[:limit], len(events) > limit
@@ -12,6 +12,22 @@ class ContactEntity(BaseModel):
     email: Optional[str] = None
     phone: Optional[str] = None
     created_at: datetime
+    updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
+
+
+class ContactFingerprintEntity(BaseModel):
+    """Минимальный набор полей для ETag/Last-Modified без загрузки всего контакта"""
+    id: UUID
+    organization_id: UUID
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ContactExportEntity(ContactEntity):
+    """Контакт для выгрузки: с именем владельца и числом открытых сделок"""
+    owner_name: str
+    open_deals_count: int
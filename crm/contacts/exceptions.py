@@ -15,3 +15,8 @@ class ContactHasDealsError(ConflictException):
     def __init__(self, message: str = "error.contact.has_deals"):
         super().__init__(message)
 
+
+
+class ContactConcurrentUpdateError(ConflictException):
+    def __init__(self, message: str = "error.contact.concurrent_update"):
+        super().__init__(message)
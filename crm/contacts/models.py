@@ -2,7 +2,7 @@ from datetime import datetime
 from uuid import UUID, uuid4
 from typing import Optional
 
-from sqlalchemy import String, DateTime, ForeignKey, func
+from sqlalchemy import String, DateTime, ForeignKey, func, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from core.database.database import BaseModel
@@ -20,6 +20,13 @@ class Contact(BaseModel):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=func.now()
     )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (
+        Index("ix_contacts_organization_id_updated_at", "organization_id", "updated_at"),
+    )
 
     organization: Mapped["Organization"] = relationship(back_populates="contacts")
     owner: Mapped["User"] = relationship(back_populates="owned_contacts")
@@ -8,7 +8,11 @@ from contacts.usecases import (
     UpdateContactUseCase,
     DeleteContactUseCase,
     ListContactsUseCase,
+    GetContactFingerprintUseCase,
+    GetContactsListFingerprintUseCase,
+    ExportContactsUseCase,
 )
+from changes.services import ChangeLog
 from core.database.unit_of_work import UnitOfWork
 
 
@@ -27,8 +31,9 @@ class ContactProvider(Provider):
         self,
         uow: Annotated[UnitOfWork, FromComponent("database")],
         contact_repository: Annotated[ContactRepository, FromComponent("contacts")],
+        change_log: Annotated[ChangeLog, FromComponent("changes")],
     ) -> CreateContactUseCase:
-        return CreateContactUseCase(uow, contact_repository)
+        return CreateContactUseCase(uow, contact_repository, change_log)
 
     @provide
     def get_get_contact_usecase(
@@ -43,16 +48,18 @@ class ContactProvider(Provider):
         self,
         uow: Annotated[UnitOfWork, FromComponent("database")],
         contact_repository: Annotated[ContactRepository, FromComponent("contacts")],
+        change_log: Annotated[ChangeLog, FromComponent("changes")],
     ) -> UpdateContactUseCase:
-        return UpdateContactUseCase(uow, contact_repository)
+        return UpdateContactUseCase(uow, contact_repository, change_log)
 
     @provide
     def get_delete_contact_usecase(
         self,
         uow: Annotated[UnitOfWork, FromComponent("database")],
         contact_repository: Annotated[ContactRepository, FromComponent("contacts")],
+        change_log: Annotated[ChangeLog, FromComponent("changes")],
     ) -> DeleteContactUseCase:
-        return DeleteContactUseCase(uow, contact_repository)
+        return DeleteContactUseCase(uow, contact_repository, change_log)
 
     @provide
     def get_list_contacts_usecase(
@@ -62,3 +69,27 @@ class ContactProvider(Provider):
     ) -> ListContactsUseCase:
         return ListContactsUseCase(uow, contact_repository)
 
+
+    @provide
+    def get_contact_fingerprint_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        contact_repository: Annotated[ContactRepository, FromComponent("contacts")],
+    ) -> GetContactFingerprintUseCase:
+        return GetContactFingerprintUseCase(uow, contact_repository)
+
+    @provide
+    def get_contacts_list_fingerprint_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        contact_repository: Annotated[ContactRepository, FromComponent("contacts")],
+    ) -> GetContactsListFingerprintUseCase:
+        return GetContactsListFingerprintUseCase(uow, contact_repository)
+
+    @provide
+    def get_export_contacts_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        contact_repository: Annotated[ContactRepository, FromComponent("contacts")],
+    ) -> ExportContactsUseCase:
+        return ExportContactsUseCase(uow, contact_repository)
@@ -1,13 +1,25 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, exists, update, delete
+from sqlalchemy import Row, Select, select, func, exists, update, delete
 from uuid import UUID
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from contacts.models import Contact
-from contacts.entities import ContactEntity
-from deals.models import Deal
+from contacts.entities import ContactEntity, ContactExportEntity, ContactFingerprintEntity
+from core.entities import ListFingerprintEntity, entity_from_row
+from core.tracing import traced
+from deals.models import Deal, DealStatus
+from users.models import User
 
 
+# Колонки ContactEntity: списки читают их кортежами, без ORM-объектов и identity map
+CONTACT_COLUMNS = tuple(getattr(Contact, field) for field in ContactEntity.model_fields)
+
+
+def contact_from_row(row: Row) -> ContactEntity:
+    return entity_from_row(ContactEntity, row)
+
+
+@traced
 class ContactRepository:
     def __init__(self, session: AsyncSession):
         self._session = session
@@ -26,24 +38,46 @@ class ContactRepository:
         await self._session.flush()
         return ContactEntity.model_validate(contact)
 
-    async def update(self, contact_id: UUID, contact_data: dict):
-        stmt = update(Contact).where(Contact.id == contact_id).values(**contact_data)
-        await self._session.execute(stmt)
+    async def update(
+        self,
+        contact_id: UUID,
+        contact_data: dict,
+        preconditions: Optional[dict] = None,
+    ) -> Optional[ContactEntity]:
+        """
+        Обновляет контакт одним UPDATE ... RETURNING и возвращает сохраненную строку.
+
+        preconditions - ожидаемые значения колонок (optimistic concurrency): если строка
+        успела измениться, UPDATE не затронет ее и метод вернет None.
+        """
+        conditions = [
+            getattr(Contact, column) == value for column, value in (preconditions or {}).items()
+        ]
+        stmt = (
+            update(Contact)
+            .where(Contact.id == contact_id, *conditions)
+            .values(**contact_data, updated_at=func.now())
+            .returning(*CONTACT_COLUMNS)
+        )
+        result = await self._session.execute(stmt)
+        row = result.one_or_none()
+        if row:
+            return contact_from_row(row)
+        return None
 
     async def delete(self, contact_id: UUID) -> bool:
         stmt = delete(Contact).where(Contact.id == contact_id)
         result = await self._session.execute(stmt)
         return result.rowcount > 0
 
-    async def list_by_organization(
+    def _filter_by_organization(
         self,
+        query: Select,
         organization_id: UUID,
-        page: int = 1,
-        page_size: int = 50,
         search: Optional[str] = None,
-        owner_id: Optional[UUID] = None
-    ) -> tuple[list[ContactEntity], int]:
-        query = select(Contact).where(Contact.organization_id == organization_id)
+        owner_id: Optional[UUID] = None,
+    ) -> Select:
+        query = query.where(Contact.organization_id == organization_id)
         
         if search:
             query = query.where(
@@ -54,14 +88,107 @@ class ContactRepository:
         if owner_id:
             query = query.where(Contact.owner_id == owner_id)
         
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await self._session.scalar(count_query)
+        return query
+
+    async def list_by_organization(
+        self,
+        organization_id: UUID,
+        page: int = 1,
+        page_size: int = 50,
+        search: Optional[str] = None,
+        owner_id: Optional[UUID] = None,
+        total: Optional[int] = None,
+    ) -> tuple[list[ContactEntity], int]:
+        """total можно передать, если он уже посчитан (например, в get_list_fingerprint)"""
+        query = self._filter_by_organization(
+            select(*CONTACT_COLUMNS), organization_id, search, owner_id
+        )
+        
+        if total is None:
+            count_query = select(func.count()).select_from(query.subquery())
+            total = await self._session.scalar(count_query)
         
         query = query.offset((page - 1) * page_size).limit(page_size)
         result = await self._session.execute(query)
-        contacts = result.scalars().all()
         
-        return [ContactEntity.model_validate(c) for c in contacts], total or 0
+        return [contact_from_row(row) for row in result], total or 0
+
+    async def stream_export_by_organization(
+        self,
+        organization_id: UUID,
+        search: Optional[str] = None,
+        owner_id: Optional[UUID] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[ContactExportEntity]:
+        """
+        Контакты с именем владельца и числом открытых сделок одним запросом через серверный курсор.
+
+        Открытые сделки агрегируются один раз по организации и присоединяются LEFT JOIN,
+        вместо отдельного подсчета на каждый контакт.
+        """
+        open_deals = (
+            select(Deal.contact_id, func.count(Deal.id).label("open_deals_count"))
+            .where(
+                Deal.organization_id == organization_id,
+                Deal.status.in_([DealStatus.NEW, DealStatus.IN_PROGRESS]),
+            )
+            .group_by(Deal.contact_id)
+            .subquery()
+        )
+        query = (
+            select(
+                *CONTACT_COLUMNS,
+                User.name.label("owner_name"),
+                func.coalesce(open_deals.c.open_deals_count, 0).label("open_deals_count"),
+            )
+            .join(User, User.id == Contact.owner_id)
+            .outerjoin(open_deals, open_deals.c.contact_id == Contact.id)
+        )
+        query = self._filter_by_organization(
+            query, organization_id, search, owner_id
+        ).order_by(Contact.created_at, Contact.id).execution_options(yield_per=batch_size)
+        
+        result = await self._session.stream(query)
+        async for partition in result.partitions():
+            for row in partition:
+                yield entity_from_row(ContactExportEntity, row)
+
+    async def get_fingerprint(self, contact_id: UUID) -> Optional[ContactFingerprintEntity]:
+        query = select(
+            Contact.id, Contact.organization_id, Contact.updated_at
+        ).where(Contact.id == contact_id)
+        result = await self._session.execute(query)
+        row = result.one_or_none()
+        if row:
+            return ContactFingerprintEntity.model_validate(row)
+        return None
+
+    async def get_list_fingerprint(
+        self,
+        organization_id: UUID,
+        search: Optional[str] = None,
+        owner_id: Optional[UUID] = None,
+    ) -> ListFingerprintEntity:
+        """
+        count, max(updated_at) и сумма хешей (id, updated_at) по тем же фильтрам,
+        что и list_by_organization: версии у контакта нет, а updated_at меняется
+        при каждом изменении
+        """
+        query = self._filter_by_organization(
+            select(
+                func.count(Contact.id).label("total"),
+                func.max(Contact.updated_at).label("last_modified"),
+                func.coalesce(
+                    func.sum(func.hashtext(func.concat(Contact.id, ":", func.extract("epoch", Contact.updated_at)))),
+                    0,
+                ).label("checksum"),
+            ),
+            organization_id,
+            search,
+            owner_id,
+        )
+        result = await self._session.execute(query)
+        return ListFingerprintEntity.model_validate(result.one())
 
     async def has_deals(self, contact_id: UUID) -> bool:
         """Проверяет, есть ли у контакта сделки в любой стадии"""
@@ -1,5 +1,6 @@
-from typing import Annotated, Optional
-from fastapi import APIRouter, Query
+from typing import Annotated, Literal, Optional
+from fastapi import APIRouter, Header, Query, Response
+from fastapi.responses import StreamingResponse
 from uuid import UUID
 from dishka.integrations.fastapi import inject
 from dishka import FromComponent
@@ -16,8 +17,20 @@ from contacts.usecases import (
     UpdateContactUseCase,
     DeleteContactUseCase,
     ListContactsUseCase,
+    GetContactFingerprintUseCase,
+    GetContactsListFingerprintUseCase,
+    ExportContactsUseCase,
 )
+from contacts.entities import ContactExportEntity
 from auth.entities import AuthenticatedUser
+from core.responses import PydanticJSONResponse
+from core.export import EXPORT_FORMATS, export_chunks, export_headers
+from core.conditional import (
+    make_timestamp_etag,
+    make_list_etag,
+    cache_headers,
+    is_not_modified,
+)
 
 
 router = APIRouter(
@@ -31,13 +44,29 @@ router = APIRouter(
 async def list_contacts(
     user: Annotated[AuthenticatedUser, FromComponent("auth")],
     list_usecase: Annotated[ListContactsUseCase, FromComponent("contacts")],
+    fingerprint_usecase: Annotated[GetContactsListFingerprintUseCase, FromComponent("contacts")],
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
     search: Optional[str] = None,
     owner_id: Optional[UUID] = None,
+    if_none_match: Optional[str] = Header(None),
 ):
-    contacts, total = await list_usecase(user, page, page_size, search, owner_id)
-    return ContactsListResponse(data=contacts, total=total, page=page, page_size=page_size)
+    # Дешевый отпечаток (count, max(updated_at), checksum): если выборка не менялась,
+    # строки не читаем вовсе. Last-Modified у списка нет: удаление, выход строки из фильтра
+    # или поздний коммит не сдвигают max(updated_at), а count и checksum в ETag это видят
+    fingerprint = await fingerprint_usecase(user, search, owner_id)
+    etag = make_list_etag(fingerprint, page, page_size, search, owner_id)
+    headers = cache_headers(etag)
+    if is_not_modified(etag, None, if_none_match, None):
+        return Response(status_code=304, headers=headers)
+
+    contacts, total = await list_usecase(
+        user, page, page_size, search, owner_id, fingerprint.total
+    )
+    return PydanticJSONResponse(
+        ContactsListResponse(data=contacts, total=total, page=page, page_size=page_size),
+        headers=headers,
+    )
 
 
 @router.post("", response_model=ContactResponse)
@@ -48,7 +77,30 @@ async def create_contact(
     create_usecase: Annotated[CreateContactUseCase, FromComponent("contacts")],
 ):
     contact = await create_usecase(user, request.name, request.email, request.phone)
-    return ContactResponse(data=contact)
+    return PydanticJSONResponse(ContactResponse(data=contact))
+
+
+@router.get("/export", response_class=StreamingResponse)
+@inject
+async def export_contacts(
+    user: Annotated[AuthenticatedUser, FromComponent("auth")],
+    export_usecase: Annotated[ExportContactsUseCase, FromComponent("contacts")],
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    search: Optional[str] = None,
+    owner_id: Optional[UUID] = None,
+):
+    """
+    Выгрузить контакты в CSV или NDJSON.
+    
+    К каждому контакту добавляются имя владельца (owner_name) и число открытых сделок
+    (open_deals_count, статусы new и in_progress).
+    """
+    contacts = export_usecase(user, search, owner_id)
+    return StreamingResponse(
+        export_chunks(contacts, ContactExportEntity, format),
+        media_type=EXPORT_FORMATS[format],
+        headers=export_headers("contacts", format),
+    )
 
 
 @router.get("/{contact_id}", response_model=ContactResponse)
@@ -57,9 +109,23 @@ async def get_contact(
     contact_id: UUID,
     user: Annotated[AuthenticatedUser, FromComponent("auth")],
     get_usecase: Annotated[GetContactUseCase, FromComponent("contacts")],
+    fingerprint_usecase: Annotated[GetContactFingerprintUseCase, FromComponent("contacts")],
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
 ):
+    if if_none_match is not None or if_modified_since is not None:
+        fingerprint = await fingerprint_usecase(user, contact_id)
+        etag = make_timestamp_etag(fingerprint.updated_at)
+        if is_not_modified(etag, fingerprint.updated_at, if_none_match, if_modified_since):
+            return Response(
+                status_code=304, headers=cache_headers(etag, fingerprint.updated_at)
+            )
+
     contact = await get_usecase(user, contact_id)
-    return ContactResponse(data=contact)
+    return PydanticJSONResponse(
+        ContactResponse(data=contact),
+        headers=cache_headers(make_timestamp_etag(contact.updated_at), contact.updated_at),
+    )
 
 
 @router.patch("/{contact_id}", response_model=ContactResponse)
@@ -72,7 +138,7 @@ async def update_contact(
 ):
     update_data = request.model_dump(exclude_unset=True)
     contact = await update_usecase(user, contact_id, update_data)
-    return ContactResponse(data=contact)
+    return PydanticJSONResponse(ContactResponse(data=contact))
 
 
 @router.delete("/{contact_id}", status_code=204)
@@ -1,19 +1,30 @@
 from uuid import UUID, uuid4
 from datetime import datetime, timezone
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from core.database.unit_of_work import UnitOfWork
 from contacts.repositories import ContactRepository
-from contacts.entities import ContactEntity
-from contacts.exceptions import ContactNotFoundError, ContactAccessDeniedError, ContactHasDealsError
+from changes.services import ChangeLog
+from changes.enums import ChangeEntityType, ChangeOperation
+from contacts.entities import ContactEntity, ContactExportEntity, ContactFingerprintEntity
+from core.entities import ListFingerprintEntity
+from core.metrics import instrumented
+from contacts.exceptions import (
+    ContactNotFoundError,
+    ContactAccessDeniedError,
+    ContactHasDealsError,
+    ContactConcurrentUpdateError,
+)
 from users.enums import UserRole
 from auth.entities import AuthenticatedUser
 
 
+@instrumented
 class CreateContactUseCase:
-    def __init__(self, uow: UnitOfWork, contact_repository: ContactRepository):
+    def __init__(self, uow: UnitOfWork, contact_repository: ContactRepository, change_log: ChangeLog):
         self._uow = uow
         self._contact_repository = contact_repository
+        self._change_log = change_log
 
     async def __call__(
         self, user: AuthenticatedUser, name: str, email: Optional[str], phone: Optional[str]
@@ -27,10 +38,16 @@ class CreateContactUseCase:
                 "email": email,
                 "phone": phone,
                 "created_at": datetime.now(timezone.utc),
+                "updated_at": datetime.now(timezone.utc),
             }
-            return await self._contact_repository.create(contact_data)
+            contact = await self._contact_repository.create(contact_data)
+            await self._change_log.record(
+                user.organization_id, ChangeEntityType.CONTACT, contact.id, ChangeOperation.CREATED, contact, user.id
+            )
+            return contact
 
 
+@instrumented
 class GetContactUseCase:
     def __init__(self, uow: UnitOfWork, contact_repository: ContactRepository):
         self._uow = uow
@@ -48,11 +65,33 @@ class GetContactUseCase:
             return contact
 
 
-class UpdateContactUseCase:
+@instrumented
+class GetContactFingerprintUseCase:
     def __init__(self, uow: UnitOfWork, contact_repository: ContactRepository):
         self._uow = uow
         self._contact_repository = contact_repository
 
+    async def __call__(
+        self, user: AuthenticatedUser, contact_id: UUID
+    ) -> ContactFingerprintEntity:
+        async with self._uow:
+            fingerprint = await self._contact_repository.get_fingerprint(contact_id)
+            if not fingerprint:
+                raise ContactNotFoundError()
+            
+            if fingerprint.organization_id != user.organization_id:
+                raise ContactAccessDeniedError()
+            
+            return fingerprint
+
+
+@instrumented
+class UpdateContactUseCase:
+    def __init__(self, uow: UnitOfWork, contact_repository: ContactRepository, change_log: ChangeLog):
+        self._uow = uow
+        self._contact_repository = contact_repository
+        self._change_log = change_log
+
     async def __call__(
         self, user: AuthenticatedUser, contact_id: UUID, update_data: dict
     ) -> ContactEntity:
@@ -67,16 +106,37 @@ class UpdateContactUseCase:
             if user.role == UserRole.MEMBER.value and contact.owner_id != user.id:
                 raise ContactAccessDeniedError()
             
-            await self._contact_repository.update(contact_id, update_data)
+            if not update_data:
+                return contact
+
+            updated_contact = await self._contact_repository.update(
+                contact_id,
+                update_data,
+                preconditions={
+                    "organization_id": user.organization_id,
+                    "owner_id": contact.owner_id,
+                },
+            )
+            if not updated_contact:
+                raise ContactConcurrentUpdateError()
             
-            updated_contact = contact.model_copy(update=update_data)
+            await self._change_log.record(
+                user.organization_id,
+                ChangeEntityType.CONTACT,
+                contact_id,
+                ChangeOperation.UPDATED,
+                updated_contact,
+                user.id,
+            )
             return updated_contact
 
 
+@instrumented
 class DeleteContactUseCase:
-    def __init__(self, uow: UnitOfWork, contact_repository: ContactRepository):
+    def __init__(self, uow: UnitOfWork, contact_repository: ContactRepository, change_log: ChangeLog):
         self._uow = uow
         self._contact_repository = contact_repository
+        self._change_log = change_log
 
     async def __call__(self, user: AuthenticatedUser, contact_id: UUID):
         async with self._uow:
@@ -94,9 +154,14 @@ class DeleteContactUseCase:
             if has_deals:
                 raise ContactHasDealsError()
             
-            await self._contact_repository.delete(contact_id)
+            # Если контакт уже удалил параллельный запрос, событие DELETED записал он
+            if await self._contact_repository.delete(contact_id):
+                await self._change_log.record(
+                    user.organization_id, ChangeEntityType.CONTACT, contact_id, ChangeOperation.DELETED, actor_id=user.id
+                )
 
 
+@instrumented
 class ListContactsUseCase:
     def __init__(self, uow: UnitOfWork, contact_repository: ContactRepository):
         self._uow = uow
@@ -109,12 +174,49 @@ class ListContactsUseCase:
         page_size: int = 50,
         search: Optional[str] = None,
         owner_id: Optional[UUID] = None,
+        total: Optional[int] = None,
     ) -> tuple[list[ContactEntity], int]:
         async with self._uow:
             # Member может видеть все контакты в организации
             # Фильтр owner_id применяется только если явно указан
             
             return await self._contact_repository.list_by_organization(
-                user.organization_id, page, page_size, search, owner_id
+                user.organization_id, page, page_size, search, owner_id, total
             )
 
+
+@instrumented
+class GetContactsListFingerprintUseCase:
+    def __init__(self, uow: UnitOfWork, contact_repository: ContactRepository):
+        self._uow = uow
+        self._contact_repository = contact_repository
+
+    async def __call__(
+        self,
+        user: AuthenticatedUser,
+        search: Optional[str] = None,
+        owner_id: Optional[UUID] = None,
+    ) -> ListFingerprintEntity:
+        async with self._uow:
+            return await self._contact_repository.get_list_fingerprint(
+                user.organization_id, search, owner_id
+            )
+
+
+@instrumented
+class ExportContactsUseCase:
+    def __init__(self, uow: UnitOfWork, contact_repository: ContactRepository):
+        self._uow = uow
+        self._contact_repository = contact_repository
+
+    async def __call__(
+        self,
+        user: AuthenticatedUser,
+        search: Optional[str] = None,
+        owner_id: Optional[UUID] = None,
+    ) -> AsyncIterator[ContactExportEntity]:
+        async with self._uow:
+            async for contact in self._contact_repository.stream_export_by_organization(
+                user.organization_id, search, owner_id
+            ):
+                yield contact
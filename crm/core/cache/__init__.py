@@ -0,0 +1,16 @@
+from core.cache.local import LocalCache
+from core.cache.bus import InvalidationBus, cache_tag
+from core.cache.repositories import CACHE_CHANNEL, CacheNotificationRepository
+from core.cache.services import CacheInvalidator
+from core.cache.singleflight import SingleFlight
+
+
+__all__ = [
+    "LocalCache",
+    "InvalidationBus",
+    "cache_tag",
+    "CACHE_CHANNEL",
+    "CacheNotificationRepository",
+    "CacheInvalidator",
+    "SingleFlight",
+]
@@ -0,0 +1,54 @@
+import json
+import logging
+from typing import Iterable, Protocol, TypeVar
+
+
+logger = logging.getLogger("crm.cache")
+
+
+class Invalidatable(Protocol):
+    def invalidate(self, tags: Iterable[str]): ...
+
+    def clear(self): ...
+
+
+T = TypeVar("T", bound=Invalidatable)
+
+
+def cache_tag(*parts) -> str:
+    """Тег записи кеша: organization_id, тип сущности и, при необходимости, ее id"""
+    return ":".join(str(part) for part in parts)
+
+
+class InvalidationBus:
+    """
+    Инвалидация локальных кешей процесса.
+
+    Кеши (и SingleFlight) регистрируются при создании; handle - обработчик канала
+    crm_cache_invalidation, через который теги изменений, закоммиченных в других
+    воркерах, доходят до этого.
+    """
+
+    def __init__(self):
+        self._caches: list[Invalidatable] = []
+
+    def register(self, cache: T) -> T:
+        self._caches.append(cache)
+        return cache
+
+    def invalidate(self, tags: Iterable[str]):
+        tags = tuple(tags)
+        for cache in self._caches:
+            cache.invalidate(tags)
+
+    def clear(self):
+        for cache in self._caches:
+            cache.clear()
+
+    def handle(self, payload: str):
+        try:
+            tags = json.loads(payload)
+        except ValueError:
+            logger.warning("malformed cache invalidation: %.200s", payload)
+            return
+        self.invalidate(tags)
@@ -0,0 +1,69 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional
+
+from core.metrics import cache_requests
+
+
+class LocalCache:
+    """
+    LRU-кеш с TTL в памяти процесса (одного воркера uvicorn).
+
+    Записи помечаются тегами, invalidate(tags) удаляет все записи с этими тегами.
+    generation растет при каждой инвалидации: значение, прочитанное из базы до
+    инвалидации, set отбросит, иначе в кеш попало бы уже устаревшее значение.
+    """
+
+    def __init__(self, name: str, max_size: int, ttl_seconds: float):
+        self.name = name
+        self.generation = 0
+        self._max_size = max_size
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any, tuple[str, ...]]] = OrderedDict()
+        self._keys_by_tag: dict[str, set[Hashable]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            self._remove(key)
+            entry = None
+        cache_requests.inc(cache=self.name, result="miss" if entry is None else "hit")
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str] = (), generation: Optional[int] = None):
+        if generation is not None and generation != self.generation:
+            return
+        if key in self._entries:
+            self._remove(key)
+        tags = tuple(tags)
+        self._entries[key] = (time.monotonic() + self._ttl_seconds, value, tags)
+        for tag in tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self._max_size:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tags: Iterable[str]):
+        self.generation += 1
+        for tag in tags:
+            for key in list(self._keys_by_tag.get(tag, ())):
+                self._remove(key)
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+        self._keys_by_tag.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: Hashable):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
@@ -0,0 +1,40 @@
+from typing import Annotated
+from dishka import Provider, Scope, provide, FromComponent
+
+from core.cache.bus import InvalidationBus
+from core.cache.repositories import CacheNotificationRepository
+from core.cache.services import CacheInvalidator
+from core.cache.singleflight import SingleFlight
+from core.database.unit_of_work import UnitOfWork
+from core.environment.config import Settings
+
+
+class CacheProvider(Provider):
+    scope = Scope.REQUEST
+    component = "cache"
+
+    @provide(scope=Scope.APP)
+    def get_invalidation_bus(self) -> InvalidationBus:
+        return InvalidationBus()
+
+    @provide(scope=Scope.APP)
+    def get_single_flight(
+        self, bus: Annotated[InvalidationBus, FromComponent("cache")]
+    ) -> SingleFlight:
+        return bus.register(SingleFlight())
+
+    @provide
+    def get_cache_notification_repository(
+        self, uow: Annotated[UnitOfWork, FromComponent("database")]
+    ) -> CacheNotificationRepository:
+        return CacheNotificationRepository(uow.session)
+
+    @provide
+    def get_cache_invalidator(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        bus: Annotated[InvalidationBus, FromComponent("cache")],
+        notification_repository: Annotated[CacheNotificationRepository, FromComponent("cache")],
+        settings: Annotated[Settings, FromComponent("environment")],
+    ) -> CacheInvalidator:
+        return CacheInvalidator(uow, bus, notification_repository, settings.cache_bus_enabled)
@@ -0,0 +1,20 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+
+from core.tracing import traced
+
+
+CACHE_CHANNEL = "crm_cache_invalidation"
+
+
+@traced
+class CacheNotificationRepository:
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def notify(self, payload: str):
+        """NOTIFY транзакционный: воркеры получат его только после commit"""
+        await self._session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": CACHE_CHANNEL, "payload": payload},
+        )
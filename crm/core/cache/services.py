@@ -0,0 +1,32 @@
+import json
+
+from core.cache.bus import InvalidationBus
+from core.cache.repositories import CacheNotificationRepository
+from core.database.unit_of_work import UnitOfWork
+
+
+class CacheInvalidator:
+    """
+    Инвалидация кешей по тегам после commit транзакции use case.
+
+    Свой процесс сбрасывает записи сразу после commit (хук unit of work), чтобы
+    следующий запрос того же клиента увидел изменение. С шиной теги уходят еще и
+    через NOTIFY во все воркеры; откат транзакции отменяет и то и другое.
+    """
+
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        bus: InvalidationBus,
+        notification_repository: CacheNotificationRepository,
+        bus_enabled: bool,
+    ):
+        self._uow = uow
+        self._bus = bus
+        self._notification_repository = notification_repository
+        self._bus_enabled = bus_enabled
+
+    async def invalidate(self, *tags: str):
+        self._uow.on_commit(lambda: self._bus.invalidate(tags))
+        if self._bus_enabled:
+            await self._notification_repository.notify(json.dumps(tags))
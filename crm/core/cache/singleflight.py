@@ -0,0 +1,72 @@
+import asyncio
+from typing import Awaitable, Callable, Iterable, TypeVar, cast
+
+from core.metrics import singleflight_requests
+
+
+T = TypeVar("T")
+
+
+class _LeaderCancelledError(Exception):
+    pass
+
+
+class SingleFlight:
+    """
+    Схлопывание одинаковых конкурентных чтений: пока запрос с ключом (name, *key)
+    выполняется, остальные такие же ждут его результат, а не идут в базу сами.
+
+    Результат общий для всех ожидающих, поэтому менять его нельзя. В ключ должно
+    входить все, от чего зависит ответ (организация, параметры). Инвалидация тегов
+    отцепляет выполняющиеся запросы: пришедшие после commit запустят новый и
+    увидят изменение.
+    """
+
+    def __init__(self):
+        self._calls: dict[tuple, tuple[asyncio.Future, tuple[str, ...]]] = {}
+
+    async def do(
+        self,
+        name: str,
+        key: tuple,
+        loader: Callable[[], Awaitable[T]],
+        tags: Iterable[str] = (),
+    ) -> T:
+        flight_key = (name, *key)
+        call = self._calls.get(flight_key)
+        if call is not None:
+            singleflight_requests.inc(name=name, result="shared")
+            try:
+                return cast(T, await asyncio.shield(call[0]))
+            except _LeaderCancelledError:
+                # Клиент ведущего запроса отключился - выполняем сами
+                return await self.do(name, key, loader, tags)
+
+        future = asyncio.get_running_loop().create_future()
+        # Без ожидающих исключение никто не заберет, а asyncio ругается в лог
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls[flight_key] = (future, tuple(tags))
+        singleflight_requests.inc(name=name, result="leader")
+        try:
+            result = await loader()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelledError())
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(flight_key, (None,))[0] is future:
+                del self._calls[flight_key]
+
+    def invalidate(self, tags: Iterable[str]):
+        tags = set(tags)
+        for flight_key, (_, call_tags) in list(self._calls.items()):
+            if tags.intersection(call_tags):
+                del self._calls[flight_key]
+
+    def clear(self):
+        self._calls.clear()
@@ -0,0 +1,101 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from core.entities import ListFingerprintEntity
+from core.exceptions import BadRequestException
+from core.metrics import cache_requests
+
+
+def make_etag(value: object) -> str:
+    return f'"{value}"'
+
+
+def make_timestamp_etag(value: datetime) -> str:
+    return make_etag(int(value.timestamp() * 1_000_000))
+
+
+def make_list_etag(fingerprint: ListFingerprintEntity, *params: object) -> str:
+    """ETag списка: отпечаток выборки + параметры запроса (страница, фильтры, сортировка)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (fingerprint.total, fingerprint.last_modified, fingerprint.checksum, *params):
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return make_etag(digest.hexdigest())
+
+
+def format_http_date(value: datetime) -> str:
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime] = None) -> dict[str, str]:
+    # no-cache: клиент может хранить ответ, но обязан перепроверять его через If-None-Match
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = format_http_date(last_modified)
+    return headers
+
+
+def parse_etags(header: str) -> list[str]:
+    """Разбирает If-Match / If-None-Match в список значений без кавычек и префикса W/"""
+    etags = []
+    for part in header.split(","):
+        part = part.strip()
+        if part.startswith("W/"):
+            part = part[2:]
+        etags.append(part.strip('"'))
+    return [etag for etag in etags if etag]
+
+
+def parse_if_match_version(header: Optional[str]) -> Optional[int]:
+    """
+    Возвращает версию из If-Match или None, если заголовок не передан (или передан "*").
+    """
+    if not header or header.strip() == "*":
+        return None
+    
+    etags = parse_etags(header)
+    if len(etags) != 1 or not etags[0].isdigit():
+        raise BadRequestException("error.request.invalid_if_match")
+    return int(etags[0])
+
+
+def is_not_modified(
+    etag: str,
+    last_modified: Optional[datetime],
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+) -> bool:
+    """Можно ли ответить 304: If-None-Match имеет приоритет над If-Modified-Since (RFC 9110)"""
+    if if_none_match is None and not if_modified_since:
+        return False
+    
+    not_modified = _is_not_modified(etag, last_modified, if_none_match, if_modified_since)
+    # Условный запрос - это обращение к кешу клиента: 304 считаем попаданием
+    cache_requests.inc(cache="http_conditional", result="hit" if not_modified else "miss")
+    return not_modified
+
+
+def _is_not_modified(
+    etag: str,
+    last_modified: Optional[datetime],
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+) -> bool:
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        return etag.strip('"') in parse_etags(if_none_match)
+    
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP-дата хранит секунды, поэтому микросекунды отбрасываем
+        return last_modified.replace(microsecond=0) <= since
+    
+    return False
@@ -3,6 +3,7 @@ from dishka.integrations.fastapi import FastapiProvider
 
 from core.database.providers import DatabaseConnectionProvider, DatabaseSessionProvider
 from core.environment.providers import EnvironmentProvider
+from core.cache.providers import CacheProvider
 from auth.providers import AuthProvider
 from users.providers import UserProvider
 from organizations.providers import OrganizationProvider
@@ -11,6 +12,12 @@ from deals.providers import DealProvider
 from tasks.providers import TaskProvider
 from activities.providers import ActivityProvider
 from analytics.providers import AnalyticsProvider
+from jobs.providers import JobProvider
+from changes.providers import ChangeProvider
+from webhooks.providers import WebhookProvider
+from live.providers import LiveProvider
+from fx.providers import FxProvider
+from bi.providers import BiProvider
 
 
 container = make_async_container(
@@ -18,6 +25,7 @@ container = make_async_container(
     DatabaseConnectionProvider(),
     DatabaseSessionProvider(),
     EnvironmentProvider(),
+    CacheProvider(),
     AuthProvider(),
     UserProvider(),
     OrganizationProvider(),
@@ -26,5 +34,11 @@ container = make_async_container(
     TaskProvider(),
     ActivityProvider(),
     AnalyticsProvider(),
+    JobProvider(),
+    ChangeProvider(),
+    WebhookProvider(),
+    LiveProvider(),
+    FxProvider(),
+    BiProvider(),
 )
 
@@ -0,0 +1,170 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+logger = logging.getLogger("crm.sql")
+
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|\?")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Форма запроса без параметров: IN ($1, $2, $3) и IN ($1) дают одну форму"""
+    shape = _PLACEHOLDER.sub("?", statement)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """Статистика SQL-запросов в рамках одного HTTP-запроса"""
+
+    __slots__ = ("count", "total_ms", "slowest_ms", "slowest_statement", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[statement_shape(statement)] += 1
+        if elapsed_ms > self.slowest_ms:
+            self.slowest_ms = elapsed_ms
+            self.slowest_statement = statement
+
+    def repeated_shapes(self, threshold: int) -> list[tuple[str, int]]:
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.total_ms:.2f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest_ms:.2f}"
+        )
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+_settings: dict[str, Any] = {"enabled": False, "slow_query_ms": 100.0, "n_plus_one_threshold": 5}
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+
+    if elapsed_ms >= _settings["slow_query_ms"]:
+        logger.warning(
+            "slow query %.2fms: %s",
+            elapsed_ms,
+            statement_shape(statement),
+            extra={"duration_ms": round(elapsed_ms, 2), "statement": statement},
+        )
+
+
+def _handle_error(exception_context):
+    # Упавший запрос не доходит до after_cursor_execute: без pop время его начала
+    # осталось бы на соединении в пуле и сдвинуло пары у следующих запросов
+    connection = exception_context.connection
+    starts = connection.info.get("query_start") if connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(
+    engine: AsyncEngine,
+    slow_query_ms: float = 100.0,
+    n_plus_one_threshold: int = 5,
+):
+    """Подписывается на события курсора движка: время и количество запросов"""
+    _settings.update(
+        enabled=True,
+        slow_query_ms=slow_query_ms,
+        n_plus_one_threshold=n_plus_one_threshold,
+    )
+    if not event.contains(engine.sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine.sync_engine, "handle_error", _handle_error)
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware: собирает статистику SQL за запрос.
+
+    Добавляет заголовок Server-Timing (db, db-slowest), пишет структурированный лог
+    и предупреждает о вероятном N+1, если одна форма запроса повторилась
+    n_plus_one_threshold раз и больше. Без instrument_engine ничего не делает.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not _settings["enabled"]:
+            return await self.app(scope, receive, send)
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            self._log(scope, stats)
+
+    def _log(self, scope: Scope, stats: QueryStats):
+        route = scope.get("route")
+        path = getattr(route, "path", scope["path"])
+        logger.info(
+            "%s %s: %d queries, %.2fms",
+            scope["method"],
+            path,
+            stats.count,
+            stats.total_ms,
+            extra={
+                "method": scope["method"],
+                "path": path,
+                "query_count": stats.count,
+                "db_time_ms": round(stats.total_ms, 2),
+                "slowest_ms": round(stats.slowest_ms, 2),
+                "slowest_statement": stats.slowest_statement,
+            },
+        )
+        for shape, count in stats.repeated_shapes(_settings["n_plus_one_threshold"]):
+            logger.warning(
+                "possible N+1 in %s %s: %d x %s",
+                scope["method"],
+                path,
+                count,
+                shape,
+                extra={"path": path, "repeat_count": count, "statement": shape},
+            )
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from typing import Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+logger = logging.getLogger("crm.database")
+
+RECONNECT_DELAY_SECONDS = 5.0
+
+
+class PostgresListener:
+    """
+    Одно LISTEN-соединение на процесс для всех каналов NOTIFY.
+
+    Обработчик канала получает payload уведомления. Уведомления, пришедшие, пока
+    соединения не было, теряются, поэтому после каждого (пере)подключения
+    вызываются хуки on_connect - например, чтобы сбросить кеши.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self._engine = engine
+        self._handlers: dict[str, Callable[[str], None]] = {}
+        self._connect_hooks: list[Callable[[], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._connected = asyncio.Event()
+
+    def subscribe(self, channel: str, handler: Callable[[str], None]):
+        self._handlers[channel] = handler
+
+    def on_connect(self, hook: Callable[[], None]):
+        self._connect_hooks.append(hook)
+
+    async def start(self):
+        if self._handlers:
+            self._task = asyncio.create_task(self._run())
+
+    async def wait_connected(self):
+        await self._connected.wait()
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        try:
+            self._handlers[channel](payload)
+        except Exception:
+            logger.exception("notification handler for %s failed", channel)
+
+    async def _run(self):
+        while True:
+            try:
+                async with self._engine.connect() as connection:
+                    raw_connection = await connection.get_raw_connection()
+                    driver_connection = raw_connection.driver_connection
+                    assert driver_connection is not None
+                    for channel in self._handlers:
+                        await driver_connection.add_listener(channel, self._on_notify)
+                    for hook in self._connect_hooks:
+                        hook()
+                    self._connected.set()
+                    try:
+                        while not driver_connection.is_closed():
+                            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+                    finally:
+                        self._connected.clear()
+                        # Соединение вернется в пул: без UNLISTEN оно продолжило бы получать события
+                        if not driver_connection.is_closed():
+                            for channel in self._handlers:
+                                await asyncio.shield(driver_connection.remove_listener(channel, self._on_notify))
+                logger.warning("notification listener connection closed, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("notification listener failed, reconnecting")
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
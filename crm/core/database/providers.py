@@ -5,6 +5,9 @@ from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 from core.environment.config import Settings
 from core.database.unit_of_work import UnitOfWork
+from core.database.instrumentation import instrument_engine
+from core.metrics import observe_engine_pool
+from core.tracing import trace_engine
 
 
 class DatabaseConnectionProvider(Provider):
@@ -27,6 +30,10 @@ class DatabaseConnectionProvider(Provider):
             pool_size=30,
             pool_timeout=30,
         )
+        if conf.sql_instrumentation:
+            instrument_engine(engine, conf.sql_slow_query_ms, conf.sql_n_plus_one_threshold)
+        observe_engine_pool(engine)
+        trace_engine(engine)
         return engine
 
     @provide
@@ -1,9 +1,12 @@
+from typing import Callable
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class UnitOfWork:
     def __init__(self, session: AsyncSession):
         self._session = session
+        self._commit_hooks: list[Callable[[], None]] = []
 
     async def __aenter__(self):
         return self
@@ -14,13 +17,20 @@ class UnitOfWork:
         else:
             await self.commit()
 
+    def on_commit(self, hook: Callable[[], None]):
+        """Вызвать hook после успешного commit; при откате хук отбрасывается"""
+        self._commit_hooks.append(hook)
+
     async def commit(self):
         await self._session.commit()
+        hooks, self._commit_hooks = self._commit_hooks, []
+        for hook in hooks:
+            hook()
 
     async def rollback(self):
+        self._commit_hooks.clear()
         await self._session.rollback()
 
     @property
     def session(self) -> AsyncSession:
         return self._session
-
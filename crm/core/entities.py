@@ -0,0 +1,42 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from enum import Enum
+from typing import Optional, TypeVar
+
+from sqlalchemy import Row
+
+
+EntityT = TypeVar("EntityT", bound=BaseModel)
+
+
+class ListFingerprintEntity(BaseModel):
+    """
+    Отпечаток выборки для ETag списка: количество строк, время последнего изменения
+    и контрольная сумма строк.
+
+    updated_at - время начала транзакции: транзакция, начатая раньше, а закоммиченная
+    позже, пишет updated_at ниже текущего максимума. checksum (сумма хешей версий
+    строк) меняется при каждом закоммиченном изменении, поэтому ETag его видит.
+    """
+    total: int
+    last_modified: Optional[datetime] = None
+    checksum: int = 0
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+def entity_from_row(entity: type[EntityT], row: Row) -> EntityT:
+    """
+    Сущность из строки БД без повторной валидации (model_construct): строка из БД
+    уже соответствует схеме сущности.
+
+    model_construct не применяет use_enum_values: SQLAlchemy отдает члены enum, а
+    model_validate хранит их значения. Здесь enum приводятся к значениям так же,
+    чтобы сущность из списка и из get_by_id не отличалась.
+    """
+    values = row._mapping
+    if entity.model_config.get("use_enum_values"):
+        return entity.model_construct(
+            **{key: value.value if isinstance(value, Enum) else value for key, value in values.items()}
+        )
+    return entity.model_construct(**values)
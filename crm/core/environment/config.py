@@ -17,6 +17,52 @@ class Settings(BaseSettings):
     access_token_lifetime: int = 60
     refresh_token_lifetime: int = 43200
 
+    sql_instrumentation: bool = True
+    sql_slow_query_ms: float = 100.0
+    sql_n_plus_one_threshold: int = 5
+
+    password_hash_workers: int = 4
+
+    tracing_enabled: bool = False
+    tracing_sample_ratio: float = 1.0
+    tracing_exporters: list[str] = ["otlp_file"]
+    tracing_file_path: str = "traces.jsonl"
+
+    jobs_concurrency: int = 4
+    jobs_poll_interval: float = 5.0
+    jobs_lock_timeout: int = 300
+    jobs_max_attempts: int = 5
+    jobs_retry_base_seconds: float = 5.0
+    jobs_retry_max_seconds: float = 3600.0
+    jobs_retention_days: int = 7
+
+    webhooks_batch_window_seconds: float = 1.0
+    webhooks_batch_size: int = 100
+    webhooks_timeout_seconds: float = 10.0
+    webhooks_per_host_concurrency: int = 4
+    webhooks_lease_seconds: float = 60.0
+    # Разрешить доставку на loopback и частные адреса (локальная разработка и тесты)
+    webhooks_allow_private_hosts: bool = False
+
+    live_bridge_enabled: bool = False
+    live_queue_size: int = 100
+    live_heartbeat_seconds: float = 15.0
+
+    cache_bus_enabled: bool = False
+    membership_cache_size: int = 10000
+    membership_cache_ttl_seconds: float = 60.0
+
+    analytics_views_max_age_seconds: float = 300.0
+    analytics_views_refresh_changes: int = 1000
+    analytics_snapshot_cache_size: int = 32
+    analytics_snapshot_ttl_seconds: float = 300.0
+
+    fx_rates_cache_ttl_seconds: float = 300.0
+
+    bi_exports_dir: str = "bi_exports"
+    bi_export_clock_skew_seconds: float = 5.0
+    bi_export_batch_size: int = 5000
+
     model_config = SettingsConfigDict(
         env_file=os.getenv("ENV_FILE", ".env"),
         env_file_encoding="utf-8",
@@ -38,6 +38,11 @@ class ConflictException(BaseCustomException):
         return 409
 
 
+class PreconditionFailedException(BaseCustomException):
+    def get_status_code(self) -> int:
+        return 412
+
+
 class ValidationException(BaseCustomException):
     def get_status_code(self) -> int:
         return 422
@@ -0,0 +1,69 @@
+import csv
+import io
+from typing import AsyncIterable, AsyncIterator
+from pydantic import BaseModel
+from pydantic_core import to_json, to_jsonable_python
+
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Сколько строк копим перед отправкой чанка клиенту
+EXPORT_CHUNK_ROWS = 500
+
+
+def export_headers(filename: str, export_format: str) -> dict[str, str]:
+    return {"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+
+
+async def csv_chunks(
+    rows: AsyncIterable[BaseModel],
+    fields: list[str],
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> AsyncIterator[bytes]:
+    """CSV по чанкам: в памяти держится не больше chunk_rows строк"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+
+    count = 0
+    async for row in rows:
+        values = to_jsonable_python(row)
+        writer.writerow([values[field] for field in fields])
+        count += 1
+        if count % chunk_rows == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode()
+
+
+async def ndjson_chunks(
+    rows: AsyncIterable[BaseModel],
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> AsyncIterator[bytes]:
+    """NDJSON по чанкам: одна сущность на строку, сериализация pydantic-core"""
+    chunk = []
+    async for row in rows:
+        chunk.append(to_json(row))
+        if len(chunk) >= chunk_rows:
+            chunk.append(b"")
+            yield b"\n".join(chunk)
+            chunk = []
+
+    if chunk:
+        chunk.append(b"")
+        yield b"\n".join(chunk)
+
+
+def export_chunks(
+    rows: AsyncIterable[BaseModel],
+    model: type[BaseModel],
+    export_format: str,
+) -> AsyncIterator[bytes]:
+    if export_format == "ndjson":
+        return ndjson_chunks(rows)
+    return csv_chunks(rows, list(model.model_fields))
@@ -0,0 +1,42 @@
+from core.metrics.definitions import (
+    registry,
+    http_request_duration,
+    http_requests_in_progress,
+    usecase_duration,
+    db_pool_size,
+    db_pool_checked_out,
+    db_pool_overflow,
+    password_hash_queue_depth,
+    cache_requests,
+    singleflight_requests,
+    job_duration,
+    webhook_deliveries,
+    webhook_delivery_duration,
+    webhook_batch_size,
+    live_subscribers,
+    observe_engine_pool,
+)
+from core.metrics.decorators import instrumented
+from core.metrics.middleware import MetricsMiddleware
+
+
+__all__ = [
+    "registry",
+    "http_request_duration",
+    "http_requests_in_progress",
+    "usecase_duration",
+    "db_pool_size",
+    "db_pool_checked_out",
+    "db_pool_overflow",
+    "password_hash_queue_depth",
+    "cache_requests",
+    "singleflight_requests",
+    "job_duration",
+    "webhook_deliveries",
+    "webhook_delivery_duration",
+    "webhook_batch_size",
+    "live_subscribers",
+    "observe_engine_pool",
+    "instrumented",
+    "MetricsMiddleware",
+]
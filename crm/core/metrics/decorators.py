@@ -0,0 +1,77 @@
+import functools
+import inspect
+import time
+from typing import AsyncIterator, Optional
+
+from core.metrics.definitions import usecase_duration
+from core.tracing import Span, current_span, start_span
+
+
+async def _observe_stream(
+    name: str, stream: AsyncIterator, started: float, parent: Optional[Span]
+) -> AsyncIterator:
+    """Длительность и спан потокового use case - до конца итерации, а не до возврата итератора"""
+    outcome = "error"
+    # Текущим спан не делаем: между yield управление у потребителя
+    span = parent.child(name) if parent is not None else None
+    try:
+        async for item in stream:
+            yield item
+        outcome = "ok"
+    except BaseException as exc:
+        if span is not None:
+            span.record_error(exc)
+        raise
+    finally:
+        if span is not None:
+            span.end()
+        usecase_duration.observe(time.perf_counter() - started, usecase=name, outcome=outcome)
+
+
+def instrumented(cls):
+    """
+    Декоратор класса use case: пишет длительность __call__ в usecase_duration_seconds
+    с меткой класса и исходом (ok/error), а внутри трейса открывает спан с именем класса.
+    Поддерживает корутины, async-генераторы и синхронный __call__, возвращающий
+    async-итератор (фильтры проверяются до начала стрима).
+    """
+    call = cls.__call__
+    name = cls.__name__
+
+    if inspect.isasyncgenfunction(call):
+        @functools.wraps(call)
+        def wrapper(self, *args, **kwargs):
+            return _observe_stream(name, call(self, *args, **kwargs), time.perf_counter(), current_span())
+
+    elif inspect.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                if current_span() is None:
+                    result = await call(self, *args, **kwargs)
+                else:
+                    with start_span(name):
+                        result = await call(self, *args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                usecase_duration.observe(time.perf_counter() - started, usecase=name, outcome=outcome)
+
+    else:
+        @functools.wraps(call)
+        def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = call(self, *args, **kwargs)
+            except BaseException:
+                usecase_duration.observe(time.perf_counter() - started, usecase=name, outcome="error")
+                raise
+            if hasattr(result, "__aiter__"):
+                return _observe_stream(name, result, started, current_span())
+            usecase_duration.observe(time.perf_counter() - started, usecase=name, outcome="ok")
+            return result
+
+    cls.__call__ = wrapper
+    return cls
@@ -0,0 +1,76 @@
+import os
+
+from sqlalchemy import QueuePool
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.metrics.registry import Registry
+
+
+registry = Registry(os.getenv("METRICS_MULTIPROC_DIR"))
+
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being processed",
+)
+usecase_duration = registry.histogram(
+    "usecase_duration_seconds",
+    "Use case latency by class",
+    ("usecase", "outcome"),
+)
+db_pool_size = registry.gauge("db_pool_size", "Configured connection pool size")
+db_pool_checked_out = registry.gauge("db_pool_checked_out", "Connections checked out from the pool")
+db_pool_overflow = registry.gauge("db_pool_overflow", "Connections opened above pool_size")
+password_hash_queue_depth = registry.gauge(
+    "password_hash_queue_depth",
+    "bcrypt operations waiting for or running in the hashing thread pool",
+)
+cache_requests = registry.counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result (hit/miss)",
+    ("cache", "result"),
+)
+singleflight_requests = registry.counter(
+    "singleflight_requests_total",
+    "Coalesced reads by operation: leader ran the query, shared waited for its result",
+    ("name", "result"),
+)
+job_duration = registry.histogram(
+    "job_duration_seconds",
+    "Background job run time by task and outcome (ok/retry/failed/lost)",
+    ("task", "outcome"),
+)
+webhook_deliveries = registry.counter(
+    "webhook_deliveries_total",
+    "Webhook batch deliveries by outcome (ok/4xx/5xx/error)",
+    ("outcome",),
+)
+webhook_delivery_duration = registry.histogram(
+    "webhook_delivery_duration_seconds",
+    "Webhook POST latency by outcome",
+    ("outcome",),
+)
+webhook_batch_size = registry.histogram(
+    "webhook_batch_size",
+    "Events per webhook delivery",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250),
+)
+live_subscribers = registry.gauge(
+    "live_subscribers",
+    "Open live (SSE) streams",
+)
+
+
+def observe_engine_pool(engine: AsyncEngine):
+    """Gauge пула соединений читаются из пула в момент сбора метрик"""
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+    db_pool_size.set_function(pool.size)
+    db_pool_checked_out.set_function(pool.checkedout)
+    db_pool_overflow.set_function(lambda: max(pool.overflow(), 0))
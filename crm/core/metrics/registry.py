@@ -0,0 +1,273 @@
+import glob
+import json
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Optional, TypeVar, cast
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def snapshot(self) -> dict:
+        """Сериализуемое состояние для объединения между воркерами"""
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {json.dumps(key): value for key, value in self._values.items()}
+
+
+class Gauge(_Metric):
+    """Значение задается set/inc/dec или функцией, которая вызывается при сборе"""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._functions: dict[tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float], **labels):
+        with self._lock:
+            self._functions[self._key(labels)] = function
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, function in functions.items():
+            values[key] = float(function())
+        return {json.dumps(key): value for key, value in values.items()}
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # По ключу меток: счетчики по бакетам (не накопительные), сумма, количество
+        self._values: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                json.dumps(key): [list(counts), total, count]
+                for key, (counts, total, count) in self._values.items()
+            }
+
+
+MetricT = TypeVar("MetricT", bound=_Metric)
+
+
+class Registry:
+    """
+    Минимальный реестр метрик в формате Prometheus text exposition.
+
+    С multiproc_dir каждый процесс (воркер uvicorn) сбрасывает снимок своих метрик
+    в <multiproc_dir>/<pid>.json не чаще раза в flush_interval секунд, а render
+    объединяет снимки всех процессов: counter и histogram суммируются, gauge
+    суммируются только по живым процессам.
+    """
+
+    def __init__(self, multiproc_dir: Optional[str] = None, flush_interval: float = 1.0):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._multiproc_dir = multiproc_dir
+        self._flush_interval = flush_interval
+        self._last_flush = 0.0
+
+    def _register(self, metric: MetricT) -> MetricT:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return cast(MetricT, existing)
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: {
+                "type": metric.type,
+                "help": metric.documentation,
+                "labelnames": list(metric.labelnames),
+                "buckets": list(getattr(metric, "buckets", ()))[:-1],
+                "samples": metric.snapshot(),
+            }
+            for metric in metrics
+        }
+
+    def maybe_flush(self):
+        if self._multiproc_dir and time.monotonic() - self._last_flush >= self._flush_interval:
+            self.flush()
+
+    def flush(self):
+        if not self._multiproc_dir:
+            return
+        self._last_flush = time.monotonic()
+        path = os.path.join(self._multiproc_dir, f"{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.snapshot(), file)
+        os.replace(tmp_path, path)
+
+    def _collect(self) -> dict:
+        if not self._multiproc_dir:
+            return self.snapshot()
+
+        self.flush()
+        merged: dict = {}
+        for path in glob.glob(os.path.join(self._multiproc_dir, "*.json")):
+            pid = int(os.path.basename(path).split(".")[0])
+            try:
+                with open(path) as file:
+                    snapshot = json.load(file)
+            except (OSError, ValueError):
+                continue
+            alive = _pid_alive(pid)
+            for name, metric in snapshot.items():
+                if metric["type"] == "gauge" and not alive:
+                    continue
+                target = merged.setdefault(name, {**metric, "samples": {}})
+                for key, value in metric["samples"].items():
+                    current = target["samples"].get(key)
+                    if current is None:
+                        target["samples"][key] = value
+                    elif metric["type"] == "histogram":
+                        target["samples"][key] = [
+                            [a + b for a, b in zip(current[0], value[0], strict=True)],
+                            current[1] + value[1],
+                            current[2] + value[2],
+                        ]
+                    else:
+                        target["samples"][key] = current + value
+        return merged
+
+    def render(self) -> str:
+        lines = []
+        for name, metric in sorted(self._collect().items()):
+            labelnames = tuple(metric["labelnames"])
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for key, value in sorted(metric["samples"].items()):
+                labelvalues = tuple(json.loads(key))
+                if metric["type"] != "histogram":
+                    lines.append(f"{name}{_format_labels(labelnames, labelvalues)} {_format_value(value)}")
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(metric["buckets"] + [math.inf], counts, strict=True):
+                    cumulative += bucket_count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(
+                        f"{name}_bucket{_format_labels(labelnames, labelvalues, le)} {cumulative}"
+                    )
+                lines.append(f"{name}_sum{_format_labels(labelnames, labelvalues)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labelnames, labelvalues)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,16 @@
+from typing import Any
+from pydantic_core import to_json
+from starlette.responses import JSONResponse
+
+
+class PydanticJSONResponse(JSONResponse):
+    """
+    JSON-ответ, который сериализуется pydantic-core (Rust) напрямую из моделей.
+
+    Когда роут возвращает готовый ответ, FastAPI не прогоняет данные через response_model
+    повторно (validate + serialize + json.dumps): сущности из use case уже провалидированы.
+    response_model в декораторе остается для OpenAPI.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
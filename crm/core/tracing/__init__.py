@@ -0,0 +1,40 @@
+from core.tracing.tracer import (
+    Span,
+    Tracer,
+    tracer,
+    current_span,
+    start_span,
+    use_span,
+    format_traceparent,
+)
+from core.tracing.exporters import ConsoleSpanExporter, OTLPFileSpanExporter
+from core.tracing.decorators import traced
+from core.tracing.middleware import TracingMiddleware
+from core.tracing.database import trace_engine
+from core.environment.config import Settings
+
+
+def configure_tracing(settings: Settings):
+    exporters: list = []
+    if "console" in settings.tracing_exporters:
+        exporters.append(ConsoleSpanExporter())
+    if "otlp_file" in settings.tracing_exporters:
+        exporters.append(OTLPFileSpanExporter(settings.tracing_file_path))
+    tracer.configure(settings.tracing_enabled, settings.tracing_sample_ratio, exporters)
+
+
+__all__ = [
+    "Span",
+    "Tracer",
+    "tracer",
+    "current_span",
+    "start_span",
+    "use_span",
+    "format_traceparent",
+    "ConsoleSpanExporter",
+    "OTLPFileSpanExporter",
+    "traced",
+    "TracingMiddleware",
+    "trace_engine",
+    "configure_tracing",
+]
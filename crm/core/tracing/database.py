@@ -0,0 +1,41 @@
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.tracing.tracer import current_span
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    parent = current_span()
+    if parent is None:
+        return
+    span = parent.child(
+        statement.split(None, 1)[0].upper() if statement else "SQL",
+        kind="client",
+        attributes={"db.system": "postgresql", "db.statement": statement[:2000]},
+    )
+    conn.info.setdefault("trace_spans", []).append(span)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        spans.pop().end()
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    spans = connection.info.get("trace_spans") if connection is not None else None
+    if spans:
+        span = spans.pop()
+        span.record_error(exception_context.original_exception)
+        span.end()
+
+
+def trace_engine(engine: AsyncEngine):
+    """Client-спан на каждый SQL-запрос внутри активного трейса"""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
@@ -0,0 +1,45 @@
+import functools
+import inspect
+
+from core.tracing.tracer import current_span, start_span
+
+
+def _traced_method(name: str, method):
+    if inspect.isasyncgenfunction(method):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            parent = current_span()
+            if parent is None:
+                async for item in method(*args, **kwargs):
+                    yield item
+                return
+            # Текущим спан не делаем: между yield управление у потребителя
+            span = parent.child(name)
+            try:
+                async for item in method(*args, **kwargs):
+                    yield item
+            except BaseException as exc:
+                span.record_error(exc)
+                raise
+            finally:
+                span.end()
+
+    else:
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            if current_span() is None:
+                return await method(*args, **kwargs)
+            with start_span(name):
+                return await method(*args, **kwargs)
+
+    return wrapper
+
+
+def traced(cls):
+    """Декоратор класса: спан на каждый публичный async-метод (DealRepository.update, ...)"""
+    for attr, method in list(vars(cls).items()):
+        if attr.startswith("_"):
+            continue
+        if inspect.iscoroutinefunction(method) or inspect.isasyncgenfunction(method):
+            setattr(cls, attr, _traced_method(f"{cls.__name__}.{attr}", method))
+    return cls
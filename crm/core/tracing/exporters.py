@@ -0,0 +1,93 @@
+import json
+import logging
+import threading
+
+from core.tracing.tracer import Span
+
+
+logger = logging.getLogger("crm.tracing")
+
+_SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+def _attribute_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: list[Span], service_name: str) -> dict:
+    """Пачка спанов в формате OTLP/JSON (ExportTraceServiceRequest)"""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": service_name}}
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "crm"},
+                        "spans": [
+                            {
+                                "traceId": span.trace_id,
+                                "spanId": span.span_id,
+                                "parentSpanId": span.parent_span_id or "",
+                                "name": span.name,
+                                "kind": _SPAN_KINDS[span.kind],
+                                "startTimeUnixNano": str(span.start_time_ns),
+                                "endTimeUnixNano": str(span.end_time_ns),
+                                "attributes": [
+                                    {"key": key, "value": _attribute_value(value)}
+                                    for key, value in span.attributes.items()
+                                ],
+                                "status": (
+                                    {"code": 2, "message": span.error}
+                                    if span.error
+                                    else {"code": 0}
+                                ),
+                            }
+                            for span in spans
+                        ],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class ConsoleSpanExporter:
+    """Спаны в лог crm.tracing, по строке на спан"""
+
+    def export(self, spans: list[Span], service_name: str):
+        for span in spans:
+            logger.info(
+                "trace=%s span=%s parent=%s %s %.2fms%s",
+                span.trace_id,
+                span.span_id,
+                span.parent_span_id or "-",
+                span.name,
+                span.duration_ms,
+                f" error={span.error}" if span.error else "",
+            )
+
+
+class OTLPFileSpanExporter:
+    """
+    OTLP/JSON в файл, по строке на трейс - формат file exporter из OpenTelemetry Collector,
+    файл можно загрузить в коллектор (receiver otlpjsonfile) или Jaeger.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span], service_name: str):
+        line = json.dumps(to_otlp(spans, service_name), separators=(",", ":"))
+        with self._lock, open(self._path, "a") as file:
+            file.write(line + "\n")
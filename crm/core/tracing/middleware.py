@@ -0,0 +1,47 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.tracing.tracer import tracer, use_span
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware: корневой server-спан на HTTP-запрос.
+
+    Входящий заголовок traceparent (W3C) продолжает трейс вызывающей стороны.
+    Имя спана - метод и шаблон маршрута, известный после роутинга.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not tracer.enabled:
+            return await self.app(scope, receive, send)
+
+        traceparent = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        span = tracer.start_trace(
+            scope["method"],
+            traceparent,
+            attributes={"http.request.method": scope["method"], "url.path": scope["path"]},
+        )
+        if span is None:
+            return await self.app(scope, receive, send)
+
+        async def send_with_status(message: Message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.response.status_code", message["status"])
+            await send(message)
+
+        with use_span(span):
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.name = f"{scope['method']} {route.path}"
+                    span.set_attribute("http.route", route.path)
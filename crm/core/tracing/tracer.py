@@ -0,0 +1,171 @@
+import random
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "kind",
+        "trace_id",
+        "span_id",
+        "parent_span_id",
+        "start_time_ns",
+        "end_time_ns",
+        "attributes",
+        "error",
+        "_trace",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace: "Trace",
+        parent_span_id: Optional[str],
+        kind: str = "internal",
+        attributes: Optional[dict] = None,
+    ):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace.trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent_span_id
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: Optional[int] = None
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+        self._trace = trace
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def record_error(self, exc: BaseException):
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    def child(self, name: str, kind: str = "internal", attributes: Optional[dict] = None) -> "Span":
+        return Span(name, self._trace, self.span_id, kind, attributes)
+
+    def end(self):
+        self.end_time_ns = time.time_ns()
+        self._trace.finished(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_time_ns or time.time_ns()) - self.start_time_ns) / 1_000_000
+
+
+class Trace:
+    """Спаны одного запроса: экспортируются пачкой, когда завершается корневой спан"""
+
+    __slots__ = ("trace_id", "spans", "root", "_tracer")
+
+    def __init__(self, trace_id: str, tracer: "Tracer"):
+        self.trace_id = trace_id
+        self.spans: list[Span] = []
+        self.root: Optional[Span] = None
+        self._tracer = tracer
+
+    def finished(self, span: Span):
+        self.spans.append(span)
+        if span is self.root:
+            self._tracer.export(self.spans)
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+class Tracer:
+    """
+    Минимальный трейсер, совместимый с OpenTelemetry по модели данных и W3C traceparent.
+
+    Спаны создаются только внутри сэмплированного трейса: без активного спана
+    start_span и декораторы сводятся к одному чтению contextvar.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.sample_ratio = 1.0
+        self.service_name = "crm"
+        self.exporters: list = []
+
+    def configure(self, enabled: bool, sample_ratio: float, exporters: list, service_name: str = "crm"):
+        self.enabled = enabled and bool(exporters)
+        self.sample_ratio = sample_ratio
+        self.exporters = exporters
+        self.service_name = service_name
+
+    def start_trace(
+        self,
+        name: str,
+        traceparent: Optional[str] = None,
+        kind: str = "server",
+        attributes: Optional[dict] = None,
+    ) -> Optional[Span]:
+        """Корневой спан запроса или None, если трейс не сэмплирован"""
+        parent_span_id = None
+        match = _TRACEPARENT.match(traceparent.strip().lower()) if traceparent else None
+        if match:
+            # Родитель уже принял решение о сэмплировании (ParentBased)
+            trace_id, parent_span_id, flags = match.groups()
+            if not int(flags, 16) & 1:
+                return None
+        else:
+            trace_id = f"{random.getrandbits(128):032x}"
+            # TraceIdRatioBased: решение детерминировано по младшим 64 битам trace id
+            if int(trace_id[16:], 16) >= self.sample_ratio * 2**64:
+                return None
+
+        trace = Trace(trace_id, self)
+        trace.root = Span(name, trace, parent_span_id, kind, attributes)
+        return trace.root
+
+    def export(self, spans: list[Span]):
+        for exporter in self.exporters:
+            exporter.export(spans, self.service_name)
+
+
+tracer = Tracer()
+
+
+@contextmanager
+def use_span(span: Optional[Span]) -> Iterator[Optional[Span]]:
+    """Делает span текущим и завершает его на выходе (с ошибкой, если было исключение)"""
+    if span is None:
+        yield None
+        return
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as exc:
+        span.record_error(exc)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+@contextmanager
+def start_span(
+    name: str, kind: str = "internal", attributes: Optional[dict] = None
+) -> Iterator[Optional[Span]]:
+    """Дочерний спан текущего; вне трейса ничего не делает"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    with use_span(parent.child(name, kind, attributes)) as span:
+        yield span
+
+
+def format_traceparent(span: Span) -> str:
+    return f"00-{span.trace_id}-{span.span_id}-01"
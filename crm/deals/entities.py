@@ -1,5 +1,6 @@
 from pydantic import BaseModel, ConfigDict
 from uuid import UUID
+from typing import Optional
 from datetime import datetime
 from decimal import Decimal
 
@@ -14,10 +15,24 @@ class DealEntity(BaseModel):
     title: str
     amount: Decimal
     currency: str
+    amount_base: Optional[Decimal] = None
     status: DealStatus
     stage: DealStage
     created_at: datetime
     updated_at: datetime
+    version: int
+    closed_at: Optional[datetime] = None
+    stage_entered_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True, use_enum_values=True)
 
+
+
+class DealFingerprintEntity(BaseModel):
+    """Минимальный набор полей для ETag/Last-Modified без загрузки всей сделки"""
+    id: UUID
+    organization_id: UUID
+    version: int
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
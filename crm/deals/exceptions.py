@@ -1,4 +1,10 @@
-from core.exceptions import NotFoundException, ForbiddenException, BadRequestException
+from core.exceptions import (
+    NotFoundException,
+    ForbiddenException,
+    BadRequestException,
+    ConflictException,
+    PreconditionFailedException,
+)
 
 
 class DealNotFoundError(NotFoundException):
@@ -25,3 +31,13 @@ class InvalidStageTransitionError(BadRequestException):
     def __init__(self, message: str = "error.deal.invalid_stage_transition"):
         super().__init__(message)
 
+
+
+class DealConcurrentUpdateError(ConflictException):
+    def __init__(self, message: str = "error.deal.concurrent_update"):
+        super().__init__(message)
+
+
+class DealVersionMismatchError(PreconditionFailedException):
+    def __init__(self, message: str = "error.deal.version_mismatch"):
+        super().__init__(message)
@@ -1,8 +1,9 @@
 from datetime import datetime
 from uuid import UUID, uuid4
 from decimal import Decimal
+from typing import Optional
 
-from sqlalchemy import String, DateTime, ForeignKey, func, Enum, Numeric
+from sqlalchemy import String, DateTime, ForeignKey, func, Enum, Numeric, Integer, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from core.database.database import BaseModel
@@ -19,6 +20,8 @@ class Deal(BaseModel):
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     amount: Mapped[Decimal] = mapped_column(Numeric(15, 2), nullable=False, default=0)
     currency: Mapped[str] = mapped_column(String(10), nullable=False, default="USD")
+    # amount в базовой валюте по курсу fx_rates на момент записи; NULL - курса валюты нет
+    amount_base: Mapped[Optional[Decimal]] = mapped_column(Numeric(18, 2), nullable=True)
     status: Mapped[DealStatus] = mapped_column(Enum(DealStatus), nullable=False, default=DealStatus.NEW)
     stage: Mapped[DealStage] = mapped_column(Enum(DealStage), nullable=False, default=DealStage.QUALIFICATION)
     created_at: Mapped[datetime] = mapped_column(
@@ -27,6 +30,17 @@ class Deal(BaseModel):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now()
     )
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    # Когда сделка перешла в won/lost; сбрасывается при возврате в работу
+    closed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Когда сделка перешла на текущий этап: аналитика считает по нему время на этапе
+    stage_entered_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now()
+    )
+
+    __table_args__ = (
+        Index("ix_deals_organization_id_updated_at", "organization_id", "updated_at"),
+    )
 
     organization: Mapped["Organization"] = relationship(back_populates="deals")
     contact: Mapped["Contact"] = relationship(back_populates="deals")
@@ -10,7 +10,15 @@ from deals.usecases import (
     UpdateDealUseCase,
     DeleteDealUseCase,
     ListDealsUseCase,
+    GetDealFingerprintUseCase,
+    GetDealsListFingerprintUseCase,
+    ExportDealsUseCase,
 )
+from changes.services import ChangeLog
+from webhooks.services import WebhookPublisher
+from live.services import LivePublisher
+from analytics.services import DealStatsRollup
+from fx.services import FxConverter
 from core.database.unit_of_work import UnitOfWork
 
 
@@ -30,8 +38,13 @@ class DealProvider(Provider):
         uow: Annotated[UnitOfWork, FromComponent("database")],
         deal_repository: Annotated[DealRepository, FromComponent("deals")],
         contact_repository: Annotated[ContactRepository, FromComponent("contacts")],
+        change_log: Annotated[ChangeLog, FromComponent("changes")],
+        deal_stats_rollup: Annotated[DealStatsRollup, FromComponent("analytics")],
+        fx_converter: Annotated[FxConverter, FromComponent("fx")],
     ) -> CreateDealUseCase:
-        return CreateDealUseCase(uow, deal_repository, contact_repository)
+        return CreateDealUseCase(
+            uow, deal_repository, contact_repository, change_log, deal_stats_rollup, fx_converter
+        )
 
     @provide
     def get_get_deal_usecase(
@@ -47,16 +60,26 @@ class DealProvider(Provider):
         uow: Annotated[UnitOfWork, FromComponent("database")],
         deal_repository: Annotated[DealRepository, FromComponent("deals")],
         activity_repository: Annotated[ActivityRepository, FromComponent("activities")],
+        change_log: Annotated[ChangeLog, FromComponent("changes")],
+        webhook_publisher: Annotated[WebhookPublisher, FromComponent("webhooks")],
+        live_publisher: Annotated[LivePublisher, FromComponent("live")],
+        deal_stats_rollup: Annotated[DealStatsRollup, FromComponent("analytics")],
+        fx_converter: Annotated[FxConverter, FromComponent("fx")],
     ) -> UpdateDealUseCase:
-        return UpdateDealUseCase(uow, deal_repository, activity_repository)
+        return UpdateDealUseCase(
+            uow, deal_repository, activity_repository, change_log, webhook_publisher, live_publisher,
+            deal_stats_rollup, fx_converter,
+        )
 
     @provide
     def get_delete_deal_usecase(
         self,
         uow: Annotated[UnitOfWork, FromComponent("database")],
         deal_repository: Annotated[DealRepository, FromComponent("deals")],
+        change_log: Annotated[ChangeLog, FromComponent("changes")],
+        deal_stats_rollup: Annotated[DealStatsRollup, FromComponent("analytics")],
     ) -> DeleteDealUseCase:
-        return DeleteDealUseCase(uow, deal_repository)
+        return DeleteDealUseCase(uow, deal_repository, change_log, deal_stats_rollup)
 
     @provide
     def get_list_deals_usecase(
@@ -66,3 +89,27 @@ class DealProvider(Provider):
     ) -> ListDealsUseCase:
         return ListDealsUseCase(uow, deal_repository)
 
+
+    @provide
+    def get_deal_fingerprint_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        deal_repository: Annotated[DealRepository, FromComponent("deals")],
+    ) -> GetDealFingerprintUseCase:
+        return GetDealFingerprintUseCase(uow, deal_repository)
+
+    @provide
+    def get_deals_list_fingerprint_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        deal_repository: Annotated[DealRepository, FromComponent("deals")],
+    ) -> GetDealsListFingerprintUseCase:
+        return GetDealsListFingerprintUseCase(uow, deal_repository)
+
+    @provide
+    def get_export_deals_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        deal_repository: Annotated[DealRepository, FromComponent("deals")],
+    ) -> ExportDealsUseCase:
+        return ExportDealsUseCase(uow, deal_repository)
@@ -1,14 +1,26 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, update, delete
+from sqlalchemy import BigInteger, Date, Row, Select, select, func, update, delete
 from uuid import UUID
-from typing import Optional
-from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional, Sequence
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 
 from deals.models import Deal, DealStatus, DealStage
-from deals.entities import DealEntity
+from deals.entities import DealEntity, DealFingerprintEntity
+from fx.models import FxRate
+from core.entities import ListFingerprintEntity, entity_from_row
+from core.tracing import traced
 
 
+# Колонки DealEntity: списки читают их кортежами, без ORM-объектов и identity map
+DEAL_COLUMNS = tuple(getattr(Deal, field) for field in DealEntity.model_fields)
+
+
+def deal_from_row(row: Row) -> DealEntity:
+    return entity_from_row(DealEntity, row)
+
+
+@traced
 class DealRepository:
     def __init__(self, session: AsyncSession):
         self._session = session
@@ -27,30 +39,53 @@ class DealRepository:
         await self._session.flush()
         return DealEntity.model_validate(deal)
 
-    async def update(self, deal_id: UUID, deal_data: dict):
-        deal_data["updated_at"] = datetime.now(timezone.utc)
-        stmt = update(Deal).where(Deal.id == deal_id).values(**deal_data)
-        await self._session.execute(stmt)
+    async def update(
+        self,
+        deal_id: UUID,
+        deal_data: dict,
+        preconditions: Optional[dict] = None,
+    ) -> Optional[DealEntity]:
+        """
+        Обновляет сделку одним UPDATE ... RETURNING и возвращает сохраненную строку.
 
-    async def delete(self, deal_id: UUID) -> bool:
-        stmt = delete(Deal).where(Deal.id == deal_id)
+        preconditions - ожидаемые значения колонок (optimistic concurrency): если строка
+        успела измениться, UPDATE не затронет ее и метод вернет None.
+        Каждое обновление увеличивает version, так что compare-and-set по version
+        отсекает любую параллельную запись.
+        """
+        conditions = [getattr(Deal, column) == value for column, value in (preconditions or {}).items()]
+        stmt = (
+            update(Deal)
+            .where(Deal.id == deal_id, *conditions)
+            .values(**deal_data, updated_at=func.now(), version=Deal.version + 1)
+            .returning(*DEAL_COLUMNS)
+        )
         result = await self._session.execute(stmt)
-        return result.rowcount > 0
+        row = result.one_or_none()
+        if row:
+            return deal_from_row(row)
+        return None
 
-    async def list_by_organization(
+    async def delete(self, deal_id: UUID) -> Optional[DealEntity]:
+        """Удаляет сделку и возвращает удаленную строку (None, если ее уже нет)"""
+        stmt = delete(Deal).where(Deal.id == deal_id).returning(*DEAL_COLUMNS)
+        result = await self._session.execute(stmt)
+        row = result.one_or_none()
+        if row:
+            return deal_from_row(row)
+        return None
+
+    def _filter_by_organization(
         self,
+        query: Select,
         organization_id: UUID,
-        page: int = 1,
-        page_size: int = 50,
         statuses: Optional[list[DealStatus]] = None,
         min_amount: Optional[Decimal] = None,
         max_amount: Optional[Decimal] = None,
         stage: Optional[DealStage] = None,
         owner_id: Optional[UUID] = None,
-        order_by: str = "created_at",
-        order: str = "desc"
-    ) -> tuple[list[DealEntity], int]:
-        query = select(Deal).where(Deal.organization_id == organization_id)
+    ) -> Select:
+        query = query.where(Deal.organization_id == organization_id)
         
         if statuses:
             query = query.where(Deal.status.in_(statuses))
@@ -67,8 +102,30 @@ class DealRepository:
         if owner_id:
             query = query.where(Deal.owner_id == owner_id)
         
-        count_query = select(func.count()).select_from(query.subquery())
-        total = await self._session.scalar(count_query)
+        return query
+
+    async def list_by_organization(
+        self,
+        organization_id: UUID,
+        page: int = 1,
+        page_size: int = 50,
+        statuses: Optional[list[DealStatus]] = None,
+        min_amount: Optional[Decimal] = None,
+        max_amount: Optional[Decimal] = None,
+        stage: Optional[DealStage] = None,
+        owner_id: Optional[UUID] = None,
+        order_by: str = "created_at",
+        order: str = "desc",
+        total: Optional[int] = None,
+    ) -> tuple[list[DealEntity], int]:
+        """total можно передать, если он уже посчитан (например, в get_list_fingerprint)"""
+        query = self._filter_by_organization(
+            select(*DEAL_COLUMNS), organization_id, statuses, min_amount, max_amount, stage, owner_id
+        )
+        
+        if total is None:
+            count_query = select(func.count()).select_from(query.subquery())
+            total = await self._session.scalar(count_query)
         
         order_column = getattr(Deal, order_by, Deal.created_at)
         if order == "asc":
@@ -78,9 +135,74 @@ class DealRepository:
         
         query = query.offset((page - 1) * page_size).limit(page_size)
         result = await self._session.execute(query)
-        deals = result.scalars().all()
         
-        return [DealEntity.model_validate(d) for d in deals], total or 0
+        return [deal_from_row(row) for row in result], total or 0
+
+    async def stream_by_organization(
+        self,
+        organization_id: UUID,
+        statuses: Optional[list[DealStatus]] = None,
+        min_amount: Optional[Decimal] = None,
+        max_amount: Optional[Decimal] = None,
+        stage: Optional[DealStage] = None,
+        owner_id: Optional[UUID] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[DealEntity]:
+        """
+        Все сделки по фильтрам одним проходом через серверный курсор.
+
+        Строки читаются пачками по batch_size (yield_per), так что память не растет
+        с размером организации; ни count, ни offset не выполняются.
+        """
+        query = self._filter_by_organization(
+            select(*DEAL_COLUMNS), organization_id, statuses, min_amount, max_amount, stage, owner_id
+        ).order_by(Deal.created_at, Deal.id).execution_options(yield_per=batch_size)
+        
+        result = await self._session.stream(query)
+        async for partition in result.partitions():
+            for row in partition:
+                yield deal_from_row(row)
+
+    async def get_fingerprint(self, deal_id: UUID) -> Optional[DealFingerprintEntity]:
+        query = select(
+            Deal.id, Deal.organization_id, Deal.version, Deal.updated_at
+        ).where(Deal.id == deal_id)
+        result = await self._session.execute(query)
+        row = result.one_or_none()
+        if row:
+            return DealFingerprintEntity.model_validate(row)
+        return None
+
+    async def get_list_fingerprint(
+        self,
+        organization_id: UUID,
+        statuses: Optional[list[DealStatus]] = None,
+        min_amount: Optional[Decimal] = None,
+        max_amount: Optional[Decimal] = None,
+        stage: Optional[DealStage] = None,
+        owner_id: Optional[UUID] = None,
+    ) -> ListFingerprintEntity:
+        """
+        count, max(updated_at) и сумма хешей (id, version) по тем же фильтрам,
+        что и list_by_organization
+        """
+        query = self._filter_by_organization(
+            select(
+                func.count(Deal.id).label("total"),
+                func.max(Deal.updated_at).label("last_modified"),
+                func.coalesce(
+                    func.sum(func.hashtext(func.concat(Deal.id, ":", Deal.version))), 0
+                ).label("checksum"),
+            ),
+            organization_id,
+            statuses,
+            min_amount,
+            max_amount,
+            stage,
+            owner_id,
+        )
+        result = await self._session.execute(query)
+        return ListFingerprintEntity.model_validate(result.one())
 
     async def get_deals_count_by_status(self, organization_id: UUID) -> dict[str, int]:
         query = select(
@@ -94,9 +216,10 @@ class DealRepository:
         return {row.status: row.count for row in result.all()}
 
     async def get_deals_amount_by_status(self, organization_id: UUID) -> dict[str, Decimal]:
+        """Суммы в базовой валюте; сделки в валютах без курса не учитываются"""
         query = select(
             Deal.status,
-            func.sum(Deal.amount).label("total_amount")
+            func.sum(Deal.amount_base).label("total_amount")
         ).where(
             Deal.organization_id == organization_id
         ).group_by(Deal.status)
@@ -114,7 +237,7 @@ class DealRepository:
         return result or 0
 
     async def get_won_deals_average(self, organization_id: UUID) -> Decimal:
-        query = select(func.avg(Deal.amount)).where(
+        query = select(func.avg(Deal.amount_base)).where(
             Deal.organization_id == organization_id,
             Deal.status == DealStatus.WON
         )
@@ -135,3 +258,58 @@ class DealRepository:
         result = await self._session.execute(query)
         return [(row.stage, row.status, row.count) for row in result.all()]
 
+
+    async def revalue_amount_base(self, currencies: Optional[list[str]] = None) -> list[DealEntity]:
+        """
+        Пересчитывает amount_base по текущим курсам (JOIN с fx_rates в одном UPDATE).
+
+        Пересчет меняет сделку для клиентов и выгрузок, поэтому, как и update, увеличивает
+        version и сдвигает updated_at: ETag, Last-Modified и водяной знак BI видят изменение.
+        Сделки, у которых сумма не изменилась, не трогаются. Возвращает пересчитанные сделки.
+        """
+        amount_base = func.round(Deal.amount * FxRate.rate, 2)
+        stmt = (
+            update(Deal)
+            .where(
+                func.upper(func.trim(Deal.currency)) == FxRate.currency,
+                Deal.amount_base.is_distinct_from(amount_base),
+            )
+            .values(amount_base=amount_base, updated_at=func.now(), version=Deal.version + 1)
+            .returning(*DEAL_COLUMNS)
+        )
+        if currencies is not None:
+            stmt = stmt.where(FxRate.currency.in_(currencies))
+        result = await self._session.execute(stmt)
+        return [deal_from_row(row) for row in result]
+
+    async def get_snapshot_rows(self, organization_id: UUID) -> Sequence[Row]:
+        """
+        Колонки сделок организации для аналитического снимка: день создания (UTC) -
+        числом дней от 1970-01-01, сумма в базовой валюте - в центах.
+        """
+        query = select(
+            Deal.owner_id,
+            Deal.stage,
+            Deal.status,
+            func.upper(func.trim(Deal.currency)).label("currency"),
+            (func.timezone("UTC", Deal.created_at).cast(Date) - date(1970, 1, 1)).label("created_day"),
+            func.coalesce(func.round(Deal.amount_base * 100), 0).cast(BigInteger).label("amount_cents"),
+        ).where(Deal.organization_id == organization_id)
+        result = await self._session.execute(query)
+        return result.all()
+
+    async def get_open_deals_stage_age(
+        self, organization_id: UUID
+    ) -> list[tuple[DealStage, int, float]]:
+        """Открытые сделки по этапам: сколько и сколько секунд в среднем уже на этапе"""
+        query = select(
+            Deal.stage,
+            func.count(Deal.id).label("deal_count"),
+            func.avg(func.extract("epoch", func.now() - Deal.stage_entered_at)).label("age_seconds"),
+        ).where(
+            Deal.organization_id == organization_id,
+            Deal.status.in_([DealStatus.NEW, DealStatus.IN_PROGRESS]),
+        ).group_by(Deal.stage)
+        
+        result = await self._session.execute(query)
+        return [(row.stage, row.deal_count, float(row.age_seconds)) for row in result.all()]
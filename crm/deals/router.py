@@ -1,5 +1,6 @@
-from typing import Annotated, Optional
-from fastapi import APIRouter, Query
+from typing import Annotated, Literal, Optional
+from fastapi import APIRouter, Header, Query, Response
+from fastapi.responses import StreamingResponse
 from uuid import UUID
 from decimal import Decimal
 from dishka.integrations.fastapi import inject
@@ -17,8 +18,21 @@ from deals.usecases import (
     UpdateDealUseCase,
     DeleteDealUseCase,
     ListDealsUseCase,
+    GetDealFingerprintUseCase,
+    GetDealsListFingerprintUseCase,
+    ExportDealsUseCase,
 )
+from deals.entities import DealEntity
 from auth.entities import AuthenticatedUser
+from core.responses import PydanticJSONResponse
+from core.export import EXPORT_FORMATS, export_chunks, export_headers
+from core.conditional import (
+    make_etag,
+    make_list_etag,
+    cache_headers,
+    is_not_modified,
+    parse_if_match_version,
+)
 
 
 router = APIRouter(
@@ -32,6 +46,7 @@ router = APIRouter(
 async def list_deals(
     user: Annotated[AuthenticatedUser, FromComponent("auth")],
     list_usecase: Annotated[ListDealsUseCase, FromComponent("deals")],
+    fingerprint_usecase: Annotated[GetDealsListFingerprintUseCase, FromComponent("deals")],
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
     status: Optional[list[str]] = Query(None),
@@ -41,11 +56,38 @@ async def list_deals(
     owner_id: Optional[UUID] = None,
     order_by: str = Query("created_at"),
     order: str = Query("desc"),
+    if_none_match: Optional[str] = Header(None),
 ):
+    # Дешевый отпечаток (count, max(updated_at), checksum): если выборка не менялась,
+    # строки не читаем вовсе. Last-Modified у списка нет: удаление, выход строки из фильтра
+    # или поздний коммит не сдвигают max(updated_at), а count и checksum в ETag это видят
+    fingerprint = await fingerprint_usecase(
+        user, status, min_amount, max_amount, stage, owner_id
+    )
+    etag = make_list_etag(
+        fingerprint, page, page_size, status, min_amount, max_amount, stage, owner_id, order_by, order
+    )
+    headers = cache_headers(etag)
+    if is_not_modified(etag, None, if_none_match, None):
+        return Response(status_code=304, headers=headers)
+
     deals, total = await list_usecase(
-        user, page, page_size, status, min_amount, max_amount, stage, owner_id, order_by, order
+        user,
+        page,
+        page_size,
+        status,
+        min_amount,
+        max_amount,
+        stage,
+        owner_id,
+        order_by,
+        order,
+        fingerprint.total,
+    )
+    return PydanticJSONResponse(
+        DealsListResponse(data=deals, total=total, page=page, page_size=page_size),
+        headers=headers,
     )
-    return DealsListResponse(data=deals, total=total, page=page, page_size=page_size)
 
 
 @router.post("", response_model=DealResponse)
@@ -58,7 +100,32 @@ async def create_deal(
     deal = await create_usecase(
         user, request.contact_id, request.title, request.amount, request.currency
     )
-    return DealResponse(data=deal)
+    return PydanticJSONResponse(DealResponse(data=deal), headers={"ETag": make_etag(deal.version)})
+
+
+@router.get("/export", response_class=StreamingResponse)
+@inject
+async def export_deals(
+    user: Annotated[AuthenticatedUser, FromComponent("auth")],
+    export_usecase: Annotated[ExportDealsUseCase, FromComponent("deals")],
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    status: Optional[list[str]] = Query(None),
+    min_amount: Optional[Decimal] = None,
+    max_amount: Optional[Decimal] = None,
+    stage: Optional[str] = None,
+    owner_id: Optional[UUID] = None,
+):
+    """
+    Выгрузить все сделки по фильтрам в CSV или NDJSON.
+    
+    Строки стримятся из серверного курсора без пагинации, фильтры те же, что у списка.
+    """
+    deals = export_usecase(user, status, min_amount, max_amount, stage, owner_id)
+    return StreamingResponse(
+        export_chunks(deals, DealEntity, format),
+        media_type=EXPORT_FORMATS[format],
+        headers=export_headers("deals", format),
+    )
 
 
 @router.get("/{deal_id}", response_model=DealResponse)
@@ -67,9 +134,22 @@ async def get_deal(
     deal_id: UUID,
     user: Annotated[AuthenticatedUser, FromComponent("auth")],
     get_usecase: Annotated[GetDealUseCase, FromComponent("deals")],
+    fingerprint_usecase: Annotated[GetDealFingerprintUseCase, FromComponent("deals")],
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
 ):
+    if if_none_match is not None or if_modified_since is not None:
+        fingerprint = await fingerprint_usecase(user, deal_id)
+        etag = make_etag(fingerprint.version)
+        if is_not_modified(etag, fingerprint.updated_at, if_none_match, if_modified_since):
+            return Response(
+                status_code=304, headers=cache_headers(etag, fingerprint.updated_at)
+            )
+
     deal = await get_usecase(user, deal_id)
-    return DealResponse(data=deal)
+    return PydanticJSONResponse(
+        DealResponse(data=deal), headers=cache_headers(make_etag(deal.version), deal.updated_at)
+    )
 
 
 @router.patch("/{deal_id}", response_model=DealResponse)
@@ -79,10 +159,17 @@ async def update_deal(
     request: UpdateDealRequest,
     user: Annotated[AuthenticatedUser, FromComponent("auth")],
     update_usecase: Annotated[UpdateDealUseCase, FromComponent("deals")],
+    if_match: Optional[str] = Header(None),
 ):
+    """
+    Обновить сделку.
+    
+    С заголовком If-Match (ETag из GET) обновление применится только к этой версии,
+    иначе вернется 412.
+    """
     update_data = request.model_dump(exclude_unset=True)
-    deal = await update_usecase(user, deal_id, update_data)
-    return DealResponse(data=deal)
+    deal = await update_usecase(user, deal_id, update_data, parse_if_match_version(if_match))
+    return PydanticJSONResponse(DealResponse(data=deal), headers={"ETag": make_etag(deal.version)})
 
 
 @router.delete("/{deal_id}", status_code=204)
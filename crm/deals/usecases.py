@@ -1,19 +1,30 @@
 from uuid import UUID, uuid4
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 from decimal import Decimal
 
 from core.database.unit_of_work import UnitOfWork
 from deals.repositories import DealRepository
 from contacts.repositories import ContactRepository
 from activities.repositories import ActivityRepository
-from deals.entities import DealEntity
+from changes.services import ChangeLog
+from changes.enums import ChangeEntityType, ChangeOperation
+from webhooks.services import WebhookPublisher
+from webhooks.enums import ACTIVITY_WEBHOOK_EVENTS
+from live.services import LivePublisher
+from analytics.services import DealStatsRollup
+from fx.services import FxConverter
+from deals.entities import DealEntity, DealFingerprintEntity
+from core.entities import ListFingerprintEntity
+from core.metrics import instrumented
 from deals.enums import DealStatus, DealStage
 from deals.exceptions import (
     DealNotFoundError,
     DealAccessDeniedError,
     InvalidDealAmountError,
     InvalidStageTransitionError,
+    DealConcurrentUpdateError,
+    DealVersionMismatchError,
 )
 from contacts.exceptions import ContactNotFoundError
 from users.enums import UserRole
@@ -28,16 +39,23 @@ STAGE_ORDER = {
 }
 
 
+@instrumented
 class CreateDealUseCase:
     def __init__(
         self,
         uow: UnitOfWork,
         deal_repository: DealRepository,
         contact_repository: ContactRepository,
+        change_log: ChangeLog,
+        deal_stats_rollup: DealStatsRollup,
+        fx_converter: FxConverter,
     ):
         self._uow = uow
         self._deal_repository = deal_repository
         self._contact_repository = contact_repository
+        self._change_log = change_log
+        self._deal_stats_rollup = deal_stats_rollup
+        self._fx_converter = fx_converter
 
     async def __call__(
         self,
@@ -55,6 +73,7 @@ class CreateDealUseCase:
             if contact.organization_id != user.organization_id:
                 raise DealAccessDeniedError()
 
+            created_at = datetime.now(timezone.utc)
             deal_data = {
                 "id": uuid4(),
                 "organization_id": user.organization_id,
@@ -63,14 +82,23 @@ class CreateDealUseCase:
                 "title": title,
                 "amount": amount,
                 "currency": currency,
+                "amount_base": await self._fx_converter.to_base(amount, currency),
                 "status": DealStatus.NEW,
                 "stage": DealStage.QUALIFICATION,
-                "created_at": datetime.now(timezone.utc),
+                "created_at": created_at,
                 "updated_at": datetime.now(timezone.utc),
+                "version": 1,
+                "stage_entered_at": created_at,
             }
-            return await self._deal_repository.create(deal_data)
+            deal = await self._deal_repository.create(deal_data)
+            await self._deal_stats_rollup.record(None, deal)
+            await self._change_log.record(
+                user.organization_id, ChangeEntityType.DEAL, deal.id, ChangeOperation.CREATED, deal, user.id
+            )
+            return deal
 
 
+@instrumented
 class GetDealUseCase:
     def __init__(self, uow: UnitOfWork, deal_repository: DealRepository):
         self._uow = uow
@@ -88,19 +116,34 @@ class GetDealUseCase:
             return deal
 
 
+@instrumented
 class UpdateDealUseCase:
     def __init__(
         self,
         uow: UnitOfWork,
         deal_repository: DealRepository,
         activity_repository: ActivityRepository,
+        change_log: ChangeLog,
+        webhook_publisher: WebhookPublisher,
+        live_publisher: LivePublisher,
+        deal_stats_rollup: DealStatsRollup,
+        fx_converter: FxConverter,
     ):
         self._uow = uow
         self._deal_repository = deal_repository
         self._activity_repository = activity_repository
+        self._change_log = change_log
+        self._webhook_publisher = webhook_publisher
+        self._live_publisher = live_publisher
+        self._deal_stats_rollup = deal_stats_rollup
+        self._fx_converter = fx_converter
 
     async def __call__(
-        self, user: AuthenticatedUser, deal_id: UUID, update_data: dict
+        self,
+        user: AuthenticatedUser,
+        deal_id: UUID,
+        update_data: dict,
+        expected_version: Optional[int] = None,
     ) -> DealEntity:
         async with self._uow:
             deal = await self._deal_repository.get_by_id(deal_id)
@@ -113,6 +156,21 @@ class UpdateDealUseCase:
             if user.role == UserRole.MEMBER.value and deal.owner_id != user.id:
                 raise DealAccessDeniedError()
 
+            # If-Match: клиент редактировал устаревшую версию сделки
+            if expected_version is not None and deal.version != expected_version:
+                raise DealVersionMismatchError()
+
+            activities: list[dict[str, Any]] = []
+
+            # Сумма в базовой валюте пересчитывается по текущему курсу, только если изменилась сама сумма
+            if "amount" in update_data or "currency" in update_data:
+                update_data = {
+                    **update_data,
+                    "amount_base": await self._fx_converter.to_base(
+                        update_data.get("amount", deal.amount), update_data.get("currency", deal.currency)
+                    ),
+                }
+
             if "status" in update_data:
                 new_status = update_data["status"]
                 if new_status == DealStatus.WON.value:
@@ -121,7 +179,10 @@ class UpdateDealUseCase:
                         raise InvalidDealAmountError("error.deal.amount_must_be_positive_for_won")
 
                 if new_status != deal.status:
-                    activity_data = {
+                    # Момент закрытия нужен аналитике: выигранные и проигранные по дням
+                    closed = new_status in (DealStatus.WON.value, DealStatus.LOST.value)
+                    update_data = {**update_data, "closed_at": datetime.now(timezone.utc) if closed else None}
+                    activities.append({
                         "id": uuid4(),
                         "deal_id": deal_id,
                         "author_id": user.id,
@@ -131,8 +192,7 @@ class UpdateDealUseCase:
                             "new_status": new_status,
                         },
                         "created_at": datetime.now(timezone.utc),
-                    }
-                    await self._activity_repository.create(activity_data)
+                    })
 
             if "stage" in update_data:
                 new_stage = DealStage(update_data["stage"])
@@ -143,7 +203,10 @@ class UpdateDealUseCase:
                         raise InvalidStageTransitionError("error.deal.stage_rollback_not_allowed")
 
                 if new_stage != old_stage:
-                    activity_data = {
+                    # Время на этапе аналитика считает от stage_entered_at; в таймлайне тот же момент
+                    stage_entered_at = datetime.now(timezone.utc)
+                    update_data = {**update_data, "stage_entered_at": stage_entered_at}
+                    activities.append({
                         "id": uuid4(),
                         "deal_id": deal_id,
                         "author_id": user.id,
@@ -152,22 +215,84 @@ class UpdateDealUseCase:
                             "old_stage": deal.stage,
                             "new_stage": new_stage.value,
                         },
-                        "created_at": datetime.now(timezone.utc),
-                    }
-                    await self._activity_repository.create(activity_data)
+                        "created_at": stage_entered_at,
+                    })
 
-            await self._deal_repository.update(deal_id, update_data)
-            
-            update_data["updated_at"] = datetime.now(timezone.utc)
-            updated_deal = deal.model_copy(update=update_data)
+            # Решения выше приняты по прочитанной версии сделки:
+            # compare-and-set по version применит UPDATE, только если ее никто не изменил
+            updated_deal = await self._deal_repository.update(
+                deal_id,
+                update_data,
+                preconditions={
+                    "organization_id": user.organization_id,
+                    "version": deal.version,
+                },
+            )
+            if not updated_deal:
+                if expected_version is not None:
+                    raise DealVersionMismatchError()
+                raise DealConcurrentUpdateError()
+
+            await self._deal_stats_rollup.record(deal, updated_deal)
+            created_activities = [
+                await self._activity_repository.create(activity_data) for activity_data in activities
+            ]
+            await self._live_publisher.publish(user.organization_id, "activity", created_activities)
+
+            # Смены статуса и этапа уходят подписчикам вебхуков; доставка - в воркере
+            await self._webhook_publisher.publish(
+                user.organization_id,
+                [
+                    (
+                        ACTIVITY_WEBHOOK_EVENTS[activity_data["type"]],
+                        {"deal_id": deal_id, "actor_id": user.id, **activity_data["payload"]},
+                    )
+                    for activity_data in activities
+                ],
+            )
+            await self._change_log.record(
+                user.organization_id,
+                ChangeEntityType.DEAL,
+                deal_id,
+                ChangeOperation.UPDATED,
+                updated_deal,
+                user.id,
+            )
             return updated_deal
 
 
-class DeleteDealUseCase:
+@instrumented
+class GetDealFingerprintUseCase:
     def __init__(self, uow: UnitOfWork, deal_repository: DealRepository):
         self._uow = uow
         self._deal_repository = deal_repository
 
+    async def __call__(self, user: AuthenticatedUser, deal_id: UUID) -> DealFingerprintEntity:
+        async with self._uow:
+            fingerprint = await self._deal_repository.get_fingerprint(deal_id)
+            if not fingerprint:
+                raise DealNotFoundError()
+            
+            if fingerprint.organization_id != user.organization_id:
+                raise DealAccessDeniedError()
+            
+            return fingerprint
+
+
+@instrumented
+class DeleteDealUseCase:
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        deal_repository: DealRepository,
+        change_log: ChangeLog,
+        deal_stats_rollup: DealStatsRollup,
+    ):
+        self._uow = uow
+        self._deal_repository = deal_repository
+        self._change_log = change_log
+        self._deal_stats_rollup = deal_stats_rollup
+
     async def __call__(self, user: AuthenticatedUser, deal_id: UUID):
         async with self._uow:
             deal = await self._deal_repository.get_by_id(deal_id)
@@ -180,9 +305,17 @@ class DeleteDealUseCase:
             if user.role == UserRole.MEMBER.value and deal.owner_id != user.id:
                 raise DealAccessDeniedError()
             
-            await self._deal_repository.delete(deal_id)
+            # Вклад в аналитику снимаем по удаленной строке: ее могли изменить после чтения выше
+            deleted_deal = await self._deal_repository.delete(deal_id)
+            if deleted_deal:
+                await self._deal_stats_rollup.record(deleted_deal, None)
+                # Если сделку уже удалил параллельный запрос, событие DELETED записал он
+                await self._change_log.record(
+                    user.organization_id, ChangeEntityType.DEAL, deal_id, ChangeOperation.DELETED, actor_id=user.id
+                )
 
 
+@instrumented
 class ListDealsUseCase:
     def __init__(self, uow: UnitOfWork, deal_repository: DealRepository):
         self._uow = uow
@@ -200,6 +333,7 @@ class ListDealsUseCase:
         owner_id: Optional[UUID] = None,
         order_by: str = "created_at",
         order: str = "desc",
+        total: Optional[int] = None,
     ) -> tuple[list[DealEntity], int]:
         async with self._uow:
             # Member может видеть все сделки в организации
@@ -219,5 +353,72 @@ class ListDealsUseCase:
                 owner_id,
                 order_by,
                 order,
+                total,
+            )
+
+
+@instrumented
+class GetDealsListFingerprintUseCase:
+    def __init__(self, uow: UnitOfWork, deal_repository: DealRepository):
+        self._uow = uow
+        self._deal_repository = deal_repository
+
+    async def __call__(
+        self,
+        user: AuthenticatedUser,
+        statuses: Optional[list[str]] = None,
+        min_amount: Optional[Decimal] = None,
+        max_amount: Optional[Decimal] = None,
+        stage: Optional[str] = None,
+        owner_id: Optional[UUID] = None,
+    ) -> ListFingerprintEntity:
+        async with self._uow:
+            status_enums = [DealStatus(s) for s in statuses] if statuses else None
+            stage_enum = DealStage(stage) if stage else None
+            
+            return await self._deal_repository.get_list_fingerprint(
+                user.organization_id,
+                status_enums,
+                min_amount,
+                max_amount,
+                stage_enum,
+                owner_id,
             )
 
+
+
+@instrumented
+class ExportDealsUseCase:
+    def __init__(self, uow: UnitOfWork, deal_repository: DealRepository):
+        self._uow = uow
+        self._deal_repository = deal_repository
+
+    def __call__(
+        self,
+        user: AuthenticatedUser,
+        statuses: Optional[list[str]] = None,
+        min_amount: Optional[Decimal] = None,
+        max_amount: Optional[Decimal] = None,
+        stage: Optional[str] = None,
+        owner_id: Optional[UUID] = None,
+    ) -> AsyncIterator[DealEntity]:
+        # Фильтры разбираем сразу: ошибка должна случиться до начала ответа, а не посреди стрима
+        status_enums = [DealStatus(s) for s in statuses] if statuses else None
+        stage_enum = DealStage(stage) if stage else None
+        
+        return self._stream(user.organization_id, status_enums, min_amount, max_amount, stage_enum, owner_id)
+
+    async def _stream(
+        self,
+        organization_id: UUID,
+        statuses: Optional[list[DealStatus]],
+        min_amount: Optional[Decimal],
+        max_amount: Optional[Decimal],
+        stage: Optional[DealStage],
+        owner_id: Optional[UUID],
+    ) -> AsyncIterator[DealEntity]:
+        async with self._uow:
+            async for deal in self._deal_repository.stream_by_organization(
+                organization_id, statuses, min_amount, max_amount, stage, owner_id
+            ):
+                yield deal
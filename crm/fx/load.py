@@ -0,0 +1,45 @@
+"""
+Загрузка курсов валют в fx_rates.
+
+    python -m fx.load EUR=1.08 RUB=0.011 --revalue
+
+Курс - сколько единиц базовой валюты (USD) стоит единица валюты. Без --revalue
+курсы применяются только к новым сделкам и правкам сумм; с --revalue сделки этих
+валют пересчитываются по новым курсам вместе с аналитическими сводками, в том числе
+сделки, сохраненные без курса (amount_base = NULL).
+"""
+import argparse
+import asyncio
+from decimal import Decimal, InvalidOperation
+
+from fx.usecases import LoadFxRatesUseCase
+
+
+def parse_rate(value: str) -> tuple[str, Decimal]:
+    currency, _, rate = value.partition("=")
+    try:
+        parsed = Decimal(rate)
+    except InvalidOperation:
+        raise argparse.ArgumentTypeError(f"invalid rate: {value}") from None
+    if not currency.strip() or not parsed.is_finite() or parsed <= 0:
+        raise argparse.ArgumentTypeError(f"invalid rate: {value}")
+    return currency, parsed
+
+
+async def main(args: argparse.Namespace):
+    from core.container import container
+
+    try:
+        async with container() as request_container:
+            load_rates = await request_container.get(LoadFxRatesUseCase, component="fx")
+            organizations = await load_rates(dict(args.rates), revalue=args.revalue)
+    finally:
+        await container.close()
+    print(f"loaded {len(args.rates)} rates, revalued deals of {organizations} organizations")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load FX rates to the base currency")
+    parser.add_argument("rates", nargs="+", type=parse_rate, metavar="CURRENCY=RATE")
+    parser.add_argument("--revalue", action="store_true", help="пересчитать сохраненные сделки этих валют")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,19 @@
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, Numeric, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.database.database import BaseModel
+
+
+class FxRate(BaseModel):
+    """Курс валюты к базовой: сколько единиц базовой валюты стоит одна единица currency"""
+
+    __tablename__ = "fx_rates"
+
+    currency: Mapped[str] = mapped_column(String(10), primary_key=True)
+    rate: Mapped[Decimal] = mapped_column(Numeric(18, 8), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now()
+    )
@@ -0,0 +1,60 @@
+from typing import Annotated
+from dishka import Provider, Scope, provide, FromComponent
+
+from core.cache import CacheInvalidator, InvalidationBus, LocalCache
+from core.database.unit_of_work import UnitOfWork
+from core.environment.config import Settings
+from changes.services import ChangeLog
+from deals.repositories import DealRepository
+from analytics.repositories import DealStatsRepository, DealViewsRepository
+from fx.repositories import FxRateRepository
+from fx.services import FxConverter
+from fx.usecases import LoadFxRatesUseCase
+
+
+class FxProvider(Provider):
+    scope = Scope.REQUEST
+    component = "fx"
+
+    @provide(scope=Scope.APP)
+    def get_rate_cache(
+        self,
+        settings: Annotated[Settings, FromComponent("environment")],
+        bus: Annotated[InvalidationBus, FromComponent("cache")],
+    ) -> LocalCache:
+        return bus.register(LocalCache("fx_rates", 1, settings.fx_rates_cache_ttl_seconds))
+
+    @provide
+    def get_fx_rate_repository(
+        self, uow: Annotated[UnitOfWork, FromComponent("database")]
+    ) -> FxRateRepository:
+        return FxRateRepository(uow.session)
+
+    @provide
+    def get_fx_converter(
+        self,
+        rate_cache: Annotated[LocalCache, FromComponent("fx")],
+        fx_rate_repository: Annotated[FxRateRepository, FromComponent("fx")],
+    ) -> FxConverter:
+        return FxConverter(rate_cache, fx_rate_repository)
+
+    @provide
+    def get_load_fx_rates_use_case(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        fx_rate_repository: Annotated[FxRateRepository, FromComponent("fx")],
+        deal_repository: Annotated[DealRepository, FromComponent("deals")],
+        deal_stats_repository: Annotated[DealStatsRepository, FromComponent("analytics")],
+        deal_views_repository: Annotated[DealViewsRepository, FromComponent("analytics")],
+        change_log: Annotated[ChangeLog, FromComponent("changes")],
+        cache_invalidator: Annotated[CacheInvalidator, FromComponent("cache")],
+    ) -> LoadFxRatesUseCase:
+        return LoadFxRatesUseCase(
+            uow,
+            fx_rate_repository,
+            deal_repository,
+            deal_stats_repository,
+            deal_views_repository,
+            change_log,
+            cache_invalidator,
+        )
@@ -0,0 +1,26 @@
+from decimal import Decimal
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.tracing import traced
+from fx.models import FxRate
+
+
+@traced
+class FxRateRepository:
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def get_rates(self) -> dict[str, Decimal]:
+        result = await self._session.execute(select(FxRate.currency, FxRate.rate))
+        return {currency: rate for currency, rate in result.all()}
+
+    async def upsert(self, rates: dict[str, Decimal]):
+        stmt = insert(FxRate).values([{"currency": currency, "rate": rate} for currency, rate in rates.items()])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[FxRate.currency],
+            set_={"rate": stmt.excluded.rate, "updated_at": func.now()},
+        )
+        await self._session.execute(stmt)
@@ -0,0 +1,43 @@
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional
+
+from core.cache import LocalCache, cache_tag
+from fx.repositories import FxRateRepository
+
+
+FX_RATES_TAG = cache_tag("fx_rates")
+RATES_KEY = "rates"
+CENT = Decimal("0.01")
+
+
+def normalize_currency(currency: str) -> str:
+    return currency.strip().upper()
+
+
+class FxConverter:
+    """
+    Пересчет сумм в базовую валюту по таблице fx_rates.
+
+    Таблица крошечная и меняется редко, поэтому целиком держится в памяти воркера:
+    запись сделки не ходит за курсом в базу. Округление - как round(numeric, 2)
+    в Postgres, чтобы пересчет в SQL давал те же копейки.
+    """
+
+    def __init__(self, rate_cache: LocalCache, fx_rate_repository: FxRateRepository):
+        self._rate_cache = rate_cache
+        self._fx_rate_repository = fx_rate_repository
+
+    async def get_rates(self) -> dict[str, Decimal]:
+        rates = self._rate_cache.get(RATES_KEY)
+        if rates is None:
+            generation = self._rate_cache.generation
+            rates = await self._fx_rate_repository.get_rates()
+            self._rate_cache.set(RATES_KEY, rates, [FX_RATES_TAG], generation)
+        return rates
+
+    async def to_base(self, amount: Decimal, currency: str) -> Optional[Decimal]:
+        """None, если курса валюты нет: сумму дозаполнит пересчет после загрузки курса"""
+        rate = (await self.get_rates()).get(normalize_currency(currency))
+        if rate is None:
+            return None
+        return (Decimal(amount) * rate).quantize(CENT, ROUND_HALF_UP)
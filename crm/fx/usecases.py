@@ -0,0 +1,63 @@
+from decimal import Decimal
+from uuid import UUID
+
+from core.cache import CacheInvalidator
+from core.database.unit_of_work import UnitOfWork
+from core.metrics import instrumented
+from changes.enums import ChangeEntityType, ChangeOperation
+from changes.services import ChangeLog
+from deals.repositories import DealRepository
+from analytics.repositories import DealStatsRepository, DealViewsRepository
+from fx.repositories import FxRateRepository
+from fx.services import FX_RATES_TAG, normalize_currency
+
+
+@instrumented
+class LoadFxRatesUseCase:
+    """
+    Загрузка курсов. Курс фиксируется в сделке при записи, поэтому новые курсы
+    действуют только на новые сделки и правки сумм; revalue пересчитывает уже
+    сохраненные сделки этих валют вместе с дневной сводкой и представлениями
+    и пишет по событию UPDATED на каждую пересчитанную сделку.
+    """
+
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        fx_rate_repository: FxRateRepository,
+        deal_repository: DealRepository,
+        deal_stats_repository: DealStatsRepository,
+        deal_views_repository: DealViewsRepository,
+        change_log: ChangeLog,
+        cache_invalidator: CacheInvalidator,
+    ):
+        self._uow = uow
+        self._fx_rate_repository = fx_rate_repository
+        self._deal_repository = deal_repository
+        self._deal_stats_repository = deal_stats_repository
+        self._deal_views_repository = deal_views_repository
+        self._change_log = change_log
+        self._cache_invalidator = cache_invalidator
+
+    async def __call__(self, rates: dict[str, Decimal], revalue: bool = False) -> int:
+        rates = {normalize_currency(currency): rate for currency, rate in rates.items()}
+        async with self._uow:
+            await self._fx_rate_repository.upsert(rates)
+            
+            organization_ids: list[UUID] = []
+            if revalue:
+                deals = await self._deal_repository.revalue_amount_base(list(rates))
+                # Лента изменений (и кеши сделок) узнают о пересчете, как о правке суммы
+                await self._change_log.record_many(
+                    ChangeEntityType.DEAL,
+                    ChangeOperation.UPDATED,
+                    [(deal.organization_id, deal.id, deal) for deal in deals],
+                )
+                organization_ids = list(dict.fromkeys(deal.organization_id for deal in deals))
+                for organization_id in organization_ids:
+                    await self._deal_stats_repository.rebuild(organization_id)
+                if organization_ids:
+                    await self._deal_views_repository.refresh()
+            
+            await self._cache_invalidator.invalidate(FX_RATES_TAG)
+            return len(organization_ids)
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, ConfigDict
+from uuid import UUID
+from datetime import datetime
+from typing import Optional
+
+from jobs.enums import JobStatus
+
+
+class JobEntity(BaseModel):
+    id: UUID
+    queue: str
+    task: str
+    payload: dict
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    idempotency_key: Optional[str] = None
+    run_at: datetime
+    locked_until: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,8 @@
+from enum import Enum as PyEnum
+
+
+class JobStatus(str, PyEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
@@ -0,0 +1,6 @@
+from core.exceptions import BaseCustomException
+
+
+class JobHandlerNotFoundError(BaseCustomException):
+    def __init__(self, message: str = "error.job.handler_not_found"):
+        super().__init__(message)
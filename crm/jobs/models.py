@@ -0,0 +1,41 @@
+from datetime import datetime
+from uuid import UUID, uuid4
+from typing import Optional
+
+from sqlalchemy import String, DateTime, Integer, Text, JSON, Enum, Index, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.database.database import BaseModel
+from jobs.enums import JobStatus
+
+
+class Job(BaseModel):
+    __tablename__ = "jobs"
+
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
+    queue: Mapped[str] = mapped_column(String(64), nullable=False, default="default")
+    task: Mapped[str] = mapped_column(String(128), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    status: Mapped[JobStatus] = mapped_column(Enum(JobStatus), nullable=False, default=JobStatus.PENDING)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=5)
+    idempotency_key: Mapped[Optional[str]] = mapped_column(String(255), nullable=True, unique=True)
+    run_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now()
+    )
+    locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now()
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Очередь выбирает только незавершенные задания: частичный индекс остается маленьким
+        Index(
+            "ix_jobs_queue_run_at_active",
+            "queue",
+            "run_at",
+            postgresql_where=text("status IN ('PENDING', 'RUNNING')"),
+        ),
+    )
@@ -0,0 +1,26 @@
+from typing import Annotated
+from dishka import Provider, Scope, provide, FromComponent
+
+from jobs.repositories import JobRepository
+from jobs.services import JobQueue
+from core.database.unit_of_work import UnitOfWork
+from core.environment.config import Settings
+
+
+class JobProvider(Provider):
+    scope = Scope.REQUEST
+    component = "jobs"
+
+    @provide
+    def get_job_repository(
+        self, uow: Annotated[UnitOfWork, FromComponent("database")]
+    ) -> JobRepository:
+        return JobRepository(uow.session)
+
+    @provide
+    def get_job_queue(
+        self,
+        job_repository: Annotated[JobRepository, FromComponent("jobs")],
+        settings: Annotated[Settings, FromComponent("environment")],
+    ) -> JobQueue:
+        return JobQueue(job_repository, settings.jobs_max_attempts)
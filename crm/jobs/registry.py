@@ -0,0 +1,48 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from jobs.exceptions import JobHandlerNotFoundError
+
+
+@dataclass(frozen=True)
+class JobHandler:
+    usecase: type
+    component: str
+    every: Optional[float] = None
+    queue: str = "default"
+
+
+_handlers: dict[str, JobHandler] = {}
+
+
+def job_handler(task: str, component: str, every: Optional[float] = None, queue: str = "default"):
+    """
+    Регистрирует use case как обработчик задания task.
+
+    Воркер достает use case из dishka-контейнера (как роутеры) и вызывает его
+    с payload задания в качестве именованных аргументов. Доставка at-least-once:
+    обработчик должен быть идемпотентным.
+
+    С every задание периодическое: воркеры очереди queue ставят его раз в every
+    секунд с пустым payload, одно на интервал независимо от числа воркеров.
+    """
+    def decorator(cls):
+        _handlers[task] = JobHandler(cls, component, every, queue)
+        return cls
+
+    return decorator
+
+
+def get_job_handler(task: str) -> JobHandler:
+    handler = _handlers.get(task)
+    if handler is None:
+        raise JobHandlerNotFoundError(f"error.job.handler_not_found: {task}")
+    return handler
+
+
+def get_periodic_handlers(queues: list[str]) -> dict[str, JobHandler]:
+    return {
+        task: handler
+        for task, handler in _handlers.items()
+        if handler.every is not None and handler.queue in queues
+    }
@@ -0,0 +1,136 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import CursorResult, Row, select, update, delete, func, and_, or_, text
+from sqlalchemy.dialects.postgresql import insert
+from uuid import UUID
+from typing import Optional, cast
+from datetime import datetime, timedelta
+
+from jobs.models import Job
+from jobs.enums import JobStatus
+from jobs.entities import JobEntity
+from core.entities import entity_from_row
+from core.tracing import traced
+
+
+JOB_COLUMNS = tuple(getattr(Job, field) for field in JobEntity.model_fields)
+
+# Канал NOTIFY, по которому воркеры узнают о новых заданиях без ожидания poll_interval
+JOBS_CHANNEL = "crm_jobs"
+
+
+def job_from_row(row: Row) -> JobEntity:
+    return entity_from_row(JobEntity, row)
+
+
+@traced
+class JobRepository:
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def enqueue(self, job_data: dict) -> Optional[UUID]:
+        """
+        Ставит задание в очередь в текущей транзакции.
+
+        При повторном idempotency_key новое задание не создается и возвращается None.
+        NOTIFY доставляется воркерам только после commit, вместе с самим заданием.
+        """
+        stmt = (
+            insert(Job)
+            .values(**job_data)
+            .on_conflict_do_nothing(index_elements=[Job.idempotency_key])
+            .returning(Job.id)
+        )
+        job_id = await self._session.scalar(stmt)
+        if job_id:
+            await self._session.execute(
+                text("SELECT pg_notify(:channel, :queue)"),
+                {"channel": JOBS_CHANNEL, "queue": job_data.get("queue", "default")},
+            )
+        return job_id
+
+    async def get_by_id(self, job_id: UUID) -> Optional[JobEntity]:
+        result = await self._session.execute(select(*JOB_COLUMNS).where(Job.id == job_id))
+        row = result.one_or_none()
+        if row:
+            return job_from_row(row)
+        return None
+
+    async def claim(self, queues: list[str], limit: int, lock_timeout: timedelta) -> list[JobEntity]:
+        """
+        Забирает до limit готовых заданий: ожидающие с наступившим run_at и зависшие
+        (воркер упал, не освободив блокировку до locked_until).
+
+        FOR UPDATE SKIP LOCKED позволяет нескольким воркерам разбирать очередь параллельно,
+        не блокируя друг друга и не получая одно задание дважды.
+        """
+        candidates = (
+            select(Job.id)
+            .where(
+                Job.queue.in_(queues),
+                or_(
+                    and_(Job.status == JobStatus.PENDING, Job.run_at <= func.now()),
+                    and_(Job.status == JobStatus.RUNNING, Job.locked_until < func.now()),
+                ),
+            )
+            .order_by(Job.run_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(Job)
+            .where(Job.id.in_(candidates.scalar_subquery()))
+            .values(
+                status=JobStatus.RUNNING,
+                attempts=Job.attempts + 1,
+                locked_until=func.now() + lock_timeout,
+            )
+            .returning(*JOB_COLUMNS)
+        )
+        result = await self._session.execute(stmt)
+        return [job_from_row(row) for row in result]
+
+    def _owned(self, job_id: UUID, attempts: int):
+        # Задание все еще за этой попыткой: после истечения locked_until его мог забрать
+        # другой воркер (attempts увеличится), и результат старой попытки не должен его затереть
+        return and_(Job.id == job_id, Job.status == JobStatus.RUNNING, Job.attempts == attempts)
+
+    async def extend_lease(self, job_id: UUID, attempts: int, lock_timeout: timedelta) -> bool:
+        """Продлевает locked_until выполняющегося задания; False - попытка уже не владеет им"""
+        stmt = (
+            update(Job)
+            .where(self._owned(job_id, attempts))
+            .values(locked_until=func.now() + lock_timeout)
+            .returning(Job.id)
+        )
+        return await self._session.scalar(stmt) is not None
+
+    async def complete(self, job_id: UUID, attempts: int) -> bool:
+        stmt = (
+            update(Job)
+            .where(self._owned(job_id, attempts))
+            .values(status=JobStatus.DONE, locked_until=None, last_error=None, finished_at=func.now())
+            .returning(Job.id)
+        )
+        return await self._session.scalar(stmt) is not None
+
+    async def fail(self, job_id: UUID, attempts: int, error: str, retry_at: Optional[datetime]) -> bool:
+        """С retry_at задание вернется в очередь, без него - помечается окончательно упавшим"""
+        if retry_at is not None:
+            values = {"status": JobStatus.PENDING, "run_at": retry_at}
+        else:
+            values = {"status": JobStatus.FAILED, "finished_at": func.now()}
+        stmt = (
+            update(Job)
+            .where(self._owned(job_id, attempts))
+            .values(**values, locked_until=None, last_error=error)
+            .returning(Job.id)
+        )
+        return await self._session.scalar(stmt) is not None
+
+    async def delete_finished(self, finished_before: datetime) -> int:
+        stmt = delete(Job).where(
+            Job.status.in_([JobStatus.DONE, JobStatus.FAILED]),
+            Job.finished_at < finished_before,
+        )
+        result = cast(CursorResult, await self._session.execute(stmt))
+        return result.rowcount
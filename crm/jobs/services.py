@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID, uuid4
+
+from pydantic_core import to_jsonable_python
+
+from jobs.repositories import JobRepository
+
+
+class JobQueue:
+    """
+    Постановка фоновых заданий из use case.
+
+    Задание пишется в сессию запроса, поэтому фиксируется или откатывается вместе
+    с бизнес-изменениями в том же `async with self._uow:` - без отдельного брокера
+    и без потерянных или лишних заданий.
+    """
+
+    def __init__(self, job_repository: JobRepository, max_attempts: int):
+        self._job_repository = job_repository
+        self._max_attempts = max_attempts
+
+    async def enqueue(
+        self,
+        task: str,
+        payload: dict,
+        idempotency_key: Optional[str] = None,
+        queue: str = "default",
+        run_at: Optional[datetime] = None,
+        max_attempts: Optional[int] = None,
+    ) -> Optional[UUID]:
+        job_data = {
+            "id": uuid4(),
+            "queue": queue,
+            "task": task,
+            # Обработчик получит payload после JSON: UUID, datetime и Decimal придут строками
+            "payload": to_jsonable_python(payload),
+            "idempotency_key": idempotency_key,
+            "max_attempts": max_attempts or self._max_attempts,
+        }
+        if run_at is not None:
+            job_data["run_at"] = run_at
+        return await self._job_repository.enqueue(job_data)
@@ -0,0 +1,340 @@
+"""
+Воркер фоновых заданий.
+
+    python -m jobs.worker --queues default --concurrency 4
+
+Забирает готовые задания из таблицы jobs (FOR UPDATE SKIP LOCKED, поэтому воркеров
+можно запускать сколько угодно), выполняет зарегистрированные через job_handler
+use case и повторяет упавшие с экспоненциальной задержкой. О новых заданиях узнает
+по LISTEN crm_jobs, а при потере уведомлений - по опросу раз в poll_interval.
+Периодические задания (job_handler(..., every=...)) ставит сам.
+
+Пока обработчик работает, воркер продлевает locked_until задания, так что другой
+воркер забирает только задания упавшего процесса. Ошибки базы не останавливают
+воркер: итерация повторяется с задержкой, LISTEN-соединение переподключается.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import signal
+import time
+import traceback
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional, cast
+
+from dishka import AsyncContainer
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.database.unit_of_work import UnitOfWork
+from core.environment.config import Settings
+from core.metrics import job_duration, registry
+from core.tracing import configure_tracing, tracer, use_span
+from jobs.entities import JobEntity
+from jobs.registry import get_job_handler, get_periodic_handlers
+from jobs.repositories import JobRepository, JOBS_CHANNEL
+from jobs.services import JobQueue
+
+
+logger = logging.getLogger("crm.jobs")
+
+PURGE_INTERVAL_SECONDS = 3600
+RECONNECT_DELAY_SECONDS = 5.0
+# Потолок задержки повтора итерации, пока база недоступна
+ERROR_BACKOFF_MAX_SECONDS = 60.0
+
+
+def retry_delay(attempts: int, base: float, cap: float) -> float:
+    """Экспоненциальная задержка с jitter: повторы упавших заданий не приходят пачкой"""
+    delay: float = min(base * 2 ** (attempts - 1), cap)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class Worker:
+    def __init__(
+        self,
+        container: AsyncContainer,
+        queues: list[str],
+        concurrency: int,
+        poll_interval: float,
+        lock_timeout: timedelta,
+        retry_base: float,
+        retry_max: float,
+        retention: timedelta,
+    ):
+        self._container = container
+        self._queues = queues
+        self._concurrency = concurrency
+        self._poll_interval = poll_interval
+        self._lock_timeout = lock_timeout
+        self._retry_base = retry_base
+        self._retry_max = retry_max
+        self._retention = retention
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._in_flight: set[asyncio.Task] = set()
+        self._last_purge = 0.0
+        self._periodic_slots: dict[str, int] = {}
+        self._errors = 0
+
+    def stop(self):
+        self._stopping.set()
+        self._wakeup.set()
+
+    def notify(self, *args):
+        self._wakeup.set()
+
+    async def run(self):
+        engine = await self._container.get(AsyncEngine, component="database")
+        logger.info("worker started: queues=%s concurrency=%s", self._queues, self._concurrency)
+        while not self._stopping.is_set():
+            try:
+                async with engine.connect() as listen_connection:
+                    raw_connection = await listen_connection.get_raw_connection()
+                    driver_connection = raw_connection.driver_connection
+                    assert driver_connection is not None
+                    await driver_connection.add_listener(JOBS_CHANNEL, self.notify)
+                    try:
+                        await self._loop(driver_connection.is_closed)
+                    finally:
+                        # Соединение вернется в пул: без UNLISTEN оно продолжило бы получать события
+                        if not driver_connection.is_closed():
+                            await asyncio.shield(driver_connection.remove_listener(JOBS_CHANNEL, self.notify))
+                if not self._stopping.is_set():
+                    logger.warning("job listener connection closed, reconnecting")
+            except Exception:
+                logger.exception("job listener failed, reconnecting")
+                await self._sleep(RECONNECT_DELAY_SECONDS)
+
+        # Завершение: новые задания не берем, текущие доделываем
+        await self.drain()
+        logger.info("worker stopped")
+
+    async def _loop(self, is_closed: Callable[[], bool]):
+        # Пока LISTEN-соединение живо; после обрыва run переподключается, опрос не прерывается
+        while not self._stopping.is_set() and not is_closed():
+            self._wakeup.clear()
+            try:
+                await self.schedule_periodic()
+                claimed = await self.run_once()
+                await self.purge_if_due()
+                self._errors = 0
+            except Exception:
+                self._errors += 1
+                delay = retry_delay(self._errors, self._poll_interval, ERROR_BACKOFF_MAX_SECONDS)
+                logger.exception("worker iteration failed, retrying in %.1fs", delay)
+                await self._sleep(delay)
+                continue
+            if claimed and len(self._in_flight) < self._concurrency:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _sleep(self, delay: float):
+        """Пауза, которую прерывает только stop (уведомления о заданиях ее не сокращают)"""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def drain(self):
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def run_once(self) -> int:
+        """Забирает задания на свободные слоты и запускает их; возвращает число взятых"""
+        free_slots = self._concurrency - len(self._in_flight)
+        if free_slots <= 0:
+            return 0
+
+        async with self._container() as request_container:
+            uow = await request_container.get(UnitOfWork, component="database")
+            job_repository = await request_container.get(JobRepository, component="jobs")
+            async with uow:
+                jobs = await job_repository.claim(self._queues, free_slots, self._lock_timeout)
+
+        for job in jobs:
+            task = asyncio.create_task(self.process(job))
+            self._in_flight.add(task)
+            task.add_done_callback(self._on_done)
+        return len(jobs)
+
+    def _on_done(self, task: asyncio.Task):
+        self._in_flight.discard(task)
+        self._wakeup.set()
+
+    async def process(self, job: JobEntity):
+        started = time.perf_counter()
+        error: Optional[str] = None
+        outcome = "ok"
+        span = tracer.start_trace(
+            f"job {job.task}",
+            kind="consumer",
+            attributes={"job.id": str(job.id), "job.queue": job.queue, "job.attempt": job.attempts},
+        ) if tracer.enabled else None
+
+        lease = asyncio.create_task(self._keep_lease(job))
+        try:
+            with use_span(span):
+                handler = get_job_handler(job.task)
+                async with self._container() as request_container:
+                    usecase: Callable[..., Awaitable[object]] = await request_container.get(
+                        handler.usecase, component=handler.component
+                    )
+                    await usecase(**job.payload)
+        except Exception as exc:
+            error = "".join(traceback.format_exception_only(exc)).strip()
+            logger.warning("job %s (%s) attempt %s failed: %s", job.id, job.task, job.attempts, error)
+        finally:
+            lease.cancel()
+            await asyncio.gather(lease, return_exceptions=True)
+
+        try:
+            async with self._container() as request_container:
+                uow = await request_container.get(UnitOfWork, component="database")
+                job_repository = await request_container.get(JobRepository, component="jobs")
+                async with uow:
+                    if error is None:
+                        recorded = await job_repository.complete(job.id, job.attempts)
+                    elif job.attempts < job.max_attempts:
+                        outcome = "retry"
+                        delay = retry_delay(job.attempts, self._retry_base, self._retry_max)
+                        retry_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+                        recorded = await job_repository.fail(job.id, job.attempts, error, retry_at)
+                    else:
+                        outcome = "failed"
+                        recorded = await job_repository.fail(job.id, job.attempts, error, None)
+            if not recorded:
+                outcome = "lost"
+                logger.warning(
+                    "job %s (%s) attempt %s lost its lease, result discarded", job.id, job.task, job.attempts
+                )
+        except Exception:
+            # Задание остается RUNNING и после locked_until достанется следующему воркеру
+            outcome = "lost"
+            logger.exception("job %s (%s) attempt %s: failed to record the result", job.id, job.task, job.attempts)
+
+        job_duration.observe(time.perf_counter() - started, task=job.task, outcome=outcome)
+
+    async def _keep_lease(self, job: JobEntity):
+        """Продлевает locked_until каждую треть lock_timeout, пока выполняется обработчик"""
+        interval = self._lock_timeout.total_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with self._container() as request_container:
+                    uow = await request_container.get(UnitOfWork, component="database")
+                    job_repository = await request_container.get(JobRepository, component="jobs")
+                    async with uow:
+                        extended = await job_repository.extend_lease(job.id, job.attempts, self._lock_timeout)
+            except Exception:
+                # Временная ошибка: до истечения locked_until есть еще две попытки
+                logger.exception("job %s (%s): failed to extend the lease", job.id, job.task)
+                continue
+            if not extended:
+                logger.warning("job %s (%s) attempt %s lost its lease", job.id, job.task, job.attempts)
+                return
+
+    async def schedule_periodic(self):
+        """
+        Ставит периодические задания текущего интервала. Ключ идемпотентности -
+        номер интервала, поэтому воркеры, стартовавшие одновременно, не создают дублей.
+        """
+        now = time.time()
+        due: dict[str, tuple[str, int, float]] = {}
+        for task, handler in get_periodic_handlers(self._queues).items():
+            # get_periodic_handlers отдает только обработчики с every
+            every = cast(float, handler.every)
+            slot = int(now // every)
+            if self._periodic_slots.get(task) != slot:
+                due[task] = (handler.queue, slot, every)
+        if not due:
+            return
+
+        async with self._container() as request_container:
+            uow = await request_container.get(UnitOfWork, component="database")
+            job_queue = await request_container.get(JobQueue, component="jobs")
+            async with uow:
+                for task, (queue, slot, every) in due.items():
+                    await job_queue.enqueue(
+                        task,
+                        {},
+                        idempotency_key=f"{task}:{slot}",
+                        queue=queue,
+                        run_at=datetime.fromtimestamp(slot * every, timezone.utc),
+                        max_attempts=1,
+                    )
+        for task, (_, slot, _) in due.items():
+            self._periodic_slots[task] = slot
+
+    async def purge_if_due(self):
+        if time.monotonic() - self._last_purge < PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = time.monotonic()
+        async with self._container() as request_container:
+            uow = await request_container.get(UnitOfWork, component="database")
+            job_repository = await request_container.get(JobRepository, component="jobs")
+            async with uow:
+                deleted = await job_repository.delete_finished(datetime.now(timezone.utc) - self._retention)
+        if deleted:
+            logger.info("purged %s finished jobs", deleted)
+
+
+async def serve_metrics(port: int) -> asyncio.AbstractServer:
+    """Минимальный HTTP-сервер для Prometheus: воркер не поднимает FastAPI"""
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            body = registry.render().encode("utf-8")
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("ascii")
+                + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "0.0.0.0", port)
+
+
+async def main(args: argparse.Namespace):
+    from core.container import container
+
+    settings = Settings()
+    configure_tracing(settings)
+    worker = Worker(
+        container,
+        queues=args.queues.split(","),
+        concurrency=args.concurrency or settings.jobs_concurrency,
+        poll_interval=settings.jobs_poll_interval,
+        lock_timeout=timedelta(seconds=settings.jobs_lock_timeout),
+        retry_base=settings.jobs_retry_base_seconds,
+        retry_max=settings.jobs_retry_max_seconds,
+        retention=timedelta(days=settings.jobs_retention_days),
+    )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+
+    metrics_server = await serve_metrics(args.metrics_port) if args.metrics_port else None
+    try:
+        await worker.run()
+    finally:
+        if metrics_server:
+            metrics_server.close()
+        await container.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="CRM background job worker")
+    parser.add_argument("--queues", default="default", help="очереди через запятую")
+    parser.add_argument("--concurrency", type=int, help="по умолчанию JOBS_CONCURRENCY")
+    parser.add_argument("--metrics-port", type=int, help="отдавать метрики воркера на GET /metrics этого порта")
+    asyncio.run(main(parser.parse_args()))
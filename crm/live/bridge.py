@@ -0,0 +1,25 @@
+import json
+import logging
+from uuid import UUID
+
+from live.broker import LiveBroker
+
+
+logger = logging.getLogger("crm.live")
+
+
+class LiveBridge:
+    """
+    Обработчик канала crm_live: событие, закоммиченное в любом воркере uvicorn,
+    раздается подписчикам брокера этого воркера. Слушает PostgresListener.
+    """
+
+    def __init__(self, broker: LiveBroker):
+        self._broker = broker
+
+    def handle(self, payload: str):
+        try:
+            message = json.loads(payload)
+            self._broker.publish(UUID(message["organization_id"]), message["event"])
+        except (ValueError, KeyError):
+            logger.warning("malformed live notification: %.200s", payload)
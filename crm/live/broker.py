@@ -0,0 +1,52 @@
+import asyncio
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from uuid import UUID
+
+from core.metrics import live_subscribers
+
+
+logger = logging.getLogger("crm.live")
+
+# Сигнал подписчику: очередь переполнилась, поток нужно закрыть (клиент переподключится)
+OVERFLOW = None
+
+
+class LiveBroker:
+    """
+    In-process pub/sub событий по организациям.
+
+    У каждого подписчика своя ограниченная очередь: publish не ждет медленных
+    клиентов, а переполненная очередь закрывает их поток.
+    """
+
+    def __init__(self, queue_size: int):
+        self._queue_size = queue_size
+        self._subscribers: dict[UUID, set[asyncio.Queue]] = defaultdict(set)
+
+    def publish(self, organization_id: UUID, event: dict):
+        for queue in list(self._subscribers.get(organization_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.info("live subscriber of %s is too slow, dropping", organization_id)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(OVERFLOW)
+
+    @asynccontextmanager
+    async def subscribe(self, organization_id: UUID) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(self._queue_size)
+        self._subscribers[organization_id].add(queue)
+        live_subscribers.inc()
+        try:
+            yield queue
+        finally:
+            live_subscribers.dec()
+            subscribers = self._subscribers.get(organization_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[organization_id]
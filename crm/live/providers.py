@@ -0,0 +1,45 @@
+from typing import Annotated
+from dishka import Provider, Scope, provide, FromComponent
+
+from live.broker import LiveBroker
+from live.repositories import LiveNotificationRepository
+from live.services import LivePublisher
+from live.usecases import StreamActivitiesUseCase
+from core.database.unit_of_work import UnitOfWork
+from core.environment.config import Settings
+
+
+class LiveProvider(Provider):
+    scope = Scope.REQUEST
+    component = "live"
+
+    @provide(scope=Scope.APP)
+    def get_live_broker(
+        self, settings: Annotated[Settings, FromComponent("environment")]
+    ) -> LiveBroker:
+        return LiveBroker(settings.live_queue_size)
+
+    @provide
+    def get_live_notification_repository(
+        self, uow: Annotated[UnitOfWork, FromComponent("database")]
+    ) -> LiveNotificationRepository:
+        return LiveNotificationRepository(uow.session)
+
+    @provide
+    def get_live_publisher(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        broker: Annotated[LiveBroker, FromComponent("live")],
+        notification_repository: Annotated[LiveNotificationRepository, FromComponent("live")],
+        settings: Annotated[Settings, FromComponent("environment")],
+    ) -> LivePublisher:
+        return LivePublisher(uow, broker, notification_repository, settings.live_bridge_enabled)
+
+    @provide
+    def get_stream_activities_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        broker: Annotated[LiveBroker, FromComponent("live")],
+        settings: Annotated[Settings, FromComponent("environment")],
+    ) -> StreamActivitiesUseCase:
+        return StreamActivitiesUseCase(uow, broker, settings.live_heartbeat_seconds)
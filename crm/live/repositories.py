@@ -0,0 +1,20 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+
+from core.tracing import traced
+
+
+LIVE_CHANNEL = "crm_live"
+
+
+@traced
+class LiveNotificationRepository:
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def notify(self, payload: str):
+        """NOTIFY транзакционный: слушатели получат его только после commit"""
+        await self._session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": LIVE_CHANNEL, "payload": payload},
+        )
@@ -0,0 +1,43 @@
+import json
+from typing import Annotated, Optional
+from uuid import UUID
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from dishka.integrations.fastapi import inject
+from dishka import FromComponent
+
+from live.usecases import StreamActivitiesUseCase
+from auth.entities import AuthenticatedUser
+
+
+router = APIRouter(
+    prefix="/api/v1/live",
+    tags=["live"],
+)
+
+
+@router.get("/activities", response_class=StreamingResponse)
+@inject
+async def stream_activities(
+    user: Annotated[AuthenticatedUser, FromComponent("auth")],
+    stream_usecase: Annotated[StreamActivitiesUseCase, FromComponent("live")],
+    deal_id: Optional[UUID] = None,
+):
+    """
+    Server-Sent Events: активности сделок организации по мере их создания
+    
+    Событие `activity` с ActivityEntity в data; `: ping` - heartbeat. Поток закрывается,
+    если клиент не успевает читать, - EventSource переподключится сам.
+    """
+    async def events():
+        async for event in stream_usecase(user, deal_id):
+            if event is None:
+                yield ": ping\n\n"
+            else:
+                yield f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,56 @@
+import json
+from typing import Sequence
+from uuid import UUID
+
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
+from core.database.unit_of_work import UnitOfWork
+from live.broker import LiveBroker
+from live.repositories import LiveNotificationRepository
+
+
+# Лимит payload NOTIFY - 8000 байт; большие события уходят без вложенных данных
+MAX_NOTIFY_PAYLOAD = 7500
+
+
+class LivePublisher:
+    """
+    Публикация событий в live-поток организации после commit транзакции use case.
+
+    С мостом (несколько воркеров uvicorn) событие уходит через NOTIFY, и каждый
+    воркер раздает его своим подписчикам; без моста - сразу в брокер процесса
+    через хук commit unit of work. В обоих случаях откат транзакции событие отменяет.
+    """
+
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        broker: LiveBroker,
+        notification_repository: LiveNotificationRepository,
+        bridge_enabled: bool,
+    ):
+        self._uow = uow
+        self._broker = broker
+        self._notification_repository = notification_repository
+        self._bridge_enabled = bridge_enabled
+
+    async def publish(self, organization_id: UUID, event_type: str, items: Sequence[BaseModel]):
+        events = [{"type": event_type, "data": to_jsonable_python(item)} for item in items]
+        if not events:
+            return
+
+        if not self._bridge_enabled:
+            def deliver():
+                for event in events:
+                    self._broker.publish(organization_id, event)
+
+            self._uow.on_commit(deliver)
+            return
+
+        for event in events:
+            payload = json.dumps({"organization_id": str(organization_id), "event": event})
+            if len(payload.encode("utf-8")) > MAX_NOTIFY_PAYLOAD:
+                event = {**event, "data": {"id": event["data"].get("id")}, "truncated": True}
+                payload = json.dumps({"organization_id": str(organization_id), "event": event})
+            await self._notification_repository.notify(payload)
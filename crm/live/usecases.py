@@ -0,0 +1,40 @@
+import asyncio
+from typing import AsyncIterator, Optional
+from uuid import UUID
+
+from core.database.unit_of_work import UnitOfWork
+from core.metrics import instrumented
+from live.broker import LiveBroker, OVERFLOW
+from auth.entities import AuthenticatedUser
+
+
+@instrumented
+class StreamActivitiesUseCase:
+    """
+    Поток событий организации для SSE. Пустой элемент (None) - сигнал отправить
+    heartbeat, чтобы прокси не закрыли простаивающее соединение.
+    """
+
+    def __init__(self, uow: UnitOfWork, broker: LiveBroker, heartbeat_seconds: float):
+        self._uow = uow
+        self._broker = broker
+        self._heartbeat_seconds = heartbeat_seconds
+
+    async def __call__(
+        self, user: AuthenticatedUser, deal_id: Optional[UUID] = None
+    ) -> AsyncIterator[Optional[dict]]:
+        # Соединение, взятое для аутентификации, возвращаем в пул: поток живет часами
+        await self._uow.rollback()
+
+        async with self._broker.subscribe(user.organization_id) as queue:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), self._heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event is OVERFLOW:
+                    return
+                if deal_id is not None and event["data"].get("deal_id") != str(deal_id):
+                    continue
+                yield event
@@ -1,9 +1,12 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError, HTTPException
 from fastapi.openapi.utils import get_openapi
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from dishka.integrations.fastapi import setup_dishka
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 from core.container import container
 from core.exception_handler import (
@@ -13,6 +16,17 @@ from core.exception_handler import (
     custom_exception_handler,
 )
 from core.exceptions import BaseCustomException
+from core.responses import PydanticJSONResponse
+from core.database.instrumentation import QueryStatsMiddleware
+from core.metrics import MetricsMiddleware
+from core.metrics.router import router as metrics_router
+from core.tracing import TracingMiddleware, configure_tracing
+from core.environment.config import Settings
+from core.database.listener import PostgresListener
+from core.cache import CACHE_CHANNEL, InvalidationBus
+from live.broker import LiveBroker
+from live.bridge import LiveBridge
+from live.repositories import LIVE_CHANNEL
 
 from auth.router import router as auth_router
 from users.router import router as users_router
@@ -22,6 +36,28 @@ from deals.router import router as deals_router
 from tasks.router import router as tasks_router
 from activities.router import router as activities_router
 from analytics.router import router as analytics_router
+from changes.router import router as changes_router
+from webhooks.router import router as webhooks_router
+from live.router import router as live_router
+from bi.router import router as bi_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # LISTEN/NOTIFY связывает воркеры uvicorn: live-события и инвалидация кешей
+    settings = Settings()
+    listener = PostgresListener(await container.get(AsyncEngine, component="database"))
+    if settings.live_bridge_enabled:
+        listener.subscribe(LIVE_CHANNEL, LiveBridge(await container.get(LiveBroker, component="live")).handle)
+    if settings.cache_bus_enabled:
+        bus = await container.get(InvalidationBus, component="cache")
+        listener.subscribe(CACHE_CHANNEL, bus.handle)
+        # Инвалидации, пропущенные пока соединения не было, не восстановить
+        listener.on_connect(bus.clear)
+    await listener.start()
+    yield
+    await listener.stop()
+    await container.close()
 
 
 app = FastAPI(
@@ -30,7 +66,9 @@ app = FastAPI(
     version="1.3.3.7",
     swagger_ui_parameters={
         "persistAuthorization": True,
-    }
+    },
+    default_response_class=PydanticJSONResponse,
+    lifespan=lifespan,
 )
 
 
@@ -87,16 +125,24 @@ def custom_openapi():
 
 app.openapi = custom_openapi
 
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "Server-Timing"],
 )
 
 setup_dishka(container, app)
 
+# Последний добавленный middleware - внешний: server-спан охватывает и request scope dishka
+configure_tracing(Settings())
+app.add_middleware(TracingMiddleware)
+
 app.include_router(auth_router)
 app.include_router(users_router)
 app.include_router(organizations_router)
@@ -105,6 +151,11 @@ app.include_router(deals_router)
 app.include_router(tasks_router)
 app.include_router(activities_router)
 app.include_router(analytics_router)
+app.include_router(changes_router)
+app.include_router(webhooks_router)
+app.include_router(live_router)
+app.include_router(bi_router)
+app.include_router(metrics_router)
 
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(HTTPException, http_exception_handler)
@@ -12,6 +12,12 @@ from contacts.models import *
 from deals.models import *
 from tasks.models import *
 from activities.models import *
+from jobs.models import *
+from changes.models import *
+from webhooks.models import *
+from analytics.models import *
+from fx.models import *
+from bi.models import *
 
 config = context.config
 settings = Settings()
@@ -0,0 +1,24 @@
+"""add deal version
+
+Revision ID: 4f1c2a9b7d3e
+Revises: cd9d6935887a
+Create Date: 2026-10-19 12:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f1c2a9b7d3e'
+down_revision = 'cd9d6935887a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('deals', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    op.drop_column('deals', 'version')
@@ -0,0 +1,30 @@
+"""add contact updated_at and list fingerprint indexes
+
+Revision ID: 8a3e5d1f6b20
+Revises: 4f1c2a9b7d3e
+Create Date: 2026-10-19 13:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a3e5d1f6b20'
+down_revision = '4f1c2a9b7d3e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('contacts', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute('UPDATE contacts SET updated_at = created_at')
+    op.alter_column('contacts', 'updated_at', nullable=False)
+    op.create_index('ix_contacts_organization_id_updated_at', 'contacts', ['organization_id', 'updated_at'], unique=False)
+    op.create_index('ix_deals_organization_id_updated_at', 'deals', ['organization_id', 'updated_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_deals_organization_id_updated_at', table_name='deals')
+    op.drop_index('ix_contacts_organization_id_updated_at', table_name='contacts')
+    op.drop_column('contacts', 'updated_at')
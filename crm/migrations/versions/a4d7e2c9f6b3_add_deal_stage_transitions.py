@@ -0,0 +1,66 @@
+"""add deals.stage_entered_at and deal_stage_transitions_daily
+
+Revision ID: a4d7e2c9f6b3
+Revises: f3c6a9d2b4e1
+Create Date: 2026-10-19 22:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4d7e2c9f6b3'
+down_revision = 'f3c6a9d2b4e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('deals', sa.Column('stage_entered_at', sa.DateTime(timezone=True), nullable=True))
+    # Вход на текущий этап - последняя смена этапа из таймлайна, без нее - создание сделки
+    op.execute("""
+        UPDATE deals SET stage_entered_at = coalesce(
+            (SELECT max(activities.created_at) FROM activities
+             WHERE activities.deal_id = deals.id AND activities.type = 'STAGE_CHANGED'),
+            deals.created_at
+        )
+    """)
+    op.alter_column('deals', 'stage_entered_at', nullable=False)
+    op.create_table('deal_stage_transitions_daily',
+    sa.Column('organization_id', sa.Uuid(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('from_stage', postgresql.ENUM('QUALIFICATION', 'PROPOSAL', 'NEGOTIATION', 'CLOSED', name='dealstage', create_type=False), nullable=False),
+    sa.Column('to_stage', postgresql.ENUM('QUALIFICATION', 'PROPOSAL', 'NEGOTIATION', 'CLOSED', name='dealstage', create_type=False), nullable=False),
+    sa.Column('transition_count', sa.Integer(), nullable=False),
+    sa.Column('duration_seconds', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('organization_id', 'day', 'from_stage', 'to_stage')
+    )
+    op.execute("""
+        INSERT INTO deal_stage_transitions_daily (
+            organization_id, day, from_stage, to_stage, transition_count, duration_seconds
+        )
+        SELECT organization_id, day, from_stage, to_stage, count(*), sum(extract(epoch FROM left_at - entered_at))
+        FROM (
+            SELECT deals.organization_id,
+                   (activities.created_at AT TIME ZONE 'UTC')::date AS day,
+                   upper(activities.payload ->> 'old_stage')::dealstage AS from_stage,
+                   upper(activities.payload ->> 'new_stage')::dealstage AS to_stage,
+                   activities.created_at AS left_at,
+                   coalesce(
+                       lag(activities.created_at) OVER (PARTITION BY activities.deal_id ORDER BY activities.created_at),
+                       deals.created_at
+                   ) AS entered_at
+            FROM activities
+            JOIN deals ON deals.id = activities.deal_id
+            WHERE activities.type = 'STAGE_CHANGED'
+        ) AS transitions
+        GROUP BY organization_id, day, from_stage, to_stage
+    """)
+
+
+def downgrade():
+    op.drop_table('deal_stage_transitions_daily')
+    op.drop_column('deals', 'stage_entered_at')
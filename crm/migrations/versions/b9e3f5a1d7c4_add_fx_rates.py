@@ -0,0 +1,93 @@
+"""add fx_rates and deals.amount_base, normalize analytics amounts
+
+Revision ID: b9e3f5a1d7c4
+Revises: a4d7e2c9f6b3
+Create Date: 2026-10-19 23:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9e3f5a1d7c4'
+down_revision = 'a4d7e2c9f6b3'
+branch_labels = None
+depends_on = None
+
+
+REBUILD_STATS_SQL = """
+    DELETE FROM deal_stats_daily;
+    INSERT INTO deal_stats_daily (
+        organization_id, day, created_count, created_amount, won_count, won_amount, lost_count, lost_amount
+    )
+    SELECT organization_id, day, sum(created_count), sum(created_amount),
+           sum(won_count), sum(won_amount), sum(lost_count), sum(lost_amount)
+    FROM (
+        SELECT organization_id, (created_at AT TIME ZONE 'UTC')::date AS day,
+               1 AS created_count, {amount} AS created_amount,
+               0 AS won_count, 0 AS won_amount, 0 AS lost_count, 0 AS lost_amount
+        FROM deals
+        UNION ALL
+        SELECT organization_id, (closed_at AT TIME ZONE 'UTC')::date,
+               0, 0,
+               (status = 'WON')::int, CASE WHEN status = 'WON' THEN {amount} ELSE 0 END,
+               (status = 'LOST')::int, CASE WHEN status = 'LOST' THEN {amount} ELSE 0 END
+        FROM deals
+        WHERE status IN ('WON', 'LOST') AND closed_at IS NOT NULL
+    ) AS contributions
+    GROUP BY organization_id, day
+"""
+
+CREATE_VIEWS_SQL = """
+    CREATE MATERIALIZED VIEW deal_owner_stats AS
+    SELECT organization_id, owner_id,
+           count(*) FILTER (WHERE status IN ('NEW', 'IN_PROGRESS'))::int AS pipeline_count,
+           coalesce(sum({amount}) FILTER (WHERE status IN ('NEW', 'IN_PROGRESS')), 0) AS pipeline_amount,
+           count(*) FILTER (WHERE status = 'WON')::int AS won_count,
+           coalesce(sum({amount}) FILTER (WHERE status = 'WON'), 0) AS won_amount,
+           count(*) FILTER (WHERE status = 'LOST')::int AS lost_count,
+           coalesce(sum({amount}) FILTER (WHERE status = 'LOST'), 0) AS lost_amount
+    FROM deals
+    GROUP BY organization_id, owner_id;
+    CREATE UNIQUE INDEX ux_deal_owner_stats ON deal_owner_stats (organization_id, owner_id);
+    CREATE MATERIALIZED VIEW deal_pipeline_stats AS
+    SELECT organization_id, stage, owner_id, count(*)::int AS deal_count, coalesce(sum({amount}), 0) AS amount
+    FROM deals
+    WHERE status IN ('NEW', 'IN_PROGRESS')
+    GROUP BY organization_id, stage, owner_id;
+    CREATE UNIQUE INDEX ux_deal_pipeline_stats ON deal_pipeline_stats (organization_id, stage, owner_id);
+    UPDATE analytics_refreshes SET refreshed_at = clock_timestamp(),
+           last_change_id = (SELECT coalesce(max(id), 0) FROM change_events),
+           snapshot_xmin = txid_snapshot_xmin(txid_current_snapshot())
+    WHERE name = 'deal_views';
+"""
+
+
+def upgrade():
+    op.create_table('fx_rates',
+    sa.Column('currency', sa.String(length=10), nullable=False),
+    sa.Column('rate', sa.Numeric(precision=18, scale=8), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('currency')
+    )
+    # Базовая валюта; курсы остальных загружает python -m fx.load
+    op.execute("INSERT INTO fx_rates (currency, rate, updated_at) VALUES ('USD', 1, now())")
+    op.add_column('deals', sa.Column('amount_base', sa.Numeric(precision=18, scale=2), nullable=True))
+    op.execute("""
+        UPDATE deals SET amount_base = round(deals.amount * fx_rates.rate, 2)
+        FROM fx_rates WHERE fx_rates.currency = upper(trim(deals.currency))
+    """)
+    op.execute(REBUILD_STATS_SQL.format(amount="coalesce(amount_base, 0)"))
+    op.execute("DROP MATERIALIZED VIEW deal_pipeline_stats")
+    op.execute("DROP MATERIALIZED VIEW deal_owner_stats")
+    op.execute(CREATE_VIEWS_SQL.format(amount="amount_base"))
+
+
+def downgrade():
+    op.execute("DROP MATERIALIZED VIEW deal_pipeline_stats")
+    op.execute("DROP MATERIALIZED VIEW deal_owner_stats")
+    op.execute(CREATE_VIEWS_SQL.format(amount="amount"))
+    op.execute(REBUILD_STATS_SQL.format(amount="amount"))
+    op.drop_column('deals', 'amount_base')
+    op.drop_table('fx_rates')
@@ -0,0 +1,50 @@
+"""add bi_exports, bi_export_states and tasks.updated_at
+
+Revision ID: c2f7a9e4b1d8
+Revises: b9e3f5a1d7c4
+Create Date: 2026-10-20 00:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2f7a9e4b1d8'
+down_revision = 'b9e3f5a1d7c4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('tasks', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE tasks SET updated_at = created_at")
+    op.alter_column('tasks', 'updated_at', nullable=False)
+    op.create_index('ix_tasks_updated_at', 'tasks', ['updated_at'], unique=False)
+    op.create_index('ix_activities_created_at', 'activities', ['created_at'], unique=False)
+    op.create_table('bi_export_states',
+    sa.Column('organization_id', sa.Uuid(), nullable=False),
+    sa.Column('watermark', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_sequence', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('organization_id')
+    )
+    op.create_table('bi_exports',
+    sa.Column('organization_id', sa.Uuid(), nullable=False),
+    sa.Column('sequence', sa.Integer(), nullable=False),
+    sa.Column('watermark_from', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('watermark_to', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('row_counts', sa.JSON(), nullable=False),
+    sa.Column('size_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('organization_id', 'sequence')
+    )
+
+
+def downgrade():
+    op.drop_table('bi_exports')
+    op.drop_table('bi_export_states')
+    op.drop_index('ix_activities_created_at', table_name='activities')
+    op.drop_index('ix_tasks_updated_at', table_name='tasks')
+    op.drop_column('tasks', 'updated_at')
@@ -0,0 +1,40 @@
+"""add change_events outbox
+
+Revision ID: c3f8a1d6e2b4
+Revises: b7d2e4c91a05
+Create Date: 2026-10-19 16:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f8a1d6e2b4'
+down_revision = 'b7d2e4c91a05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('change_events',
+    sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+    sa.Column('txid', sa.BigInteger(), server_default=sa.text('txid_current()'), nullable=False),
+    sa.Column('organization_id', sa.Uuid(), nullable=False),
+    sa.Column('entity_type', sa.Enum('DEAL', 'CONTACT', 'TASK', 'ORGANIZATION_MEMBER', name='changeentitytype'), nullable=False),
+    sa.Column('entity_id', sa.Uuid(), nullable=False),
+    sa.Column('operation', sa.Enum('CREATED', 'UPDATED', 'DELETED', name='changeoperation'), nullable=False),
+    sa.Column('data', sa.JSON(), nullable=True),
+    sa.Column('actor_id', sa.Uuid(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_change_events_organization_id_txid_id', 'change_events', ['organization_id', 'txid', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_change_events_organization_id_txid_id', table_name='change_events')
+    op.drop_table('change_events')
+    sa.Enum(name='changeoperation').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='changeentitytype').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,48 @@
+"""add webhook subscriptions and events
+
+Revision ID: d5a9c7e3f1b8
+Revises: c3f8a1d6e2b4
+Create Date: 2026-10-19 17:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a9c7e3f1b8'
+down_revision = 'c3f8a1d6e2b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('webhook_subscriptions',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('organization_id', sa.Uuid(), nullable=False),
+    sa.Column('url', sa.String(length=2048), nullable=False),
+    sa.Column('secret', sa.String(length=128), nullable=False),
+    sa.Column('event_types', sa.JSON(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_webhook_subscriptions_organization_id'), 'webhook_subscriptions', ['organization_id'], unique=False)
+    op.create_table('webhook_events',
+    sa.Column('id', sa.BigInteger(), sa.Identity(always=False), nullable=False),
+    sa.Column('subscription_id', sa.Uuid(), nullable=False),
+    sa.Column('event_type', sa.String(length=64), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['subscription_id'], ['webhook_subscriptions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_webhook_events_subscription_id_id', 'webhook_events', ['subscription_id', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_webhook_events_subscription_id_id', table_name='webhook_events')
+    op.drop_table('webhook_events')
+    op.drop_index(op.f('ix_webhook_subscriptions_organization_id'), table_name='webhook_subscriptions')
+    op.drop_table('webhook_subscriptions')
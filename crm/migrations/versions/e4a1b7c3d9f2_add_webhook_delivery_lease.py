@@ -0,0 +1,26 @@
+"""add webhook_subscriptions.delivery_leased_until
+
+Revision ID: e4a1b7c3d9f2
+Revises: c2f7a9e4b1d8
+Create Date: 2026-10-20 01:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a1b7c3d9f2'
+down_revision = 'c2f7a9e4b1d8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'webhook_subscriptions', sa.Column('delivery_leased_until', sa.DateTime(timezone=True), nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_column('webhook_subscriptions', 'delivery_leased_until')
@@ -0,0 +1,67 @@
+"""add deals.closed_at and deal_stats_daily rollup
+
+Revision ID: e8b1f4a7c2d9
+Revises: d5a9c7e3f1b8
+Create Date: 2026-10-19 19:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b1f4a7c2d9'
+down_revision = 'd5a9c7e3f1b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('deals', sa.Column('closed_at', sa.DateTime(timezone=True), nullable=True))
+    # Момент закрытия - последняя смена статуса из таймлайна, без нее - последнее изменение сделки
+    op.execute("""
+        UPDATE deals SET closed_at = coalesce(
+            (SELECT max(activities.created_at) FROM activities
+             WHERE activities.deal_id = deals.id AND activities.type = 'STATUS_CHANGED'),
+            deals.updated_at
+        )
+        WHERE deals.status IN ('WON', 'LOST')
+    """)
+    op.create_table('deal_stats_daily',
+    sa.Column('organization_id', sa.Uuid(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('created_count', sa.Integer(), nullable=False),
+    sa.Column('created_amount', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('won_count', sa.Integer(), nullable=False),
+    sa.Column('won_amount', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('lost_count', sa.Integer(), nullable=False),
+    sa.Column('lost_amount', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('organization_id', 'day')
+    )
+    op.execute("""
+        INSERT INTO deal_stats_daily (
+            organization_id, day, created_count, created_amount, won_count, won_amount, lost_count, lost_amount
+        )
+        SELECT organization_id, day, sum(created_count), sum(created_amount),
+               sum(won_count), sum(won_amount), sum(lost_count), sum(lost_amount)
+        FROM (
+            SELECT organization_id, (created_at AT TIME ZONE 'UTC')::date AS day,
+                   1 AS created_count, amount AS created_amount,
+                   0 AS won_count, 0 AS won_amount, 0 AS lost_count, 0 AS lost_amount
+            FROM deals
+            UNION ALL
+            SELECT organization_id, (closed_at AT TIME ZONE 'UTC')::date,
+                   0, 0,
+                   (status = 'WON')::int, CASE WHEN status = 'WON' THEN amount ELSE 0 END,
+                   (status = 'LOST')::int, CASE WHEN status = 'LOST' THEN amount ELSE 0 END
+            FROM deals
+            WHERE status IN ('WON', 'LOST') AND closed_at IS NOT NULL
+        ) AS contributions
+        GROUP BY organization_id, day
+    """)
+
+
+def downgrade():
+    op.drop_table('deal_stats_daily')
+    op.drop_column('deals', 'closed_at')
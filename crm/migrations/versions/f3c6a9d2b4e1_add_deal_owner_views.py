@@ -0,0 +1,61 @@
+"""add deal_owner_stats and deal_pipeline_stats materialized views
+
+Revision ID: f3c6a9d2b4e1
+Revises: e8b1f4a7c2d9
+Create Date: 2026-10-19 21:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c6a9d2b4e1'
+down_revision = 'e8b1f4a7c2d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('analytics_refreshes',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_change_id', sa.BigInteger(), nullable=False),
+    sa.Column('snapshot_xmin', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("""
+        CREATE MATERIALIZED VIEW deal_owner_stats AS
+        SELECT organization_id, owner_id,
+               count(*) FILTER (WHERE status IN ('NEW', 'IN_PROGRESS'))::int AS pipeline_count,
+               coalesce(sum(amount) FILTER (WHERE status IN ('NEW', 'IN_PROGRESS')), 0) AS pipeline_amount,
+               count(*) FILTER (WHERE status = 'WON')::int AS won_count,
+               coalesce(sum(amount) FILTER (WHERE status = 'WON'), 0) AS won_amount,
+               count(*) FILTER (WHERE status = 'LOST')::int AS lost_count,
+               coalesce(sum(amount) FILTER (WHERE status = 'LOST'), 0) AS lost_amount
+        FROM deals
+        GROUP BY organization_id, owner_id
+    """)
+    # Уникальный индекс обязателен для REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("CREATE UNIQUE INDEX ux_deal_owner_stats ON deal_owner_stats (organization_id, owner_id)")
+    op.execute("""
+        CREATE MATERIALIZED VIEW deal_pipeline_stats AS
+        SELECT organization_id, stage, owner_id, count(*)::int AS deal_count, sum(amount) AS amount
+        FROM deals
+        WHERE status IN ('NEW', 'IN_PROGRESS')
+        GROUP BY organization_id, stage, owner_id
+    """)
+    op.execute(
+        "CREATE UNIQUE INDEX ux_deal_pipeline_stats ON deal_pipeline_stats (organization_id, stage, owner_id)"
+    )
+    op.execute("""
+        INSERT INTO analytics_refreshes (name, refreshed_at, last_change_id, snapshot_xmin)
+        SELECT 'deal_views', clock_timestamp(), coalesce(max(id), 0), txid_snapshot_xmin(txid_current_snapshot())
+        FROM change_events
+    """)
+
+
+def downgrade():
+    op.execute("DROP MATERIALIZED VIEW deal_pipeline_stats")
+    op.execute("DROP MATERIALIZED VIEW deal_owner_stats")
+    op.drop_table('analytics_refreshes')
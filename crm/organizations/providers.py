@@ -10,7 +10,9 @@ from organizations.usecases import (
     UpdateMemberRoleUseCase,
     RemoveOrganizationMemberUseCase,
 )
+from changes.services import ChangeLog
 from core.database.unit_of_work import UnitOfWork
+from core.cache import SingleFlight
 
 
 class OrganizationProvider(Provider):
@@ -36,8 +38,9 @@ class OrganizationProvider(Provider):
         self,
         uow: Annotated[UnitOfWork, FromComponent("database")],
         organization_repository: Annotated[OrganizationRepository, FromComponent("organizations")],
+        single_flight: Annotated[SingleFlight, FromComponent("cache")],
     ) -> GetOrganizationMembersUseCase:
-        return GetOrganizationMembersUseCase(uow, organization_repository)
+        return GetOrganizationMembersUseCase(uow, organization_repository, single_flight)
 
     @provide
     def add_organization_member_usecase(
@@ -45,22 +48,25 @@ class OrganizationProvider(Provider):
         uow: Annotated[UnitOfWork, FromComponent("database")],
         organization_repository: Annotated[OrganizationRepository, FromComponent("organizations")],
         user_repository: Annotated[UserRepository, FromComponent("users")],
+        change_log: Annotated[ChangeLog, FromComponent("changes")],
     ) -> AddOrganizationMemberUseCase:
-        return AddOrganizationMemberUseCase(uow, organization_repository, user_repository)
+        return AddOrganizationMemberUseCase(uow, organization_repository, user_repository, change_log)
 
     @provide
     def update_member_role_usecase(
         self,
         uow: Annotated[UnitOfWork, FromComponent("database")],
         organization_repository: Annotated[OrganizationRepository, FromComponent("organizations")],
+        change_log: Annotated[ChangeLog, FromComponent("changes")],
     ) -> UpdateMemberRoleUseCase:
-        return UpdateMemberRoleUseCase(uow, organization_repository)
+        return UpdateMemberRoleUseCase(uow, organization_repository, change_log)
 
     @provide
     def remove_organization_member_usecase(
         self,
         uow: Annotated[UnitOfWork, FromComponent("database")],
         organization_repository: Annotated[OrganizationRepository, FromComponent("organizations")],
+        change_log: Annotated[ChangeLog, FromComponent("changes")],
     ) -> RemoveOrganizationMemberUseCase:
-        return RemoveOrganizationMemberUseCase(uow, organization_repository)
+        return RemoveOrganizationMemberUseCase(uow, organization_repository, change_log)
 
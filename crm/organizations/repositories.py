@@ -1,14 +1,16 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import CursorResult, select, delete
 from uuid import UUID
-from typing import Optional
+from typing import Optional, cast
 
 from organizations.models import Organization
 from organizations.entities import OrganizationEntity, OrganizationWithRoleEntity, OrganizationMemberEntity
 from users.models import OrganizationMember, User
 from users.enums import UserRole
+from core.tracing import traced
 
 
+@traced
 class OrganizationRepository:
     def __init__(self, session: AsyncSession):
         self._session = session
@@ -21,6 +23,10 @@ class OrganizationRepository:
             return OrganizationEntity.model_validate(org)
         return None
 
+    async def list_ids(self) -> list[UUID]:
+        result = await self._session.scalars(select(Organization.id).order_by(Organization.id))
+        return list(result.all())
+
     async def create(self, org_data: dict) -> OrganizationEntity:
         org = Organization(**org_data)
         self._session.add(org)
@@ -101,10 +107,11 @@ class OrganizationRepository:
             member.role = role
             await self._session.flush()
 
-    async def remove_member(self, organization_id: UUID, user_id: UUID):
+    async def remove_member(self, organization_id: UUID, user_id: UUID) -> bool:
         query = delete(OrganizationMember).where(
             OrganizationMember.organization_id == organization_id,
             OrganizationMember.user_id == user_id
         )
-        await self._session.execute(query)
+        result = cast(CursorResult, await self._session.execute(query))
+        return result.rowcount > 0
 
@@ -19,6 +19,7 @@ from organizations.usecases import (
     RemoveOrganizationMemberUseCase,
 )
 from auth.entities import AuthenticatedUser
+from core.responses import PydanticJSONResponse
 
 
 router = APIRouter(
@@ -35,7 +36,7 @@ async def get_my_organizations(
 ):
     """Получить список организаций, в которых состоит текущий пользователь"""
     orgs = await get_orgs_usecase(user.id)
-    return OrganizationsListResponse(data=orgs)
+    return PydanticJSONResponse(OrganizationsListResponse(data=orgs))
 
 
 @router.get("/members", response_model=MembersListResponse)
@@ -46,7 +47,7 @@ async def get_organization_members(
 ):
     """Получить список участников текущей организации"""
     members = await get_members_usecase(user)
-    return MembersListResponse(data=members)
+    return PydanticJSONResponse(MembersListResponse(data=members))
 
 
 @router.post("/members", response_model=MemberResponse, status_code=status.HTTP_201_CREATED)
@@ -62,7 +63,7 @@ async def add_organization_member(
     Пользователь должен быть уже зарегистрирован в системе.
     """
     member = await add_member_usecase(user, request.email, request.role)
-    return MemberResponse(data=member)
+    return PydanticJSONResponse(MemberResponse(data=member), status_code=status.HTTP_201_CREATED)
 
 
 @router.patch("/members/{user_id}", response_model=MemberResponse)
@@ -79,7 +80,7 @@ async def update_member_role(
     Нельзя изменить роль последнего owner.
     """
     member = await update_role_usecase(user, user_id, request.role)
-    return MemberResponse(data=member)
+    return PydanticJSONResponse(MemberResponse(data=member))
 
 
 @router.delete("/members/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
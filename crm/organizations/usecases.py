@@ -1,8 +1,12 @@
 from uuid import UUID
 
+from core.cache import SingleFlight, cache_tag
 from core.database.unit_of_work import UnitOfWork
+from core.metrics import instrumented
 from organizations.repositories import OrganizationRepository
 from users.repositories import UserRepository
+from changes.services import ChangeLog
+from changes.enums import ChangeEntityType, ChangeOperation
 from organizations.entities import OrganizationEntity, OrganizationWithRoleEntity, OrganizationMemberEntity
 from organizations.exceptions import (
     OrganizationNotFoundError,
@@ -16,6 +20,7 @@ from users.enums import UserRole
 from auth.entities import AuthenticatedUser
 
 
+@instrumented
 class GetUserOrganizationsUseCase:
     def __init__(
         self,
@@ -30,34 +35,48 @@ class GetUserOrganizationsUseCase:
             return await self._organization_repository.get_user_organizations(user_id)
 
 
+@instrumented
 class GetOrganizationMembersUseCase:
     def __init__(
         self,
         uow: UnitOfWork,
         organization_repository: OrganizationRepository,
+        single_flight: SingleFlight,
     ):
         self._uow = uow
         self._organization_repository = organization_repository
+        self._single_flight = single_flight
 
     async def __call__(self, user: AuthenticatedUser) -> list[OrganizationMemberEntity]:
+        return await self._single_flight.do(
+            "organization_members",
+            (user.organization_id,),
+            lambda: self._load(user.organization_id),
+            [cache_tag(user.organization_id, ChangeEntityType.ORGANIZATION_MEMBER.value)],
+        )
+
+    async def _load(self, organization_id: UUID) -> list[OrganizationMemberEntity]:
         async with self._uow:
-            org = await self._organization_repository.get_by_id(user.organization_id)
+            org = await self._organization_repository.get_by_id(organization_id)
             if not org:
                 raise OrganizationNotFoundError()
             
-            return await self._organization_repository.get_members(user.organization_id)
+            return await self._organization_repository.get_members(organization_id)
 
 
+@instrumented
 class AddOrganizationMemberUseCase:
     def __init__(
         self,
         uow: UnitOfWork,
         organization_repository: OrganizationRepository,
         user_repository: UserRepository,
+        change_log: ChangeLog,
     ):
         self._uow = uow
         self._organization_repository = organization_repository
         self._user_repository = user_repository
+        self._change_log = change_log
 
     async def __call__(
         self, 
@@ -98,17 +117,28 @@ class AddOrganizationMemberUseCase:
             if not added_member:
                 raise MemberNotFoundError()
             
+            await self._change_log.record(
+                current_user.organization_id,
+                ChangeEntityType.ORGANIZATION_MEMBER,
+                user.id,
+                ChangeOperation.CREATED,
+                added_member,
+                current_user.id,
+            )
             return added_member
 
 
+@instrumented
 class UpdateMemberRoleUseCase:
     def __init__(
         self,
         uow: UnitOfWork,
         organization_repository: OrganizationRepository,
+        change_log: ChangeLog,
     ):
         self._uow = uow
         self._organization_repository = organization_repository
+        self._change_log = change_log
 
     async def __call__(
         self,
@@ -146,17 +176,28 @@ class UpdateMemberRoleUseCase:
             if not updated_member:
                 raise MemberNotFoundError()
             
+            await self._change_log.record(
+                current_user.organization_id,
+                ChangeEntityType.ORGANIZATION_MEMBER,
+                member_user_id,
+                ChangeOperation.UPDATED,
+                updated_member,
+                current_user.id,
+            )
             return updated_member
 
 
+@instrumented
 class RemoveOrganizationMemberUseCase:
     def __init__(
         self,
         uow: UnitOfWork,
         organization_repository: OrganizationRepository,
+        change_log: ChangeLog,
     ):
         self._uow = uow
         self._organization_repository = organization_repository
+        self._change_log = change_log
 
     async def __call__(
         self,
@@ -182,8 +223,16 @@ class RemoveOrganizationMemberUseCase:
                 if owner_count <= 1:
                     raise CannotRemoveLastOwnerError()
 
-            # Удаляем участника
-            await self._organization_repository.remove_member(
+            # Удаляем участника; если его уже удалил параллельный запрос, событие записал он
+            removed = await self._organization_repository.remove_member(
                 current_user.organization_id, member_user_id
             )
+            if removed:
+                await self._change_log.record(
+                    current_user.organization_id,
+                    ChangeEntityType.ORGANIZATION_MEMBER,
+                    member_user_id,
+                    ChangeOperation.DELETED,
+                    actor_id=current_user.id,
+                )
 
@@ -20,11 +20,20 @@ if [ "$ENTRYPOINT_BACKEND" = 'true' ]; then
         uvicorn main:app --host 0.0.0.0 --port 8000 --reload --proxy-headers
     else
         echo "Production mode - starting with 4 workers"
+        # Снимки метрик воркеров для /metrics: каталог общий, очищаем при старте
+        export METRICS_MULTIPROC_DIR="${METRICS_MULTIPROC_DIR:-/tmp/crm_metrics}"
+        rm -rf "$METRICS_MULTIPROC_DIR" && mkdir -p "$METRICS_MULTIPROC_DIR"
+        # Live-события и инвалидация кешей должны доходить до всех воркеров
+        export LIVE_BRIDGE_ENABLED="${LIVE_BRIDGE_ENABLED:-true}"
+        export CACHE_BUS_ENABLED="${CACHE_BUS_ENABLED:-true}"
         uvicorn main:app --host 0.0.0.0 --port 8000 --workers 4 --proxy-headers
     fi
+elif [ "$ENTRYPOINT_WORKER" = 'true' ]; then
+    echo "Starting job worker..."
+    python -m jobs.worker --queues "${JOBS_QUEUES:-default}"
 else
     echo "No valid service specified. Check environment variables."
-    echo "Available options: ENTRYPOINT_BACKEND"
+    echo "Available options: ENTRYPOINT_BACKEND, ENTRYPOINT_WORKER"
     exit 1
 fi
 
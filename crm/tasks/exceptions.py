@@ -1,4 +1,9 @@
-from core.exceptions import NotFoundException, ForbiddenException, BadRequestException
+from core.exceptions import (
+    NotFoundException,
+    ForbiddenException,
+    BadRequestException,
+    ConflictException,
+)
 
 
 class TaskNotFoundError(NotFoundException):
@@ -15,3 +20,8 @@ class InvalidDueDateError(BadRequestException):
     def __init__(self, message: str = "error.task.invalid_due_date"):
         super().__init__(message)
 
+
+
+class TaskConcurrentUpdateError(ConflictException):
+    def __init__(self, message: str = "error.task.concurrent_update"):
+        super().__init__(message)
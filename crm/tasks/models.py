@@ -2,7 +2,7 @@ from datetime import datetime, date
 from uuid import UUID, uuid4
 from typing import Optional
 
-from sqlalchemy import String, DateTime, ForeignKey, func, Boolean, Date, Text
+from sqlalchemy import String, DateTime, ForeignKey, func, Boolean, Date, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from core.database.database import BaseModel
@@ -20,6 +20,14 @@ class Task(BaseModel):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, default=func.now()
     )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (
+        # Инкрементальные выгрузки BI читают задачи, измененные после watermark
+        Index("ix_tasks_updated_at", "updated_at"),
+    )
 
     deal: Mapped["Deal"] = relationship(back_populates="tasks")
 
@@ -11,6 +11,8 @@ from tasks.usecases import (
     DeleteTaskUseCase,
     ListTasksUseCase,
 )
+from changes.services import ChangeLog
+from live.services import LivePublisher
 from core.database.unit_of_work import UnitOfWork
 
 
@@ -31,8 +33,12 @@ class TaskProvider(Provider):
         task_repository: Annotated[TaskRepository, FromComponent("tasks")],
         deal_repository: Annotated[DealRepository, FromComponent("deals")],
         activity_repository: Annotated[ActivityRepository, FromComponent("activities")],
+        change_log: Annotated[ChangeLog, FromComponent("changes")],
+        live_publisher: Annotated[LivePublisher, FromComponent("live")],
     ) -> CreateTaskUseCase:
-        return CreateTaskUseCase(uow, task_repository, deal_repository, activity_repository)
+        return CreateTaskUseCase(
+            uow, task_repository, deal_repository, activity_repository, change_log, live_publisher
+        )
 
     @provide
     def get_get_task_usecase(
@@ -49,8 +55,9 @@ class TaskProvider(Provider):
         uow: Annotated[UnitOfWork, FromComponent("database")],
         task_repository: Annotated[TaskRepository, FromComponent("tasks")],
         deal_repository: Annotated[DealRepository, FromComponent("deals")],
+        change_log: Annotated[ChangeLog, FromComponent("changes")],
     ) -> UpdateTaskUseCase:
-        return UpdateTaskUseCase(uow, task_repository, deal_repository)
+        return UpdateTaskUseCase(uow, task_repository, deal_repository, change_log)
 
     @provide
     def get_delete_task_usecase(
@@ -58,8 +65,9 @@ class TaskProvider(Provider):
         uow: Annotated[UnitOfWork, FromComponent("database")],
         task_repository: Annotated[TaskRepository, FromComponent("tasks")],
         deal_repository: Annotated[DealRepository, FromComponent("deals")],
+        change_log: Annotated[ChangeLog, FromComponent("changes")],
     ) -> DeleteTaskUseCase:
-        return DeleteTaskUseCase(uow, task_repository, deal_repository)
+        return DeleteTaskUseCase(uow, task_repository, deal_repository, change_log)
 
     @provide
     def get_list_tasks_usecase(
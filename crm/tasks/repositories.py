@@ -1,13 +1,24 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import Row, select, update, delete, func
 from uuid import UUID
 from typing import Optional
 from datetime import date
 
 from tasks.models import Task
 from tasks.entities import TaskEntity
+from core.entities import entity_from_row
+from core.tracing import traced
 
 
+# Колонки TaskEntity: списки читают их кортежами, без ORM-объектов и identity map
+TASK_COLUMNS = tuple(getattr(Task, field) for field in TaskEntity.model_fields)
+
+
+def task_from_row(row: Row) -> TaskEntity:
+    return entity_from_row(TaskEntity, row)
+
+
+@traced
 class TaskRepository:
     def __init__(self, session: AsyncSession):
         self._session = session
@@ -26,9 +37,30 @@ class TaskRepository:
         await self._session.flush()
         return TaskEntity.model_validate(task)
 
-    async def update(self, task_id: UUID, task_data: dict):
-        stmt = update(Task).where(Task.id == task_id).values(**task_data)
-        await self._session.execute(stmt)
+    async def update(
+        self,
+        task_id: UUID,
+        task_data: dict,
+        preconditions: Optional[dict] = None,
+    ) -> Optional[TaskEntity]:
+        """
+        Обновляет задачу одним UPDATE ... RETURNING и возвращает сохраненную строку.
+
+        preconditions - ожидаемые значения колонок (optimistic concurrency): если строка
+        успела измениться, UPDATE не затронет ее и метод вернет None.
+        """
+        conditions = [getattr(Task, column) == value for column, value in (preconditions or {}).items()]
+        stmt = (
+            update(Task)
+            .where(Task.id == task_id, *conditions)
+            .values(**task_data, updated_at=func.now())
+            .returning(*TASK_COLUMNS)
+        )
+        result = await self._session.execute(stmt)
+        row = result.one_or_none()
+        if row:
+            return task_from_row(row)
+        return None
 
     async def delete(self, task_id: UUID) -> bool:
         stmt = delete(Task).where(Task.id == task_id)
@@ -36,10 +68,9 @@ class TaskRepository:
         return result.rowcount > 0
 
     async def list_by_deal(self, deal_id: UUID) -> list[TaskEntity]:
-        query = select(Task).where(Task.deal_id == deal_id)
+        query = select(*TASK_COLUMNS).where(Task.deal_id == deal_id)
         result = await self._session.execute(query)
-        tasks = result.scalars().all()
-        return [TaskEntity.model_validate(t) for t in tasks]
+        return [task_from_row(row) for row in result]
 
     async def list_with_filters(
         self,
@@ -48,7 +79,7 @@ class TaskRepository:
         due_before: Optional[date] = None,
         due_after: Optional[date] = None
     ) -> list[TaskEntity]:
-        query = select(Task)
+        query = select(*TASK_COLUMNS)
         
         if deal_id:
             query = query.where(Task.deal_id == deal_id)
@@ -63,6 +94,5 @@ class TaskRepository:
             query = query.where(Task.due_date >= due_after)
         
         result = await self._session.execute(query)
-        tasks = result.scalars().all()
-        return [TaskEntity.model_validate(t) for t in tasks]
+        return [task_from_row(row) for row in result]
 
@@ -14,6 +14,7 @@ from tasks.usecases import (
     ListTasksUseCase,
 )
 from auth.entities import AuthenticatedUser
+from core.responses import PydanticJSONResponse
 
 
 router = APIRouter(
@@ -32,7 +33,7 @@ async def list_tasks(
     due_after: Optional[date] = None,
 ):
     tasks = await list_usecase(deal_id, only_open, due_before, due_after)
-    return TasksListResponse(data=tasks)
+    return PydanticJSONResponse(TasksListResponse(data=tasks))
 
 
 @router.post("", response_model=TaskResponse)
@@ -45,7 +46,7 @@ async def create_task(
     task = await create_usecase(
         user, request.deal_id, request.title, request.description, request.due_date
     )
-    return TaskResponse(data=task)
+    return PydanticJSONResponse(TaskResponse(data=task))
 
 
 @router.get("/{task_id}", response_model=TaskResponse)
@@ -56,7 +57,7 @@ async def get_task(
     get_usecase: Annotated[GetTaskUseCase, FromComponent("tasks")],
 ):
     task = await get_usecase(user, task_id)
-    return TaskResponse(data=task)
+    return PydanticJSONResponse(TaskResponse(data=task))
 
 
 @router.patch("/{task_id}", response_model=TaskResponse)
@@ -69,7 +70,7 @@ async def update_task(
 ):
     update_data = request.model_dump(exclude_unset=True)
     task = await update_usecase(user, task_id, update_data)
-    return TaskResponse(data=task)
+    return PydanticJSONResponse(TaskResponse(data=task))
 
 
 @router.delete("/{task_id}", status_code=204)
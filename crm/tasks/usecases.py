@@ -3,16 +3,26 @@ from datetime import datetime, timezone, date
 from typing import Optional
 
 from core.database.unit_of_work import UnitOfWork
+from core.metrics import instrumented
 from tasks.repositories import TaskRepository
 from deals.repositories import DealRepository
 from activities.repositories import ActivityRepository
+from changes.services import ChangeLog
+from changes.enums import ChangeEntityType, ChangeOperation
+from live.services import LivePublisher
 from tasks.entities import TaskEntity
-from tasks.exceptions import TaskNotFoundError, TaskAccessDeniedError, InvalidDueDateError
+from tasks.exceptions import (
+    TaskNotFoundError,
+    TaskAccessDeniedError,
+    InvalidDueDateError,
+    TaskConcurrentUpdateError,
+)
 from deals.exceptions import DealNotFoundError, DealAccessDeniedError
 from users.enums import UserRole
 from auth.entities import AuthenticatedUser
 
 
+@instrumented
 class CreateTaskUseCase:
     def __init__(
         self,
@@ -20,11 +30,15 @@ class CreateTaskUseCase:
         task_repository: TaskRepository,
         deal_repository: DealRepository,
         activity_repository: ActivityRepository,
+        change_log: ChangeLog,
+        live_publisher: LivePublisher,
     ):
         self._uow = uow
         self._task_repository = task_repository
         self._deal_repository = deal_repository
         self._activity_repository = activity_repository
+        self._change_log = change_log
+        self._live_publisher = live_publisher
 
     async def __call__(
         self,
@@ -67,11 +81,16 @@ class CreateTaskUseCase:
                 "payload": {"task_id": str(task.id), "task_title": title},
                 "created_at": datetime.now(timezone.utc),
             }
-            await self._activity_repository.create(activity_data)
+            activity = await self._activity_repository.create(activity_data)
+            await self._live_publisher.publish(deal.organization_id, "activity", [activity])
 
+            await self._change_log.record(
+                deal.organization_id, ChangeEntityType.TASK, task.id, ChangeOperation.CREATED, task, user.id
+            )
             return task
 
 
+@instrumented
 class GetTaskUseCase:
     def __init__(
         self,
@@ -96,16 +115,19 @@ class GetTaskUseCase:
             return task
 
 
+@instrumented
 class UpdateTaskUseCase:
     def __init__(
         self,
         uow: UnitOfWork,
         task_repository: TaskRepository,
         deal_repository: DealRepository,
+        change_log: ChangeLog,
     ):
         self._uow = uow
         self._task_repository = task_repository
         self._deal_repository = deal_repository
+        self._change_log = change_log
 
     async def __call__(
         self, user: AuthenticatedUser, task_id: UUID, update_data: dict
@@ -126,22 +148,34 @@ class UpdateTaskUseCase:
                 if update_data["due_date"] < date.today():
                     raise InvalidDueDateError()
 
-            await self._task_repository.update(task_id, update_data)
+            if not update_data:
+                return task
+
+            updated_task = await self._task_repository.update(
+                task_id, update_data, preconditions={"deal_id": task.deal_id}
+            )
+            if not updated_task:
+                raise TaskConcurrentUpdateError()
             
-            updated_task = task.model_copy(update=update_data)
+            await self._change_log.record(
+                deal.organization_id, ChangeEntityType.TASK, task_id, ChangeOperation.UPDATED, updated_task, user.id
+            )
             return updated_task
 
 
+@instrumented
 class DeleteTaskUseCase:
     def __init__(
         self,
         uow: UnitOfWork,
         task_repository: TaskRepository,
         deal_repository: DealRepository,
+        change_log: ChangeLog,
     ):
         self._uow = uow
         self._task_repository = task_repository
         self._deal_repository = deal_repository
+        self._change_log = change_log
 
     async def __call__(self, user: AuthenticatedUser, task_id: UUID):
         async with self._uow:
@@ -156,9 +190,14 @@ class DeleteTaskUseCase:
             if user.role == UserRole.MEMBER.value and deal.owner_id != user.id:
                 raise TaskAccessDeniedError()
             
-            await self._task_repository.delete(task_id)
+            # Если задачу уже удалил параллельный запрос, событие DELETED записал он
+            if await self._task_repository.delete(task_id):
+                await self._change_log.record(
+                    deal.organization_id, ChangeEntityType.TASK, task_id, ChangeOperation.DELETED, actor_id=user.id
+                )
 
 
+@instrumented
 class ListTasksUseCase:
     def __init__(self, uow: UnitOfWork, task_repository: TaskRepository):
         self._uow = uow
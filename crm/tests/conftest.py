@@ -1,3 +1,4 @@
+import os
 import pytest
 import asyncio
 from httpx import AsyncClient, ASGITransport
@@ -9,6 +10,11 @@ from core.database.database import BaseModel
 from core.environment.config import Settings
 
 
+def pytest_configure(config):
+    # Тестовый получатель вебхуков слушает 127.0.0.1
+    os.environ.setdefault("WEBHOOKS_ALLOW_PRIVATE_HOSTS", "true")
+
+
 @pytest.fixture(scope="session")
 def event_loop():
     loop = asyncio.get_event_loop_policy().new_event_loop()
@@ -0,0 +1,366 @@
+import pytest
+from collections import namedtuple
+from dataclasses import astuple
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import UUID, uuid4
+from httpx import AsyncClient
+import jwt
+
+from core.container import container
+from core.database.unit_of_work import UnitOfWork
+from core.environment.config import Settings
+from analytics.enums import TimeseriesInterval, PivotDimension
+from analytics.repositories import DealStatsRepository, DealStageStatsRepository, DealViewsRepository
+from analytics.services import DealSnapshot
+from analytics.usecases import bucket_start, next_bucket, RefreshDealViewsUseCase
+from fx.usecases import LoadFxRatesUseCase
+from deals.enums import DealStage
+
+
+async def create_test_user(client: AsyncClient):
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": f"analytics_test_{uuid4().hex}@example.com",
+            "password": "TestPassword123",
+            "name": "Analytics Test User",
+            "organization_name": "Analytics Test Org",
+        },
+    )
+    
+    access_token = response.json()["data"]["access_token"]
+    settings = Settings()
+    decoded = jwt.decode(access_token, settings.secret_key, algorithms=[settings.jwt_algorithm])
+    org_id = decoded["organization_id"]
+    
+    return {"Authorization": f"Bearer {access_token}", "X-Organization-Id": org_id}
+
+
+async def create_deal(client: AsyncClient, headers: dict, contact_id: str, amount: float) -> str:
+    response = await client.post(
+        "/api/v1/deals",
+        json={"contact_id": contact_id, "title": f"Deal {amount}", "amount": amount},
+        headers=headers,
+    )
+    return response.json()["data"]["id"]
+
+
+def test_buckets_follow_date_trunc():
+    assert bucket_start(date(2026, 10, 18), TimeseriesInterval.WEEK) == date(2026, 10, 12)
+    assert bucket_start(date(2026, 10, 18), TimeseriesInterval.MONTH) == date(2026, 10, 1)
+    assert next_bucket(date(2026, 1, 1), TimeseriesInterval.MONTH) == date(2026, 2, 1)
+    assert next_bucket(date(2026, 12, 1), TimeseriesInterval.MONTH) == date(2027, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_timeseries_is_maintained_incrementally(client: AsyncClient):
+    headers = await create_test_user(client)
+    contact_response = await client.post("/api/v1/contacts", json={"name": "Trend"}, headers=headers)
+    contact_id = contact_response.json()["data"]["id"]
+    won_id = await create_deal(client, headers, contact_id, 100.0)
+    lost_id = await create_deal(client, headers, contact_id, 200.0)
+    reopened_id = await create_deal(client, headers, contact_id, 300.0)
+    deleted_id = await create_deal(client, headers, contact_id, 400.0)
+    
+    await client.patch(f"/api/v1/deals/{won_id}", json={"status": "won"}, headers=headers)
+    await client.patch(f"/api/v1/deals/{won_id}", json={"amount": 150.0}, headers=headers)
+    await client.patch(f"/api/v1/deals/{lost_id}", json={"status": "lost"}, headers=headers)
+    await client.patch(f"/api/v1/deals/{reopened_id}", json={"status": "won"}, headers=headers)
+    await client.patch(f"/api/v1/deals/{reopened_id}", json={"status": "in_progress"}, headers=headers)
+    await client.delete(f"/api/v1/deals/{deleted_id}", headers=headers)
+    
+    response = await client.get(
+        "/api/v1/analytics/deals/timeseries", params={"interval": "week"}, headers=headers
+    )
+    
+    assert response.status_code == 200
+    body = response.json()
+    today = datetime.now(timezone.utc).date()
+    assert body["points"][0]["bucket"] == bucket_start(date.fromisoformat(body["date_from"]), TimeseriesInterval.WEEK).isoformat()
+    current = next(point for point in body["points"] if point["bucket"] == bucket_start(today, TimeseriesInterval.WEEK).isoformat())
+    assert current["created_count"] == 3
+    assert float(current["created_amount"]) == 650.0
+    assert current["won_count"] == 1
+    assert float(current["won_amount"]) == 150.0
+    assert current["lost_count"] == 1
+    assert float(current["lost_amount"]) == 200.0
+    assert sum(point["created_count"] for point in body["points"]) == 3
+    
+    # Инкрементальные срезы совпадают с пересчетом по таблице deals
+    organization_id = UUID(headers["X-Organization-Id"])
+    async with container() as request_container:
+        uow = await request_container.get(UnitOfWork, component="database")
+        repository = DealStatsRepository(uow.session)
+        incremental = await repository.get_timeseries(organization_id, TimeseriesInterval.DAY, today, today)
+        await repository.rebuild(organization_id)
+        rebuilt = await repository.get_timeseries(organization_id, TimeseriesInterval.DAY, today, today)
+        await uow.rollback()
+    assert incremental == rebuilt
+
+
+@pytest.mark.asyncio
+async def test_timeseries_rejects_invalid_range(client: AsyncClient):
+    headers = await create_test_user(client)
+    
+    response = await client.get(
+        "/api/v1/analytics/deals/timeseries",
+        params={"date_from": "2026-02-01", "date_to": "2026-01-01"},
+        headers=headers,
+    )
+    
+    assert response.status_code == 400
+
+
+
+@pytest.mark.asyncio
+async def test_stage_velocity_and_conversion_are_maintained_incrementally(client: AsyncClient):
+    headers = await create_test_user(client)
+    contact_response = await client.post("/api/v1/contacts", json={"name": "Velocity"}, headers=headers)
+    contact_id = contact_response.json()["data"]["id"]
+    advanced_id = await create_deal(client, headers, contact_id, 100.0)
+    returned_id = await create_deal(client, headers, contact_id, 200.0)
+    
+    await client.patch(f"/api/v1/deals/{advanced_id}", json={"stage": "proposal"}, headers=headers)
+    await client.patch(f"/api/v1/deals/{advanced_id}", json={"stage": "negotiation"}, headers=headers)
+    await client.patch(f"/api/v1/deals/{returned_id}", json={"stage": "proposal"}, headers=headers)
+    await client.patch(f"/api/v1/deals/{returned_id}", json={"stage": "qualification"}, headers=headers)
+    
+    response = await client.get("/api/v1/analytics/deals/stage-conversion", headers=headers)
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert [(t["from_stage"], t["to_stage"], t["transition_count"]) for t in body["transitions"]] == [
+        ("qualification", "proposal", 2),
+        ("proposal", "qualification", 1),
+        ("proposal", "negotiation", 1),
+    ]
+    stages = {stage["stage"]: stage for stage in body["stages"]}
+    assert list(stages) == ["qualification", "proposal", "negotiation"]
+    assert (stages["qualification"]["entered_count"], stages["qualification"]["advanced_count"]) == (3, 2)
+    assert stages["qualification"]["conversion_rate"] == 66.67
+    assert stages["proposal"]["conversion_rate"] == 50.0
+    assert stages["negotiation"]["conversion_rate"] == 0.0
+    
+    velocity = (await client.get("/api/v1/analytics/deals/stage-velocity", headers=headers)).json()
+    stages = {stage["stage"]: stage for stage in velocity["stages"]}
+    assert stages["qualification"]["exited_count"] == 2
+    assert stages["proposal"]["exited_count"] == 2
+    assert stages["proposal"]["average_days_in_stage"] >= 0
+    assert stages["negotiation"]["exited_count"] == 0
+    assert stages["negotiation"]["average_days_in_stage"] is None
+    assert (stages["qualification"]["open_count"], stages["negotiation"]["open_count"]) == (1, 1)
+    assert stages["proposal"]["open_average_age_days"] is None
+    
+    # Инкрементальные агрегаты совпадают с пересчетом по таймлайну
+    organization_id = UUID(headers["X-Organization-Id"])
+    today = datetime.now(timezone.utc).date()
+    async with container() as request_container:
+        uow = await request_container.get(UnitOfWork, component="database")
+        repository = DealStageStatsRepository(uow.session)
+        incremental = await repository.get_transitions(organization_id, today, today)
+        await repository.rebuild(organization_id)
+        rebuilt = await repository.get_transitions(organization_id, today, today)
+        await uow.rollback()
+    assert [row[:3] for row in incremental] == [row[:3] for row in rebuilt]
+    assert [row[3] for row in incremental] == pytest.approx([row[3] for row in rebuilt])
+
+
+async def refresh_deal_views():
+    async with container() as request_container:
+        uow = await request_container.get(UnitOfWork, component="database")
+        async with uow:
+            await DealViewsRepository(uow.session).refresh()
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_and_pipeline_are_served_from_views(client: AsyncClient):
+    headers = await create_test_user(client)
+    contact_response = await client.post("/api/v1/contacts", json={"name": "Leader"}, headers=headers)
+    contact_id = contact_response.json()["data"]["id"]
+    won_id = await create_deal(client, headers, contact_id, 100.0)
+    lost_id = await create_deal(client, headers, contact_id, 200.0)
+    open_id = await create_deal(client, headers, contact_id, 300.0)
+    await client.patch(f"/api/v1/deals/{won_id}", json={"status": "won"}, headers=headers)
+    await client.patch(f"/api/v1/deals/{lost_id}", json={"status": "lost"}, headers=headers)
+    await client.patch(f"/api/v1/deals/{open_id}", json={"stage": "proposal"}, headers=headers)
+    await refresh_deal_views()
+    
+    response = await client.get("/api/v1/analytics/deals/leaderboard", headers=headers)
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert body["order_by"] == "won_amount"
+    assert body["freshness"]["pending_changes"] == 0
+    [owner] = body["owners"]
+    assert owner["owner_name"] == "Analytics Test User"
+    assert owner["pipeline_count"] == 1
+    assert float(owner["pipeline_amount"]) == 300.0
+    assert owner["won_count"] == 1
+    assert float(owner["won_amount"]) == 100.0
+    assert owner["lost_count"] == 1
+    assert owner["win_rate"] == 50.0
+    
+    pipeline = (await client.get("/api/v1/analytics/deals/pipeline", headers=headers)).json()
+    assert [stage["stage"] for stage in pipeline["stages"]] == ["proposal"]
+    assert pipeline["stages"][0]["deal_count"] == 1
+    assert pipeline["stages"][0]["owners"][0]["owner_id"] == owner["owner_id"]
+    
+    # До следующего обновления изменение видно только в метаданных свежести
+    await create_deal(client, headers, contact_id, 400.0)
+    response = await client.get("/api/v1/analytics/deals/leaderboard", headers=headers)
+    
+    body = response.json()
+    assert body["owners"][0]["pipeline_count"] == 1
+    assert body["freshness"]["pending_changes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_deal_views_refresh_waits_for_age_or_changes(client: AsyncClient):
+    headers = await create_test_user(client)
+    contact_response = await client.post("/api/v1/contacts", json={"name": "Refresh"}, headers=headers)
+    await refresh_deal_views()
+    await create_deal(client, headers, contact_response.json()["data"]["id"], 100.0)
+    
+    async def run_refresh(max_age: timedelta, refresh_changes: int) -> datetime:
+        async with container() as request_container:
+            uow = await request_container.get(UnitOfWork, component="database")
+            repository = DealViewsRepository(uow.session)
+            await RefreshDealViewsUseCase(uow, repository, max_age, refresh_changes)()
+            async with uow:
+                return (await repository.get_refresh_state()).refreshed_at
+    
+    async with container() as request_container:
+        uow = await request_container.get(UnitOfWork, component="database")
+        async with uow:
+            refreshed_at = (await DealViewsRepository(uow.session).get_refresh_state()).refreshed_at
+    
+    assert await run_refresh(timedelta(days=1), 1000) == refreshed_at
+    refreshed_by_changes = await run_refresh(timedelta(days=1), 1)
+    assert refreshed_by_changes > refreshed_at
+    assert await run_refresh(timedelta(0), 1000) > refreshed_by_changes
+
+
+@pytest.mark.asyncio
+async def test_amounts_are_normalized_to_base_currency(client: AsyncClient):
+    headers = await create_test_user(client)
+    contact_response = await client.post("/api/v1/contacts", json={"name": "Fx"}, headers=headers)
+    contact_id = contact_response.json()["data"]["id"]
+    
+    async with container() as request_container:
+        load_rates = await request_container.get(LoadFxRatesUseCase, component="fx")
+        await load_rates({"xts": Decimal("2")})
+    
+    response = await client.post(
+        "/api/v1/deals",
+        json={"contact_id": contact_id, "title": "Unknown", "amount": 10, "currency": "ZZZ"},
+        headers=headers,
+    )
+    # Курса нет: сделка сохраняется без суммы в базовой валюте
+    assert response.status_code == 200
+    assert response.json()["data"]["amount_base"] is None
+    unknown_deal = response.json()["data"]
+    
+    await create_deal(client, headers, contact_id, 50.0)
+    response = await client.post(
+        "/api/v1/deals",
+        json={"contact_id": contact_id, "title": "Foreign", "amount": 100, "currency": "XTS"},
+        headers=headers,
+    )
+    assert response.json()["data"]["amount_base"] == "200.00"
+    foreign_deal = response.json()["data"]
+    response = await client.get("/api/v1/analytics/deals/summary", headers=headers)
+    assert Decimal(response.json()["amount_by_status"]["new"]) == Decimal("250")
+    etag = (await client.get(f"/api/v1/deals/{foreign_deal['id']}", headers=headers)).headers["etag"]
+    
+    # Новый курс меняет уже сохраненные сделки только с revalue
+    async with container() as request_container:
+        load_rates = await request_container.get(LoadFxRatesUseCase, component="fx")
+        assert await load_rates({"XTS": Decimal("3")}, revalue=True) >= 1
+    
+    # Пересчет - изменение сделки: новая версия, новый ETag и событие в ленте
+    response = await client.get(
+        f"/api/v1/deals/{foreign_deal['id']}", headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["data"]["amount_base"] == "300.00"
+    assert response.json()["data"]["version"] == foreign_deal["version"] + 1
+    changes = (await client.get("/api/v1/changes", headers=headers)).json()["data"]
+    assert changes[-1]["operation"] == "updated"
+    assert changes[-1]["entity_id"] == foreign_deal["id"]
+    assert changes[-1]["data"]["amount_base"] == "300.00"
+    
+    response = await client.get("/api/v1/analytics/deals/summary", headers=headers)
+    assert Decimal(response.json()["amount_by_status"]["new"]) == Decimal("350")
+    response = await client.get(
+        "/api/v1/analytics/deals/timeseries", params={"interval": "month"}, headers=headers
+    )
+    assert sum(Decimal(point["created_amount"]) for point in response.json()["points"]) == Decimal("350")
+    
+    # Загруженный позже курс дозаполняет сделки, сохраненные без него
+    async with container() as request_container:
+        load_rates = await request_container.get(LoadFxRatesUseCase, component="fx")
+        await load_rates({"ZZZ": Decimal("0.5")}, revalue=True)
+    response = await client.get(f"/api/v1/deals/{unknown_deal['id']}", headers=headers)
+    assert response.json()["data"]["amount_base"] == "5.00"
+    response = await client.get("/api/v1/analytics/deals/summary", headers=headers)
+    assert Decimal(response.json()["amount_by_status"]["new"]) == Decimal("355")
+
+
+def test_snapshot_pivot_matches_python_grouping():
+    owners = [uuid4(), uuid4()]
+    Row = namedtuple("Row", "owner_id stage status currency created_day amount_cents")
+    rows = [
+        Row(owners[0], "QUALIFICATION", "NEW", "USD", (date(2026, 10, 18) - date(1970, 1, 1)).days, 10_050),
+        Row(owners[0], "PROPOSAL", "IN_PROGRESS", "EUR", (date(2026, 10, 19) - date(1970, 1, 1)).days, 20_000),
+        Row(owners[1], "QUALIFICATION", "WON", "USD", (date(2026, 9, 30) - date(1970, 1, 1)).days, 5),
+        Row(owners[0], "QUALIFICATION", "NEW", "USD", (date(2026, 10, 12) - date(1970, 1, 1)).days, 1),
+    ]
+    snapshot = DealSnapshot(rows, datetime.now(timezone.utc))
+    
+    result = snapshot.pivot([PivotDimension.OWNER_ID, PivotDimension.CREATED_MONTH])
+    cells = {tuple(keys.values()): (count, amount) for keys, count, amount in zip(*astuple(result), strict=True)}
+    assert cells == {
+        (str(owners[0]), "2026-10-01"): (3, Decimal("300.51")),
+        (str(owners[1]), "2026-09-01"): (1, Decimal("0.05")),
+    }
+    
+    result = snapshot.pivot([PivotDimension.CREATED_WEEK], currencies=["USD"], stages=[DealStage.QUALIFICATION])
+    assert [keys[PivotDimension.CREATED_WEEK] for keys in result.keys] == ["2026-09-28", "2026-10-12"]
+    assert result.counts == [1, 2]
+    
+    result = snapshot.pivot([], date_from=date(2026, 10, 13))
+    assert result.counts == [2] and result.amounts == [Decimal("300.50")]
+
+
+@pytest.mark.asyncio
+async def test_pivot_follows_deal_changes(client: AsyncClient):
+    headers = await create_test_user(client)
+    contact_response = await client.post("/api/v1/contacts", json={"name": "Pivot"}, headers=headers)
+    contact_id = contact_response.json()["data"]["id"]
+    first_id = await create_deal(client, headers, contact_id, 100.0)
+    await create_deal(client, headers, contact_id, 200.0)
+    await create_deal(client, headers, contact_id, 300.0)
+    await client.patch(f"/api/v1/deals/{first_id}", json={"stage": "proposal"}, headers=headers)
+    
+    params = {"group_by": ["stage", "created_month"], "currency": "usd"}
+    response = await client.get("/api/v1/analytics/deals/pivot", params=params, headers=headers)
+    assert response.status_code == 200
+    month = datetime.now(timezone.utc).date().replace(day=1).isoformat()
+    assert [(cell["keys"], cell["deal_count"], cell["amount"]) for cell in response.json()["cells"]] == [
+        ({"stage": "qualification", "created_month": month}, 2, "500.00"),
+        ({"stage": "proposal", "created_month": month}, 1, "100.00"),
+    ]
+    
+    # Изменение сделки сбрасывает снимок организации
+    await client.patch(f"/api/v1/deals/{first_id}", json={"amount": 150}, headers=headers)
+    response = await client.get(
+        "/api/v1/analytics/deals/pivot", params={"stage": "proposal"}, headers=headers
+    )
+    assert response.json()["deal_count"] == 1
+    assert response.json()["amount"] == "150.00"
+    
+    response = await client.get(
+        "/api/v1/analytics/deals/pivot", params={"group_by": ["stage", "stage"]}, headers=headers
+    )
+    assert response.status_code == 400
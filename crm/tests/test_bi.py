@@ -0,0 +1,143 @@
+import io
+import pytest
+from uuid import UUID, uuid4
+from httpx import AsyncClient
+import jwt
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core.container import container
+from core.database.unit_of_work import UnitOfWork
+from core.environment.config import Settings
+from bi.enums import ExportEntity
+from bi.repositories import BiExportRepository, BiSourceRepository
+from bi.services import ParquetExportStorage
+from bi.usecases import ExportOrganizationUseCase
+
+
+async def create_test_user(client: AsyncClient):
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": f"bi_test_{uuid4().hex}@example.com",
+            "password": "TestPassword123",
+            "name": "BI Test User",
+            "organization_name": "BI Test Org",
+        },
+    )
+    
+    access_token = response.json()["data"]["access_token"]
+    settings = Settings()
+    decoded = jwt.decode(access_token, settings.secret_key, algorithms=[settings.jwt_algorithm])
+    org_id = decoded["organization_id"]
+    
+    return {"Authorization": f"Bearer {access_token}", "X-Organization-Id": org_id}
+
+
+async def run_export(storage: ParquetExportStorage, organization_id: str):
+    # Без запаса на часы и мелкими пачками: выгрузка видит только что закоммиченные строки
+    async with container() as request_container:
+        uow = await request_container.get(UnitOfWork, component="database")
+        export = ExportOrganizationUseCase(
+            uow,
+            await request_container.get(BiExportRepository, component="bi"),
+            await request_container.get(BiSourceRepository, component="bi"),
+            storage,
+            clock_skew_seconds=0,
+            batch_size=2,
+        )
+        await export(organization_id)
+
+
+@pytest.mark.asyncio
+async def test_incremental_parquet_exports(client: AsyncClient, tmp_path, monkeypatch):
+    storage = await container.get(ParquetExportStorage, component="bi")
+    monkeypatch.setattr(storage, "root", tmp_path)
+    headers = await create_test_user(client)
+    organization_id = headers["X-Organization-Id"]
+    
+    contact_response = await client.post("/api/v1/contacts", json={"name": "BI"}, headers=headers)
+    contact_id = contact_response.json()["data"]["id"]
+    deal_ids = []
+    for amount in (100, 200, 300):
+        response = await client.post(
+            "/api/v1/deals",
+            json={"contact_id": contact_id, "title": f"Deal {amount}", "amount": amount},
+            headers=headers,
+        )
+        deal_ids.append(response.json()["data"]["id"])
+    task_response = await client.post(
+        "/api/v1/tasks", json={"deal_id": deal_ids[0], "title": "Call"}, headers=headers
+    )
+    task_id = task_response.json()["data"]["id"]
+    await client.patch(f"/api/v1/deals/{deal_ids[0]}", json={"status": "won"}, headers=headers)
+    
+    await run_export(storage, organization_id)
+    response = await client.get("/api/v1/bi/exports", headers=headers)
+    exports = response.json()["data"]
+    assert len(exports) == 1
+    assert exports[0]["watermark_from"] is None
+    assert exports[0]["row_counts"] == {"deals": 3, "contacts": 1, "tasks": 1, "activities": 2}
+    
+    response = await client.get("/api/v1/bi/exports/1/deals.parquet", headers=headers)
+    assert response.status_code == 200
+    deals = pq.read_table(io.BytesIO(response.content))
+    assert deals.schema.field("status").type == pa.dictionary(pa.int8(), pa.string())
+    rows = {row["id"]: row for row in deals.to_pylist()}
+    assert rows[deal_ids[0]]["status"] == "won"
+    assert str(rows[deal_ids[1]]["amount"]) == "200.00"
+    
+    # Без изменений новая выгрузка не появляется
+    await run_export(storage, organization_id)
+    response = await client.get("/api/v1/bi/exports", params={"after": 1}, headers=headers)
+    assert response.json()["data"] == []
+    
+    await client.patch(f"/api/v1/deals/{deal_ids[1]}", json={"amount": 250}, headers=headers)
+    await client.delete(f"/api/v1/tasks/{task_id}", headers=headers)
+    await run_export(storage, organization_id)
+    
+    response = await client.get("/api/v1/bi/exports", params={"after": 1}, headers=headers)
+    exports = response.json()["data"]
+    assert [export["sequence"] for export in exports] == [2]
+    assert exports[0]["row_counts"] == {"deals": 1, "deletions": 1}
+    deals = pq.read_table(storage.path(UUID(organization_id), 2, ExportEntity.DEALS))
+    assert deals.column("id").to_pylist() == [deal_ids[1]]
+    deletions = pq.read_table(storage.path(UUID(organization_id), 2, ExportEntity.DELETIONS)).to_pylist()
+    assert [(row["entity_type"], row["entity_id"]) for row in deletions] == [("task", task_id)]
+    
+    response = await client.get("/api/v1/bi/exports/2/contacts.parquet", headers=headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_member_cannot_read_exports(client: AsyncClient):
+    headers = await create_test_user(client)
+    member_email = f"bi_member_{uuid4().hex}@example.com"
+    await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": member_email,
+            "password": "TestPassword123",
+            "name": "BI Member",
+            "organization_name": "BI Member Org",
+        },
+    )
+    await client.post(
+        "/api/v1/organizations/members",
+        json={"email": member_email, "role": "member"},
+        headers=headers,
+    )
+    login_response = await client.post(
+        "/api/v1/auth/login",
+        headers={"X-Organization-Id": headers["X-Organization-Id"]},
+        json={"email": member_email, "password": "TestPassword123"},
+    )
+    member_headers = {
+        "Authorization": f"Bearer {login_response.json()['data']['access_token']}",
+        "X-Organization-Id": headers["X-Organization-Id"],
+    }
+    
+    response = await client.get("/api/v1/bi/exports", headers=member_headers)
+    assert response.status_code == 403
+    response = await client.get("/api/v1/bi/exports/1/deals.parquet", headers=member_headers)
+    assert response.status_code == 403
@@ -0,0 +1,184 @@
+import asyncio
+import pytest
+from uuid import uuid4
+from httpx import AsyncClient
+import jwt
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.container import container
+from core.database.unit_of_work import UnitOfWork
+from core.database.listener import PostgresListener
+from core.environment.config import Settings
+from core.cache import (
+    CACHE_CHANNEL,
+    CacheInvalidator,
+    CacheNotificationRepository,
+    InvalidationBus,
+    LocalCache,
+    SingleFlight,
+    cache_tag,
+)
+
+
+async def create_test_user(client: AsyncClient, prefix: str):
+    email = f"{prefix}_{uuid4().hex}@example.com"
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": email,
+            "password": "TestPassword123",
+            "name": "Cache Test User",
+            "organization_name": "Cache Test Org",
+        },
+    )
+    
+    access_token = response.json()["data"]["access_token"]
+    settings = Settings()
+    decoded = jwt.decode(access_token, settings.secret_key, algorithms=[settings.jwt_algorithm])
+    
+    return email, decoded["id"], access_token, decoded["organization_id"]
+
+
+def test_local_cache_evicts_by_tag_ttl_and_size():
+    cache = LocalCache("test", max_size=2, ttl_seconds=60)
+    cache.set("a", 1, ["org:deal"])
+    cache.set("b", 2, ["org:contact"])
+    
+    cache.invalidate(["org:deal"])
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    
+    cache.set("c", 3)
+    cache.set("d", 4)
+    assert cache.get("b") is None
+    assert len(cache) == 2
+    
+    # Значение, прочитанное до инвалидации, в кеш не попадает
+    generation = cache.generation
+    cache.invalidate(["org:contact"])
+    cache.set("e", 5, generation=generation)
+    assert cache.get("e") is None
+    
+    expired = LocalCache("test", max_size=10, ttl_seconds=0)
+    expired.set("a", 1)
+    assert expired.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_membership_cache_sees_role_change_and_removal(client: AsyncClient):
+    _, _, owner_token, organization_id = await create_test_user(client, "cache_owner")
+    member_email, member_id, member_token, _ = await create_test_user(client, "cache_member")
+    owner_headers = {"Authorization": f"Bearer {owner_token}", "X-Organization-Id": organization_id}
+    member_headers = {"Authorization": f"Bearer {member_token}", "X-Organization-Id": organization_id}
+    await client.post("/api/v1/organizations/members", json={"email": member_email}, headers=owner_headers)
+    
+    response = await client.patch(
+        f"/api/v1/organizations/members/{member_id}", json={"role": "admin"}, headers=member_headers
+    )
+    assert response.status_code == 403
+    
+    await client.patch(f"/api/v1/organizations/members/{member_id}", json={"role": "admin"}, headers=owner_headers)
+    response = await client.patch(
+        f"/api/v1/organizations/members/{member_id}", json={"role": "admin"}, headers=member_headers
+    )
+    assert response.status_code == 200
+    
+    await client.delete(f"/api/v1/organizations/members/{member_id}", headers=owner_headers)
+    response = await client.get("/api/v1/organizations/members", headers=member_headers)
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_invalidation_reaches_other_workers_after_commit():
+    # Кеш "другого воркера": его шина получает теги только через LISTEN
+    worker_bus = InvalidationBus()
+    worker_cache = worker_bus.register(LocalCache("test", max_size=10, ttl_seconds=60))
+    listener = PostgresListener(await container.get(AsyncEngine, component="database"))
+    listener.subscribe(CACHE_CHANNEL, worker_bus.handle)
+    await listener.start()
+    await asyncio.wait_for(listener.wait_connected(), 5)
+    tag = cache_tag(uuid4(), "deal")
+    worker_cache.set("summary", 1, [tag])
+    
+    try:
+        async with container() as request_container:
+            uow = await request_container.get(UnitOfWork, component="database")
+            invalidator = CacheInvalidator(
+                uow, InvalidationBus(), CacheNotificationRepository(uow.session), bus_enabled=True
+            )
+            async with uow:
+                await invalidator.invalidate(tag)
+                await asyncio.sleep(0.1)
+                assert worker_cache.get("summary") == 1
+        
+        for _ in range(50):
+            if worker_cache.get("summary") is None:
+                break
+            await asyncio.sleep(0.1)
+        assert worker_cache.get("summary") is None
+    finally:
+        await listener.stop()
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_one_load_between_concurrent_calls():
+    single_flight = SingleFlight()
+    calls = 0
+    
+    async def load():
+        nonlocal calls
+        calls += 1
+        call = calls
+        await asyncio.sleep(0.05)
+        return {"calls": call}
+    
+    results = await asyncio.gather(*(single_flight.do("test", ("org",), load, ["org:deal"]) for _ in range(10)))
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    
+    # После инвалидации новый вызов не присоединяется к уже идущему
+    first = asyncio.create_task(single_flight.do("test", ("org",), load, ["org:deal"]))
+    await asyncio.sleep(0.01)
+    single_flight.invalidate(["org:deal"])
+    second = await single_flight.do("test", ("org",), load, ["org:deal"])
+    assert (await first) == {"calls": 2}
+    assert second == {"calls": 3}
+
+
+@pytest.mark.asyncio
+async def test_single_flight_survives_cancelled_leader():
+    single_flight = SingleFlight()
+    
+    async def load():
+        await asyncio.sleep(0.05)
+        return "loaded"
+    
+    leader = asyncio.create_task(single_flight.do("test", ("org",), load))
+    await asyncio.sleep(0.01)
+    follower = asyncio.create_task(single_flight.do("test", ("org",), load))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+    
+    assert await follower == "loaded"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+@pytest.mark.asyncio
+async def test_concurrent_funnel_requests_return_same_result(client: AsyncClient):
+    _, _, token, organization_id = await create_test_user(client, "cache_funnel")
+    headers = {"Authorization": f"Bearer {token}", "X-Organization-Id": organization_id}
+    contact_response = await client.post("/api/v1/contacts", json={"name": "Funnel"}, headers=headers)
+    await client.post(
+        "/api/v1/deals",
+        json={"contact_id": contact_response.json()["data"]["id"], "title": "Funnel Deal", "amount": 10.0},
+        headers=headers,
+    )
+    
+    responses = await asyncio.gather(
+        *(client.get("/api/v1/analytics/deals/funnel", headers=headers) for _ in range(10))
+    )
+    
+    assert all(response.status_code == 200 for response in responses)
+    assert len({response.text for response in responses}) == 1
+    assert responses[0].json()["stages"][0]["count_by_status"] == {"new": 1}
@@ -0,0 +1,187 @@
+import asyncio
+import pytest
+from uuid import uuid4
+from httpx import AsyncClient
+import jwt
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.environment.config import Settings
+from changes.models import ChangeEvent
+from changes.enums import ChangeEntityType, ChangeOperation
+
+
+async def create_test_user(client: AsyncClient):
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": f"changes_test_{uuid4().hex}@example.com",
+            "password": "TestPassword123",
+            "name": "Changes Test User",
+            "organization_name": "Changes Test Org",
+        },
+    )
+    
+    access_token = response.json()["data"]["access_token"]
+    settings = Settings()
+    decoded = jwt.decode(access_token, settings.secret_key, algorithms=[settings.jwt_algorithm])
+    org_id = decoded["organization_id"]
+    
+    return {"Authorization": f"Bearer {access_token}", "X-Organization-Id": org_id}
+
+
+@pytest.mark.asyncio
+async def test_changes_feed_records_mutations_in_order(client: AsyncClient):
+    headers = await create_test_user(client)
+    
+    contact_response = await client.post(
+        "/api/v1/contacts", json={"name": "Feed Contact"}, headers=headers
+    )
+    contact_id = contact_response.json()["data"]["id"]
+    deal_response = await client.post(
+        "/api/v1/deals",
+        json={"contact_id": contact_id, "title": "Feed Deal", "amount": 500.0},
+        headers=headers,
+    )
+    deal_id = deal_response.json()["data"]["id"]
+    await client.patch(f"/api/v1/deals/{deal_id}", json={"title": "Feed Deal v2"}, headers=headers)
+    await client.delete(f"/api/v1/deals/{deal_id}", headers=headers)
+    
+    response = await client.get("/api/v1/changes", headers=headers)
+    
+    assert response.status_code == 200
+    body = response.json()
+    events = [(e["entity_type"], e["operation"], e["entity_id"]) for e in body["data"]]
+    assert events == [
+        ("contact", "created", contact_id),
+        ("deal", "created", deal_id),
+        ("deal", "updated", deal_id),
+        ("deal", "deleted", deal_id),
+    ]
+    assert body["data"][2]["data"]["title"] == "Feed Deal v2"
+    assert body["data"][3]["data"] is None
+    assert body["has_more"] is False
+    assert body["next_cursor"] == body["data"][-1]["cursor"]
+    
+    # Догоняющий потребитель: постранично с курсором, без повторов и пропусков
+    first_page = (await client.get("/api/v1/changes?limit=3", headers=headers)).json()
+    assert first_page["has_more"] is True
+    second_page = (await client.get(
+        f"/api/v1/changes?limit=3&since={first_page['next_cursor']}", headers=headers
+    )).json()
+    assert [e["id"] for e in first_page["data"] + second_page["data"]] == [e["id"] for e in body["data"]]
+    
+    other_headers = await create_test_user(client)
+    other = (await client.get("/api/v1/changes", headers=other_headers)).json()
+    assert other["data"] == []
+
+
+@pytest.mark.asyncio
+async def test_delete_of_already_deleted_deal_records_no_event(client: AsyncClient):
+    headers = await create_test_user(client)
+    contact_response = await client.post(
+        "/api/v1/contacts", json={"name": "Race Contact"}, headers=headers
+    )
+    deal_response = await client.post(
+        "/api/v1/deals",
+        json={"contact_id": contact_response.json()["data"]["id"], "title": "Race Deal", "amount": 10.0},
+        headers=headers,
+    )
+    deal_id = deal_response.json()["data"]["id"]
+    settings = Settings()
+    engine = create_async_engine(
+        f"{settings.database_dialect}+asyncpg://{settings.postgres_user}:"
+        f"{settings.postgres_password}@{settings.postgres_hostname}:"
+        f"{settings.postgres_port}/{settings.postgres_db}"
+    )
+    
+    try:
+        async with engine.connect() as connection:
+            transaction = await connection.begin()
+            await connection.execute(text("SELECT 1 FROM deals WHERE id = :id FOR UPDATE"), {"id": deal_id})
+            
+            # Запрос уже прочитал сделку и ждет блокировку, а удаляет ее параллельная транзакция
+            request = asyncio.create_task(client.delete(f"/api/v1/deals/{deal_id}", headers=headers))
+            await asyncio.sleep(0.3)
+            await connection.execute(text("DELETE FROM deals WHERE id = :id"), {"id": deal_id})
+            await transaction.commit()
+            await request
+    finally:
+        await engine.dispose()
+    
+    body = (await client.get("/api/v1/changes", headers=headers)).json()
+    assert [e["operation"] for e in body["data"] if e["entity_type"] == "deal"] == ["created"]
+
+
+@pytest.mark.asyncio
+async def test_delete_of_already_deleted_contact_records_no_event(client: AsyncClient):
+    headers = await create_test_user(client)
+    contact_response = await client.post(
+        "/api/v1/contacts", json={"name": "Race Contact"}, headers=headers
+    )
+    contact_id = contact_response.json()["data"]["id"]
+    settings = Settings()
+    engine = create_async_engine(
+        f"{settings.database_dialect}+asyncpg://{settings.postgres_user}:"
+        f"{settings.postgres_password}@{settings.postgres_hostname}:"
+        f"{settings.postgres_port}/{settings.postgres_db}"
+    )
+    
+    try:
+        async with engine.connect() as connection:
+            transaction = await connection.begin()
+            await connection.execute(text("SELECT 1 FROM contacts WHERE id = :id FOR UPDATE"), {"id": contact_id})
+            
+            request = asyncio.create_task(client.delete(f"/api/v1/contacts/{contact_id}", headers=headers))
+            await asyncio.sleep(0.3)
+            await connection.execute(text("DELETE FROM contacts WHERE id = :id"), {"id": contact_id})
+            await transaction.commit()
+            await request
+    finally:
+        await engine.dispose()
+    
+    body = (await client.get("/api/v1/changes", headers=headers)).json()
+    assert [e["operation"] for e in body["data"] if e["entity_type"] == "contact"] == ["created"]
+
+
+@pytest.mark.asyncio
+async def test_changes_feed_waits_for_open_transactions(client: AsyncClient):
+    headers = await create_test_user(client)
+    organization_id = headers["X-Organization-Id"]
+    settings = Settings()
+    engine = create_async_engine(
+        f"{settings.database_dialect}+asyncpg://{settings.postgres_user}:"
+        f"{settings.postgres_password}@{settings.postgres_hostname}:"
+        f"{settings.postgres_port}/{settings.postgres_db}"
+    )
+    
+    try:
+        async with engine.connect() as connection:
+            transaction = await connection.begin()
+            await connection.execute(insert(ChangeEvent).values(
+                organization_id=organization_id,
+                entity_type=ChangeEntityType.CONTACT,
+                entity_id=uuid4(),
+                operation=ChangeOperation.CREATED,
+            ))
+            
+            # Событие еще не зафиксировано, а более поздние транзакции не должны его обогнать
+            await client.post("/api/v1/contacts", json={"name": "Later Contact"}, headers=headers)
+            pending = (await client.get("/api/v1/changes", headers=headers)).json()
+            assert pending["data"] == []
+            
+            await transaction.commit()
+    finally:
+        await engine.dispose()
+    
+    committed = (await client.get("/api/v1/changes", headers=headers)).json()
+    assert len(committed["data"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_changes_feed_rejects_invalid_cursor(client: AsyncClient):
+    headers = await create_test_user(client)
+    
+    response = await client.get("/api/v1/changes?since=garbage", headers=headers)
+    
+    assert response.status_code == 400
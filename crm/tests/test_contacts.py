@@ -1,4 +1,6 @@
+import json
 import pytest
+from uuid import uuid4
 from httpx import AsyncClient
 import jwt
 from core.environment.config import Settings
@@ -8,7 +10,7 @@ async def create_test_user_and_org(client: AsyncClient):
     response = await client.post(
         "/api/v1/auth/register",
         json={
-            "email": f"contact_test_{id(client)}@example.com",
+            "email": f"contact_test_{uuid4().hex}@example.com",
             "password": "TestPassword123",
             "name": "Contact Test User",
             "organization_name": "Contact Test Org",
@@ -121,3 +123,53 @@ async def test_cannot_delete_contact_with_deals(client: AsyncClient):
     
     assert delete_response.status_code == 409
 
+
+
+@pytest.mark.asyncio
+async def test_export_contacts_includes_owner_and_open_deals(client: AsyncClient):
+    access_token, org_id = await create_test_user_and_org(client)
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "X-Organization-Id": org_id,
+    }
+    
+    contact_response = await client.post(
+        "/api/v1/contacts",
+        json={"name": "Busy Contact", "email": "busy@example.com"},
+        headers=headers,
+    )
+    contact_id = contact_response.json()["data"]["id"]
+    
+    await client.post(
+        "/api/v1/contacts",
+        json={"name": "Idle Contact", "email": "idle@example.com"},
+        headers=headers,
+    )
+    
+    for title in ["Open Deal", "Lost Deal"]:
+        deal_response = await client.post(
+            "/api/v1/deals",
+            json={"contact_id": contact_id, "title": title, "amount": 1000, "currency": "USD"},
+            headers=headers,
+        )
+    
+    await client.patch(
+        f"/api/v1/deals/{deal_response.json()['data']['id']}",
+        json={"status": "lost"},
+        headers=headers,
+    )
+    
+    response = await client.get(
+        "/api/v1/contacts/export", params={"format": "ndjson"}, headers=headers
+    )
+    
+    assert response.status_code == 200
+    rows = {row["name"]: row for row in map(json.loads, response.text.splitlines())}
+    assert rows["Busy Contact"]["owner_name"] == "Contact Test User"
+    assert rows["Busy Contact"]["open_deals_count"] == 1
+    assert rows["Idle Contact"]["open_deals_count"] == 0
+    
+    csv_response = await client.get("/api/v1/contacts/export", headers=headers)
+    
+    assert csv_response.status_code == 200
+    assert csv_response.text.splitlines()[0].endswith("owner_name,open_deals_count")
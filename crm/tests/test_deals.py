@@ -1,15 +1,22 @@
+import json
 import pytest
+from uuid import UUID, uuid4
 from httpx import AsyncClient
 import jwt
 from decimal import Decimal
+from sqlalchemy import text
+from core.container import container
+from core.database.unit_of_work import UnitOfWork
 from core.environment.config import Settings
+from deals.repositories import DealRepository
+from activities.repositories import ActivityRepository
 
 
 async def create_test_user_and_contact(client: AsyncClient):
     response = await client.post(
         "/api/v1/auth/register",
         json={
-            "email": f"deal_test_{id(client)}@example.com",
+            "email": f"deal_test_{uuid4().hex}@example.com",
             "password": "TestPassword123",
             "name": "Deal Test User",
             "organization_name": "Deal Test Org",
@@ -136,3 +143,299 @@ async def test_update_deal_creates_activity(client: AsyncClient):
     assert len(activities) > 0
     assert any(a["type"] == "status_changed" for a in activities)
 
+
+
+@pytest.mark.asyncio
+async def test_update_deal_returns_stored_row(client: AsyncClient):
+    access_token, org_id, contact_id = await create_test_user_and_contact(client)
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "X-Organization-Id": org_id,
+    }
+    
+    create_response = await client.post(
+        "/api/v1/deals",
+        json={
+            "contact_id": contact_id,
+            "title": "Test Deal",
+            "amount": 5000,
+            "currency": "USD",
+        },
+        headers=headers,
+    )
+    
+    deal_id = create_response.json()["data"]["id"]
+    
+    update_response = await client.patch(
+        f"/api/v1/deals/{deal_id}",
+        json={"title": "Renamed Deal", "stage": "proposal"},
+        headers=headers,
+    )
+    
+    assert update_response.status_code == 200
+    
+    get_response = await client.get(f"/api/v1/deals/{deal_id}", headers=headers)
+    
+    assert update_response.json() == get_response.json()
+    assert get_response.json()["data"]["title"] == "Renamed Deal"
+    assert get_response.json()["data"]["stage"] == "proposal"
+
+
+@pytest.mark.asyncio
+async def test_update_deal_with_stale_if_match_fails(client: AsyncClient):
+    access_token, org_id, contact_id = await create_test_user_and_contact(client)
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "X-Organization-Id": org_id,
+    }
+    
+    create_response = await client.post(
+        "/api/v1/deals",
+        json={
+            "contact_id": contact_id,
+            "title": "Test Deal",
+            "amount": 5000,
+            "currency": "USD",
+        },
+        headers=headers,
+    )
+    
+    deal_id = create_response.json()["data"]["id"]
+    etag = create_response.headers["ETag"]
+    
+    first_response = await client.patch(
+        f"/api/v1/deals/{deal_id}",
+        json={"title": "First"},
+        headers={**headers, "If-Match": etag},
+    )
+    
+    assert first_response.status_code == 200
+    assert first_response.headers["ETag"] != etag
+    assert first_response.json()["data"]["version"] == 2
+    
+    second_response = await client.patch(
+        f"/api/v1/deals/{deal_id}",
+        json={"title": "Second"},
+        headers={**headers, "If-Match": etag},
+    )
+    
+    assert second_response.status_code == 412
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_returns_not_modified(client: AsyncClient):
+    access_token, org_id, contact_id = await create_test_user_and_contact(client)
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "X-Organization-Id": org_id,
+    }
+    
+    create_response = await client.post(
+        "/api/v1/deals",
+        json={
+            "contact_id": contact_id,
+            "title": "Test Deal",
+            "amount": 5000,
+            "currency": "USD",
+        },
+        headers=headers,
+    )
+    
+    deal_id = create_response.json()["data"]["id"]
+    
+    detail_response = await client.get(f"/api/v1/deals/{deal_id}", headers=headers)
+    list_response = await client.get("/api/v1/deals", headers=headers)
+    
+    assert detail_response.status_code == 200
+    assert list_response.status_code == 200
+    
+    not_modified_detail = await client.get(
+        f"/api/v1/deals/{deal_id}",
+        headers={**headers, "If-None-Match": detail_response.headers["ETag"]},
+    )
+    not_modified_list = await client.get(
+        "/api/v1/deals",
+        headers={**headers, "If-None-Match": list_response.headers["ETag"]},
+    )
+    
+    assert not_modified_detail.status_code == 304
+    assert not_modified_list.status_code == 304
+    assert not_modified_list.content == b""
+    
+    await client.patch(
+        f"/api/v1/deals/{deal_id}",
+        json={"title": "Renamed Deal"},
+        headers=headers,
+    )
+    
+    modified_list = await client.get(
+        "/api/v1/deals",
+        headers={**headers, "If-None-Match": list_response.headers["ETag"]},
+    )
+    
+    assert modified_list.status_code == 200
+    assert modified_list.json()["data"][0]["title"] == "Renamed Deal"
+
+
+@pytest.mark.asyncio
+async def test_list_is_validated_by_etag_only(client: AsyncClient):
+    access_token, org_id, contact_id = await create_test_user_and_contact(client)
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "X-Organization-Id": org_id,
+    }
+    
+    deal_ids = []
+    for title in ("First", "Second"):
+        response = await client.post(
+            "/api/v1/deals",
+            json={"contact_id": contact_id, "title": title, "amount": 100},
+            headers=headers,
+        )
+        deal_ids.append(response.json()["data"]["id"])
+    
+    list_response = await client.get("/api/v1/deals", headers=headers)
+    detail_response = await client.get(f"/api/v1/deals/{deal_ids[1]}", headers=headers)
+    assert "Last-Modified" not in list_response.headers
+    assert "Last-Modified" in detail_response.headers
+    
+    # Удаление не сдвигает max(updated_at) оставшихся сделок, но список изменился
+    await client.delete(f"/api/v1/deals/{deal_ids[0]}", headers=headers)
+    
+    modified_list = await client.get(
+        "/api/v1/deals",
+        headers={**headers, "If-Modified-Since": detail_response.headers["Last-Modified"]},
+    )
+    assert modified_list.status_code == 200
+    assert [deal["id"] for deal in modified_list.json()["data"]] == [deal_ids[1]]
+    
+    modified_list = await client.get(
+        "/api/v1/deals",
+        headers={**headers, "If-None-Match": list_response.headers["ETag"]},
+    )
+    assert modified_list.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_list_etag_changes_on_late_commit(client: AsyncClient):
+    access_token, org_id, contact_id = await create_test_user_and_contact(client)
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "X-Organization-Id": org_id,
+    }
+    
+    deal_ids = []
+    for title in ("Early", "Late"):
+        response = await client.post(
+            "/api/v1/deals",
+            json={"contact_id": contact_id, "title": title, "amount": 100},
+            headers=headers,
+        )
+        deal_ids.append(response.json()["data"]["id"])
+    
+    list_response = await client.get("/api/v1/deals", headers=headers)
+    
+    # Транзакция началась раньше последнего изменения, а закоммитилась позже:
+    # updated_at ниже max(updated_at), count тот же
+    async with container() as request_container:
+        uow = await request_container.get(UnitOfWork, component="database")
+        async with uow:
+            await uow.session.execute(
+                text(
+                    "UPDATE deals SET title = 'Committed Late', version = version + 1, "
+                    "updated_at = updated_at - interval '1 hour' WHERE id = :id"
+                ),
+                {"id": deal_ids[0]},
+            )
+    
+    modified_list = await client.get(
+        "/api/v1/deals",
+        headers={**headers, "If-None-Match": list_response.headers["ETag"]},
+    )
+    assert modified_list.status_code == 200
+    assert "Committed Late" in [deal["title"] for deal in modified_list.json()["data"]]
+
+
+@pytest.mark.asyncio
+async def test_export_deals_streams_filtered_rows(client: AsyncClient):
+    access_token, org_id, contact_id = await create_test_user_and_contact(client)
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "X-Organization-Id": org_id,
+    }
+    
+    for title, amount in [("Small Deal", 100), ("Big Deal", 9000)]:
+        await client.post(
+            "/api/v1/deals",
+            json={
+                "contact_id": contact_id,
+                "title": title,
+                "amount": amount,
+                "currency": "USD",
+            },
+            headers=headers,
+        )
+    
+    csv_response = await client.get("/api/v1/deals/export", headers=headers)
+    
+    assert csv_response.status_code == 200
+    assert csv_response.headers["content-type"].startswith("text/csv")
+    assert 'filename="deals.csv"' in csv_response.headers["content-disposition"]
+    lines = csv_response.text.strip().splitlines()
+    assert lines[0].startswith("id,organization_id,contact_id")
+    assert len(lines) == 3
+    
+    ndjson_response = await client.get(
+        "/api/v1/deals/export",
+        params={"format": "ndjson", "min_amount": 1000},
+        headers=headers,
+    )
+    
+    assert ndjson_response.status_code == 200
+    rows = [json.loads(line) for line in ndjson_response.text.splitlines()]
+    assert [row["title"] for row in rows] == ["Big Deal"]
+    assert Decimal(rows[0]["amount"]) == Decimal("9000")
+
+
+@pytest.mark.asyncio
+async def test_row_entities_match_validated_entities(client: AsyncClient):
+    """Списки и UPDATE ... RETURNING (model_construct) дают те же типы полей, что и model_validate"""
+    access_token, org_id, contact_id = await create_test_user_and_contact(client)
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "X-Organization-Id": org_id,
+    }
+    
+    create_response = await client.post(
+        "/api/v1/deals",
+        json={"contact_id": contact_id, "title": "Typed Deal", "amount": 100},
+        headers=headers,
+    )
+    deal_id = create_response.json()["data"]["id"]
+    update_response = await client.patch(
+        f"/api/v1/deals/{deal_id}",
+        json={"status": "won", "stage": "proposal"},
+        headers=headers,
+    )
+    
+    detail_response = await client.get(f"/api/v1/deals/{deal_id}", headers=headers)
+    list_response = await client.get("/api/v1/deals", headers=headers)
+    assert update_response.json()["data"] == detail_response.json()["data"]
+    assert list_response.json()["data"] == [detail_response.json()["data"]]
+    
+    async with container() as request_container:
+        uow = await request_container.get(UnitOfWork, component="database")
+        deal_repository = await request_container.get(DealRepository, component="deals")
+        activity_repository = await request_container.get(ActivityRepository, component="activities")
+        async with uow:
+            validated = await deal_repository.get_by_id(UUID(deal_id))
+            (listed,), _ = await deal_repository.list_by_organization(UUID(org_id))
+            updated = await deal_repository.update(UUID(deal_id), {"title": "Renamed"})
+            activities = await activity_repository.list_by_deal(UUID(deal_id))
+            await uow.rollback()
+    
+    for entity in (listed, updated):
+        assert {name: type(value) for name, value in entity} == {name: type(value) for name, value in validated}
+        assert str(entity.status) == "won"
+        assert str(entity.stage) == "proposal"
+    assert {type(activity.type) for activity in activities} == {str}
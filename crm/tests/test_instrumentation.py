@@ -0,0 +1,59 @@
+import pytest
+from uuid import uuid4
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.container import container
+from core.database.instrumentation import QueryStats, instrument_engine, statement_shape
+
+
+def test_statement_shape_ignores_parameters():
+    assert statement_shape("SELECT * FROM deals WHERE id = $1") == statement_shape(
+        "SELECT * FROM deals\n WHERE id = $7"
+    )
+    assert statement_shape("SELECT 1 WHERE id IN ($1, $2, $3)") == statement_shape(
+        "SELECT 1 WHERE id IN ($1)"
+    )
+
+
+def test_repeated_shapes_detects_n_plus_one():
+    stats = QueryStats()
+    for _ in range(5):
+        stats.record("SELECT * FROM tasks WHERE deal_id = $1", 1.0)
+    stats.record("SELECT * FROM deals WHERE id = $1", 3.0)
+    
+    assert stats.count == 6
+    assert stats.slowest_statement == "SELECT * FROM deals WHERE id = $1"
+    assert stats.repeated_shapes(5) == [("SELECT * FROM tasks WHERE deal_id = ?", 5)]
+
+
+@pytest.mark.asyncio
+async def test_response_has_server_timing(client: AsyncClient):
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": f"timing_test_{uuid4().hex}@example.com",
+            "password": "TestPassword123",
+            "name": "Timing Test User",
+            "organization_name": "Timing Test Org",
+        },
+    )
+    
+    assert response.status_code == 200
+    assert response.headers["server-timing"].startswith("db;dur=")
+
+
+@pytest.mark.asyncio
+async def test_failed_statement_does_not_leak_start_time():
+    engine = await container.get(AsyncEngine, component="database")
+    instrument_engine(engine)
+    
+    async with engine.connect() as connection:
+        with pytest.raises(DBAPIError):
+            await connection.execute(text("SELECT 1 / 0"))
+        await connection.rollback()
+        await connection.execute(text("SELECT 1"))
+        
+        assert connection.info.get("query_start") == []
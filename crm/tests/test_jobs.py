@@ -0,0 +1,250 @@
+import asyncio
+import pytest
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+from dishka import Provider, Scope, make_async_container, provide
+from sqlalchemy import text
+
+from core.database.providers import DatabaseConnectionProvider, DatabaseSessionProvider
+from core.database.unit_of_work import UnitOfWork
+from core.environment.providers import EnvironmentProvider
+from jobs.enums import JobStatus
+from jobs.providers import JobProvider
+from jobs.registry import job_handler
+from jobs.repositories import JobRepository
+from jobs.services import JobQueue
+from jobs.worker import Worker, retry_delay
+
+
+calls: list[dict] = []
+
+
+@job_handler("tests.record", component="tests")
+class RecordCallUseCase:
+    async def __call__(self, value: str, fail: bool = False):
+        calls.append({"value": value})
+        if fail:
+            raise RuntimeError("boom")
+
+
+@job_handler("tests.slow", component="tests")
+class SlowUseCase:
+    async def __call__(self, value: str, seconds: float):
+        await asyncio.sleep(seconds)
+        calls.append({"slow": value})
+
+
+@job_handler("tests.tick", component="tests", every=3600, queue="tests-periodic")
+class TickUseCase:
+    async def __call__(self):
+        calls.append({"tick": True})
+
+
+class JobTestProvider(Provider):
+    scope = Scope.REQUEST
+    component = "tests"
+
+    @provide
+    def get_record_call_usecase(self) -> RecordCallUseCase:
+        return RecordCallUseCase()
+
+    @provide
+    def get_slow_usecase(self) -> SlowUseCase:
+        return SlowUseCase()
+
+    @provide
+    def get_tick_usecase(self) -> TickUseCase:
+        return TickUseCase()
+
+
+@pytest.fixture
+async def job_container():
+    container = make_async_container(
+        DatabaseConnectionProvider(),
+        DatabaseSessionProvider(),
+        EnvironmentProvider(),
+        JobProvider(),
+        JobTestProvider(),
+    )
+    yield container
+    await container.close()
+
+
+def make_worker(container, queue: str, lock_timeout: timedelta = timedelta(seconds=60)) -> Worker:
+    return Worker(
+        container,
+        queues=[queue],
+        concurrency=4,
+        poll_interval=0.1,
+        lock_timeout=lock_timeout,
+        retry_base=60,
+        retry_max=600,
+        retention=timedelta(days=7),
+    )
+
+
+async def enqueue(container, task: str = "tests.record", **kwargs):
+    async with container() as request_container:
+        uow = await request_container.get(UnitOfWork, component="database")
+        job_queue = await request_container.get(JobQueue, component="jobs")
+        async with uow:
+            return await job_queue.enqueue(task, **kwargs)
+
+
+async def get_job(container, job_id):
+    async with container() as request_container:
+        job_repository = await request_container.get(JobRepository, component="jobs")
+        return await job_repository.get_by_id(job_id)
+
+
+def test_retry_delay_grows_and_is_capped():
+    assert 2.5 <= retry_delay(1, 5, 3600) <= 5
+    assert 20 <= retry_delay(4, 5, 3600) <= 40
+    assert 1800 <= retry_delay(20, 5, 3600) <= 3600
+
+
+@pytest.mark.asyncio
+async def test_enqueue_is_idempotent_by_key(job_container):
+    queue = f"test-{uuid4().hex}"
+    key = f"record-{uuid4().hex}"
+    
+    first_id = await enqueue(job_container, payload={"value": "a"}, idempotency_key=key, queue=queue)
+    second_id = await enqueue(job_container, payload={"value": "b"}, idempotency_key=key, queue=queue)
+    
+    assert first_id is not None
+    assert second_id is None
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_job_and_marks_done(job_container):
+    queue = f"test-{uuid4().hex}"
+    value = uuid4()
+    job_id = await enqueue(job_container, payload={"value": value}, queue=queue)
+    
+    worker = make_worker(job_container, queue)
+    assert await worker.run_once() == 1
+    await worker.drain()
+    
+    job = await get_job(job_container, job_id)
+    assert {"value": str(value)} in calls
+    assert job.status == JobStatus.DONE
+    assert job.attempts == 1
+    assert job.finished_at is not None
+    assert await worker.run_once() == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_job_is_retried_with_backoff_then_failed(job_container):
+    queue = f"test-{uuid4().hex}"
+    job_id = await enqueue(
+        job_container, payload={"value": "x", "fail": True}, queue=queue, max_attempts=2
+    )
+    worker = make_worker(job_container, queue)
+    
+    assert await worker.run_once() == 1
+    await worker.drain()
+    
+    job = await get_job(job_container, job_id)
+    assert job.status == JobStatus.PENDING
+    assert job.run_at > datetime.now(timezone.utc) + timedelta(seconds=20)
+    assert "boom" in job.last_error
+    assert await worker.run_once() == 0
+    
+    async with job_container() as request_container:
+        uow = await request_container.get(UnitOfWork, component="database")
+        async with uow:
+            await uow.session.execute(
+                text("UPDATE jobs SET run_at = now() WHERE id = :id"), {"id": job_id}
+            )
+    
+    assert await worker.run_once() == 1
+    await worker.drain()
+    
+    job = await get_job(job_container, job_id)
+    assert job.status == JobStatus.FAILED
+    assert job.attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_periodic_job_is_scheduled_once_per_interval(job_container):
+    slot = int(time.time() // 3600)
+    first_worker = make_worker(job_container, "tests-periodic")
+    second_worker = make_worker(job_container, "tests-periodic")
+    
+    await first_worker.schedule_periodic()
+    await second_worker.schedule_periodic()
+    
+    async with job_container() as request_container:
+        uow = await request_container.get(UnitOfWork, component="database")
+        async with uow:
+            scheduled = await uow.session.scalar(
+                text("SELECT count(*) FROM jobs WHERE task = 'tests.tick' AND idempotency_key = :key"),
+                {"key": f"tests.tick:{slot}"},
+            )
+    assert scheduled == 1
+
+
+@pytest.mark.asyncio
+async def test_lease_is_extended_while_handler_runs(job_container):
+    queue = f"test-{uuid4().hex}"
+    value = uuid4().hex
+    job_id = await enqueue(job_container, "tests.slow", payload={"value": value, "seconds": 1.0}, queue=queue)
+    worker = make_worker(job_container, queue, lock_timeout=timedelta(seconds=0.3))
+    other_worker = make_worker(job_container, queue, lock_timeout=timedelta(seconds=0.3))
+    
+    assert await worker.run_once() == 1
+    await asyncio.sleep(0.6)
+    assert await other_worker.run_once() == 0
+    await worker.drain()
+    
+    job = await get_job(job_container, job_id)
+    assert job.status == JobStatus.DONE
+    assert job.attempts == 1
+    assert calls.count({"slow": value}) == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_attempt_cannot_record_result(job_container):
+    queue = f"test-{uuid4().hex}"
+    job_id = await enqueue(job_container, payload={"value": "x"}, queue=queue)
+    
+    async with job_container() as request_container:
+        uow = await request_container.get(UnitOfWork, component="database")
+        job_repository = await request_container.get(JobRepository, component="jobs")
+        async with uow:
+            [first] = await job_repository.claim([queue], 1, timedelta(seconds=60))
+            await uow.session.execute(
+                text("UPDATE jobs SET locked_until = now() - interval '1 second' WHERE id = :id"), {"id": job_id}
+            )
+            [second] = await job_repository.claim([queue], 1, timedelta(seconds=60))
+            
+            assert not await job_repository.complete(job_id, first.attempts)
+            assert not await job_repository.extend_lease(job_id, first.attempts, timedelta(seconds=60))
+            assert await job_repository.fail(job_id, second.attempts, "boom", None)
+    
+    job = await get_job(job_container, job_id)
+    assert job.status == JobStatus.FAILED
+    assert job.attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_worker_keeps_running_after_iteration_error(job_container):
+    queue = f"test-{uuid4().hex}"
+    worker = make_worker(job_container, queue)
+    run_once = worker.run_once
+    attempts = 0
+    
+    async def flaky_run_once():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise ConnectionError("database is unavailable")
+        claimed = await run_once()
+        worker.stop()
+        return claimed
+    
+    worker.run_once = flaky_run_once
+    await asyncio.wait_for(worker.run(), 5)
+    
+    assert attempts == 2
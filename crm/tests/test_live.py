@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+from uuid import UUID, uuid4
+from httpx import AsyncClient
+import jwt
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from core.container import container
+from core.database.unit_of_work import UnitOfWork
+from core.database.listener import PostgresListener
+from core.environment.config import Settings
+from auth.entities import AuthenticatedUser
+from activities.entities import ActivityEntity
+from live.broker import LiveBroker, OVERFLOW
+from live.bridge import LiveBridge
+from live.repositories import LIVE_CHANNEL, LiveNotificationRepository
+from live.services import LivePublisher
+from live.usecases import StreamActivitiesUseCase
+
+
+@pytest.mark.asyncio
+async def test_broker_fans_out_per_organization_and_drops_slow_subscribers():
+    broker = LiveBroker(queue_size=2)
+    organization_id, other_organization_id = uuid4(), uuid4()
+    
+    async with broker.subscribe(organization_id) as queue, broker.subscribe(other_organization_id) as other:
+        broker.publish(organization_id, {"type": "activity", "data": {"n": 1}})
+        
+        assert queue.get_nowait() == {"type": "activity", "data": {"n": 1}}
+        assert other.empty()
+        
+        for n in range(3):
+            broker.publish(organization_id, {"type": "activity", "data": {"n": n}})
+        assert queue.get_nowait() is OVERFLOW
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_heartbeats_and_filters_by_deal():
+    broker = LiveBroker(queue_size=10)
+    user = AuthenticatedUser.model_construct(id=uuid4(), organization_id=uuid4(), role="member")
+    deal_id = uuid4()
+    
+    async with container() as request_container:
+        uow = await request_container.get(UnitOfWork, component="database")
+        stream = StreamActivitiesUseCase(uow, broker, heartbeat_seconds=0.05)(user, deal_id)
+        
+        assert await anext(stream) is None
+        
+        broker.publish(user.organization_id, {"type": "activity", "data": {"deal_id": str(uuid4())}})
+        broker.publish(user.organization_id, {"type": "activity", "data": {"deal_id": str(deal_id)}})
+        assert await anext(stream) == {"type": "activity", "data": {"deal_id": str(deal_id)}}
+        await stream.aclose()
+
+
+async def create_test_user(client: AsyncClient):
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": f"live_test_{uuid4().hex}@example.com",
+            "password": "TestPassword123",
+            "name": "Live Test User",
+            "organization_name": "Live Test Org",
+        },
+    )
+    
+    access_token = response.json()["data"]["access_token"]
+    settings = Settings()
+    decoded = jwt.decode(access_token, settings.secret_key, algorithms=[settings.jwt_algorithm])
+    org_id = decoded["organization_id"]
+    
+    return {"Authorization": f"Bearer {access_token}", "X-Organization-Id": org_id}
+
+
+@pytest.mark.asyncio
+async def test_deal_update_is_published_after_commit(client: AsyncClient):
+    headers = await create_test_user(client)
+    contact_response = await client.post("/api/v1/contacts", json={"name": "Live Contact"}, headers=headers)
+    deal_response = await client.post(
+        "/api/v1/deals",
+        json={"contact_id": contact_response.json()["data"]["id"], "title": "Live Deal", "amount": 10.0},
+        headers=headers,
+    )
+    deal_id = deal_response.json()["data"]["id"]
+    broker = await container.get(LiveBroker, component="live")
+    
+    async with broker.subscribe(UUID(headers["X-Organization-Id"])) as queue:
+        await client.patch(f"/api/v1/deals/{deal_id}", json={"status": "in_progress"}, headers=headers)
+        
+        event = queue.get_nowait()
+        assert event["type"] == "activity"
+        assert event["data"]["deal_id"] == deal_id
+        assert event["data"]["type"] == "status_changed"
+        assert queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_bridge_delivers_notifications_after_commit():
+    broker = LiveBroker(queue_size=10)
+    listener = PostgresListener(await container.get(AsyncEngine, component="database"))
+    listener.subscribe(LIVE_CHANNEL, LiveBridge(broker).handle)
+    await listener.start()
+    await asyncio.wait_for(listener.wait_connected(), 5)
+    organization_id = uuid4()
+    activity = ActivityEntity.model_construct(
+        id=uuid4(), deal_id=uuid4(), author_id=None, type="comment", payload={"text": "hi"}, created_at=None
+    )
+    
+    try:
+        async with broker.subscribe(organization_id) as queue:
+            async with container() as request_container:
+                uow = await request_container.get(UnitOfWork, component="database")
+                publisher = LivePublisher(uow, broker, LiveNotificationRepository(uow.session), bridge_enabled=True)
+                async with uow:
+                    await publisher.publish(organization_id, "activity", [activity])
+                    await asyncio.sleep(0.1)
+                    assert queue.empty()
+            
+            event = await asyncio.wait_for(queue.get(), 5)
+            assert event["data"]["id"] == str(activity.id)
+            assert event["data"]["payload"] == {"text": "hi"}
+    finally:
+        await listener.stop()
@@ -0,0 +1,53 @@
+import os
+import pytest
+from uuid import uuid4
+from httpx import AsyncClient
+
+from core.metrics.registry import Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    
+    text = registry.render()
+    
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{route="/a"} 2' in text
+
+
+def test_multiprocess_snapshots_are_merged(tmp_path):
+    registry = Registry(str(tmp_path))
+    registry.counter("jobs_total", "Jobs").inc(2)
+    
+    # Снимок другого (живого) воркера: родительский процесс pytest
+    (tmp_path / f"{os.getppid()}.json").write_text(
+        '{"jobs_total": {"type": "counter", "help": "Jobs", "labelnames": [], '
+        '"buckets": [], "samples": {"[]": 3.0}}}'
+    )
+    
+    assert "jobs_total 5.0" in registry.render()
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposes_route_and_usecase_latency(client: AsyncClient):
+    await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": f"metrics_test_{uuid4().hex}@example.com",
+            "password": "TestPassword123",
+            "name": "Metrics Test User",
+            "organization_name": "Metrics Test Org",
+        },
+    )
+    
+    response = await client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert 'route="/api/v1/auth/register"' in response.text
+    assert 'usecase="RegisterUseCase",outcome="ok"' in response.text
+    assert "db_pool_checked_out" in response.text
@@ -0,0 +1,100 @@
+import pytest
+from httpx import AsyncClient
+
+from core.metrics import registry
+from core.tracing import tracer
+from tests.test_deals import create_test_user_and_contact
+
+
+class InMemoryExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans, service_name):
+        self.spans.extend(spans)
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemoryExporter()
+    tracer.configure(True, 1.0, [exporter])
+    yield exporter
+    tracer.configure(False, 1.0, [])
+
+
+@pytest.mark.asyncio
+async def test_deal_update_is_traced_down_to_sql(client: AsyncClient, exporter: InMemoryExporter):
+    access_token, org_id, contact_id = await create_test_user_and_contact(client)
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "X-Organization-Id": org_id,
+    }
+    create_response = await client.post(
+        "/api/v1/deals",
+        json={"contact_id": contact_id, "title": "Traced Deal", "amount": 100, "currency": "USD"},
+        headers=headers,
+    )
+    deal_id = create_response.json()["data"]["id"]
+    exporter.spans.clear()
+    
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    await client.patch(
+        f"/api/v1/deals/{deal_id}",
+        json={"stage": "proposal"},
+        headers={**headers, "traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"},
+    )
+    
+    spans = {span.name: span for span in exporter.spans}
+    server = spans["PATCH /api/v1/deals/{deal_id}"]
+    usecase = spans["UpdateDealUseCase"]
+    update = spans["DealRepository.update"]
+    
+    assert {span.trace_id for span in exporter.spans} == {trace_id}
+    assert server.parent_span_id == "00f067aa0ba902b7"
+    assert spans["auth.authenticate"].parent_span_id == server.span_id
+    assert usecase.parent_span_id == server.span_id
+    assert update.parent_span_id == usecase.span_id
+    assert any(
+        span.name == "UPDATE" and span.parent_span_id == update.span_id for span in exporter.spans
+    )
+
+
+@pytest.mark.asyncio
+async def test_streaming_export_is_traced_and_measured(client: AsyncClient, exporter: InMemoryExporter):
+    access_token, org_id, contact_id = await create_test_user_and_contact(client)
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "X-Organization-Id": org_id,
+    }
+    await client.post(
+        "/api/v1/deals",
+        json={"contact_id": contact_id, "title": "Exported Deal", "amount": 100, "currency": "USD"},
+        headers=headers,
+    )
+    exporter.spans.clear()
+    
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    for path in ("/api/v1/deals/export", "/api/v1/contacts/export"):
+        response = await client.get(
+            path, headers={**headers, "traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"}
+        )
+        assert response.status_code == 200
+    
+    spans = {span.name: span for span in exporter.spans}
+    for server_name, usecase_name in (
+        ("GET /api/v1/deals/export", "ExportDealsUseCase"),
+        ("GET /api/v1/contacts/export", "ExportContactsUseCase"),
+    ):
+        assert spans[usecase_name].parent_span_id == spans[server_name].span_id
+        assert spans[usecase_name].error is None
+        assert f'usecase="{usecase_name}",outcome="ok"' in registry.render()
+
+
+@pytest.mark.asyncio
+async def test_unsampled_traceparent_records_nothing(client: AsyncClient, exporter: InMemoryExporter):
+    await client.get(
+        "/api/v1/deals",
+        headers={"traceparent": "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-00"},
+    )
+    
+    assert exporter.spans == []
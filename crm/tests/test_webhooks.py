@@ -0,0 +1,278 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import pytest
+from datetime import timedelta
+from uuid import uuid4
+from httpx import AsyncClient
+import jwt
+from sqlalchemy import text
+
+from core.container import container
+from core.database.unit_of_work import UnitOfWork
+from core.environment.config import Settings
+from jobs.repositories import JobRepository
+from jobs.worker import Worker
+from auth.entities import AuthenticatedUser
+from users.enums import UserRole
+from webhooks.enums import WebhookEventType
+from webhooks.exceptions import WebhookDeliveryError, WebhookForbiddenUrlError
+from webhooks.repositories import WebhookSubscriptionRepository
+from webhooks.services import WebhookClient
+from webhooks.usecases import (
+    CreateWebhookSubscriptionUseCase,
+    DeliverWebhookBatchUseCase,
+    SweepWebhookEventsUseCase,
+)
+
+
+class StubReceiver:
+    """Локальный HTTP-сервер получателя: запоминает запросы и отвечает заданным статусом"""
+
+    def __init__(self, status: int = 200, on_request=None):
+        self.status = status
+        self.on_request = on_request
+        self.requests: list[tuple[dict, bytes]] = []
+        self._server = None
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/hook"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        head = await reader.readuntil(b"\r\n\r\n")
+        headers = {}
+        for line in head.decode().split("\r\n")[1:]:
+            if line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+        self.requests.append((headers, body))
+        if self.on_request:
+            await self.on_request()
+        writer.write(f"HTTP/1.1 {self.status} X\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        writer.close()
+
+
+async def create_deal_with_subscription(client: AsyncClient, url: str):
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": f"webhook_test_{uuid4().hex}@example.com",
+            "password": "TestPassword123",
+            "name": "Webhook Test User",
+            "organization_name": "Webhook Test Org",
+        },
+    )
+    access_token = response.json()["data"]["access_token"]
+    settings = Settings()
+    decoded = jwt.decode(access_token, settings.secret_key, algorithms=[settings.jwt_algorithm])
+    headers = {"Authorization": f"Bearer {access_token}", "X-Organization-Id": decoded["organization_id"]}
+    
+    contact_id = (await client.post(
+        "/api/v1/contacts", json={"name": "Webhook Contact"}, headers=headers
+    )).json()["data"]["id"]
+    deal_id = (await client.post(
+        "/api/v1/deals",
+        json={"contact_id": contact_id, "title": "Webhook Deal", "amount": 1000.0},
+        headers=headers,
+    )).json()["data"]["id"]
+    subscription = (await client.post(
+        "/api/v1/webhooks",
+        json={"url": url, "event_types": ["deal.status_changed", "deal.stage_changed"]},
+        headers=headers,
+    )).json()["data"]
+    
+    return headers, deal_id, subscription
+
+
+async def run_delivery(subscription_id: str):
+    """Сдвигает отложенное задание доставки на сейчас и прогоняет его воркером"""
+    async with container() as request_container:
+        uow = await request_container.get(UnitOfWork, component="database")
+        async with uow:
+            await uow.session.execute(
+                text("UPDATE jobs SET run_at = now() WHERE payload->>'subscription_id' = :id"),
+                {"id": subscription_id},
+            )
+    
+    worker = Worker(
+        container,
+        queues=["default"],
+        concurrency=4,
+        poll_interval=0.1,
+        lock_timeout=timedelta(seconds=60),
+        retry_base=60,
+        retry_max=600,
+        retention=timedelta(days=7),
+    )
+    await worker.run_once()
+    await worker.drain()
+
+
+async def get_delivery_job(subscription_id: str):
+    async with container() as request_container:
+        uow = await request_container.get(UnitOfWork, component="database")
+        job_id = await uow.session.scalar(
+            text("SELECT id FROM jobs WHERE payload->>'subscription_id' = :id"), {"id": subscription_id}
+        )
+        job_repository = await request_container.get(JobRepository, component="jobs")
+        return await job_repository.get_by_id(job_id)
+
+
+@pytest.mark.asyncio
+async def test_deal_changes_are_delivered_as_one_signed_batch(client: AsyncClient):
+    async with StubReceiver() as receiver:
+        headers, deal_id, subscription = await create_deal_with_subscription(client, receiver.url)
+        
+        await client.patch(f"/api/v1/deals/{deal_id}", json={"status": "in_progress"}, headers=headers)
+        await client.patch(f"/api/v1/deals/{deal_id}", json={"stage": "proposal"}, headers=headers)
+        await client.patch(f"/api/v1/deals/{deal_id}", json={"title": "No webhook"}, headers=headers)
+        
+        await run_delivery(subscription["id"])
+    
+    assert len(receiver.requests) == 1
+    request_headers, body = receiver.requests[0]
+    expected_signature = "sha256=" + hmac.new(
+        subscription["secret"].encode(), body, hashlib.sha256
+    ).hexdigest()
+    assert request_headers["x-crm-signature"] == expected_signature
+    
+    events = json.loads(body)["events"]
+    assert [event["type"] for event in events] == ["deal.status_changed", "deal.stage_changed"]
+    assert events[0]["data"]["deal_id"] == deal_id
+    assert events[0]["data"]["new_status"] == "in_progress"
+    assert events[1]["data"]["new_stage"] == "proposal"
+    
+    job = await get_delivery_job(subscription["id"])
+    assert job.status == "done"
+
+
+@pytest.mark.asyncio
+async def test_delivery_holds_no_transaction_during_post(client: AsyncClient):
+    leases = []
+    
+    async def check_subscription():
+        # Строка подписки не заблокирована, а аренда доставки взята
+        async with container() as request_container:
+            uow = await request_container.get(UnitOfWork, component="database")
+            async with uow:
+                leases.append(await uow.session.scalar(
+                    text("SELECT delivery_leased_until FROM webhook_subscriptions WHERE id = :id FOR UPDATE NOWAIT"),
+                    {"id": subscription["id"]},
+                ))
+            busy = await request_container.get(DeliverWebhookBatchUseCase, component="webhooks")
+            await busy(subscription["id"])
+    
+    async with StubReceiver(on_request=check_subscription) as receiver:
+        headers, deal_id, subscription = await create_deal_with_subscription(client, receiver.url)
+        await client.patch(f"/api/v1/deals/{deal_id}", json={"status": "won"}, headers=headers)
+        
+        await run_delivery(subscription["id"])
+    
+    assert len(receiver.requests) == 1
+    assert leases[0] is not None
+    async with container() as request_container:
+        uow = await request_container.get(UnitOfWork, component="database")
+        lease, rescheduled = (await uow.session.execute(
+            text(
+                "SELECT s.delivery_leased_until, (SELECT count(*) FROM jobs WHERE idempotency_key LIKE :key) "
+                "FROM webhook_subscriptions s WHERE s.id = :id"
+            ),
+            {"id": subscription["id"], "key": f"webhooks:{subscription['id']}:lease:%"},
+        )).one()
+    assert lease is None
+    # Задание, заставшее аренду, не ждало ее, а перенеслось на ее конец
+    assert rescheduled == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_delivery_is_retried_later(client: AsyncClient):
+    async with StubReceiver(status=503) as receiver:
+        headers, deal_id, subscription = await create_deal_with_subscription(client, receiver.url)
+        await client.patch(f"/api/v1/deals/{deal_id}", json={"status": "won"}, headers=headers)
+        
+        await run_delivery(subscription["id"])
+    
+    assert len(receiver.requests) == 1
+    job = await get_delivery_job(subscription["id"])
+    assert job.status == "pending"
+    assert "HTTP 503" in job.last_error
+
+
+@pytest.mark.asyncio
+async def test_late_committed_event_is_delivered_by_sweep(client: AsyncClient):
+    async with StubReceiver() as receiver:
+        headers, deal_id, subscription = await create_deal_with_subscription(client, receiver.url)
+        await client.patch(f"/api/v1/deals/{deal_id}", json={"status": "won"}, headers=headers)
+        await run_delivery(subscription["id"])
+        
+        # Транзакция окна закоммитилась после его задания: ключ окна уже занят
+        async with container() as request_container:
+            uow = await request_container.get(UnitOfWork, component="database")
+            async with uow:
+                await uow.session.execute(
+                    text(
+                        "INSERT INTO webhook_events (subscription_id, event_type, payload, created_at) "
+                        "VALUES (:id, 'deal.stage_changed', CAST(:payload AS json), now() - interval '10 minutes')"
+                    ),
+                    {"id": subscription["id"], "payload": json.dumps({"type": "deal.stage_changed"})},
+                )
+        
+        async with container() as request_container:
+            sweep = await request_container.get(SweepWebhookEventsUseCase, component="webhooks")
+            await sweep()
+            await sweep()
+            uow = await request_container.get(UnitOfWork, component="database")
+            sweep_jobs = await uow.session.scalar(
+                text("SELECT count(*) FROM jobs WHERE idempotency_key LIKE :key"),
+                {"key": f"webhooks:{subscription['id']}:sweep:%"},
+            )
+        assert sweep_jobs == 1
+        await run_delivery(subscription["id"])
+    
+    assert len(receiver.requests) == 2
+    events = json.loads(receiver.requests[1][1])["events"]
+    assert [event["type"] for event in events] == ["deal.stage_changed"]
+
+
+@pytest.mark.asyncio
+async def test_webhook_list_hides_secret(client: AsyncClient):
+    headers, _, _ = await create_deal_with_subscription(client, "http://127.0.0.1:9/hook")
+    
+    response = await client.get("/api/v1/webhooks", headers=headers)
+    
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 1
+    assert "secret" not in response.json()["data"][0]
+
+
+@pytest.mark.asyncio
+async def test_internal_addresses_are_rejected():
+    webhook_client = WebhookClient(timeout=1.0, per_host_concurrency=1)
+    async with StubReceiver() as receiver:
+        for url in (receiver.url, receiver.url.replace("127.0.0.1", "localhost"), "http://169.254.169.254/"):
+            with pytest.raises(WebhookDeliveryError, match="forbidden address"):
+                await webhook_client.send(url, "secret", "delivery", [])
+    await webhook_client.close()
+    assert receiver.requests == []
+    
+    owner = AuthenticatedUser(id=uuid4(), email="owner@example.com", organization_id=uuid4(), role=UserRole.OWNER)
+    async with container() as request_container:
+        uow = await request_container.get(UnitOfWork, component="database")
+        repository = await request_container.get(WebhookSubscriptionRepository, component="webhooks")
+        create_usecase = CreateWebhookSubscriptionUseCase(uow, repository)
+        for url in ("http://localhost:8000/hook", "http://10.0.0.5/hook", "http://[::ffff:127.0.0.1]/hook"):
+            with pytest.raises(WebhookForbiddenUrlError):
+                await create_usecase(owner, url, [WebhookEventType.DEAL_STATUS_CHANGED])
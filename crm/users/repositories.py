@@ -6,8 +6,10 @@ from typing import Optional
 
 from users.models import User, OrganizationMember
 from users.entities import UserEntity, UserEntityWithPassword, OrganizationMemberEntity
+from core.tracing import traced
 
 
+@traced
 class UserRepository:
     def __init__(self, session: AsyncSession):
         self._session = session
@@ -6,6 +6,7 @@ from dishka import FromComponent
 from users.schemas import UserResponse
 from users.usecases import GetCurrentUserUseCase
 from auth.entities import AuthenticatedUser
+from core.responses import PydanticJSONResponse
 
 
 router = APIRouter(
@@ -22,5 +23,5 @@ async def get_current_user(
 ):
     """Получить информацию о текущем пользователе"""
     user_info = await get_user_usecase(user.id)
-    return UserResponse(data=user_info)
+    return PydanticJSONResponse(UserResponse(data=user_info))
 
@@ -1,11 +1,13 @@
 from uuid import UUID
 
 from core.database.unit_of_work import UnitOfWork
+from core.metrics import instrumented
 from users.repositories import UserRepository
 from users.entities import UserEntity
 from users.exceptions import UserNotFoundError
 
 
+@instrumented
 class GetCurrentUserUseCase:
     def __init__(
         self,
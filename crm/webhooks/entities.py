@@ -0,0 +1,31 @@
+from pydantic import BaseModel, ConfigDict
+from uuid import UUID
+from datetime import datetime
+
+from webhooks.enums import WebhookEventType
+
+
+class WebhookSubscriptionEntity(BaseModel):
+    id: UUID
+    organization_id: UUID
+    url: str
+    event_types: list[WebhookEventType]
+    is_active: bool
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
+
+
+class WebhookSubscriptionWithSecretEntity(WebhookSubscriptionEntity):
+    """Секрет отдается только при создании подписки и читается воркером доставки"""
+    secret: str
+
+
+class WebhookEventEntity(BaseModel):
+    id: int
+    subscription_id: UUID
+    event_type: str
+    payload: dict
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
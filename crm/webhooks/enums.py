@@ -0,0 +1,13 @@
+from enum import Enum as PyEnum
+
+
+class WebhookEventType(str, PyEnum):
+    DEAL_STATUS_CHANGED = "deal.status_changed"
+    DEAL_STAGE_CHANGED = "deal.stage_changed"
+
+
+# Активности UpdateDealUseCase, которые уходят во внешние системы
+ACTIVITY_WEBHOOK_EVENTS = {
+    "status_changed": WebhookEventType.DEAL_STATUS_CHANGED,
+    "stage_changed": WebhookEventType.DEAL_STAGE_CHANGED,
+}
@@ -0,0 +1,23 @@
+from core.exceptions import BaseCustomException, BadRequestException, NotFoundException, ForbiddenException
+
+
+class WebhookSubscriptionNotFoundError(NotFoundException):
+    def __init__(self, message: str = "error.webhook.subscription_not_found"):
+        super().__init__(message)
+
+
+class WebhookAccessDeniedError(ForbiddenException):
+    def __init__(self, message: str = "error.webhook.access_denied"):
+        super().__init__(message)
+
+
+class WebhookForbiddenUrlError(BadRequestException):
+    def __init__(self, message: str = "error.webhook.forbidden_url"):
+        super().__init__(message)
+
+
+class WebhookDeliveryError(BaseCustomException):
+    """Получатель не принял пачку: задание доставки будет повторено с задержкой"""
+
+    def __init__(self, message: str = "error.webhook.delivery_failed"):
+        super().__init__(message)
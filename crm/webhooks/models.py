@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import BigInteger, Identity, String, DateTime, ForeignKey, Boolean, JSON, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.database.database import BaseModel
+
+
+class WebhookSubscription(BaseModel):
+    __tablename__ = "webhook_subscriptions"
+
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
+    organization_id: Mapped[UUID] = mapped_column(
+        ForeignKey("organizations.id"), nullable=False, index=True
+    )
+    url: Mapped[str] = mapped_column(String(2048), nullable=False)
+    # Ключ HMAC-подписи тела запроса (заголовок X-CRM-Signature)
+    secret: Mapped[str] = mapped_column(String(128), nullable=False)
+    event_types: Mapped[list] = mapped_column(JSON, nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    # Аренда доставки: пока она не истекла, пачки подписки отправляет один воркер
+    delivery_leased_until: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now()
+    )
+
+
+class WebhookEvent(BaseModel):
+    __tablename__ = "webhook_events"
+
+    # Порядковый номер: события подписки доставляются в порядке записи
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    subscription_id: Mapped[UUID] = mapped_column(
+        ForeignKey("webhook_subscriptions.id", ondelete="CASCADE"), nullable=False
+    )
+    event_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, default=func.now()
+    )
+
+    __table_args__ = (
+        # Таблица - очередь недоставленных событий: доставленные удаляются
+        Index("ix_webhook_events_subscription_id_id", "subscription_id", "id"),
+    )
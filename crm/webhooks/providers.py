@@ -0,0 +1,114 @@
+from datetime import timedelta
+from typing import Annotated, AsyncIterator
+from dishka import Provider, Scope, provide, FromComponent
+
+from webhooks.repositories import WebhookSubscriptionRepository, WebhookEventRepository
+from webhooks.services import WebhookClient, WebhookPublisher
+from webhooks.usecases import (
+    CreateWebhookSubscriptionUseCase,
+    ListWebhookSubscriptionsUseCase,
+    DeleteWebhookSubscriptionUseCase,
+    DeliverWebhookBatchUseCase,
+    SweepWebhookEventsUseCase,
+)
+from jobs.services import JobQueue
+from core.database.unit_of_work import UnitOfWork
+from core.environment.config import Settings
+
+
+class WebhookProvider(Provider):
+    scope = Scope.REQUEST
+    component = "webhooks"
+
+    @provide
+    def get_webhook_subscription_repository(
+        self, uow: Annotated[UnitOfWork, FromComponent("database")]
+    ) -> WebhookSubscriptionRepository:
+        return WebhookSubscriptionRepository(uow.session)
+
+    @provide
+    def get_webhook_event_repository(
+        self, uow: Annotated[UnitOfWork, FromComponent("database")]
+    ) -> WebhookEventRepository:
+        return WebhookEventRepository(uow.session)
+
+    @provide(scope=Scope.APP)
+    async def get_webhook_client(
+        self, settings: Annotated[Settings, FromComponent("environment")]
+    ) -> AsyncIterator[WebhookClient]:
+        client = WebhookClient(
+            settings.webhooks_timeout_seconds,
+            settings.webhooks_per_host_concurrency,
+            settings.webhooks_allow_private_hosts,
+        )
+        yield client
+        await client.close()
+
+    @provide
+    def get_webhook_publisher(
+        self,
+        subscription_repository: Annotated[WebhookSubscriptionRepository, FromComponent("webhooks")],
+        event_repository: Annotated[WebhookEventRepository, FromComponent("webhooks")],
+        job_queue: Annotated[JobQueue, FromComponent("jobs")],
+        settings: Annotated[Settings, FromComponent("environment")],
+    ) -> WebhookPublisher:
+        return WebhookPublisher(
+            subscription_repository, event_repository, job_queue, settings.webhooks_batch_window_seconds
+        )
+
+    @provide
+    def get_create_webhook_subscription_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        subscription_repository: Annotated[WebhookSubscriptionRepository, FromComponent("webhooks")],
+        settings: Annotated[Settings, FromComponent("environment")],
+    ) -> CreateWebhookSubscriptionUseCase:
+        return CreateWebhookSubscriptionUseCase(
+            uow, subscription_repository, settings.webhooks_allow_private_hosts
+        )
+
+    @provide
+    def get_list_webhook_subscriptions_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        subscription_repository: Annotated[WebhookSubscriptionRepository, FromComponent("webhooks")],
+    ) -> ListWebhookSubscriptionsUseCase:
+        return ListWebhookSubscriptionsUseCase(uow, subscription_repository)
+
+    @provide
+    def get_delete_webhook_subscription_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        subscription_repository: Annotated[WebhookSubscriptionRepository, FromComponent("webhooks")],
+    ) -> DeleteWebhookSubscriptionUseCase:
+        return DeleteWebhookSubscriptionUseCase(uow, subscription_repository)
+
+    @provide
+    def get_deliver_webhook_batch_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        subscription_repository: Annotated[WebhookSubscriptionRepository, FromComponent("webhooks")],
+        event_repository: Annotated[WebhookEventRepository, FromComponent("webhooks")],
+        webhook_client: Annotated[WebhookClient, FromComponent("webhooks")],
+        job_queue: Annotated[JobQueue, FromComponent("jobs")],
+        settings: Annotated[Settings, FromComponent("environment")],
+    ) -> DeliverWebhookBatchUseCase:
+        return DeliverWebhookBatchUseCase(
+            uow,
+            subscription_repository,
+            event_repository,
+            webhook_client,
+            job_queue,
+            settings.webhooks_batch_size,
+            timedelta(seconds=settings.webhooks_lease_seconds),
+        )
+
+    @provide
+    def get_sweep_webhook_events_usecase(
+        self,
+        uow: Annotated[UnitOfWork, FromComponent("database")],
+        event_repository: Annotated[WebhookEventRepository, FromComponent("webhooks")],
+        job_queue: Annotated[JobQueue, FromComponent("jobs")],
+        settings: Annotated[Settings, FromComponent("environment")],
+    ) -> SweepWebhookEventsUseCase:
+        return SweepWebhookEventsUseCase(uow, event_repository, job_queue, settings.webhooks_batch_window_seconds)
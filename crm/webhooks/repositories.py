@@ -0,0 +1,149 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import CursorResult, select, insert, update, delete, func, or_
+from uuid import UUID
+from typing import Optional, cast
+from datetime import datetime, timedelta
+
+from webhooks.models import WebhookSubscription, WebhookEvent
+from webhooks.entities import (
+    WebhookSubscriptionEntity,
+    WebhookSubscriptionWithSecretEntity,
+    WebhookEventEntity,
+)
+from core.tracing import traced
+
+
+SUBSCRIPTION_COLUMNS = tuple(
+    getattr(WebhookSubscription, field) for field in WebhookSubscriptionWithSecretEntity.model_fields
+)
+EVENT_COLUMNS = tuple(getattr(WebhookEvent, field) for field in WebhookEventEntity.model_fields)
+
+
+@traced
+class WebhookSubscriptionRepository:
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def create(self, subscription_data: dict) -> WebhookSubscriptionWithSecretEntity:
+        subscription = WebhookSubscription(**subscription_data)
+        self._session.add(subscription)
+        await self._session.flush()
+        return WebhookSubscriptionWithSecretEntity.model_validate(subscription)
+
+    async def get_by_id(self, subscription_id: UUID) -> Optional[WebhookSubscriptionEntity]:
+        query = select(*SUBSCRIPTION_COLUMNS).where(WebhookSubscription.id == subscription_id)
+        row = (await self._session.execute(query)).one_or_none()
+        if row:
+            return WebhookSubscriptionEntity.model_validate(row._mapping)
+        return None
+
+    async def list_by_organization(self, organization_id: UUID) -> list[WebhookSubscriptionEntity]:
+        query = (
+            select(*SUBSCRIPTION_COLUMNS)
+            .where(WebhookSubscription.organization_id == organization_id)
+            .order_by(WebhookSubscription.created_at)
+        )
+        result = await self._session.execute(query)
+        return [WebhookSubscriptionEntity.model_validate(row._mapping) for row in result]
+
+    async def list_active_by_organization(self, organization_id: UUID) -> list[tuple[UUID, list]]:
+        """(id, event_types) активных подписок; подписок у организации единицы"""
+        query = select(WebhookSubscription.id, WebhookSubscription.event_types).where(
+            WebhookSubscription.organization_id == organization_id,
+            WebhookSubscription.is_active.is_(True),
+        )
+        result = await self._session.execute(query)
+        return [(row.id, row.event_types) for row in result]
+
+    async def lease_active(
+        self, subscription_id: UUID, lease: timedelta
+    ) -> Optional[tuple[WebhookSubscriptionWithSecretEntity, datetime]]:
+        """
+        Берет аренду доставки активной подписки: пачки одной подписки доставляются
+        по очереди и в порядке событий, даже если задания попали к разным воркерам.
+
+        В отличие от блокировки строки аренда переживает commit, поэтому POST получателю
+        идет вне транзакции. Возвращает подписку и срок аренды (он же ее токен) или None,
+        если подписка неактивна или ее аренду держит другой воркер.
+        """
+        stmt = (
+            update(WebhookSubscription)
+            .where(
+                WebhookSubscription.id == subscription_id,
+                WebhookSubscription.is_active.is_(True),
+                or_(
+                    WebhookSubscription.delivery_leased_until.is_(None),
+                    WebhookSubscription.delivery_leased_until < func.now(),
+                ),
+            )
+            .values(delivery_leased_until=func.now() + lease)
+            .returning(*SUBSCRIPTION_COLUMNS, WebhookSubscription.delivery_leased_until)
+        )
+        row = (await self._session.execute(stmt)).one_or_none()
+        if row:
+            return WebhookSubscriptionWithSecretEntity.model_validate(row._mapping), row.delivery_leased_until
+        return None
+
+    async def get_active_lease(self, subscription_id: UUID) -> Optional[datetime]:
+        """Срок чужой аренды доставки активной подписки (None - аренды нет)"""
+        query = select(WebhookSubscription.delivery_leased_until).where(
+            WebhookSubscription.id == subscription_id,
+            WebhookSubscription.is_active.is_(True),
+            WebhookSubscription.delivery_leased_until >= func.now(),
+        )
+        return await self._session.scalar(query)
+
+    async def release_lease(self, subscription_id: UUID, leased_until: datetime) -> bool:
+        """Снимает аренду; False - она истекла и ее уже взял другой воркер"""
+        stmt = (
+            update(WebhookSubscription)
+            .where(
+                WebhookSubscription.id == subscription_id,
+                WebhookSubscription.delivery_leased_until == leased_until,
+            )
+            .values(delivery_leased_until=None)
+        )
+        result = cast(CursorResult, await self._session.execute(stmt))
+        return result.rowcount > 0
+
+    async def delete(self, subscription_id: UUID) -> bool:
+        stmt = delete(WebhookSubscription).where(WebhookSubscription.id == subscription_id)
+        result = cast(CursorResult, await self._session.execute(stmt))
+        return result.rowcount > 0
+
+
+@traced
+class WebhookEventRepository:
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def create_many(self, events_data: list[dict]):
+        if events_data:
+            await self._session.execute(insert(WebhookEvent), events_data)
+
+    async def list_pending(self, subscription_id: UUID, limit: int) -> list[WebhookEventEntity]:
+        query = (
+            select(*EVENT_COLUMNS)
+            .where(WebhookEvent.subscription_id == subscription_id)
+            .order_by(WebhookEvent.id)
+            .limit(limit)
+        )
+        result = await self._session.execute(query)
+        return [WebhookEventEntity.model_construct(**row._mapping) for row in result]
+
+    async def list_stale(self, created_before: datetime) -> list[tuple[UUID, int]]:
+        """
+        (подписка, id первого события) активных подписок с событиями старше created_before.
+        В таблице только недоставленные события, поэтому она мала и индекс по времени не нужен.
+        """
+        query = (
+            select(WebhookEvent.subscription_id, func.min(WebhookEvent.id).label("first_event_id"))
+            .join(WebhookSubscription, WebhookSubscription.id == WebhookEvent.subscription_id)
+            .where(WebhookEvent.created_at < created_before, WebhookSubscription.is_active.is_(True))
+            .group_by(WebhookEvent.subscription_id)
+        )
+        result = await self._session.execute(query)
+        return [(row.subscription_id, row.first_event_id) for row in result]
+
+    async def delete_delivered(self, event_ids: list[int]):
+        await self._session.execute(delete(WebhookEvent).where(WebhookEvent.id.in_(event_ids)))
@@ -0,0 +1,62 @@
+from typing import Annotated
+from uuid import UUID
+from fastapi import APIRouter, status
+from dishka.integrations.fastapi import inject
+from dishka import FromComponent
+
+from webhooks.schemas import (
+    CreateWebhookSubscriptionRequest,
+    WebhookSubscriptionCreatedResponse,
+    WebhookSubscriptionsListResponse,
+)
+from webhooks.usecases import (
+    CreateWebhookSubscriptionUseCase,
+    ListWebhookSubscriptionsUseCase,
+    DeleteWebhookSubscriptionUseCase,
+)
+from auth.entities import AuthenticatedUser
+from core.responses import PydanticJSONResponse
+
+
+router = APIRouter(
+    prefix="/api/v1/webhooks",
+    tags=["webhooks"],
+)
+
+
+@router.get("", response_model=WebhookSubscriptionsListResponse)
+@inject
+async def list_webhook_subscriptions(
+    user: Annotated[AuthenticatedUser, FromComponent("auth")],
+    list_usecase: Annotated[ListWebhookSubscriptionsUseCase, FromComponent("webhooks")],
+):
+    subscriptions = await list_usecase(user)
+    return PydanticJSONResponse(WebhookSubscriptionsListResponse(data=subscriptions))
+
+
+@router.post("", response_model=WebhookSubscriptionCreatedResponse, status_code=status.HTTP_201_CREATED)
+@inject
+async def create_webhook_subscription(
+    request: CreateWebhookSubscriptionRequest,
+    user: Annotated[AuthenticatedUser, FromComponent("auth")],
+    create_usecase: Annotated[CreateWebhookSubscriptionUseCase, FromComponent("webhooks")],
+):
+    """
+    Подписать URL на события сделок (только для owner/admin)
+    
+    В ответе - secret для проверки заголовка X-CRM-Signature; повторно он не отдается.
+    """
+    subscription = await create_usecase(user, str(request.url), request.event_types)
+    return PydanticJSONResponse(
+        WebhookSubscriptionCreatedResponse(data=subscription), status_code=status.HTTP_201_CREATED
+    )
+
+
+@router.delete("/{subscription_id}", status_code=204)
+@inject
+async def delete_webhook_subscription(
+    subscription_id: UUID,
+    user: Annotated[AuthenticatedUser, FromComponent("auth")],
+    delete_usecase: Annotated[DeleteWebhookSubscriptionUseCase, FromComponent("webhooks")],
+):
+    await delete_usecase(user, subscription_id)
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field, HttpUrl
+
+from webhooks.entities import WebhookSubscriptionEntity, WebhookSubscriptionWithSecretEntity
+from webhooks.enums import WebhookEventType
+
+
+class CreateWebhookSubscriptionRequest(BaseModel):
+    url: HttpUrl
+    event_types: list[WebhookEventType] = Field(min_length=1)
+
+
+class WebhookSubscriptionResponse(BaseModel):
+    data: WebhookSubscriptionEntity
+
+
+class WebhookSubscriptionCreatedResponse(BaseModel):
+    data: WebhookSubscriptionWithSecretEntity
+
+
+class WebhookSubscriptionsListResponse(BaseModel):
+    data: list[WebhookSubscriptionEntity]
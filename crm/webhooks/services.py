@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import math
+import socket
+import time
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+import httpx
+from pydantic_core import to_jsonable_python
+
+from core.metrics import webhook_batch_size, webhook_deliveries, webhook_delivery_duration
+from jobs.services import JobQueue
+from webhooks.enums import WebhookEventType
+from webhooks.exceptions import WebhookDeliveryError
+from webhooks.repositories import WebhookSubscriptionRepository, WebhookEventRepository
+
+
+DELIVER_WEBHOOKS_TASK = "webhooks.deliver"
+SWEEP_WEBHOOKS_TASK = "webhooks.sweep"
+
+
+def sign(secret: str, body: bytes) -> str:
+    return "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+def is_public_address(address: str) -> bool:
+    """Адрес в интернете: не loopback, не частная сеть, не link-local и не зарезервированный"""
+    ip = ipaddress.ip_address(address)
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def is_internal_url(url: str) -> bool:
+    """Хост URL заведомо внутренний: localhost или IP-адрес не из интернета (без DNS)"""
+    host = httpx.URL(url).host.rstrip(".").lower()
+    if host == "localhost" or host.endswith(".localhost"):
+        return True
+    try:
+        return not is_public_address(host)
+    except ValueError:
+        return False
+
+
+class WebhookPublisher:
+    """
+    Раскладывает события по подпискам организации и планирует их доставку.
+
+    События пишутся в webhook_events в транзакции use case, а доставка - одно
+    задание на подписку и окно batch_window: все события окна уходят одной пачкой.
+    Задание запускается через окно после конца своего окна, чтобы транзакции,
+    записавшие события окна, успели закоммититься. Если транзакция закоммитилась
+    позже, ключ задания окна уже занят: ее события доставит периодическое задание
+    webhooks.sweep.
+    """
+
+    def __init__(
+        self,
+        subscription_repository: WebhookSubscriptionRepository,
+        event_repository: WebhookEventRepository,
+        job_queue: JobQueue,
+        batch_window: float,
+    ):
+        self._subscription_repository = subscription_repository
+        self._event_repository = event_repository
+        self._job_queue = job_queue
+        self._batch_window = batch_window
+
+    async def publish(self, organization_id: UUID, events: list[tuple[WebhookEventType, dict]]):
+        if not events:
+            return
+        subscriptions = await self._subscription_repository.list_active_by_organization(organization_id)
+        if not subscriptions:
+            return
+
+        occurred_at = datetime.now(timezone.utc)
+        events_data = []
+        scheduled: set[UUID] = set()
+        for event_type, data in events:
+            payload = {
+                "id": str(uuid4()),
+                "type": event_type.value,
+                "occurred_at": occurred_at.isoformat(),
+                "data": to_jsonable_python(data),
+            }
+            for subscription_id, event_types in subscriptions:
+                if event_type.value in event_types:
+                    events_data.append({
+                        "subscription_id": subscription_id,
+                        "event_type": event_type.value,
+                        "payload": payload,
+                        "created_at": occurred_at,
+                    })
+                    scheduled.add(subscription_id)
+        await self._event_repository.create_many(events_data)
+
+        window_end = math.floor(occurred_at.timestamp() / self._batch_window + 1) * self._batch_window
+        run_at = datetime.fromtimestamp(window_end + self._batch_window, timezone.utc)
+        for subscription_id in scheduled:
+            await self._job_queue.enqueue(
+                DELIVER_WEBHOOKS_TASK,
+                {"subscription_id": subscription_id},
+                idempotency_key=f"webhooks:{subscription_id}:{window_end:.3f}",
+                run_at=run_at,
+            )
+
+
+class WebhookClient:
+    """
+    HTTP-клиент доставки: общий пул соединений httpx на процесс и не больше
+    per_host_concurrency одновременных запросов к одному хосту получателя,
+    чтобы медленный получатель не занимал все слоты воркера.
+
+    URL задает администратор организации, поэтому хост резолвится при каждой отправке,
+    внутренние адреса отклоняются (SSRF), а запрос идет на проверенный адрес, чтобы
+    повторный резолв не подменил его. allow_private_hosts снимает проверку (локальные стенды).
+    """
+
+    def __init__(self, timeout: float, per_host_concurrency: int, allow_private_hosts: bool = False):
+        self._client = httpx.AsyncClient(timeout=timeout, follow_redirects=False)
+        self._per_host_concurrency = per_host_concurrency
+        self._allow_private_hosts = allow_private_hosts
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).netloc.decode("ascii")
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self._per_host_concurrency)
+        return semaphore
+
+    async def send(self, url: str, secret: str, delivery_id: str, events: list[dict]):
+        body = json.dumps({"delivery_id": delivery_id, "events": events}).encode("utf-8")
+        headers = {
+            "Content-Type": "application/json",
+            "X-CRM-Delivery": delivery_id,
+            "X-CRM-Signature": sign(secret, body),
+        }
+        webhook_batch_size.observe(len(events))
+
+        request = self._client.build_request("POST", url, content=body, headers=headers)
+        if not self._allow_private_hosts:
+            await self._pin_public_address(request)
+
+        async with self._semaphore(url):
+            started = time.perf_counter()
+            try:
+                response = await self._client.send(request)
+            except httpx.HTTPError as exc:
+                self._observe("error", started)
+                raise WebhookDeliveryError(f"error.webhook.delivery_failed: {type(exc).__name__}") from exc
+
+        if not response.is_success:
+            self._observe(f"{response.status_code // 100}xx", started)
+            raise WebhookDeliveryError(f"error.webhook.delivery_failed: HTTP {response.status_code}")
+        self._observe("ok", started)
+
+    async def _pin_public_address(self, request: httpx.Request):
+        """Направляет запрос на адрес хоста, если все его адреса в интернете"""
+        url = request.url
+        try:
+            addresses = await asyncio.get_running_loop().getaddrinfo(
+                url.host, url.port or (443 if url.scheme == "https" else 80), type=socket.SOCK_STREAM
+            )
+        except socket.gaierror as exc:
+            webhook_deliveries.inc(outcome="error")
+            raise WebhookDeliveryError("error.webhook.delivery_failed: unresolved host") from exc
+        hosts = [str(address[4][0]) for address in addresses]
+        if not hosts or not all(is_public_address(host) for host in hosts):
+            webhook_deliveries.inc(outcome="forbidden")
+            raise WebhookDeliveryError("error.webhook.delivery_failed: forbidden address")
+
+        # Host и SNI остаются исходными: виртуальный хост и проверка сертификата не меняются
+        request.url = url.copy_with(host=hosts[0])
+        request.headers["Host"] = url.netloc.decode("ascii")
+        if url.scheme == "https":
+            request.extensions["sni_hostname"] = url.host
+
+    def _observe(self, outcome: str, started: float):
+        webhook_deliveries.inc(outcome=outcome)
+        webhook_delivery_duration.observe(time.perf_counter() - started, outcome=outcome)
+
+    async def close(self):
+        await self._client.aclose()
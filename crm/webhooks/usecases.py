@@ -0,0 +1,200 @@
+import secrets
+from uuid import UUID, uuid4
+from datetime import datetime, timedelta, timezone
+
+from core.database.unit_of_work import UnitOfWork
+from core.metrics import instrumented
+from jobs.registry import job_handler
+from jobs.services import JobQueue
+from webhooks.repositories import WebhookSubscriptionRepository, WebhookEventRepository
+from webhooks.services import WebhookClient, is_internal_url, DELIVER_WEBHOOKS_TASK, SWEEP_WEBHOOKS_TASK
+from webhooks.entities import WebhookSubscriptionEntity, WebhookSubscriptionWithSecretEntity
+from webhooks.enums import WebhookEventType
+from webhooks.exceptions import (
+    WebhookSubscriptionNotFoundError,
+    WebhookAccessDeniedError,
+    WebhookForbiddenUrlError,
+)
+from users.enums import UserRole
+from auth.entities import AuthenticatedUser
+
+
+SWEEP_INTERVAL_SECONDS = 60
+
+
+def check_can_manage_webhooks(user: AuthenticatedUser):
+    # Подписка отправляет данные организации наружу: только owner и admin
+    if user.role not in [UserRole.OWNER.value, UserRole.ADMIN.value]:
+        raise WebhookAccessDeniedError()
+
+
+@instrumented
+class CreateWebhookSubscriptionUseCase:
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        subscription_repository: WebhookSubscriptionRepository,
+        allow_private_hosts: bool = False,
+    ):
+        self._uow = uow
+        self._subscription_repository = subscription_repository
+        self._allow_private_hosts = allow_private_hosts
+
+    async def __call__(
+        self, user: AuthenticatedUser, url: str, event_types: list[WebhookEventType]
+    ) -> WebhookSubscriptionWithSecretEntity:
+        check_can_manage_webhooks(user)
+        # Заведомо внутренние хосты отклоняем сразу; имена проверяет резолв при доставке
+        if not self._allow_private_hosts and is_internal_url(url):
+            raise WebhookForbiddenUrlError()
+        async with self._uow:
+            subscription_data = {
+                "id": uuid4(),
+                "organization_id": user.organization_id,
+                "url": url,
+                "secret": secrets.token_hex(32),
+                "event_types": [event_type.value for event_type in dict.fromkeys(event_types)],
+                "is_active": True,
+                "created_at": datetime.now(timezone.utc),
+            }
+            return await self._subscription_repository.create(subscription_data)
+
+
+@instrumented
+class ListWebhookSubscriptionsUseCase:
+    def __init__(self, uow: UnitOfWork, subscription_repository: WebhookSubscriptionRepository):
+        self._uow = uow
+        self._subscription_repository = subscription_repository
+
+    async def __call__(self, user: AuthenticatedUser) -> list[WebhookSubscriptionEntity]:
+        check_can_manage_webhooks(user)
+        async with self._uow:
+            return await self._subscription_repository.list_by_organization(user.organization_id)
+
+
+@instrumented
+class DeleteWebhookSubscriptionUseCase:
+    def __init__(self, uow: UnitOfWork, subscription_repository: WebhookSubscriptionRepository):
+        self._uow = uow
+        self._subscription_repository = subscription_repository
+
+    async def __call__(self, user: AuthenticatedUser, subscription_id: UUID):
+        check_can_manage_webhooks(user)
+        async with self._uow:
+            subscription = await self._subscription_repository.get_by_id(subscription_id)
+            if not subscription or subscription.organization_id != user.organization_id:
+                raise WebhookSubscriptionNotFoundError()
+            
+            await self._subscription_repository.delete(subscription_id)
+
+
+@job_handler(DELIVER_WEBHOOKS_TASK, component="webhooks")
+@instrumented
+class DeliverWebhookBatchUseCase:
+    """
+    Задание воркера: отправляет пачку недоставленных событий подписки одним POST.
+
+    Пачку выбирают и арендуют подписку в одной короткой транзакции, POST идет вне
+    транзакции, доставленные события удаляются во второй. Медленный получатель не держит
+    соединение пула и не задерживает xmin снимков (лента изменений, водяной знак BI).
+    Аренда подписки сохраняет порядок пачек; задание, заставшее чужую аренду,
+    переносится на ее конец. Ошибка получателя снимает аренду, события остаются
+    недоставленными, а задание повторяется воркером с экспоненциальной задержкой.
+    """
+
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        subscription_repository: WebhookSubscriptionRepository,
+        event_repository: WebhookEventRepository,
+        webhook_client: WebhookClient,
+        job_queue: JobQueue,
+        batch_size: int,
+        lease: timedelta,
+    ):
+        self._uow = uow
+        self._subscription_repository = subscription_repository
+        self._event_repository = event_repository
+        self._webhook_client = webhook_client
+        self._job_queue = job_queue
+        self._batch_size = batch_size
+        self._lease = lease
+
+    async def __call__(self, subscription_id: str):
+        subscription_uuid = UUID(subscription_id)
+        async with self._uow:
+            leased = await self._subscription_repository.lease_active(subscription_uuid, self._lease)
+            if not leased:
+                leased_until = await self._subscription_repository.get_active_lease(subscription_uuid)
+                if leased_until:
+                    # Пачку подписки сейчас отправляет другой воркер: продолжим после его аренды
+                    await self._job_queue.enqueue(
+                        DELIVER_WEBHOOKS_TASK,
+                        {"subscription_id": subscription_id},
+                        idempotency_key=f"webhooks:{subscription_id}:lease:{leased_until.timestamp():.6f}",
+                        run_at=leased_until,
+                    )
+                return
+
+            subscription, leased_until = leased
+            events = await self._event_repository.list_pending(subscription_uuid, self._batch_size + 1)
+            if not events:
+                await self._subscription_repository.release_lease(subscription_uuid, leased_until)
+                return
+
+        batch = events[:self._batch_size]
+        # Один и тот же id у повторов пачки: получатель может отбрасывать дубли
+        delivery_id = f"{subscription_id}:{batch[0].id}-{batch[-1].id}"
+        try:
+            await self._webhook_client.send(
+                subscription.url, subscription.secret, delivery_id, [event.payload for event in batch]
+            )
+        except Exception:
+            async with self._uow:
+                await self._subscription_repository.release_lease(subscription_uuid, leased_until)
+            raise
+
+        async with self._uow:
+            await self._event_repository.delete_delivered([event.id for event in batch])
+            await self._subscription_repository.release_lease(subscription_uuid, leased_until)
+
+            if len(events) > self._batch_size:
+                await self._job_queue.enqueue(
+                    DELIVER_WEBHOOKS_TASK,
+                    {"subscription_id": subscription_id},
+                    idempotency_key=f"webhooks:{subscription_id}:after:{batch[-1].id}",
+                )
+
+
+@job_handler(SWEEP_WEBHOOKS_TASK, component="webhooks", every=SWEEP_INTERVAL_SECONDS)
+@instrumented
+class SweepWebhookEventsUseCase:
+    """
+    Периодическое задание: ставит доставку подпискам, у которых остались события
+    старше двух окон. Так доставляются события транзакций, закоммитившихся после
+    задания своего окна.
+    """
+
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        event_repository: WebhookEventRepository,
+        job_queue: JobQueue,
+        batch_window: float,
+    ):
+        self._uow = uow
+        self._event_repository = event_repository
+        self._job_queue = job_queue
+        self._batch_window = batch_window
+
+    async def __call__(self):
+        stale_after = timedelta(seconds=max(2 * self._batch_window, SWEEP_INTERVAL_SECONDS))
+        async with self._uow:
+            stale = await self._event_repository.list_stale(datetime.now(timezone.utc) - stale_after)
+            for subscription_id, first_event_id in stale:
+                # Ключ по первому событию: пока оно не доставлено, повторный обход дубля не создаст
+                await self._job_queue.enqueue(
+                    DELIVER_WEBHOOKS_TASK,
+                    {"subscription_id": subscription_id},
+                    idempotency_key=f"webhooks:{subscription_id}:sweep:{first_event_id}",
+                )